@@ -0,0 +1,46 @@
+"""add_ai_analysis_tasks_table
+
+Revision ID: 5b8e3f1a7c2d
+Revises: d064a2ea4323
+Create Date: 2026-10-17 09:12:40.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e3f1a7c2d'
+down_revision = 'd064a2ea4323'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_analysis_tasks',
+    sa.Column('task_id', sa.String(length=36), nullable=False, comment='任务ID (UUID)'),
+    sa.Column('user_id', sa.BigInteger(), nullable=False, comment='用户ID'),
+    sa.Column('analysis_type', sa.String(length=50), nullable=False, comment='分析类型: daily'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='任务状态: pending/processing/completed/partial/failed'),
+    sa.Column('stock_symbols', sa.JSON(), nullable=False, comment='股票代码列表'),
+    sa.Column('total_stocks', sa.Integer(), nullable=False, comment='股票总数'),
+    sa.Column('processed_stocks', sa.Integer(), nullable=False, comment='分析成功数量'),
+    sa.Column('failed_stocks', sa.Integer(), nullable=False, comment='分析失败数量'),
+    sa.Column('results', sa.JSON(), nullable=True, comment='逐只股票结果 [{symbol, status, decision_id, error}]'),
+    sa.Column('error_message', sa.Text(), nullable=True, comment='任务级错误信息'),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False, comment='是否删除'),
+    sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=True, comment='开始执行时间'),
+    sa.Column('completed_at', sa.TIMESTAMP(timezone=True), nullable=True, comment='完成时间'),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False, comment='创建时间'),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False, comment='更新时间'),
+    sa.Column('deleted_at', sa.TIMESTAMP(timezone=True), nullable=True, comment='删除时间'),
+    sa.PrimaryKeyConstraint('task_id')
+    )
+    op.create_index('idx_ai_analysis_tasks_user_created', 'ai_analysis_tasks', ['user_id', 'created_at'], unique=False)
+    op.create_index('idx_ai_analysis_tasks_status', 'ai_analysis_tasks', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ai_analysis_tasks_status', table_name='ai_analysis_tasks')
+    op.drop_index('idx_ai_analysis_tasks_user_created', table_name='ai_analysis_tasks')
+    op.drop_table('ai_analysis_tasks')
@@ -0,0 +1,28 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 9a4c6e2d8f13
+Revises: 5b8e3f1a7c2d
+Create Date: 2026-10-17 11:02:19.554871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4c6e2d8f13'
+down_revision = '5b8e3f1a7c2d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 游标分页按 (排序列..., 主键) 定位，复合索引可直接范围扫描
+    # 事件列表复用已有的 idx_events_user_date (user_id, event_date)
+    op.create_index('idx_trades_user_date', 'trades', ['user_id', 'trade_date', 'created_at', 'trade_id'], unique=False)
+    op.create_index('idx_ai_decisions_user_created', 'ai_decisions', ['user_id', 'created_at', 'decision_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ai_decisions_user_created', table_name='ai_decisions')
+    op.drop_index('idx_trades_user_date', table_name='trades')
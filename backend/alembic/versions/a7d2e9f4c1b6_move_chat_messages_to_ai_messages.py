@@ -0,0 +1,76 @@
+"""move_chat_messages_to_ai_messages
+
+Revision ID: a7d2e9f4c1b6
+Revises: f1a5c8d3b7e2
+Create Date: 2026-10-17 19:05:12.604937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2e9f4c1b6'
+down_revision = 'f1a5c8d3b7e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('ai_messages',
+    sa.Column('message_id', sa.BigInteger(), autoincrement=True, nullable=False, comment='消息ID'),
+    sa.Column('conversation_id', sa.BigInteger(), nullable=False, comment='会话ID'),
+    sa.Column('seq', sa.Integer(), nullable=False, comment='会话内序号（从1开始递增）'),
+    sa.Column('role', sa.String(length=20), nullable=False, comment='角色: user/assistant/system'),
+    sa.Column('content', sa.Text(), nullable=False, comment='消息内容'),
+    sa.Column('tokens', sa.Integer(), nullable=True, comment='消息Token数（未统计时为空）'),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False, comment='创建时间'),
+    sa.PrimaryKeyConstraint('message_id')
+    )
+    op.create_index('uq_ai_messages_conversation_seq', 'ai_messages', ['conversation_id', 'seq'], unique=True)
+
+    # 将 messages JSON 数组按原顺序拆成消息行（数组下标即 seq）
+    op.execute(
+        """
+        INSERT INTO ai_messages (conversation_id, seq, role, content, created_at)
+        SELECT c.conversation_id,
+               m.seq,
+               coalesce(m.value ->> 'role', 'user'),
+               coalesce(m.value ->> 'content', ''),
+               coalesce((m.value ->> 'timestamp')::timestamptz, c.created_at)
+        FROM ai_conversations AS c
+        CROSS JOIN LATERAL json_array_elements(c.messages) WITH ORDINALITY AS m(value, seq)
+        WHERE json_typeof(c.messages) = 'array'
+        """
+    )
+
+    op.drop_column('ai_conversations', 'messages')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'ai_conversations',
+        sa.Column('messages', sa.JSON(), server_default='[]', nullable=False, comment='消息列表 [{role, content, timestamp}]')
+    )
+
+    # 按 seq 将消息行聚合回 JSON 数组
+    op.execute(
+        """
+        UPDATE ai_conversations AS c
+        SET messages = m.messages
+        FROM (
+            SELECT conversation_id,
+                   json_agg(
+                       json_build_object('role', role, 'content', content, 'timestamp', created_at)
+                       ORDER BY seq
+                   ) AS messages
+            FROM ai_messages
+            GROUP BY conversation_id
+        ) AS m
+        WHERE c.conversation_id = m.conversation_id
+        """
+    )
+    op.alter_column('ai_conversations', 'messages', server_default=None)
+
+    op.drop_index('uq_ai_messages_conversation_seq', table_name='ai_messages')
+    op.drop_table('ai_messages')
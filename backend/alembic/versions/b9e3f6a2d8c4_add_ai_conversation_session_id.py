@@ -0,0 +1,35 @@
+"""add_ai_conversation_session_id
+
+Revision ID: b9e3f6a2d8c4
+Revises: a7d2e9f4c1b6
+Create Date: 2026-10-17 19:47:30.218755
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e3f6a2d8c4'
+down_revision = 'a7d2e9f4c1b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'ai_conversations',
+        sa.Column('session_id', sa.String(length=64), nullable=True, comment='会话ID（UUID）')
+    )
+
+    # 旧版本把会话ID（36位UUID）写入 context_symbol（varchar(20)），在 Postgres 上无法写入成功，
+    # 已有记录没有可恢复的会话ID，分配新的随机会话ID
+    op.execute("UPDATE ai_conversations SET session_id = gen_random_uuid()::text")
+
+    op.alter_column('ai_conversations', 'session_id', nullable=False)
+    op.create_index('uq_ai_conversations_session_live', 'ai_conversations', ['session_id'], unique=True, postgresql_where=sa.text('is_deleted = false'))
+
+
+def downgrade() -> None:
+    op.drop_index('uq_ai_conversations_session_live', table_name='ai_conversations')
+    op.drop_column('ai_conversations', 'session_id')
@@ -0,0 +1,31 @@
+"""add_soft_delete_partial_indexes
+
+Revision ID: c3d7a9e1b5f2
+Revises: 9a4c6e2d8f13
+Create Date: 2026-10-17 14:26:41.308215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d7a9e1b5f2'
+down_revision = '9a4c6e2d8f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 部分索引只包含未删除记录，Repository 的查询条件 is_deleted = false 与索引谓词一致时才会被选用
+    op.create_index('idx_holdings_account_symbol_live', 'holdings', ['account_id', 'symbol'], unique=False, postgresql_where=sa.text('is_deleted = false'))
+    op.create_index('idx_trades_account_date_live', 'trades', ['account_id', 'trade_date'], unique=False, postgresql_where=sa.text('is_deleted = false'))
+    op.create_index('idx_events_user_date_live', 'events', ['user_id', 'event_date'], unique=False, postgresql_where=sa.text('is_deleted = false'))
+    op.create_index('idx_strategies_user_status_live', 'strategies', ['user_id', 'status'], unique=False, postgresql_where=sa.text('is_deleted = false'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_strategies_user_status_live', table_name='strategies')
+    op.drop_index('idx_events_user_date_live', table_name='events')
+    op.drop_index('idx_trades_account_date_live', table_name='trades')
+    op.drop_index('idx_holdings_account_symbol_live', table_name='holdings')
@@ -0,0 +1,29 @@
+"""add_ai_conversation_summary
+
+Revision ID: d4c8a1f7e3b5
+Revises: b9e3f6a2d8c4
+Create Date: 2026-10-17 20:31:08.447219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4c8a1f7e3b5'
+down_revision = 'b9e3f6a2d8c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('ai_conversations', sa.Column('summary', sa.Text(), nullable=True, comment='早期对话摘要'))
+    op.add_column(
+        'ai_conversations',
+        sa.Column('summary_seq', sa.Integer(), server_default='0', nullable=False, comment='已折叠进摘要的最大消息序号')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('ai_conversations', 'summary_seq')
+    op.drop_column('ai_conversations', 'summary')
@@ -0,0 +1,42 @@
+"""add_symbol_analysis_snapshots
+
+Revision ID: e5f9b2c7d1a3
+Revises: d4c8a1f7e3b5
+Create Date: 2026-10-17 22:06:51.730942
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f9b2c7d1a3'
+down_revision = 'd4c8a1f7e3b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('symbol_analysis_snapshots',
+    sa.Column('snapshot_id', sa.BigInteger(), autoincrement=True, nullable=False, comment='快照ID'),
+    sa.Column('symbol', sa.String(length=20), nullable=False, comment='股票代码'),
+    sa.Column('stock_name', sa.String(length=100), nullable=True, comment='股票名称'),
+    sa.Column('input_hash', sa.String(length=64), nullable=False, comment='分析输入哈希'),
+    sa.Column('ai_score', sa.JSON(), nullable=True, comment='AI评分详情 {fundamental_score, technical_score, valuation_score, overall_score}'),
+    sa.Column('ai_suggestion', sa.Text(), nullable=False, comment='AI建议'),
+    sa.Column('ai_strategy', sa.JSON(), nullable=True, comment='AI策略 {target_price, recommended_position, risk_level, holding_period, stop_loss_price}'),
+    sa.Column('ai_reasons', postgresql.ARRAY(sa.Text()), nullable=True, comment='AI理由列表'),
+    sa.Column('confidence_level', sa.NUMERIC(precision=10, scale=4), nullable=True, comment='置信度 (0-100)'),
+    sa.Column('expires_at', sa.TIMESTAMP(timezone=True), nullable=False, comment='过期时间'),
+    sa.Column('created_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False, comment='创建时间'),
+    sa.PrimaryKeyConstraint('snapshot_id')
+    )
+    op.create_index('idx_symbol_analysis_snapshots_hash', 'symbol_analysis_snapshots', ['input_hash', 'expires_at'], unique=False)
+    op.add_column('ai_decisions', sa.Column('snapshot_id', sa.BigInteger(), nullable=True, comment='个股分析快照ID'))
+
+
+def downgrade() -> None:
+    op.drop_column('ai_decisions', 'snapshot_id')
+    op.drop_index('idx_symbol_analysis_snapshots_hash', table_name='symbol_analysis_snapshots')
+    op.drop_table('symbol_analysis_snapshots')
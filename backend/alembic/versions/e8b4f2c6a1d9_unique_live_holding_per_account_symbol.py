@@ -0,0 +1,41 @@
+"""unique_live_holding_per_account_symbol
+
+Revision ID: e8b4f2c6a1d9
+Revises: c3d7a9e1b5f2
+Create Date: 2026-10-17 16:08:52.730164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b4f2c6a1d9'
+down_revision = 'c3d7a9e1b5f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 旧的逐只 upsert 查不到已有持仓，可能为同一账户同一股票插入了多条记录，只保留最新一条
+    op.execute(
+        """
+        UPDATE holdings AS h
+        SET is_deleted = true, deleted_at = now()
+        FROM holdings AS newer
+        WHERE h.account_id = newer.account_id
+          AND h.symbol = newer.symbol
+          AND h.is_deleted = false
+          AND newer.is_deleted = false
+          AND h.holding_id < newer.holding_id
+        """
+    )
+
+    # 持仓同步的 ON CONFLICT (account_id, symbol) 需要唯一索引作为冲突目标
+    op.drop_index('idx_holdings_account_symbol_live', table_name='holdings')
+    op.create_index('idx_holdings_account_symbol_live', 'holdings', ['account_id', 'symbol'], unique=True, postgresql_where=sa.text('is_deleted = false'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_holdings_account_symbol_live', table_name='holdings')
+    op.create_index('idx_holdings_account_symbol_live', 'holdings', ['account_id', 'symbol'], unique=False, postgresql_where=sa.text('is_deleted = false'))
@@ -0,0 +1,30 @@
+"""add_user_token_version
+
+Revision ID: f1a5c8d3b7e2
+Revises: e8b4f2c6a1d9
+Create Date: 2026-10-17 18:20:41.318502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a5c8d3b7e2'
+down_revision = 'e8b4f2c6a1d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column(
+            'token_version', sa.Integer(), server_default='0', nullable=False,
+            comment='令牌版本（停用账户或修改密码时递增，使已签发的令牌失效）'
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
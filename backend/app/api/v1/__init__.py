@@ -17,6 +17,7 @@ from app.api.v1 import (
     settings_api,
     export_api,
     strategy_api,
+    system_api,
 )
 
 api_router = APIRouter()
@@ -57,3 +58,6 @@ api_router.include_router(export_api.router, tags=["数据导出"])
 
 # 操作策略管理
 api_router.include_router(strategy_api.router, tags=["操作策略管理"])
+
+# 系统诊断
+api_router.include_router(system_api.router, tags=["系统诊断"])
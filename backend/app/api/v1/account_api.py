@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only
 from app.schemas.common import Response
 from app.models.user import User
 from app.services.account import (
@@ -80,7 +80,9 @@ class AccountDeleteRequest(BaseModel):
 
 @router.post("/query")
 async def query_accounts(
-    request: AccountQueryRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: AccountQueryRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     查询账户列表
@@ -189,7 +191,9 @@ async def query_accounts(
 
 @router.post("/detail")
 async def get_account_detail(
-    request: AccountDetailRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: AccountDetailRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     获取账户详情
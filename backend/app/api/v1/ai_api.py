@@ -10,14 +10,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only, get_diagnostics_admin
 from app.models.user import User
 from app.schemas.common import Response
+from app.utils.sse import sse_response
 from app.services.ai import (
     DailyAnalysisService,
     SingleAnalysisService,
     DailyReviewService,
     AIChatService,
+    AIDiagnosticsService,
 )
 
 
@@ -58,6 +60,7 @@ class AISuggestionsRequest(BaseModel):
     action: Optional[str] = Field(None, description="操作类型筛选：buy/sell/hold/observe")
     page: int = Field(1, ge=1)
     page_size: int = Field(20, ge=1, le=100)
+    cursor: Optional[str] = Field(None, description="分页游标（上一页返回的next_cursor，传入时忽略page）")
 
 
 class DailyReviewGenerateRequest(BaseModel):
@@ -116,7 +119,7 @@ async def create_daily_analysis(
     ========================================
     接口路径: POST /api/v1/ai/daily-analysis/create
     对应页面: pages/ai/daily-analysis.vue - AI批量分析页
-    接口功能: 创建AI批量分析任务，异步处理多只股票的分析
+    接口功能: 创建AI批量分析任务，立即返回任务ID，后台异步分析多只股票
 
     ========================================
     请求参数
@@ -142,16 +145,19 @@ async def create_daily_analysis(
     执行流程（时序）
     ========================================
     1. 接收请求，提取用户ID和股票列表
-    2. 调用Service生成任务ID和任务信息
-    3. （TODO）创建Celery异步任务
-    4. 返回任务信息供前端轮询
+    2. Service校验股票列表，写入ai_analysis_tasks任务记录（pending）
+    3. 投递后台任务（TASK_QUEUE_BACKEND: celery worker / 进程内local）
+    4. 返回任务信息供前端轮询 /daily-analysis/results
+
+    后台任务：批量获取行情后并发分析各股票（任务内并发数、全局行情/AI调用并发均有上限），
+    每完成一只股票即保存决策并更新任务进度。
 
     ========================================
     业务规则
     ========================================
     1. 股票代码列表不能为空
-    2. 单次最多支持100只股票
-    3. 任务状态：pending/processing/completed/failed
+    2. 单次最多支持100只股票（AI_BATCH_MAX_SYMBOLS），重复代码自动去重
+    3. 任务状态：pending/processing/completed/partial/failed
     4. 预估每只股票消耗1500 tokens，耗时3秒
 
     ========================================
@@ -171,6 +177,7 @@ async def create_daily_analysis(
     修改记录
     ========================================
     2025-11-18: 初始版本 - 重构为POST-only架构
+    2026-10-17: 股票间并发分析，改为后台任务执行
     """
     service = DailyAnalysisService()
     result = await service.create_task(db=db, user_id=current_user.user_id, stock_symbols=request.stock_symbols)
@@ -180,7 +187,7 @@ async def create_daily_analysis(
 @router.post("/daily-analysis/results")
 async def get_daily_analysis_results(
     request: DailyAnalysisResultRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_read_only),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -191,7 +198,7 @@ async def get_daily_analysis_results(
     ========================================
     接口路径: POST /api/v1/ai/daily-analysis/results
     对应页面: pages/ai/daily-analysis.vue - 结果展示区域
-    接口功能: 根据任务ID获取AI批量分析的结果
+    接口功能: 根据任务ID获取AI批量分析的进度和结果
 
     ========================================
     请求参数
@@ -205,8 +212,12 @@ async def get_daily_analysis_results(
     ========================================
     {
         "task_id": "uuid-string",
-        "status": "completed",
-        "total_count": 10,
+        "status": "processing",              // pending/processing/completed/partial/failed
+        "total_stocks": 10,
+        "processed_stocks": 6,               // 分析成功数量
+        "failed_stocks": 1,                  // 分析失败数量
+        "progress": 70.0,                    // 完成进度（%）
+        "total_count": 6,
         "results": [
             {
                 "decision_id": 1,
@@ -223,16 +234,21 @@ async def get_daily_analysis_results(
                 "created_at": "2025-11-18T10:05:00Z"
             }
         ],
-        "total_tokens_used": 12000,
-        "completed_at": "2025-11-18T10:05:30Z"
+        "failures": [
+            {"symbol": "000858", "error": "..."}
+        ],
+        "error_message": null,               // 任务级错误信息
+        "total_tokens_used": 7200,
+        "created_at": "2025-11-18T10:05:00Z",
+        "completed_at": null                 // 任务结束后返回
     }
 
     ========================================
     执行流程（时序）
     ========================================
     1. 接收task_id
-    2. Service查询任务状态（TODO: 从Redis）
-    3. 从数据库获取AI决策记录
+    2. Service按主键查询任务记录（状态、进度、逐只股票结果）
+    3. 一次IN查询已完成股票的AI决策记录
     4. Converter转换数据格式
     5. Builder构建响应
 
@@ -240,8 +256,8 @@ async def get_daily_analysis_results(
     业务规则
     ========================================
     1. 只能查询本用户的任务结果
-    2. 任务状态为completed时返回完整结果
-    3. 任务状态为processing时返回进度信息
+    2. 任务未结束时返回当前进度和已完成股票的结果
+    3. 任务不存在或不属于当前用户时返回1002
 
     ========================================
     前端调用示例
@@ -338,6 +354,46 @@ async def analyze_single_stock(
     return Response.success(data=result)
 
 
+@router.post("/single-analysis/stream")
+async def analyze_single_stock_stream(
+    request: SingleAnalysisRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+):
+    """
+    单股AI深度分析（流式，Server-Sent Events）
+
+    接口路径: POST /api/v1/ai/single-analysis/stream
+    请求参数: 同 /ai/single-analysis
+    响应类型: text/event-stream
+
+    ========================================
+    事件序列
+    ========================================
+    event: meta     data: {"symbol": "600600", "stock_name": "青岛啤酒"}
+    event: token    data: {"content": "..."}          // AI生成的内容片段（多次）
+    event: done     data: {...}                       // 同 /ai/single-analysis 响应数据（已保存）
+    event: error    data: {"message": "..."}          // 出错时代替done
+
+    ========================================
+    前端调用示例
+    ========================================
+    const response = await fetch('/api/v1/ai/single-analysis/stream', {
+        method: 'POST', headers, body: JSON.stringify({ symbol: '600600' })
+    })
+    // 使用 response.body.getReader() 逐段读取并按空行切分事件
+    """
+    service = SingleAnalysisService()
+    events = await service.start_analysis_stream(
+        db=db,
+        user_id=current_user.user_id,
+        symbol=request.symbol,
+        analysis_type=request.analysis_type,
+        include_fundamentals=request.include_fundamentals,
+        include_technicals=request.include_technicals,
+        include_valuation=request.include_valuation,
+    )
+    return sse_response(events)
+
+
 @router.post("/suggestions")
 async def get_ai_suggestions(
     request: AISuggestionsRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
@@ -359,16 +415,19 @@ async def get_ai_suggestions(
         "priority": "urgent",        // 优先级筛选（可选）: urgent/medium/low
         "action": "buy",             // 操作类型筛选（可选）: buy/sell/hold/observe
         "page": 1,
-        "page_size": 20
+        "page_size": 20,
+        "cursor": null               // 分页游标（可选）上一页返回的next_cursor，传入时忽略page
     }
 
     ========================================
     响应数据
     ========================================
     {
-        "total": 15,
-        "page": 1,
+        "total": 15,                 // 游标模式为null
+        "page": 1,                   // 游标模式为null
         "page_size": 20,
+        "next_cursor": null,         // 下一页游标，最后一页为null
+        "has_more": false,
         "suggestions": [
             {
                 "decision_id": 1,
@@ -396,7 +455,8 @@ async def get_ai_suggestions(
     ========================================
     1. priority从confidence_level提取（>=80: urgent, >=60: medium, <60: low）
     2. action从ai_suggestion文本提取（买入/卖出/持有）
-    3. 按创建时间倒序排列
+    3. 按创建时间、决策ID倒序排列
+    4. 游标模式（传cursor）不统计总数，深翻页耗时不随页码增长
 
     ========================================
     前端调用示例
@@ -414,6 +474,7 @@ async def get_ai_suggestions(
         action=request.action,
         page=request.page,
         page_size=request.page_size,
+        cursor=request.cursor,
     )
     return Response.success(data=result)
 
@@ -473,7 +534,9 @@ async def generate_daily_review(
 
 @router.post("/review/get")
 async def get_daily_review(
-    request: DailyReviewGetRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: DailyReviewGetRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """获取每日复盘报告"""
     service = DailyReviewService()
@@ -580,9 +643,37 @@ async def send_chat_message(
     return Response.success(data=result)
 
 
+@router.post("/chat/message/stream")
+async def send_chat_message_stream(
+    request: ChatMessageRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+):
+    """
+    发送消息并流式获取AI回复（Server-Sent Events）
+
+    接口路径: POST /api/v1/ai/chat/message/stream
+    请求参数: 同 /ai/chat/message/send
+    响应类型: text/event-stream
+
+    ========================================
+    事件序列
+    ========================================
+    event: meta     data: {"session_id": "..."}
+    event: token    data: {"content": "..."}          // AI回复片段（多次）
+    event: done     data: {"message_id": 123, "role": "assistant", "content": "...", "timestamp": "..."}
+    event: error    data: {"message": "..."}          // 出错时代替done
+
+    用户消息在请求时保存，AI回复在生成完成后保存到会话。
+    """
+    service = AIChatService()
+    events = await service.start_message_stream(db, current_user.user_id, request.session_id, request.message)
+    return sse_response(events)
+
+
 @router.post("/chat/history")
 async def get_chat_history(
-    request: ChatHistoryRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: ChatHistoryRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """获取对话历史"""
     service = AIChatService()
@@ -598,3 +689,61 @@ async def delete_chat_session(
     service = AIChatService()
     result = await service.delete_session(db, current_user.user_id, request.session_id)
     return Response.success(data=result)
+
+
+# ========================================
+# API Endpoints - Diagnostics (后端诊断)
+# ========================================
+
+
+@router.post("/diagnostics/backends")
+async def get_ai_backend_status(current_user: User = Depends(get_diagnostics_admin)):
+    """
+    查询AI后端状态
+
+    接口路径: POST /api/v1/ai/diagnostics/backends
+
+    仅 DIAGNOSTICS_ADMIN_USER_IDS 中配置的用户可以访问，其他用户返回403。
+
+    ========================================
+    响应数据
+    ========================================
+    {
+        "serving_backend": "ollama",             // 当前会优先服务请求的后端（mock表示无可用后端）
+        "selection_order": ["ollama", "deepseek", "mock"],
+        "last_backend": "ollama",                // 最近一次成功响应的后端
+        "http2_enabled": false,
+        "backends": [
+            {
+                "name": "ollama",
+                "state": "closed",               // closed/open/half_open
+                "available": true,
+                "error_rate": 0.0,               // 滑动窗口内错误率
+                "window_requests": 12,
+                "latency_ewma_ms": 850.3,        // EWMA延迟
+                "total_requests": 120,
+                "total_failures": 2,
+                "cooldown_seconds": 30.0,
+                "cooldown_remaining_seconds": null,
+                "last_error": null
+            }
+        ],
+        "response_cache": {                      // AI响应缓存指标（进程内累计）
+            "backend": "memory",
+            "size": 42,
+            "max_size": 512,
+            "hits": 30,
+            "redis_hits": 0,
+            "misses": 45,
+            "coalesced": 5,                      // 等待进行中的相同调用的请求数
+            "stores": 44,
+            "evictions": 0,
+            "inflight": 1,
+            "hit_rate": 0.4375
+        },
+        "checked_at": "2025-11-20T10:00:00"
+    }
+    """
+    service = AIDiagnosticsService()
+    result = await service.get_backend_status()
+    return Response.success(data=result)
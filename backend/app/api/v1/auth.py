@@ -54,8 +54,7 @@ async def register(
     )
 
     db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
+    await db.flush()
 
     return UserResponse(user_id=new_user.user_id, username=new_user.username, nickname=new_user.nickname)
 
@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only
 from app.models.user import User
 from app.schemas.common import Response
 from app.services.event import (
@@ -41,6 +41,7 @@ class EventQueryRequest(BaseModel):
     end_date: Optional[date] = Field(None, description="结束日期")
     page: int = Field(1, ge=1, description="页码")
     page_size: int = Field(20, ge=1, le=100, description="每页数量")
+    cursor: Optional[str] = Field(None, description="分页游标（上一页返回的next_cursor，传入时忽略page）")
 
 
 class EventDetailRequest(BaseModel):
@@ -91,7 +92,9 @@ class EventMarkReadRequest(BaseModel):
 
 @router.post("/query")
 async def query_events(
-    request: EventQueryRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: EventQueryRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     查询事件列表
@@ -113,7 +116,8 @@ async def query_events(
         "start_date": "2025-01-01",         // 开始日期（可选）
         "end_date": "2025-01-31",           // 结束日期（可选）
         "page": 1,                          // 页码（默认1）
-        "page_size": 20                     // 每页数量（默认20）
+        "page_size": 20,                    // 每页数量（默认20）
+        "cursor": null                      // 分页游标（可选）上一页返回的next_cursor，传入时忽略page
     }
 
     ========================================
@@ -142,10 +146,12 @@ async def query_events(
                     "updated_at": "2025-01-15T10:00:00"
                 }
             ],
-            "total": 50,
-            "page": 1,
+            "total": 50,                    // 游标模式为null
+            "page": 1,                      // 游标模式为null
             "page_size": 20,
-            "total_pages": 3
+            "total_pages": 3,               // 游标模式为null
+            "next_cursor": "WyJ7XCJkdC...", // 下一页游标，最后一页为null
+            "has_more": true
         }
     }
 
@@ -184,7 +190,8 @@ async def query_events(
     5. 分页规则：
        - 默认页码1，每页20条
        - 最大每页100条
-       - 按事件日期倒序
+       - 按事件日期、事件ID倒序
+       - 页码模式返回总数；游标模式（传cursor）不统计总数，沿 idx_events_user_date 索引定位，深翻页耗时不随页码增长
 
     ========================================
     错误码
@@ -226,6 +233,7 @@ async def query_events(
     修改记录
     ========================================
     2025-01-17: 重构为POST-only架构，使用Service+Converter+Builder模式
+    2026-10-17: 新增游标分页模式（cursor / next_cursor）
     """
     service = EventQueryService()
     data = await service.execute(
@@ -238,13 +246,16 @@ async def query_events(
         end_date=request.end_date,
         page=request.page,
         page_size=request.page_size,
+        cursor=request.cursor,
     )
     return Response.success(data)
 
 
 @router.post("/detail")
 async def get_event_detail(
-    request: EventDetailRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: EventDetailRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     查询事件详情
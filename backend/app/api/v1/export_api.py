@@ -6,11 +6,12 @@ Export API - POST-only架构
 
 from typing import Optional
 from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only
 from app.models.user import User
 from app.schemas.common import Response
 from app.services.export import ExportService
@@ -94,7 +95,7 @@ async def export_trades(
     ========================================
     {
         "task_id": "export_abc123",
-        "status": "processing",
+        "status": "completed",
         "export_type": "trades",
         "download_url": "/api/v1/export/download/export_abc123",
         "created_at": "2025-11-18T10:00:00Z"
@@ -104,16 +105,18 @@ async def export_trades(
     执行流程（时序）
     ========================================
     1. 接收导出参数
-    2. Service创建导出任务
-    3. （TODO）后台异步生成文件
-    4. 返回任务ID供轮询或下载
+    2. 调用 ExportService.export_trades()
+       2.1 校验导出格式（csv/xlsx）和日期
+       2.2 调用 TradeRepository.stream_by_user() 按成交时间正序流式读取交易（服务端游标分批）
+       2.3 逐行写入文件，边读边累计汇总，不在内存中保留交易明细
+    3. 返回任务ID供下载
 
     ========================================
     业务规则
     ========================================
-    1. 支持Excel和CSV两种格式
+    1. 支持Excel和CSV两种格式（xlsx需安装openpyxl）
     2. 可以筛选账户、日期范围
-    3. 异步生成文件，返回任务ID
+    3. 文件生成后返回任务ID，通过 /export/download 下载
 
     ========================================
     前端调用示例
@@ -265,7 +268,9 @@ class DownloadRequest(BaseModel):
 
 @router.post("/download")
 async def download_export(
-    request: DownloadRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: DownloadRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     下载导出文件
@@ -299,6 +304,6 @@ async def download_export(
     // 方式2：通过接口下载
     const response = await post('/export/download', { task_id: taskId })
     """
-    # TODO: 实现实际的文件下载
-    # return FileResponse(file_path, filename=filename)
-    return Response.error(code=1001, message="文件不存在或已过期")
+    service = ExportService()
+    path = service.get_export_file(current_user.user_id, request.task_id)
+    return FileResponse(path, filename=path.name)
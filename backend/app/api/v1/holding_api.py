@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only
 from app.models.user import User
 from app.schemas.common import Response
 from app.services.holding import (
@@ -45,7 +45,9 @@ class HoldingSyncRequest(BaseModel):
 
 @router.post("/query")
 async def query_holdings(
-    request: HoldingQueryRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: HoldingQueryRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     查询账户持仓
@@ -188,7 +190,7 @@ async def sync_holdings(
     ========================================
     接口路径: POST /api/v1/holding/sync
     对应页面: pages/account/detail.vue - 账户详情页（同步按钮）
-    接口功能: 根据账户的所有交易记录重新计算并更新持仓数据
+    接口功能: 根据账户的所有交易记录重新计算并更新持仓数据（全量重建）
 
     ========================================
     请求参数
@@ -205,8 +207,9 @@ async def sync_holdings(
         "message": "success",
         "data": {
             "success": true,
-            "updated_count": 5,              // 更新的持仓数量
-            "total_holdings": 5,             // 总持仓数量
+            "updated_count": 6,              // 写入与软删除的持仓记录总数
+            "total_holdings": 5,             // 同步后的持仓数量
+            "closed_count": 1,               // 已清仓（软删除）的持仓数量
             "message": "成功同步 5 个持仓"
         }
     }
@@ -218,14 +221,16 @@ async def sync_holdings(
     2. 调用 HoldingSyncService.execute()
        2.1 调用 AccountRepository.get_by_id() 查询账户
        2.2 权限校验：检查account.user_id == user_id
-       2.3 调用 TradeRepository.query_by_account() 查询所有交易
-       2.4 调用 HoldingSyncConverter.calculate_holdings() 计算持仓
+       2.3 调用 TradeRepository.stream_by_account() 按成交时间正序流式读取所有交易
+       2.4 调用 HoldingSyncConverter.accumulate() 逐笔累计持仓
            - 按股票代码分组
-           - 遍历交易记录：
+           - 按成交时间正序遍历交易记录：
              买入：增加数量，更新平均成本
              卖出：减少数量，平均成本不变
            - 过滤掉数量为0的持仓
-       2.5 调用 HoldingRepository.upsert() 更新每个持仓
+       2.5 调用 HoldingRepository.sync_account_holdings() 单事务批量写入
+           - INSERT ... ON CONFLICT (account_id, symbol) DO UPDATE 一条语句写入全部持仓
+           - 软删除不再持有的持仓
        2.6 调用 HoldingSyncBuilder.build_response() 构建响应
     3. 返回统一响应格式
 
@@ -241,17 +246,18 @@ async def sync_holdings(
        - 按时间顺序处理交易：
          买入：quantity += buy_quantity, avg_cost = (old_cost × old_qty + buy_cost × buy_qty) / new_qty
          卖出：quantity -= sell_quantity, avg_cost 保持不变
-       - 数量为0的持仓不保存
+       - 数量为0的持仓不保存，已有的持仓记录软删除
 
     3. 触发时机：
        - 用户手动点击"同步持仓"按钮
-       - 创建/修改/删除交易后自动触发
        - 定时任务定期同步
+       - 补录或修改历史交易后校正平均成本
+       - 创建/修改/删除交易时由 HoldingDeltaService 增量更新持仓，无需触发同步
 
     4. 性能考虑：
-       - 单次查询获取所有交易（限制10000条）
+       - 服务端游标分批读取全部交易，不一次性加载
        - 内存中计算持仓
-       - 批量更新数据库
+       - 批量写入数据库（一条upsert + 一条软删除，单次提交）
 
     ========================================
     错误码
@@ -286,16 +292,14 @@ async def sync_holdings(
       }
     };
 
-    // 创建交易后自动同步
-    const afterTradeCreated = async (accountId) => {
-      await syncHoldings(accountId);
-    };
     ```
 
     ========================================
     修改记录
     ========================================
     2025-01-17: 重构为POST-only架构，使用Service+Converter+Builder模式
+    2026-10-17: 持仓改为单条 ON CONFLICT 批量写入，已清仓持仓软删除
+    2026-10-17: 交易改为按时间正序流式读取，仅用于显式重建
     """
     service = HoldingSyncService()
     data = await service.execute(db=db, user_id=current_user.user_id, account_id=request.account_id)
@@ -11,7 +11,7 @@ from typing import Optional, List
 from decimal import Decimal
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only
 from app.models.user import User
 from app.schemas.common import Response
 from app.services.review import ReviewService
@@ -51,7 +51,9 @@ class ReviewCreateRequest(BaseModel):
 
 @router.post("/get")
 async def get_review(
-    request: ReviewGetRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: ReviewGetRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     获取股票评价
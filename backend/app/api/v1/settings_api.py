@@ -10,7 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only
 from app.models.user import User
 from app.schemas.common import Response
 from app.services.settings import SettingsService
@@ -54,7 +54,7 @@ class AIKeyTestRequest(BaseModel):
 
 
 @router.post("/get")
-async def get_settings(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+async def get_settings(current_user: User = Depends(get_current_user_read_only), db: AsyncSession = Depends(get_db)):
     """
     获取用户设置
 
@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only
 from app.schemas.common import Response
 from app.models.user import User
 from app.services.strategy import (
@@ -88,7 +88,9 @@ class StrategyExecuteRequest(BaseModel):
 
 @router.post("/query")
 async def query_strategies(
-    request: StrategyQueryRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: StrategyQueryRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     查询策略列表
@@ -0,0 +1,75 @@
+"""
+System API - POST-only架构
+
+系统诊断相关API - 使用POST-only + Service + Builder模式
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.dependencies import get_diagnostics_admin
+from app.models.user import User
+from app.schemas.common import Response
+from app.services.system import SystemDiagnosticsService
+
+
+router = APIRouter(prefix="/system", tags=["系统诊断"])
+
+
+# ========================================
+# API Endpoints
+# ========================================
+
+
+@router.post("/diagnostics/database")
+async def get_database_status(current_user: User = Depends(get_diagnostics_admin), db: AsyncSession = Depends(get_db)):
+    """
+    查询数据库连接池状态
+
+    接口路径: POST /api/v1/system/diagnostics/database
+
+    仅 DIAGNOSTICS_ADMIN_USER_IDS 中配置的用户可以访问，其他用户返回403。
+
+    指标为当前进程内累计值（每个 worker 进程各自一个连接池）。
+    每个进程最多占用 max_connections_per_process 个连接，
+    进程数 × max_connections_per_process 应小于 server.max_connections。
+
+    ========================================
+    响应数据
+    ========================================
+    {
+        "pool": {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "checked_out": 3,                // 当前借出的连接数
+            "checked_in": 7,                 // 池中空闲连接数
+            "overflow": 0,                   // 当前溢出连接数
+            "checkouts": 1520,               // 累计取连接次数
+            "overflow_events": 4,            // 累计新建溢出连接次数（持续增长说明 pool_size 偏小）
+            "timeouts": 0,                   // 累计取连接超时次数
+            "max_checked_out": 14,           // 借出连接数峰值
+            "avg_wait_ms": 0.21,             // 取连接平均耗时（含排队与新建连接）
+            "p95_wait_ms": 0.35,             // 最近1000次取连接耗时P95
+            "max_wait_ms": 48.2
+        },
+        "config": {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "max_connections_per_process": 30,
+            "pool_timeout": 30.0,
+            "pool_recycle": 1800,
+            "pool_pre_ping": true,
+            "statement_cache_size": 100,
+            "prepared_statement_cache_size": 100
+        },
+        "server": {
+            "max_connections": 100,          // Postgres max_connections
+            "connections": 23                // 当前服务端连接数（全部客户端）
+        },
+        "checked_at": "2026-10-17T10:00:00"
+    }
+    """
+    service = SystemDiagnosticsService()
+    result = await service.get_database_status(db)
+    return Response.success(data=result)
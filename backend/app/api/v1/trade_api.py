@@ -12,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_user_read_only
 from app.models.user import User
 from app.schemas.common import Response
 from app.services.trade import (
@@ -42,6 +42,7 @@ class TradeQueryRequest(BaseModel):
     end_date: Optional[date] = Field(None, description="结束日期")
     page: int = Field(1, ge=1, description="页码")
     page_size: int = Field(20, ge=1, le=100, description="每页数量")
+    cursor: Optional[str] = Field(None, description="分页游标（上一页返回的next_cursor，传入时忽略page）")
 
 
 class TradeDetailRequest(BaseModel):
@@ -95,7 +96,9 @@ class TradeDeleteRequest(BaseModel):
 
 @router.post("/query")
 async def query_trades(
-    request: TradeQueryRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: TradeQueryRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     查询交易列表
@@ -117,7 +120,8 @@ async def query_trades(
         "start_date": "2025-01-01",         // 开始日期（可选）
         "end_date": "2025-01-31",           // 结束日期（可选）
         "page": 1,                          // 页码（默认1）
-        "page_size": 20                     // 每页数量（默认20）
+        "page_size": 20,                    // 每页数量（默认20）
+        "cursor": null                      // 分页游标（可选）上一页返回的next_cursor，传入时忽略page
     }
 
     ========================================
@@ -145,10 +149,12 @@ async def query_trades(
                     "created_at": "2025-01-15T10:30:00"
                 }
             ],
-            "total": 50,
-            "page": 1,
+            "total": 50,                    // 游标模式为null
+            "page": 1,                      // 游标模式为null
             "page_size": 20,
-            "total_pages": 3
+            "total_pages": 3,               // 游标模式为null
+            "next_cursor": "WyJ7XCJkdC...", // 下一页游标，最后一页为null
+            "has_more": true
         }
     }
 
@@ -184,7 +190,8 @@ async def query_trades(
     4. 分页规则：
        - 默认页码1，每页20条
        - 最大每页100条
-       - 按交易日期倒序
+       - 按交易日期、创建时间、交易ID倒序
+       - 页码模式返回总数；游标模式（传cursor）不统计总数，深翻页耗时不随页码增长
 
     ========================================
     错误码
@@ -226,6 +233,7 @@ async def query_trades(
     修改记录
     ========================================
     2025-01-17: 重构为POST-only架构，使用Service+Converter+Builder模式
+    2026-10-17: 新增游标分页模式（cursor / next_cursor）
     """
     service = TradeQueryService()
     data = await service.execute(
@@ -238,13 +246,16 @@ async def query_trades(
         end_date=request.end_date,
         page=request.page,
         page_size=request.page_size,
+        cursor=request.cursor,
     )
     return Response.success(data)
 
 
 @router.post("/detail")
 async def get_trade_detail(
-    request: TradeDetailRequest, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    request: TradeDetailRequest,
+    current_user: User = Depends(get_current_user_read_only),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     查询交易详情
@@ -424,8 +435,9 @@ async def create_trade(
        2.4 调用 TradeCreateConverter.prepare_data() 准备数据
            - 股票代码转大写
            - 手续费和税费默认0
-       2.5 调用 TradeRepository.create() 创建交易
-       2.6 调用 TradeCreateBuilder.build_response() 构建响应
+       2.5 调用 HoldingDeltaService.apply() 增量更新该股票持仓（行锁，不重放历史交易）
+       2.6 调用 TradeRepository.create() 创建交易（与持仓变更同一事务提交）
+       2.7 调用 TradeCreateBuilder.build_response() 构建响应
     3. 返回统一响应格式
 
     ========================================
@@ -491,6 +503,7 @@ async def create_trade(
     修改记录
     ========================================
     2025-01-17: 重构为POST-only架构，使用Service+Converter+Builder模式
+    2026-10-17: 交易变更时增量更新持仓
     """
     service = TradeCreateService()
     data = await service.execute(
@@ -577,8 +590,10 @@ async def update_trade(
        2.3 调用 TradeUpdateConverter.prepare_update_data() 准备更新数据
            - 只更新提供的字段
            - 验证每个字段的合法性
-       2.4 调用 TradeRepository.update() 更新交易
-       2.5 调用 TradeUpdateBuilder.build_response() 构建响应
+       2.4 股票代码、类型、数量或价格变化时调用 HoldingDeltaService.replace()
+           - 撤销旧交易对持仓的影响，再应用新交易（变更后持仓为负时拒绝）
+       2.5 调用 TradeRepository.update() 更新交易（与持仓变更同一事务提交）
+       2.6 调用 TradeUpdateBuilder.build_response() 构建响应
     3. 返回统一响应格式
 
     ========================================
@@ -643,6 +658,7 @@ async def update_trade(
     修改记录
     ========================================
     2025-01-17: 重构为POST-only架构，使用Service+Converter+Builder模式
+    2026-10-17: 交易变更时增量更新持仓
     """
     service = TradeUpdateService()
     data = await service.execute(
@@ -704,10 +720,11 @@ async def delete_trade(
     2. 调用 TradeDeleteService.execute()
        2.1 调用 TradeRepository.get_by_id() 查询交易
        2.2 权限校验：检查trade.user_id == user_id
-       2.3 调用 TradeRepository.soft_delete() 软删除交易
+       2.3 调用 HoldingDeltaService.apply(reverse=True) 撤销该交易对持仓的影响
+       2.4 调用 TradeRepository.soft_delete() 软删除交易（与持仓变更同一事务提交）
            - 设置is_deleted=True
            - 设置deleted_at=当前时间
-       2.4 调用 TradeDeleteBuilder.build_response() 构建响应
+       2.5 调用 TradeDeleteBuilder.build_response() 构建响应
     3. 返回统一响应格式
 
     ========================================
@@ -757,6 +774,7 @@ async def delete_trade(
     修改记录
     ========================================
     2025-01-17: 重构为POST-only架构，使用Service+Converter+Builder模式
+    2026-10-17: 交易变更时增量更新持仓
     """
     service = TradeDeleteService()
     data = await service.execute(db=db, trade_id=request.trade_id, user_id=current_user.user_id)
@@ -22,6 +22,16 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     DATABASE_ECHO: bool = False
+    DB_POOL_SIZE: int = 10  # 每个进程常驻连接数
+    DB_MAX_OVERFLOW: int = (
+        20  # 连接池满时允许额外新建的连接数（每个进程最多占用 DB_POOL_SIZE + DB_MAX_OVERFLOW 个连接）
+    )
+    DB_POOL_TIMEOUT: float = 30.0  # 连接池满时等待空闲连接的超时（秒）
+    DB_POOL_RECYCLE: int = 1800  # 连接最长使用时间（秒），超过后重建，应小于服务端/中间件空闲断开时间；-1 表示不回收
+    DB_POOL_PRE_PING: bool = True  # 取连接时先探活（每次取连接多一次往返）；已设置 DB_POOL_RECYCLE 且网络稳定时可关闭
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg 连接级语句缓存大小（PgBouncer 事务模式设为0）
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # 每个连接复用的预编译语句数（PgBouncer 事务模式设为0）
+    DB_STREAM_BATCH_SIZE: int = 500  # 流式查询（服务端游标）每批读取行数
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -31,6 +41,12 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    USER_CACHE_BACKEND: str = "memory"  # 认证用户缓存: memory（仅进程内）/ redis（进程内 + Redis共享）/ none（不缓存）
+    USER_CACHE_TTL: float = 30.0  # 进程内用户缓存TTL（秒），也是其他进程感知用户变更的最长延迟
+    USER_CACHE_REDIS_TTL: float = 300.0  # Redis用户缓存TTL（秒）
+    USER_CACHE_MAX_SIZE: int = 1024  # 进程内用户缓存最多条目数（LRU淘汰）
+    AUTH_TRUST_JWT_CLAIMS: bool = False  # 只读接口直接信任已签名JWT中的用户信息，不查询用户
+    DIAGNOSTICS_ADMIN_USER_IDS: str = ""  # 允许访问诊断接口的用户ID（逗号分隔），为空时诊断接口不对任何用户开放
 
     # CORS
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
@@ -43,9 +59,44 @@ class Settings(BaseSettings):
     DEEPSEEK_MODEL: str = "deepseek-chat"
     DEEPSEEK_MAX_TOKENS: int = 4000
     DEEPSEEK_TEMPERATURE: float = 0.7
+    AI_HTTP_TIMEOUT: float = 120.0  # AI调用超时（秒）
+    AI_HTTP_CONNECT_TIMEOUT: float = 5.0  # 建立连接超时（秒）
+    AI_HTTP_MAX_CONNECTIONS: int = 20  # 每个AI后端的最大连接数
+    AI_HTTP_MAX_KEEPALIVE: int = 10  # 每个AI后端保持的空闲长连接数
+    AI_HTTP_KEEPALIVE_EXPIRY: float = 60.0  # 空闲长连接保留时间（秒）
+    AI_BACKEND_COOLDOWN: float = 30.0  # AI后端熔断时长（秒）
+    AI_BREAKER_MAX_COOLDOWN: float = 300.0  # 半开探测连续失败时熔断时长上限（秒）
+    AI_BREAKER_WINDOW: float = 60.0  # 错误率统计滑动窗口（秒）
+    AI_BREAKER_MIN_REQUESTS: int = 5  # 按错误率熔断所需的最少请求数
+    AI_BREAKER_ERROR_RATE: float = 0.5  # 触发熔断的错误率
+    AI_BATCH_MAX_SYMBOLS: int = 100  # 批量分析单次最多股票数
+    AI_BATCH_CONCURRENCY: int = 10  # 单个批量任务内并发分析的股票数
+    AI_BATCH_MARKET_CONCURRENCY: int = 4  # 批量分析中同时进行的单股行情补查上限（全局）
+    AI_BATCH_LLM_CONCURRENCY: int = 5  # 批量分析中同时进行的AI调用上限（全局）
+    AI_CHAT_CONTEXT_TOKENS: int = 3000  # 对话Prompt的Token预算（系统提示 + 历史摘要 + 历史消息 + 本次消息）
+    AI_CHAT_SUMMARY_TOKENS: int = 400  # 历史摘要的Token上限（从对话预算中预留）
+    AI_CHAT_HISTORY_MAX_MESSAGES: int = 20  # 每轮最多读取的未摘要历史消息条数
+    AI_RESPONSE_CACHE_BACKEND: str = (
+        "memory"  # AI响应缓存: memory（仅进程内）/ redis（进程内 + Redis共享）/ none（不缓存）
+    )
+    AI_RESPONSE_CACHE_MAX_SIZE: int = 512  # 进程内AI响应缓存最多条目数（LRU淘汰）
+    AI_RESPONSE_CACHE_TTL_TRADING: float = 60.0  # 个股分析缓存TTL - 交易时段（秒）
+    AI_RESPONSE_CACHE_TTL_CLOSED: float = 43200.0  # 个股分析缓存TTL上限 - 非交易时段（缓存到下一交易时段开盘，秒）
+    AI_RESPONSE_CACHE_TTL_REVIEW: float = 3600.0  # 每日复盘缓存TTL（秒）
 
     # Stock Data APIs
     TUSHARE_TOKEN: str = ""
+    MARKET_DATA_MAX_WORKERS: int = 8  # 行情SDK线程池大小
+    MARKET_DATA_CONCURRENCY: int = 8  # 同时进行的上游调用上限
+    MARKET_DATA_TIMEOUT: float = 15.0  # 单次上游调用超时（秒）
+    MARKET_SPOT_TTL_TRADING: float = 15.0  # 全市场行情快照TTL - 交易时段（秒）
+    MARKET_SPOT_TTL_CLOSED: float = 1800.0  # 全市场行情快照TTL - 非交易时段（秒）
+    MARKET_SPOT_TIMEOUT: float = 60.0  # 全市场行情快照下载超时（秒，分页下载约5000只股票，远慢于单次调用）
+    OHLCV_STORE_DIR: str = "data/ohlcv"  # 本地日线存储目录
+    OHLCV_RECHECK_INTERVAL: float = 3600.0  # 同一交易日内日线增量检查的最小间隔（秒）
+
+    # Export
+    EXPORT_DIR: str = "data/exports"  # 导出文件目录
 
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
@@ -54,6 +105,7 @@ class Settings(BaseSettings):
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
+    TASK_QUEUE_BACKEND: str = "local"  # 后台任务执行方式: celery（Redis + worker）/ local（当前进程内执行）
 
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -63,6 +115,10 @@ class Settings(BaseSettings):
         """Parse CORS origins from comma-separated string"""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    def get_diagnostics_admin_ids(self) -> List[int]:
+        """Parse diagnostics admin user IDs from comma-separated string"""
+        return [int(user_id) for user_id in self.DIAGNOSTICS_ADMIN_USER_IDS.split(",") if user_id.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -5,14 +5,13 @@ Database Configuration
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
+from app.core.db_pool import build_engine_options
 
-# Create async engine
+# Create async engine（连接池参数见 Settings 的 DB_POOL_* 配置）
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DATABASE_ECHO,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    **build_engine_options(settings.DATABASE_URL),
 )
 
 # Create async session factory
@@ -24,8 +23,14 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+
+class _ModelBase:
+    # flush 时用 INSERT/UPDATE ... RETURNING 取回服务端生成的列（created_at、updated_at 等），无需再 refresh
+    __mapper_args__ = {"eager_defaults": True}
+
+
 # Base class for models
-Base = declarative_base()
+Base = declarative_base(cls=_ModelBase)
 
 
 # Dependency to get DB session
@@ -33,11 +38,18 @@ async def get_db() -> AsyncSession:
     """
     Dependency function to get database session
 
+    每个请求一个事务（unit of work）：Repository 只 flush，请求成功结束时统一提交一次，
+    抛出异常时回滚。
+
     Yields:
         AsyncSession: Database session
     """
     async with AsyncSessionLocal() as session:
         try:
             yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
         finally:
             await session.close()
@@ -0,0 +1,148 @@
+"""
+Database Connection Pool
+
+数据库连接池配置与指标
+
+- 连接池参数全部来自 Settings（DB_POOL_*、DB_*_CACHE_SIZE）
+- InstrumentedAsyncPool 记录取连接等待时间、溢出连接、取连接超时，
+  用于按 Postgres max_connections 规划 worker 数量：
+  每个 worker 最多占用 DB_POOL_SIZE + DB_MAX_OVERFLOW 个连接
+"""
+
+import time
+from collections import deque
+from typing import Any, Dict
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.config import settings
+
+# 用于计算等待时间分位数的最近取连接次数
+WAIT_SAMPLE_SIZE = 1000
+
+
+class PoolMetrics:
+    """
+    连接池指标（进程内累计）
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.max_checked_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent_waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def record_checkout(self, wait: float, checked_out: int, overflowed: bool) -> None:
+        """
+        记录一次取连接
+
+        Args:
+            wait: 取连接耗时（秒，含排队等待与新建连接）
+            checked_out: 取出后已借出的连接数
+            overflowed: 是否新建了溢出连接（超出 pool_size）
+        """
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.max_checked_out = max(self.max_checked_out, checked_out)
+        self._recent_waits.append(wait)
+        if overflowed:
+            self.overflow_events += 1
+
+    def record_timeout(self, wait: float) -> None:
+        """记录一次取连接超时（连接池已满且等待超过 DB_POOL_TIMEOUT）"""
+        self.timeouts += 1
+        self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """指标快照（等待时间单位：毫秒）"""
+        recent = sorted(self._recent_waits)
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "overflow_events": self.overflow_events,
+            "timeouts": self.timeouts,
+            "max_checked_out": self.max_checked_out,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "p95_wait_ms": round(p95 * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    记录指标的异步连接池
+
+    重写 _do_get（从池中取出或新建连接），连接池行为不变。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        overflow_before = self._overflow
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+
+        self.metrics.record_checkout(
+            wait=time.perf_counter() - started,
+            checked_out=self.checkedout(),
+            overflowed=self._overflow > max(overflow_before, 0),
+        )
+        return connection
+
+    def status_snapshot(self) -> Dict[str, Any]:
+        """当前连接池状态 + 累计指标"""
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            **self.metrics.snapshot(),
+        }
+
+
+def build_engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    构建 create_async_engine 的连接池参数
+
+    Args:
+        database_url: 数据库连接URL
+
+    Returns:
+        create_async_engine 关键字参数
+    """
+    options = {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+    if make_url(database_url).get_driver_name() == "asyncpg":
+        connect_args = {
+            # asyncpg 连接级语句缓存
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            # SQLAlchemy 适配层的预编译语句缓存（同一连接上复用 prepared statement）
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        }
+        if settings.DB_PREPARED_STATEMENT_CACHE_SIZE == 0:
+            # 不复用预编译语句时（如 PgBouncer 事务模式），语句名必须全局唯一，避免跨后端连接冲突
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+        options["connect_args"] = connect_args
+
+    return options
@@ -8,8 +8,10 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_access_token
+from app.core.user_cache import user_cache
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
@@ -22,6 +24,9 @@ async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: As
     In development mode (ENVIRONMENT=development), accepts 'dev-token'
     and automatically creates/returns a test user.
 
+    用户记录经 user_cache 缓存（按 user_id，校验令牌中的 token_version），
+    命中时不查询数据库；令牌版本与用户当前版本不一致时拒绝（账户已停用或已修改密码）。
+
     Args:
         token: JWT token from Authorization header
         db: Database session
@@ -63,8 +68,7 @@ async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: As
                 is_active=True,
             )
             db.add(user)
-            await db.commit()
-            await db.refresh(user)
+            await db.flush()
 
         return user
 
@@ -77,20 +81,67 @@ async def get_current_user(token: Optional[str] = Depends(oauth2_scheme), db: As
     if user_id is None:
         raise credentials_exception
 
-    # Get user from database
+    # Get user from cache or database
     try:
-        stmt = select(User).where(User.user_id == int(user_id))
+        user_id = int(user_id)
+        token_version = payload.get("ver", 0)
+
+        user = await user_cache.get(user_id, token_version)
+        if user:
+            return user
+
+        stmt = select(User).where(User.user_id == user_id)
         result = await db.execute(stmt)
         user = result.scalar_one_or_none()
 
-        if not user:
+        if not user or user.token_version != token_version:
             raise credentials_exception
 
+        await user_cache.set(user)
         return user
     except Exception:
         raise credentials_exception
 
 
+async def get_current_user_read_only(
+    token: Optional[str] = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Get current user for read-only endpoints
+
+    AUTH_TRUST_JWT_CLAIMS 开启时直接使用已签名JWT中的用户信息，不读取缓存也不查询数据库；
+    未开启、令牌无法解析或令牌缺少 active 声明（旧令牌）时与 get_current_user 相同。
+
+    注意：信任令牌时只填充令牌中的字段（user_id、username、token_version、is_active），
+    其余字段为None，只读接口只应使用 user_id；且不会感知账户停用或密码修改，
+    已停用的账户在令牌过期前（ACCESS_TOKEN_EXPIRE_MINUTES）仍可访问这些接口。
+
+    Args:
+        token: JWT token from Authorization header
+        db: Database session
+
+    Returns:
+        User: Current user (built from token claims when trusted)
+
+    Raises:
+        HTTPException: If token is invalid, user not found or inactive
+    """
+    if settings.AUTH_TRUST_JWT_CLAIMS and token:
+        payload = decode_access_token(token)
+        user_id = payload.get("sub") if payload else None
+        if user_id is not None and str(user_id).isdigit() and "active" in payload:
+            if payload["active"] is not True:
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="用户已被禁用")
+            return User(
+                user_id=int(user_id),
+                username=payload.get("username"),
+                token_version=payload.get("ver", 0),
+                is_active=True,
+            )
+
+    return await get_current_user(token=token, db=db)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -109,3 +160,26 @@ async def get_current_active_user(
     if not current_user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="用户已被禁用")
     return current_user
+
+
+async def get_diagnostics_admin(
+    current_user: User = Depends(get_current_user),
+) -> User:
+    """
+    Get current user for diagnostics endpoints
+
+    用户模型没有角色字段，诊断接口只对 DIAGNOSTICS_ADMIN_USER_IDS 中配置的用户开放
+    （诊断信息包含连接池、AI后端等部署细节，不应对普通用户暴露）。
+
+    Args:
+        current_user: Current user from get_current_user
+
+    Returns:
+        User: Diagnostics admin user
+
+    Raises:
+        HTTPException: If user is not a diagnostics admin
+    """
+    if current_user.user_id not in settings.get_diagnostics_admin_ids():
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权访问诊断接口")
+    return current_user
@@ -0,0 +1,234 @@
+"""
+Authenticated User Cache
+
+认证用户缓存：get_current_user 不必每个请求都查询 users 表
+
+- 进程内 LRU + 短TTL（USER_CACHE_TTL），也是其他进程感知用户变更的最长延迟
+- USER_CACHE_BACKEND=redis 时以 Redis 作为二级缓存，多个进程共享；Redis 不可用时回退查库
+- 按 user_id 缓存，条目记录 token_version，与令牌中的版本不一致视为未命中
+- 用户记录更新或删除后，在事务提交时失效（本进程的进程内缓存 + Redis）
+- 缓存中不保存密码哈希
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import TIMESTAMP, event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.user import User
+
+# 不进入缓存的列
+_EXCLUDED_COLUMNS = ("password_hash",)
+
+# session.info 中记录本事务内变更的用户ID
+_PENDING_KEY = "user_cache_invalidations"
+
+
+class UserCache:
+    """
+    认证用户缓存
+
+    缓存条目为用户列值快照，每次命中都重建一个未绑定会话的 User 对象，请求之间互不影响。
+    """
+
+    def __init__(self, backend: str, ttl: float, redis_ttl: float, max_size: int, redis_url: str):
+        self.backend = backend
+        self.ttl = ttl
+        self.redis_ttl = redis_ttl
+        self.max_size = max_size
+        self.redis_url = redis_url
+        self._entries: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._redis = None
+        # 失效 Redis 条目的后台任务（保持强引用，避免被垃圾回收）
+        self._pending_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用缓存"""
+        return self.backend in ("memory", "redis")
+
+    async def get(self, user_id: int, token_version: int) -> Optional[User]:
+        """
+        读取缓存的用户
+
+        Args:
+            user_id: 用户ID
+            token_version: 令牌中的版本号
+
+        Returns:
+            命中且版本一致时返回 User 对象，否则返回None
+        """
+        if not self.enabled:
+            return None
+
+        # 1. 进程内缓存
+        snapshot = self._get_local(user_id)
+
+        # 2. Redis 二级缓存，命中后回填进程内缓存
+        if snapshot is None and self.backend == "redis":
+            snapshot = await self._get_redis(user_id)
+            if snapshot is not None:
+                self._set_local(user_id, snapshot)
+
+        if snapshot is None or snapshot["token_version"] != token_version:
+            return None
+        return User(**snapshot)
+
+    async def set(self, user: User) -> None:
+        """
+        缓存用户
+
+        Args:
+            user: 已从数据库加载的 User 对象
+        """
+        if not self.enabled:
+            return
+
+        snapshot = {
+            column.key: getattr(user, column.key)
+            for column in User.__table__.columns
+            if column.key not in _EXCLUDED_COLUMNS
+        }
+        self._set_local(user.user_id, snapshot)
+        if self.backend == "redis":
+            await self._set_redis(user.user_id, snapshot)
+
+    def invalidate(self, user_ids: Iterable[int]) -> Optional[asyncio.Task]:
+        """
+        使用户缓存失效
+
+        进程内条目立即删除；Redis 条目在当前事件循环中异步删除。
+
+        Args:
+            user_ids: 用户ID列表
+
+        Returns:
+            删除 Redis 条目的后台任务（未使用 Redis 时返回None）
+        """
+        user_ids = list(user_ids)
+        for user_id in user_ids:
+            self._entries.pop(user_id, None)
+
+        if self.backend != "redis" or not user_ids:
+            return None
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 不在事件循环中（同步脚本），Redis 条目依靠 USER_CACHE_REDIS_TTL 过期
+            return None
+
+        task = loop.create_task(self._delete_redis(user_ids))
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+        return task
+
+    def clear(self) -> None:
+        """清空进程内缓存"""
+        self._entries.clear()
+
+    def _get_local(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """读取进程内缓存（过期条目删除）"""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+
+        expires_at, snapshot = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[user_id]
+            return None
+
+        self._entries.move_to_end(user_id)
+        return snapshot
+
+    def _set_local(self, user_id: int, snapshot: Dict[str, Any]) -> None:
+        """写入进程内缓存（超出容量时淘汰最久未使用的条目）"""
+        self._entries[user_id] = (time.monotonic() + self.ttl, snapshot)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _client(self):
+        """懒加载 Redis 客户端"""
+        if self._redis is None:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(self.redis_url)
+        return self._redis
+
+    @staticmethod
+    def _redis_key(user_id: int) -> str:
+        return f"user_cache:{user_id}"
+
+    async def _get_redis(self, user_id: int) -> Optional[Dict[str, Any]]:
+        try:
+            raw = await self._client().get(self._redis_key(user_id))
+        except Exception as e:
+            print(f"读取用户缓存失败: {e}")
+            return None
+        return _loads(raw) if raw else None
+
+    async def _set_redis(self, user_id: int, snapshot: Dict[str, Any]) -> None:
+        try:
+            await self._client().set(self._redis_key(user_id), _dumps(snapshot), ex=int(self.redis_ttl))
+        except Exception as e:
+            print(f"写入用户缓存失败: {e}")
+
+    async def _delete_redis(self, user_ids: list) -> None:
+        try:
+            await self._client().delete(*[self._redis_key(user_id) for user_id in user_ids])
+        except Exception as e:
+            print(f"删除用户缓存失败: {e}")
+
+
+def _dumps(snapshot: Dict[str, Any]) -> str:
+    """快照序列化为JSON（时间列转为ISO格式）"""
+    return json.dumps(
+        {key: value.isoformat() if isinstance(value, datetime) else value for key, value in snapshot.items()}
+    )
+
+
+def _loads(raw) -> Dict[str, Any]:
+    """从JSON还原快照"""
+    snapshot = json.loads(raw)
+    for column in User.__table__.columns:
+        if isinstance(column.type, TIMESTAMP) and snapshot.get(column.key):
+            snapshot[column.key] = datetime.fromisoformat(snapshot[column.key])
+    return snapshot
+
+
+# Global user cache instance
+user_cache = UserCache(
+    backend=settings.USER_CACHE_BACKEND,
+    ttl=settings.USER_CACHE_TTL,
+    redis_ttl=settings.USER_CACHE_REDIS_TTL,
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    redis_url=settings.REDIS_URL,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _track_user_change(mapper, connection, target) -> None:
+    """记录本事务内变更的用户，提交后再失效，避免其他请求在提交前把旧数据重新写入缓存"""
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session) -> None:
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if user_ids:
+        user_cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
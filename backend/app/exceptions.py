@@ -175,3 +175,9 @@ class EventNotFound(ResourceNotFound):
     """事件不存在"""
 
     message = "事件不存在"
+
+
+class ConversationAccessDenied(PermissionDenied):
+    """无权访问该对话会话"""
+
+    message = "无权访问该对话会话"
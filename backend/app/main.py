@@ -9,6 +9,10 @@ from app.core.config import settings
 from app.api.v1 import api_router
 from app.exceptions import APIException
 from app.schemas.common import Response
+from app.tasks import shutdown_local_tasks
+from app.utils.ai_client import ai_client
+from app.utils.ai_response_cache import ai_response_cache
+from app.utils.tushare_client import tushare_client
 
 # Create FastAPI app
 app = FastAPI(
@@ -59,6 +63,21 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+async def startup_event():
+    """应用启动时创建外部连接池"""
+    await ai_client.startup()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时释放外部资源"""
+    await shutdown_local_tasks()
+    tushare_client.shutdown()
+    await ai_client.shutdown()
+    await ai_response_cache.aclose()
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -7,7 +7,8 @@ from app.models.holding import Holding
 from app.models.trade import Trade
 from app.models.event import Event
 from app.models.review import Review
-from app.models.ai_decision import AIDecision, AIConversation
+from app.models.ai_decision import AIDecision, AIConversation, AIMessage, SymbolAnalysisSnapshot
+from app.models.ai_analysis_task import AIAnalysisTask
 from app.models.strategy import Strategy
 
 __all__ = [
@@ -20,5 +21,8 @@ __all__ = [
     "Review",
     "AIDecision",
     "AIConversation",
+    "AIMessage",
+    "SymbolAnalysisSnapshot",
+    "AIAnalysisTask",
     "Strategy",
 ]
@@ -0,0 +1,51 @@
+"""
+AI Analysis Task Model
+"""
+
+from sqlalchemy import Column, BigInteger, String, Integer, Boolean, TIMESTAMP, Text, Index, JSON
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class AIAnalysisTask(Base):
+    """AI Analysis Task table - AI批量分析任务表"""
+
+    __tablename__ = "ai_analysis_tasks"
+
+    task_id = Column(String(36), primary_key=True, comment="任务ID (UUID)")
+    user_id = Column(BigInteger, nullable=False, comment="用户ID")
+
+    analysis_type = Column(String(50), nullable=False, default="daily", comment="分析类型: daily")
+    status = Column(
+        String(20), nullable=False, default="pending", comment="任务状态: pending/processing/completed/partial/failed"
+    )
+
+    # 待分析股票代码列表 (存储为JSON数组)
+    stock_symbols = Column(JSON, nullable=False, comment="股票代码列表")
+
+    total_stocks = Column(Integer, nullable=False, default=0, comment="股票总数")
+    processed_stocks = Column(Integer, nullable=False, default=0, comment="分析成功数量")
+    failed_stocks = Column(Integer, nullable=False, default=0, comment="分析失败数量")
+
+    # 逐只股票的分析结果 (存储为JSON数组)
+    results = Column(JSON, comment="逐只股票结果 [{symbol, status, decision_id, error}]")
+
+    error_message = Column(Text, comment="任务级错误信息")
+
+    is_deleted = Column(Boolean, default=False, nullable=False, comment="是否删除")
+
+    started_at = Column(TIMESTAMP(timezone=True), comment="开始执行时间")
+    completed_at = Column(TIMESTAMP(timezone=True), comment="完成时间")
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, comment="创建时间")
+    updated_at = Column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False, comment="更新时间"
+    )
+    deleted_at = Column(TIMESTAMP(timezone=True), comment="删除时间")
+
+    __table_args__ = (
+        Index("idx_ai_analysis_tasks_user_created", "user_id", "created_at"),
+        Index("idx_ai_analysis_tasks_status", "status"),
+    )
+
+    def __repr__(self):
+        return f"<AIAnalysisTask(task_id={self.task_id}, status={self.status})>"
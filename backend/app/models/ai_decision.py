@@ -4,7 +4,7 @@ AI Decision Model (v3.2)
 
 from sqlalchemy import Column, BigInteger, String, Integer, NUMERIC, Boolean, TIMESTAMP, Text, Index, JSON
 from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 
 
@@ -36,6 +36,9 @@ class AIDecision(Base):
 
     confidence_level = Column(NUMERIC(10, 4), comment="置信度 (0-100)")
 
+    # 分析结果来自共享的个股分析快照时记录快照ID（结果字段仍复制到本行，读取不必关联快照）
+    snapshot_id = Column(BigInteger, comment="个股分析快照ID")
+
     is_deleted = Column(Boolean, default=False, nullable=False, comment="是否删除")
 
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, comment="创建时间")
@@ -48,6 +51,7 @@ class AIDecision(Base):
         Index("idx_ai_decisions_user_symbol", "user_id", "symbol"),
         Index("idx_ai_decisions_analysis_type", "analysis_type"),
         Index("idx_ai_decisions_created_date", "created_at"),
+        Index("idx_ai_decisions_user_created", "user_id", "created_at", "decision_id"),
     )
 
     def __repr__(self):
@@ -62,11 +66,13 @@ class AIConversation(Base):
     conversation_id = Column(BigInteger, primary_key=True, autoincrement=True, comment="会话ID")
     user_id = Column(BigInteger, nullable=False, index=True, comment="用户ID")
 
+    session_id = Column(String(64), nullable=False, comment="会话ID（UUID）")
     context_symbol = Column(String(20), comment="上下文股票代码")
     context_type = Column(String(50), comment="上下文类型")
 
-    # 对话消息 (存储为JSON数组)
-    messages = Column(JSON, nullable=False, comment="消息列表 [{role, content, timestamp}]")
+    # 滚动摘要：seq <= summary_seq 的消息已折叠进 summary，不再放入Prompt
+    summary = Column(Text, comment="早期对话摘要")
+    summary_seq = Column(Integer, default=0, server_default="0", nullable=False, comment="已折叠进摘要的最大消息序号")
 
     total_tokens = Column(Integer, default=0, comment="消耗Token总数")
 
@@ -81,7 +87,64 @@ class AIConversation(Base):
     __table_args__ = (
         Index("idx_ai_conversations_user", "user_id"),
         Index("idx_ai_conversations_context_symbol", "context_symbol"),
+        Index(
+            "uq_ai_conversations_session_live",
+            "session_id",
+            unique=True,
+            postgresql_where=text("is_deleted = false"),
+        ),
     )
 
     def __repr__(self):
         return f"<AIConversation(conversation_id={self.conversation_id}, user_id={self.user_id})>"
+
+
+class AIMessage(Base):
+    """AI Message table - AI对话消息表（每条消息一行，只追加）"""
+
+    __tablename__ = "ai_messages"
+
+    message_id = Column(BigInteger, primary_key=True, autoincrement=True, comment="消息ID")
+    conversation_id = Column(BigInteger, nullable=False, comment="会话ID")
+    seq = Column(Integer, nullable=False, comment="会话内序号（从1开始递增）")
+
+    role = Column(String(20), nullable=False, comment="角色: user/assistant/system")
+    content = Column(Text, nullable=False, comment="消息内容")
+    tokens = Column(Integer, comment="消息Token数（未统计时为空）")
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, comment="创建时间")
+
+    __table_args__ = (Index("uq_ai_messages_conversation_seq", "conversation_id", "seq", unique=True),)
+
+    def __repr__(self):
+        return f"<AIMessage(conversation_id={self.conversation_id}, seq={self.seq}, role={self.role})>"
+
+
+class SymbolAnalysisSnapshot(Base):
+    """Symbol Analysis Snapshot table - 个股分析快照表（跨用户共享，同一分析输入只调用一次AI）"""
+
+    __tablename__ = "symbol_analysis_snapshots"
+
+    snapshot_id = Column(BigInteger, primary_key=True, autoincrement=True, comment="快照ID")
+
+    symbol = Column(String(20), nullable=False, comment="股票代码")
+    stock_name = Column(String(100), comment="股票名称")
+
+    # 分析输入（Prompt + 生成参数）的SHA-256哈希，行情数据刷新后哈希随之变化
+    input_hash = Column(String(64), nullable=False, comment="分析输入哈希")
+
+    ai_score = Column(JSON, comment="AI评分详情 {fundamental_score, technical_score, valuation_score, overall_score}")
+    ai_suggestion = Column(Text, nullable=False, comment="AI建议")
+    ai_strategy = Column(
+        JSON, comment="AI策略 {target_price, recommended_position, risk_level, holding_period, stop_loss_price}"
+    )
+    ai_reasons = Column(ARRAY(Text), default=list, comment="AI理由列表")
+    confidence_level = Column(NUMERIC(10, 4), comment="置信度 (0-100)")
+
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, comment="过期时间")
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, comment="创建时间")
+
+    __table_args__ = (Index("idx_symbol_analysis_snapshots_hash", "input_hash", "expires_at"),)
+
+    def __repr__(self):
+        return f"<SymbolAnalysisSnapshot(snapshot_id={self.snapshot_id}, symbol={self.symbol})>"
@@ -3,7 +3,7 @@ Event Model
 """
 
 from sqlalchemy import Column, BigInteger, String, Integer, Boolean, TIMESTAMP, Text, Index
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 
 
@@ -45,6 +45,7 @@ class Event(Base):
         Index("idx_events_user_date", "user_id", "event_date"),
         Index("idx_events_symbol", "symbol"),
         Index("idx_events_category_date", "category", "event_date"),
+        Index("idx_events_user_date_live", "user_id", "event_date", postgresql_where=text("is_deleted = false")),
     )
 
     def __repr__(self):
@@ -3,7 +3,7 @@ Holding Model
 """
 
 from sqlalchemy import Column, BigInteger, String, NUMERIC, Boolean, TIMESTAMP, Index
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 
 
@@ -54,6 +54,15 @@ class Holding(Base):
         Index("idx_holdings_user_account", "user_id", "account_id"),
         Index("idx_holdings_account_symbol", "account_id", "symbol"),
         Index("idx_holdings_symbol", "symbol"),
+        # 部分索引：只包含未删除记录，查询条件须为 is_deleted = false
+        # 唯一：每个账户每只股票最多一条有效持仓（持仓同步 ON CONFLICT 的冲突目标）
+        Index(
+            "idx_holdings_account_symbol_live",
+            "account_id",
+            "symbol",
+            unique=True,
+            postgresql_where=text("is_deleted = false"),
+        ),
     )
 
     def __repr__(self):
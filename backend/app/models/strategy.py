@@ -3,7 +3,7 @@ Strategy Model - 操作策略模型
 """
 
 from sqlalchemy import Column, BigInteger, String, NUMERIC, Boolean, TIMESTAMP, Index, Text
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 
 
@@ -51,6 +51,7 @@ class Strategy(Base):
         Index("idx_strategies_symbol", "symbol"),
         Index("idx_strategies_status", "status"),
         Index("idx_strategies_user_symbol", "user_id", "symbol"),
+        Index("idx_strategies_user_status_live", "user_id", "status", postgresql_where=text("is_deleted = false")),
     )
 
     def __repr__(self):
@@ -3,7 +3,7 @@ Trade Model
 """
 
 from sqlalchemy import Column, BigInteger, String, NUMERIC, Boolean, TIMESTAMP, Index
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.core.database import Base
 
 
@@ -47,6 +47,8 @@ class Trade(Base):
         Index("idx_trades_account_symbol", "account_id", "symbol"),
         Index("idx_trades_trade_date", "trade_date"),
         Index("idx_trades_symbol_date", "symbol", "trade_date"),
+        Index("idx_trades_user_date", "user_id", "trade_date", "created_at", "trade_id"),
+        Index("idx_trades_account_date_live", "account_id", "trade_date", postgresql_where=text("is_deleted = false")),
     )
 
     def __repr__(self):
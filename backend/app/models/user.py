@@ -2,7 +2,7 @@
 User Model
 """
 
-from sqlalchemy import Column, BigInteger, String, Boolean, TIMESTAMP
+from sqlalchemy import Column, BigInteger, Integer, String, Boolean, TIMESTAMP, event, inspect
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -22,6 +22,13 @@ class User(Base):
 
     is_active = Column(Boolean, default=True, nullable=False, comment="是否激活")
     is_deleted = Column(Boolean, default=False, nullable=False, comment="是否删除")
+    token_version = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="令牌版本（停用账户或修改密码时递增，使已签发的令牌失效）",
+    )
 
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, comment="创建时间")
     updated_at = Column(
@@ -32,3 +39,14 @@ class User(Base):
 
     def __repr__(self):
         return f"<User(user_id={self.user_id}, username={self.username})>"
+
+
+# 停用、删除账户或修改密码时递增令牌版本，已签发的令牌（以及按旧版本缓存的用户）随之失效
+_REVOKING_ATTRIBUTES = ("is_active", "is_deleted", "password_hash")
+
+
+@event.listens_for(User, "before_update")
+def _bump_token_version(mapper, connection, target) -> None:
+    state = inspect(target)
+    if any(state.attrs[key].history.has_changes() for key in _REVOKING_ATTRIBUTES):
+        target.token_version = (target.token_version or 0) + 1
@@ -8,11 +8,15 @@ from typing import List, Optional
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.account import Account
+from app.repositories.pagination import paginate
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class AccountRepository:
+class AccountRepository(SoftDeleteQueryMixin):
     """账户数据访问层（纯CRUD，无业务逻辑）"""
 
+    model = Account
+
     async def get_by_id(self, db: AsyncSession, account_id: int) -> Optional[Account]:
         """
         根据ID查询账户
@@ -24,9 +28,7 @@ class AccountRepository:
         Returns:
             Account对象，不存在返回None
         """
-        result = await db.execute(
-            select(Account).where(and_(Account.account_id == account_id, Account.is_deleted is False))
-        )
+        result = await db.execute(select(Account).where(and_(Account.account_id == account_id, self.not_deleted())))
         return result.scalar_one_or_none()
 
     async def query_by_user(
@@ -53,31 +55,16 @@ class AccountRepository:
             (账户列表, 总数)
         """
         # 构建查询条件
-        conditions = [Account.user_id == user_id, Account.is_deleted is False]
+        conditions = [Account.user_id == user_id, self.not_deleted()]
 
         if market:
             conditions.append(Account.market == market)
         if status:
             conditions.append(Account.status == status)
 
-        # 查询总数
-        count_query = select(Account).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Account)
-            .where(and_(*conditions))
-            .order_by(Account.created_at.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        accounts = result.scalars().all()
-
-        return list(accounts), total
+        # 分页查询（count(*)统计总数）
+        query = select(Account).where(and_(*conditions)).order_by(Account.created_at.desc())
+        return await paginate(db, query, page, page_size)
 
     async def create(self, db: AsyncSession, data: dict) -> Account:
         """
@@ -92,8 +79,7 @@ class AccountRepository:
         """
         account = Account(**data)
         db.add(account)
-        await db.commit()
-        await db.refresh(account)
+        await db.flush()
         return account
 
     async def update(self, db: AsyncSession, account_id: int, data: dict) -> Optional[Account]:
@@ -116,8 +102,7 @@ class AccountRepository:
             if hasattr(account, key):
                 setattr(account, key, value)
 
-        await db.commit()
-        await db.refresh(account)
+        await db.flush()
         return account
 
     async def soft_delete(self, db: AsyncSession, account_id: int) -> bool:
@@ -140,7 +125,7 @@ class AccountRepository:
         account.is_deleted = True
         account.deleted_at = datetime.utcnow()
 
-        await db.commit()
+        await db.flush()
         return True
 
     async def get_by_user_and_name(self, db: AsyncSession, user_id: int, account_name: str) -> Optional[Account]:
@@ -157,7 +142,7 @@ class AccountRepository:
         """
         result = await db.execute(
             select(Account).where(
-                and_(Account.user_id == user_id, Account.account_name == account_name, Account.is_deleted is False)
+                and_(Account.user_id == user_id, Account.account_name == account_name, self.not_deleted())
             )
         )
         return result.scalar_one_or_none()
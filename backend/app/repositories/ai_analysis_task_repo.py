@@ -0,0 +1,66 @@
+"""
+AI Analysis Task Repository
+
+纯数据访问层 - 只负责ai_analysis_tasks表的CRUD操作，不包含任何业务逻辑
+"""
+
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.ai_analysis_task import AIAnalysisTask
+from app.repositories.soft_delete import SoftDeleteQueryMixin
+
+
+class AIAnalysisTaskRepository(SoftDeleteQueryMixin):
+    """AI批量分析任务数据访问层（纯CRUD，无业务逻辑）"""
+
+    model = AIAnalysisTask
+
+    async def get_by_id(self, db: AsyncSession, task_id: str) -> Optional[AIAnalysisTask]:
+        """
+        根据任务ID查询（主键查询）
+
+        Args:
+            db: 数据库会话
+            task_id: 任务ID
+
+        Returns:
+            AIAnalysisTask对象，不存在返回None
+        """
+        result = await db.execute(select(AIAnalysisTask).where(AIAnalysisTask.task_id == task_id, self.not_deleted()))
+        return result.scalar_one_or_none()
+
+    async def create(self, db: AsyncSession, task_data: dict) -> AIAnalysisTask:
+        """
+        创建分析任务
+
+        Args:
+            db: 数据库会话
+            task_data: 任务数据字典
+
+        Returns:
+            创建的AIAnalysisTask对象
+        """
+        task = AIAnalysisTask(**task_data)
+        db.add(task)
+        await db.flush()
+        return task
+
+    async def update(self, db: AsyncSession, task: AIAnalysisTask, update_data: dict) -> AIAnalysisTask:
+        """
+        更新分析任务（状态、进度、结果）
+
+        Args:
+            db: 数据库会话
+            task: 已加载的任务对象
+            update_data: 更新数据字典
+
+        Returns:
+            更新后的AIAnalysisTask对象
+        """
+        for key, value in update_data.items():
+            if hasattr(task, key):
+                setattr(task, key, value)
+
+        await db.flush()
+        return task
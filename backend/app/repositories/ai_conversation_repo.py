@@ -2,34 +2,37 @@
 AI Conversation Repository
 
 纯数据访问层 - 只负责ai_conversations表的CRUD操作，不包含任何业务逻辑
-注意：AIConversation表结构中messages是JSON数组，每个会话存一条记录
+注意：每个会话存一条记录，消息存储在ai_messages表（见 AIMessageRepository）
 """
 
-from datetime import datetime
 from typing import Optional
-from sqlalchemy import select, and_
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.ai_decision import AIConversation  # AIConversation定义在ai_decision.py中
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class AIConversationRepository:
+class AIConversationRepository(SoftDeleteQueryMixin):
     """AI对话数据访问层（纯CRUD，无业务逻辑）"""
 
-    async def get_by_session(self, db: AsyncSession, session_id: str) -> Optional[AIConversation]:
+    model = AIConversation
+
+    async def get_by_session(self, db: AsyncSession, user_id: int, session_id: str) -> Optional[AIConversation]:
         """
-        根据session_id查询会话
+        根据session_id查询用户的会话（走 session_id 唯一部分索引，同一查询校验归属）
 
         Args:
             db: 数据库会话
+            user_id: 用户ID
             session_id: 会话ID
 
         Returns:
-            AIConversation对象，不存在返回None
+            AIConversation对象，不存在或不属于该用户返回None
         """
-        # 使用context_symbol作为session_id（简化处理）
         result = await db.execute(
             select(AIConversation).where(
-                and_(AIConversation.context_symbol == session_id, AIConversation.is_deleted is False)
+                AIConversation.session_id == session_id, AIConversation.user_id == user_id, self.not_deleted()
             )
         )
         return result.scalar_one_or_none()
@@ -41,7 +44,7 @@ class AIConversationRepository:
         session_id: str,
         context_symbol: Optional[str] = None,
         context_type: Optional[str] = None,
-    ) -> AIConversation:
+    ) -> Optional[AIConversation]:
         """
         创建或获取会话记录
 
@@ -53,73 +56,66 @@ class AIConversationRepository:
             context_type: 上下文类型
 
         Returns:
-            AIConversation对象
+            AIConversation对象；session_id 已被其他用户的会话占用时返回None
+            （同一用户并发创建同一会话时返回先创建的记录）
         """
         # 先尝试获取
-        conv = await self.get_by_session(db, session_id)
+        conv = await self.get_by_session(db, user_id, session_id)
         if conv:
             return conv
 
-        # 不存在则创建
+        # 不存在则创建（在保存点中写入，唯一索引冲突只回滚本次插入）
         conv = AIConversation(
             user_id=user_id,
-            context_symbol=session_id,  # 使用session_id作为context_symbol
+            session_id=session_id,
+            context_symbol=context_symbol,
             context_type=context_type or "chat",
-            messages=[],  # 初始化空消息列表
             total_tokens=0,
         )
-        db.add(conv)
-        await db.flush()
-        await db.refresh(conv)
+        try:
+            async with db.begin_nested():
+                db.add(conv)
+        except IntegrityError:
+            # 同一用户的并发请求已先创建该会话时返回其记录；仍不存在说明会话属于其他用户
+            return await self.get_by_session(db, user_id, session_id)
         return conv
 
-    async def append_message(self, db: AsyncSession, session_id: str, role: str, content: str) -> AIConversation:
+    async def delete_session(self, db: AsyncSession, conv: AIConversation) -> None:
         """
-        向会话添加消息
+        软删除会话
 
         Args:
             db: 数据库会话
-            session_id: 会话ID
-            role: 角色 (user/assistant/system)
-            content: 消息内容
-
-        Returns:
-            更新后的AIConversation对象
+            conv: 会话对象
         """
-        conv = await self.get_by_session(db, session_id)
-        if not conv:
-            raise ValueError(f"Session {session_id} not found")
-
-        # 构建新消息
-        new_message = {"role": role, "content": content, "timestamp": datetime.now().isoformat()}
-
-        # 追加消息到messages数组
-        if conv.messages is None:
-            conv.messages = []
-
-        messages = list(conv.messages) if conv.messages else []
-        messages.append(new_message)
-        conv.messages = messages
-
+        conv.is_deleted = True
         await db.flush()
-        await db.refresh(conv)
-        return conv
 
-    async def delete_session(self, db: AsyncSession, session_id: str) -> bool:
+    async def update_summary(self, db: AsyncSession, conv: AIConversation, summary: str, summary_seq: int) -> None:
         """
-        软删除会话
+        更新会话的滚动摘要
 
         Args:
             db: 数据库会话
-            session_id: 会话ID
+            conv: 会话对象
+            summary: 摘要内容
+            summary_seq: 已折叠进摘要的最大消息序号
+        """
+        conv.summary = summary
+        conv.summary_seq = summary_seq
+        await db.flush()
 
-        Returns:
-            是否删除成功
+    async def add_tokens(self, db: AsyncSession, conversation_id: int, tokens: int) -> None:
         """
-        conv = await self.get_by_session(db, session_id)
-        if not conv:
-            return False
+        累加会话消耗的Token数（原子更新，并发对话不会丢失计数）
 
-        conv.is_deleted = True
-        await db.flush()
-        return True
+        Args:
+            db: 数据库会话
+            conversation_id: 会话ID
+            tokens: 本轮消耗的Token数
+        """
+        await db.execute(
+            update(AIConversation)
+            .where(AIConversation.conversation_id == conversation_id)
+            .values(total_tokens=func.coalesce(AIConversation.total_tokens, 0) + tokens)
+        )
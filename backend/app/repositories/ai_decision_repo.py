@@ -8,11 +8,18 @@ from typing import List, Optional
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.ai_decision import AIDecision
+from app.repositories.pagination import paginate, paginate_keyset
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class AIDecisionRepository:
+class AIDecisionRepository(SoftDeleteQueryMixin):
     """AI决策数据访问层（纯CRUD，无业务逻辑）"""
 
+    model = AIDecision
+
+    # 用户AI决策列表的排序键（倒序，最后一列唯一，用于游标分页）
+    SORT_KEYS = (AIDecision.created_at, AIDecision.decision_id)
+
     async def get_by_id(self, db: AsyncSession, decision_id: int) -> Optional[AIDecision]:
         """
         根据ID查询AI决策
@@ -25,10 +32,30 @@ class AIDecisionRepository:
             AIDecision对象，不存在返回None
         """
         result = await db.execute(
-            select(AIDecision).where(and_(AIDecision.decision_id == decision_id, AIDecision.is_deleted is False))
+            select(AIDecision).where(and_(AIDecision.decision_id == decision_id, self.not_deleted()))
         )
         return result.scalar_one_or_none()
 
+    async def get_by_ids(self, db: AsyncSession, decision_ids: List[int]) -> List[AIDecision]:
+        """
+        根据ID批量查询AI决策（单次IN查询）
+
+        Args:
+            db: 数据库会话
+            decision_ids: 决策ID列表
+
+        Returns:
+            AIDecision列表（按决策ID升序）
+        """
+        if not decision_ids:
+            return []
+        result = await db.execute(
+            select(AIDecision)
+            .where(AIDecision.decision_id.in_(decision_ids), self.not_deleted())
+            .order_by(AIDecision.decision_id)
+        )
+        return list(result.scalars().all())
+
     async def query_by_user(
         self,
         db: AsyncSession,
@@ -52,32 +79,49 @@ class AIDecisionRepository:
         Returns:
             (决策列表, 总数)
         """
-        # 构建查询条件
-        conditions = [AIDecision.user_id == user_id, AIDecision.is_deleted is False]
+        query = self._build_user_query(user_id, analysis_type, symbol)
+
+        # 分页查询（count(*)统计总数，排序与游标模式一致）
+        query = query.order_by(*(key.desc() for key in self.SORT_KEYS))
+        return await paginate(db, query, page, page_size)
+
+    async def query_by_user_after(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        after: Optional[list] = None,
+        analysis_type: Optional[str] = None,
+        symbol: Optional[str] = None,
+        page_size: int = 20,
+    ) -> tuple[List[AIDecision], Optional[list]]:
+        """
+        查询用户的AI决策列表（游标分页）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            after: 上一页最后一条记录的排序键值 [created_at, decision_id]（首页为None）
+            analysis_type: 分析类型（可选）: daily/single/portfolio
+            symbol: 股票代码（可选）
+            page_size: 每页数量
+
+        Returns:
+            (决策列表, 下一页排序键值；没有下一页时为None)
+        """
+        query = self._build_user_query(user_id, analysis_type, symbol)
+        return await paginate_keyset(db, query, self.SORT_KEYS, page_size, after=after)
+
+    @classmethod
+    def _build_user_query(cls, user_id: int, analysis_type: Optional[str], symbol: Optional[str]):
+        """构建用户AI决策查询（含筛选条件，不含排序）"""
+        conditions = [AIDecision.user_id == user_id, cls.not_deleted()]
 
         if analysis_type:
             conditions.append(AIDecision.analysis_type == analysis_type)
         if symbol:
             conditions.append(AIDecision.symbol == symbol)
 
-        # 查询总数
-        count_query = select(AIDecision).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(AIDecision)
-            .where(and_(*conditions))
-            .order_by(AIDecision.created_at.desc())
-            .limit(page_size)
-            .offset((page - 1) * page_size)
-        )
-
-        result = await db.execute(query)
-        decisions = result.scalars().all()
-
-        return list(decisions), total
+        return select(AIDecision).where(and_(*conditions))
 
     async def query_by_symbol(
         self, db: AsyncSession, symbol: str, analysis_type: Optional[str] = None, limit: int = 10
@@ -94,7 +138,7 @@ class AIDecisionRepository:
         Returns:
             决策列表
         """
-        conditions = [AIDecision.symbol == symbol, AIDecision.is_deleted is False]
+        conditions = [AIDecision.symbol == symbol, self.not_deleted()]
 
         if analysis_type:
             conditions.append(AIDecision.analysis_type == analysis_type)
@@ -118,7 +162,6 @@ class AIDecisionRepository:
         decision = AIDecision(**decision_data)
         db.add(decision)
         await db.flush()
-        await db.refresh(decision)
         return decision
 
     async def update(self, db: AsyncSession, decision_id: int, update_data: dict) -> Optional[AIDecision]:
@@ -142,7 +185,6 @@ class AIDecisionRepository:
                 setattr(decision, key, value)
 
         await db.flush()
-        await db.refresh(decision)
         return decision
 
     async def soft_delete(self, db: AsyncSession, decision_id: int) -> bool:
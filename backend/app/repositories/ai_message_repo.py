@@ -0,0 +1,72 @@
+"""
+AI Message Repository
+
+纯数据访问层 - 只负责ai_messages表的读写操作，不包含任何业务逻辑
+注意：消息只追加不修改，会话内按seq排序；读取历史只取最近N条
+"""
+
+from typing import List, Optional
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.ai_decision import AIMessage
+
+
+class AIMessageRepository:
+    """AI对话消息数据访问层（纯CRUD，无业务逻辑）"""
+
+    async def append(
+        self, db: AsyncSession, conversation_id: int, role: str, content: str, tokens: Optional[int] = None
+    ) -> AIMessage:
+        """
+        追加一条消息（seq取会话内最大序号+1，一条 INSERT ... SELECT ... RETURNING 完成）
+
+        并发追加同一会话时，(conversation_id, seq) 唯一索引冲突会使后提交的事务失败，不会产生重复序号。
+
+        Args:
+            db: 数据库会话
+            conversation_id: 会话ID
+            role: 角色 (user/assistant/system)
+            content: 消息内容
+            tokens: 消息Token数（可选）
+
+        Returns:
+            新增的AIMessage对象
+        """
+        next_seq = select(
+            literal(conversation_id, AIMessage.conversation_id.type),
+            func.coalesce(func.max(AIMessage.seq), 0) + 1,
+            literal(role, AIMessage.role.type),
+            literal(content, AIMessage.content.type),
+            literal(tokens, AIMessage.tokens.type),
+        ).where(AIMessage.conversation_id == conversation_id)
+
+        stmt = (
+            insert(AIMessage)
+            .from_select(["conversation_id", "seq", "role", "content", "tokens"], next_seq)
+            .returning(AIMessage)
+        )
+        result = await db.scalars(stmt)
+        return result.one()
+
+    async def get_recent(
+        self, db: AsyncSession, conversation_id: int, limit: int, after_seq: int = 0
+    ) -> List[AIMessage]:
+        """
+        查询会话最近N条消息（按seq正序返回）
+
+        Args:
+            db: 数据库会话
+            conversation_id: 会话ID
+            limit: 消息数量
+            after_seq: 只查询序号大于该值的消息（跳过已折叠进摘要的消息）
+
+        Returns:
+            AIMessage列表（从旧到新）
+        """
+        result = await db.execute(
+            select(AIMessage)
+            .where(AIMessage.conversation_id == conversation_id, AIMessage.seq > after_seq)
+            .order_by(AIMessage.seq.desc())
+            .limit(limit)
+        )
+        return list(reversed(result.scalars().all()))
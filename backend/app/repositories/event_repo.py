@@ -6,14 +6,21 @@ Event Repository
 
 from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, false
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.event import Event
+from app.repositories.pagination import count_rows, paginate, paginate_keyset
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class EventRepository:
+class EventRepository(SoftDeleteQueryMixin):
     """事件数据访问层（纯CRUD，无业务逻辑）"""
 
+    model = Event
+
+    # 用户事件列表的排序键（倒序，最后一列唯一，用于游标分页）
+    SORT_KEYS = (Event.event_date, Event.event_id)
+
     async def get_by_id(self, db: AsyncSession, event_id: int) -> Optional[Event]:
         """
         根据ID查询事件
@@ -25,7 +32,7 @@ class EventRepository:
         Returns:
             Event对象，不存在返回None
         """
-        result = await db.execute(select(Event).where(and_(Event.event_id == event_id, Event.is_deleted is False)))
+        result = await db.execute(select(Event).where(and_(Event.event_id == event_id, self.not_deleted())))
         return result.scalar_one_or_none()
 
     async def query_by_user(
@@ -42,7 +49,7 @@ class EventRepository:
         page_size: int = 20,
     ) -> tuple[List[Event], int]:
         """
-        查询用户事件列表（支持多种筛选）
+        查询用户事件列表（支持多种筛选，页码分页）
 
         Args:
             db: 数据库会话
@@ -59,8 +66,59 @@ class EventRepository:
         Returns:
             (事件列表, 总数)
         """
-        # 构建查询条件
-        conditions = [Event.user_id == user_id, Event.is_deleted is False]
+        query = self._build_user_query(user_id, category, event_type, symbol, is_read, start_date, end_date)
+
+        # 分页查询（count(*)统计总数，排序与游标模式一致）
+        query = query.order_by(*(key.desc() for key in self.SORT_KEYS))
+        return await paginate(db, query, page, page_size)
+
+    async def query_by_user_after(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        after: Optional[list] = None,
+        category: Optional[str] = None,
+        event_type: Optional[str] = None,
+        symbol: Optional[str] = None,
+        is_read: Optional[bool] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 20,
+    ) -> tuple[List[Event], Optional[list]]:
+        """
+        查询用户事件列表（游标分页，走 idx_events_user_date 索引）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            after: 上一页最后一条记录的排序键值 [event_date, event_id]（首页为None）
+            category: 事件类别（可选）
+            event_type: 事件类型（可选）
+            symbol: 股票代码（可选）
+            is_read: 是否已读（可选）
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            page_size: 每页数量
+
+        Returns:
+            (事件列表, 下一页排序键值；没有下一页时为None)
+        """
+        query = self._build_user_query(user_id, category, event_type, symbol, is_read, start_date, end_date)
+        return await paginate_keyset(db, query, self.SORT_KEYS, page_size, after=after)
+
+    @classmethod
+    def _build_user_query(
+        cls,
+        user_id: int,
+        category: Optional[str],
+        event_type: Optional[str],
+        symbol: Optional[str],
+        is_read: Optional[bool],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ):
+        """构建用户事件查询（含筛选条件，不含排序）"""
+        conditions = [Event.user_id == user_id, cls.not_deleted()]
 
         if category:
             conditions.append(Event.category == category)
@@ -75,24 +133,7 @@ class EventRepository:
         if end_date:
             conditions.append(Event.event_date <= end_date)
 
-        # 查询总数
-        count_query = select(Event).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Event)
-            .where(and_(*conditions))
-            .order_by(Event.event_date.desc(), Event.created_at.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        events = result.scalars().all()
-
-        return list(events), total
+        return select(Event).where(and_(*conditions))
 
     async def query_by_symbol(
         self, db: AsyncSession, user_id: int, symbol: str, page: int = 1, page_size: int = 20
@@ -110,26 +151,11 @@ class EventRepository:
         Returns:
             (事件列表, 总数)
         """
-        conditions = [Event.user_id == user_id, Event.symbol == symbol, Event.is_deleted is False]
-
-        # 查询总数
-        count_query = select(Event).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Event)
-            .where(and_(*conditions))
-            .order_by(Event.event_date.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        events = result.scalars().all()
+        conditions = [Event.user_id == user_id, Event.symbol == symbol, self.not_deleted()]
 
-        return list(events), total
+        # 分页查询（count(*)统计总数）
+        query = select(Event).where(and_(*conditions)).order_by(Event.event_date.desc())
+        return await paginate(db, query, page, page_size)
 
     async def create(self, db: AsyncSession, data: dict) -> Event:
         """
@@ -144,8 +170,7 @@ class EventRepository:
         """
         event = Event(**data)
         db.add(event)
-        await db.commit()
-        await db.refresh(event)
+        await db.flush()
         return event
 
     async def update(self, db: AsyncSession, event_id: int, data: dict) -> Optional[Event]:
@@ -168,8 +193,7 @@ class EventRepository:
             if hasattr(event, key):
                 setattr(event, key, value)
 
-        await db.commit()
-        await db.refresh(event)
+        await db.flush()
         return event
 
     async def soft_delete(self, db: AsyncSession, event_id: int) -> bool:
@@ -190,7 +214,7 @@ class EventRepository:
         event.is_deleted = True
         event.deleted_at = datetime.utcnow()
 
-        await db.commit()
+        await db.flush()
         return True
 
     async def mark_as_read(self, db: AsyncSession, event_id: int) -> bool:
@@ -209,7 +233,7 @@ class EventRepository:
             return False
 
         event.is_read = True
-        await db.commit()
+        await db.flush()
         return True
 
     async def get_unread_count(self, db: AsyncSession, user_id: int) -> int:
@@ -223,10 +247,9 @@ class EventRepository:
         Returns:
             未读数量
         """
-        result = await db.execute(
-            select(Event).where(and_(Event.user_id == user_id, Event.is_read is False, Event.is_deleted is False))
+        return await count_rows(
+            db, select(Event).where(and_(Event.user_id == user_id, Event.is_read == false(), self.not_deleted()))
         )
-        return len(result.scalars().all())
 
     async def query_by_category(
         self, db: AsyncSession, user_id: int, category: str, page: int = 1, page_size: int = 20
@@ -244,23 +267,8 @@ class EventRepository:
         Returns:
             (事件列表, 总数)
         """
-        conditions = [Event.user_id == user_id, Event.category == category, Event.is_deleted is False]
-
-        # 查询总数
-        count_query = select(Event).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Event)
-            .where(and_(*conditions))
-            .order_by(Event.event_date.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        events = result.scalars().all()
+        conditions = [Event.user_id == user_id, Event.category == category, self.not_deleted()]
 
-        return list(events), total
+        # 分页查询（count(*)统计总数）
+        query = select(Event).where(and_(*conditions)).order_by(Event.event_date.desc())
+        return await paginate(db, query, page, page_size)
@@ -4,15 +4,19 @@ Holding Repository
 纯数据访问层 - 只负责持仓表的CRUD操作，不包含任何业务逻辑
 """
 
-from typing import List, Optional
-from sqlalchemy import select, and_
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select, update, and_, func, true
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.holding import Holding
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class HoldingRepository:
+class HoldingRepository(SoftDeleteQueryMixin):
     """持仓数据访问层（纯CRUD，无业务逻辑）"""
 
+    model = Holding
+
     async def get_by_id(self, db: AsyncSession, holding_id: int) -> Optional[Holding]:
         """
         根据ID查询持仓记录
@@ -24,9 +28,7 @@ class HoldingRepository:
         Returns:
             Holding对象，不存在返回None
         """
-        result = await db.execute(
-            select(Holding).where(and_(Holding.holding_id == holding_id, Holding.is_deleted is False))
-        )
+        result = await db.execute(select(Holding).where(and_(Holding.holding_id == holding_id, self.not_deleted())))
         return result.scalar_one_or_none()
 
     async def get_by_account_symbol(self, db: AsyncSession, account_id: int, symbol: str) -> Optional[Holding]:
@@ -42,9 +44,48 @@ class HoldingRepository:
             Holding对象，不存在返回None
         """
         result = await db.execute(
-            select(Holding).where(
-                and_(Holding.account_id == account_id, Holding.symbol == symbol, Holding.is_deleted is False)
-            )
+            select(Holding).where(and_(Holding.account_id == account_id, Holding.symbol == symbol, self.not_deleted()))
+        )
+        return result.scalar_one_or_none()
+
+    async def get_for_update(self, db: AsyncSession, account_id: int, symbol: str) -> Optional[Holding]:
+        """
+        查询账户某只股票的持仓并加行锁（SELECT ... FOR UPDATE）
+
+        用于交易增删改时增量更新持仓，锁持续到调用方提交事务，避免并发交易互相覆盖
+
+        Args:
+            db: 数据库会话
+            account_id: 账户ID
+            symbol: 股票代码
+
+        Returns:
+            Holding对象，不存在返回None
+        """
+        result = await db.execute(
+            select(Holding)
+            .where(Holding.account_id == account_id, Holding.symbol == symbol, self.not_deleted())
+            .with_for_update()
+        )
+        return result.scalar_one_or_none()
+
+    async def get_latest_deleted(self, db: AsyncSession, account_id: int, symbol: str) -> Optional[Holding]:
+        """
+        查询账户某只股票最近一次清仓（软删除）的持仓
+
+        Args:
+            db: 数据库会话
+            account_id: 账户ID
+            symbol: 股票代码
+
+        Returns:
+            Holding对象，不存在返回None
+        """
+        result = await db.execute(
+            select(Holding)
+            .where(Holding.account_id == account_id, Holding.symbol == symbol, Holding.is_deleted == true())
+            .order_by(Holding.deleted_at.desc().nulls_last(), Holding.holding_id.desc())
+            .limit(1)
         )
         return result.scalar_one_or_none()
 
@@ -60,7 +101,7 @@ class HoldingRepository:
         Returns:
             持仓列表
         """
-        conditions = [Holding.account_id == account_id, Holding.is_deleted is False]
+        conditions = [Holding.account_id == account_id, self.not_deleted()]
 
         if symbol:
             conditions.append(Holding.symbol == symbol)
@@ -82,7 +123,7 @@ class HoldingRepository:
         Returns:
             持仓列表
         """
-        conditions = [Holding.user_id == user_id, Holding.is_deleted is False]
+        conditions = [Holding.user_id == user_id, self.not_deleted()]
 
         if symbol:
             conditions.append(Holding.symbol == symbol)
@@ -92,6 +133,35 @@ class HoldingRepository:
         result = await db.execute(query)
         return list(result.scalars().all())
 
+    async def query_stats_by_accounts(self, db: AsyncSession, account_ids: List[int]) -> Dict[int, Any]:
+        """
+        按账户分组统计持仓（一条 GROUP BY 查询，不加载持仓对象）
+
+        Args:
+            db: 数据库会话
+            account_ids: 账户ID列表
+
+        Returns:
+            账户ID到统计行的映射，统计行包含 market_value（市值）、total_cost（成本）、holding_count（持仓数）；
+            没有持仓的账户不在映射中
+        """
+        if not account_ids:
+            return {}
+
+        query = (
+            select(
+                Holding.account_id,
+                func.coalesce(func.sum(Holding.quantity * Holding.current_price), 0).label("market_value"),
+                func.coalesce(func.sum(Holding.quantity * Holding.avg_cost), 0).label("total_cost"),
+                func.count().label("holding_count"),
+            )
+            .where(Holding.account_id.in_(account_ids), self.not_deleted())
+            .group_by(Holding.account_id)
+        )
+
+        result = await db.execute(query)
+        return {row.account_id: row for row in result.all()}
+
     async def create(self, db: AsyncSession, data: dict) -> Holding:
         """
         创建持仓记录
@@ -105,41 +175,88 @@ class HoldingRepository:
         """
         holding = Holding(**data)
         db.add(holding)
-        await db.commit()
-        await db.refresh(holding)
+        await db.flush()
         return holding
 
-    async def upsert(self, db: AsyncSession, data: dict) -> Holding:
+    async def create_if_absent(self, db: AsyncSession, data: dict) -> Optional[Holding]:
         """
-        插入或更新持仓记录（如果已存在则更新）
+        创建持仓记录，同一 (账户, 股票) 已有未删除持仓时不写入
+
+        INSERT ... ON CONFLICT (account_id, symbol) DO NOTHING，冲突目标同 sync_account_holdings；
+        并发事务插入同一持仓且未提交时，等待其提交后再判断冲突
 
         Args:
             db: 数据库会话
-            data: 持仓数据字典（必须包含account_id和symbol）
+            data: 持仓数据字典
 
         Returns:
-            Holding对象
+            创建的Holding对象，已存在返回None
         """
-        account_id = data.get("account_id")
-        symbol = data.get("symbol")
+        stmt = (
+            insert(Holding)
+            .values(**data)
+            .on_conflict_do_nothing(index_elements=[Holding.account_id, Holding.symbol], index_where=self.not_deleted())
+            .returning(Holding)
+        )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
 
-        if not account_id or not symbol:
-            raise ValueError("account_id and symbol are required for upsert")
+    async def assign(self, db: AsyncSession, holding: Holding, data: dict) -> Holding:
+        """
+        修改持仓记录（只flush不提交，由调用方在同一事务中提交）
 
-        # 查找是否已存在
-        existing = await self.get_by_account_symbol(db, account_id, symbol)
+        Args:
+            db: 数据库会话
+            holding: 持仓对象
+            data: 更新数据字典
+
+        Returns:
+            修改后的Holding对象
+        """
+        for key, value in data.items():
+            if hasattr(holding, key):
+                setattr(holding, key, value)
+        await db.flush()
+        return holding
+
+    async def sync_account_holdings(self, db: AsyncSession, account_id: int, holdings_data: List[dict]) -> int:
+        """
+        批量写入账户持仓（单事务）
+
+        1. 一条 INSERT ... ON CONFLICT (account_id, symbol) DO UPDATE 写入全部持仓
+        2. 一条 UPDATE 软删除不在 holdings_data 中的持仓（已清仓）
+
+        Args:
+            db: 数据库会话
+            account_id: 账户ID
+            holdings_data: 持仓数据字典列表（键一致，必须包含account_id和symbol）
+
+        Returns:
+            软删除的持仓数量
+        """
+        # 1. 批量 upsert（冲突目标为未删除记录上的唯一部分索引）
+        if holdings_data:
+            stmt = insert(Holding).values(holdings_data)
+            update_columns = {
+                key: stmt.excluded[key] for key in holdings_data[0] if key not in ("user_id", "account_id", "symbol")
+            }
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Holding.account_id, Holding.symbol],
+                index_where=self.not_deleted(),
+                set_={**update_columns, "updated_at": func.now()},
+            )
+            await db.execute(stmt)
+
+        # 2. 软删除已清仓的持仓
+        symbols = [data["symbol"] for data in holdings_data]
+        result = await db.execute(
+            update(Holding)
+            .where(Holding.account_id == account_id, self.not_deleted(), Holding.symbol.notin_(symbols))
+            .values(quantity=0, available_quantity=0, is_deleted=True, deleted_at=func.now())
+        )
 
-        if existing:
-            # 更新
-            for key, value in data.items():
-                if hasattr(existing, key):
-                    setattr(existing, key, value)
-            await db.commit()
-            await db.refresh(existing)
-            return existing
-        else:
-            # 创建
-            return await self.create(db, data)
+        await db.flush()
+        return result.rowcount
 
     async def update(self, db: AsyncSession, holding_id: int, data: dict) -> Optional[Holding]:
         """
@@ -161,8 +278,7 @@ class HoldingRepository:
             if hasattr(holding, key):
                 setattr(holding, key, value)
 
-        await db.commit()
-        await db.refresh(holding)
+        await db.flush()
         return holding
 
     async def soft_delete(self, db: AsyncSession, holding_id: int) -> bool:
@@ -185,5 +301,5 @@ class HoldingRepository:
         holding.is_deleted = True
         holding.deleted_at = datetime.utcnow()
 
-        await db.commit()
+        await db.flush()
         return True
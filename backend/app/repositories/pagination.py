@@ -0,0 +1,109 @@
+"""
+Repository Pagination Helpers
+
+分页查询工具 - 供各Repository复用
+
+- paginate: 页码分页，总数用 SELECT count(*) 统计，不加载全部行
+- paginate_keyset: 游标（keyset）分页，按排序键的上一页末尾值定位，深翻页耗时不随页码增长
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def count_rows(db: AsyncSession, query: Select) -> int:
+    """
+    统计查询匹配的行数（SELECT count(*)，忽略排序和分页）
+
+    Args:
+        db: 数据库会话
+        query: 查询语句
+
+    Returns:
+        匹配行数
+    """
+    count_query = select(func.count()).select_from(query.order_by(None).limit(None).offset(None).subquery())
+    result = await db.execute(count_query)
+    return result.scalar_one()
+
+
+async def paginate(db: AsyncSession, query: Select, page: int, page_size: int) -> Tuple[List[Any], int]:
+    """
+    页码分页查询
+
+    Args:
+        db: 数据库会话
+        query: 已包含筛选条件和排序的查询语句
+        page: 页码（从1开始）
+        page_size: 每页数量
+
+    Returns:
+        (当前页记录列表, 总数)
+    """
+    # 1. count(*) 统计总数
+    total = await count_rows(db, query)
+
+    # 2. 超出范围的页直接返回空列表，省去一次查询
+    offset = (max(page, 1) - 1) * page_size
+    if offset >= total:
+        return [], total
+
+    result = await db.execute(query.offset(offset).limit(page_size))
+    return list(result.scalars().all()), total
+
+
+async def paginate_keyset(
+    db: AsyncSession,
+    query: Select,
+    keys: Sequence[Any],
+    page_size: int,
+    after: Optional[Sequence[Any]] = None,
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[List[Any]]]:
+    """
+    游标（keyset）分页查询
+
+    按 keys 排序（最后一个键须唯一，通常为主键），用行值比较 (k1, k2, ...) < (v1, v2, ...)
+    定位到上一页末尾之后，可直接利用 keys 上的复合索引，不需要扫描并丢弃前面的行。
+
+    Args:
+        db: 数据库会话
+        query: 已包含筛选条件的查询语句（排序由本函数按 keys 设置）
+        keys: 排序列（模型属性）
+        page_size: 每页数量
+        after: 上一页最后一条记录的排序键值（首页为None）
+        descending: 是否倒序
+
+    Returns:
+        (当前页记录列表, 下一页的排序键值；没有下一页时为None)
+    """
+    # 1. 定位到上一页末尾之后
+    if after is not None:
+        row, values = tuple_(*keys), tuple_(*after)
+        query = query.where(row < values if descending else row > values)
+
+    # 2. 多取一条判断是否还有下一页
+    ordering = [key.desc() if descending else key.asc() for key in keys]
+    result = await db.execute(query.order_by(None).order_by(*ordering).limit(page_size + 1))
+    items = list(result.scalars().all())
+    if len(items) <= page_size:
+        return items, None
+
+    items = items[:page_size]
+    return items, keyset_values(items[-1], keys)
+
+
+def keyset_values(item: Any, keys: Sequence[Any]) -> List[Any]:
+    """
+    读取记录的排序键值（作为下一页的游标位置）
+
+    Args:
+        item: ORM对象
+        keys: 排序列（模型属性）
+
+    Returns:
+        排序键值列表
+    """
+    return [getattr(item, key.key) for key in keys]
@@ -8,11 +8,14 @@ from typing import Optional
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.review import Review
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class ReviewRepository:
+class ReviewRepository(SoftDeleteQueryMixin):
     """股票评价数据访问层（纯CRUD，无业务逻辑）"""
 
+    model = Review
+
     async def get_by_user_symbol(self, db: AsyncSession, user_id: int, symbol: str) -> Optional[Review]:
         """
         查询用户对指定股票的评价
@@ -26,7 +29,7 @@ class ReviewRepository:
             Review对象，不存在返回None
         """
         result = await db.execute(
-            select(Review).where(and_(Review.user_id == user_id, Review.symbol == symbol, Review.is_deleted is False))
+            select(Review).where(and_(Review.user_id == user_id, Review.symbol == symbol, self.not_deleted()))
         )
         return result.scalar_one_or_none()
 
@@ -44,7 +47,6 @@ class ReviewRepository:
         review = Review(**review_data)
         db.add(review)
         await db.flush()
-        await db.refresh(review)
         return review
 
     async def update(self, db: AsyncSession, review: Review, update_data: dict) -> Review:
@@ -64,5 +66,4 @@ class ReviewRepository:
                 setattr(review, key, value)
 
         await db.flush()
-        await db.refresh(review)
         return review
@@ -0,0 +1,33 @@
+"""
+Soft Delete Query Mixin
+
+软删除查询条件 - 供各Repository复用
+
+所有业务表用 is_deleted 标记软删除，查询只返回未删除的记录。
+条件必须写成 SQL 表达式 `is_deleted = false`：
+
+- `Model.is_deleted is False` 是 Python 的身份比较，结果恒为 False，
+  拼进 where 后整条查询变成 `WHERE false`，什么都查不到
+- `is_deleted = false` 与迁移中部分索引的谓词 `WHERE is_deleted = false` 一致，
+  PostgreSQL 规划器才能选用这些只包含有效记录的部分索引
+"""
+
+from typing import Any
+
+from sqlalchemy import ColumnElement, false
+
+
+class SoftDeleteQueryMixin:
+    """软删除查询条件（子类通过 model 指定模型）"""
+
+    model: Any = None
+
+    @classmethod
+    def not_deleted(cls) -> ColumnElement[bool]:
+        """
+        未删除记录的查询条件
+
+        Returns:
+            SQL条件表达式 `is_deleted = false`
+        """
+        return cls.model.is_deleted == false()
@@ -8,11 +8,15 @@ from typing import List, Optional
 from sqlalchemy import select, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.stock import Stock
+from app.repositories.pagination import paginate
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class StockRepository:
+class StockRepository(SoftDeleteQueryMixin):
     """股票数据访问层（纯CRUD，无业务逻辑）"""
 
+    model = Stock
+
     async def get_by_symbol(self, db: AsyncSession, symbol: str) -> Optional[Stock]:
         """
         根据股票代码查询
@@ -24,9 +28,25 @@ class StockRepository:
         Returns:
             Stock对象，不存在返回None
         """
-        result = await db.execute(select(Stock).where(and_(Stock.symbol == symbol, Stock.is_deleted is False)))
+        result = await db.execute(select(Stock).where(and_(Stock.symbol == symbol, self.not_deleted())))
         return result.scalar_one_or_none()
 
+    async def get_by_symbols(self, db: AsyncSession, symbols: List[str]) -> List[Stock]:
+        """
+        根据股票代码批量查询（单次IN查询）
+
+        Args:
+            db: 数据库会话
+            symbols: 股票代码列表
+
+        Returns:
+            Stock列表（不存在的代码不返回）
+        """
+        if not symbols:
+            return []
+        result = await db.execute(select(Stock).where(Stock.symbol.in_(symbols), self.not_deleted()))
+        return list(result.scalars().all())
+
     async def search(
         self, db: AsyncSession, keyword: str, market: Optional[str] = None, limit: int = 20
     ) -> List[Stock]:
@@ -42,7 +62,7 @@ class StockRepository:
         Returns:
             股票列表
         """
-        conditions = [Stock.is_deleted is False]
+        conditions = [self.not_deleted()]
 
         # 模糊搜索（代码或名称）
         conditions.append(or_(Stock.symbol.ilike(f"%{keyword}%"), Stock.name.ilike(f"%{keyword}%")))
@@ -70,26 +90,11 @@ class StockRepository:
         Returns:
             (股票列表, 总数)
         """
-        conditions = [Stock.market == market, Stock.is_deleted is False]
-
-        # 查询总数
-        count_query = select(Stock).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Stock)
-            .where(and_(*conditions))
-            .order_by(Stock.symbol)
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        stocks = result.scalars().all()
+        conditions = [Stock.market == market, self.not_deleted()]
 
-        return list(stocks), total
+        # 分页查询（count(*)统计总数）
+        query = select(Stock).where(and_(*conditions)).order_by(Stock.symbol)
+        return await paginate(db, query, page, page_size)
 
     async def create(self, db: AsyncSession, data: dict) -> Stock:
         """
@@ -104,8 +109,7 @@ class StockRepository:
         """
         stock = Stock(**data)
         db.add(stock)
-        await db.commit()
-        await db.refresh(stock)
+        await db.flush()
         return stock
 
     async def create_or_update(self, db: AsyncSession, data: dict) -> Stock:
@@ -131,8 +135,7 @@ class StockRepository:
             for key, value in data.items():
                 if hasattr(existing, key) and key != "symbol":  # symbol不能修改
                     setattr(existing, key, value)
-            await db.commit()
-            await db.refresh(existing)
+            await db.flush()
             return existing
         else:
             # 创建
@@ -158,8 +161,7 @@ class StockRepository:
             if hasattr(stock, key) and key != "symbol":  # symbol不能修改
                 setattr(stock, key, value)
 
-        await db.commit()
-        await db.refresh(stock)
+        await db.flush()
         return stock
 
     async def soft_delete(self, db: AsyncSession, symbol: str) -> bool:
@@ -182,7 +184,7 @@ class StockRepository:
         stock.is_deleted = True
         stock.deleted_at = datetime.utcnow()
 
-        await db.commit()
+        await db.flush()
         return True
 
     async def batch_create_or_update(self, db: AsyncSession, stocks_data: List[dict]) -> int:
@@ -9,11 +9,15 @@ from datetime import datetime
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.strategy import Strategy
+from app.repositories.pagination import paginate
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class StrategyRepository:
+class StrategyRepository(SoftDeleteQueryMixin):
     """策略数据访问层（纯CRUD，无业务逻辑）"""
 
+    model = Strategy
+
     async def get_by_id(self, db: AsyncSession, strategy_id: int) -> Optional[Strategy]:
         """
         根据ID查询策略
@@ -25,9 +29,7 @@ class StrategyRepository:
         Returns:
             Strategy对象，不存在返回None
         """
-        result = await db.execute(
-            select(Strategy).where(and_(Strategy.strategy_id == strategy_id, Strategy.is_deleted is False))
-        )
+        result = await db.execute(select(Strategy).where(and_(Strategy.strategy_id == strategy_id, self.not_deleted())))
         return result.scalar_one_or_none()
 
     async def query_by_user(
@@ -56,7 +58,7 @@ class StrategyRepository:
             (策略列表, 总数)
         """
         # 构建查询条件
-        conditions = [Strategy.user_id == user_id, Strategy.is_deleted is False]
+        conditions = [Strategy.user_id == user_id, self.not_deleted()]
 
         if symbol:
             conditions.append(Strategy.symbol == symbol)
@@ -65,24 +67,9 @@ class StrategyRepository:
         if status:
             conditions.append(Strategy.status == status)
 
-        # 查询总数
-        count_query = select(Strategy).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Strategy)
-            .where(and_(*conditions))
-            .order_by(Strategy.created_at.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        strategies = result.scalars().all()
-
-        return list(strategies), total
+        # 分页查询（count(*)统计总数）
+        query = select(Strategy).where(and_(*conditions)).order_by(Strategy.created_at.desc())
+        return await paginate(db, query, page, page_size)
 
     async def query_by_symbol(
         self, db: AsyncSession, user_id: int, symbol: str, status: Optional[str] = None
@@ -99,7 +86,7 @@ class StrategyRepository:
         Returns:
             策略列表
         """
-        conditions = [Strategy.user_id == user_id, Strategy.symbol == symbol, Strategy.is_deleted is False]
+        conditions = [Strategy.user_id == user_id, Strategy.symbol == symbol, self.not_deleted()]
 
         if status:
             conditions.append(Strategy.status == status)
@@ -122,7 +109,7 @@ class StrategyRepository:
         """
         result = await db.execute(
             select(Strategy)
-            .where(and_(Strategy.user_id == user_id, Strategy.status == "pending", Strategy.is_deleted is False))
+            .where(and_(Strategy.user_id == user_id, Strategy.status == "pending", self.not_deleted()))
             .order_by(Strategy.priority.desc(), Strategy.created_at.desc())
         )
         return list(result.scalars().all())
@@ -140,8 +127,7 @@ class StrategyRepository:
         """
         strategy = Strategy(**data)
         db.add(strategy)
-        await db.commit()
-        await db.refresh(strategy)
+        await db.flush()
         return strategy
 
     async def update(self, db: AsyncSession, strategy_id: int, data: dict) -> Optional[Strategy]:
@@ -164,8 +150,7 @@ class StrategyRepository:
             if hasattr(strategy, key):
                 setattr(strategy, key, value)
 
-        await db.commit()
-        await db.refresh(strategy)
+        await db.flush()
         return strategy
 
     async def soft_delete(self, db: AsyncSession, strategy_id: int) -> bool:
@@ -186,7 +171,7 @@ class StrategyRepository:
         strategy.is_deleted = True
         strategy.deleted_at = datetime.utcnow()
 
-        await db.commit()
+        await db.flush()
         return True
 
     async def execute_strategy(
@@ -213,8 +198,7 @@ class StrategyRepository:
         strategy.executed_price = executed_price
         strategy.executed_quantity = executed_quantity
 
-        await db.commit()
-        await db.refresh(strategy)
+        await db.flush()
         return strategy
 
     async def cancel_strategy(self, db: AsyncSession, strategy_id: int) -> Optional[Strategy]:
@@ -234,6 +218,5 @@ class StrategyRepository:
 
         strategy.status = "cancelled"
 
-        await db.commit()
-        await db.refresh(strategy)
+        await db.flush()
         return strategy
@@ -0,0 +1,36 @@
+"""
+Repository Streaming Helpers
+
+流式查询工具 - 供各Repository复用
+
+全量扫描（持仓重建、数据导出等）通过服务端游标分批读取，
+每批 DB_STREAM_BATCH_SIZE 行，内存占用与总行数无关。
+"""
+
+from typing import Any, AsyncIterator, Optional
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+async def stream_scalars(db: AsyncSession, query: Select, batch_size: Optional[int] = None) -> AsyncIterator[Any]:
+    """
+    流式读取查询结果（AsyncSession.stream + yield_per）
+
+    Args:
+        db: 数据库会话
+        query: 查询语句
+        batch_size: 每批行数（默认使用 DB_STREAM_BATCH_SIZE）
+
+    Yields:
+        ORM对象
+    """
+    query = query.execution_options(yield_per=batch_size or settings.DB_STREAM_BATCH_SIZE)
+    result = await db.stream_scalars(query)
+    try:
+        async for item in result:
+            yield item
+    finally:
+        await result.close()
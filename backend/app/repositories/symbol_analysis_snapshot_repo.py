@@ -0,0 +1,55 @@
+"""
+Symbol Analysis Snapshot Repository
+
+纯数据访问层 - 只负责symbol_analysis_snapshots表的读写操作，不包含任何业务逻辑
+注意：快照只新增不修改，过期后由新的快照取代
+"""
+
+from datetime import datetime
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.ai_decision import SymbolAnalysisSnapshot
+
+
+class SymbolAnalysisSnapshotRepository:
+    """个股分析快照数据访问层（纯CRUD，无业务逻辑）"""
+
+    async def get_live_by_hashes(
+        self, db: AsyncSession, input_hashes: List[str], now: datetime
+    ) -> List[SymbolAnalysisSnapshot]:
+        """
+        按分析输入哈希批量查询未过期的快照（单次IN查询）
+
+        Args:
+            db: 数据库会话
+            input_hashes: 分析输入哈希列表
+            now: 当前时间
+
+        Returns:
+            SymbolAnalysisSnapshot列表（按创建时间升序，同一哈希可能有多条）
+        """
+        if not input_hashes:
+            return []
+        result = await db.execute(
+            select(SymbolAnalysisSnapshot)
+            .where(SymbolAnalysisSnapshot.input_hash.in_(input_hashes), SymbolAnalysisSnapshot.expires_at > now)
+            .order_by(SymbolAnalysisSnapshot.created_at, SymbolAnalysisSnapshot.snapshot_id)
+        )
+        return list(result.scalars().all())
+
+    async def create(self, db: AsyncSession, snapshot_data: dict) -> SymbolAnalysisSnapshot:
+        """
+        创建快照
+
+        Args:
+            db: 数据库会话
+            snapshot_data: 快照数据字典
+
+        Returns:
+            创建的SymbolAnalysisSnapshot对象
+        """
+        snapshot = SymbolAnalysisSnapshot(**snapshot_data)
+        db.add(snapshot)
+        await db.flush()
+        return snapshot
@@ -4,16 +4,24 @@ Trade Repository
 纯数据访问层 - 只负责交易表的CRUD操作，不包含任何业务逻辑
 """
 
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.trade import Trade
+from app.repositories.pagination import paginate, paginate_keyset
+from app.repositories.streaming import stream_scalars
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 
-class TradeRepository:
+class TradeRepository(SoftDeleteQueryMixin):
     """交易数据访问层（纯CRUD，无业务逻辑）"""
 
+    model = Trade
+
+    # 用户交易列表的排序键（倒序，最后一列唯一，用于游标分页）
+    SORT_KEYS = (Trade.trade_date, Trade.created_at, Trade.trade_id)
+
     async def get_by_id(self, db: AsyncSession, trade_id: int) -> Optional[Trade]:
         """
         根据ID查询交易记录
@@ -25,7 +33,7 @@ class TradeRepository:
         Returns:
             Trade对象，不存在返回None
         """
-        result = await db.execute(select(Trade).where(and_(Trade.trade_id == trade_id, Trade.is_deleted is False)))
+        result = await db.execute(select(Trade).where(and_(Trade.trade_id == trade_id, self.not_deleted())))
         return result.scalar_one_or_none()
 
     async def query_by_account(
@@ -56,7 +64,7 @@ class TradeRepository:
             (交易记录列表, 总数)
         """
         # 构建查询条件
-        conditions = [Trade.account_id == account_id, Trade.is_deleted is False]
+        conditions = [Trade.account_id == account_id, self.not_deleted()]
 
         if symbol:
             conditions.append(Trade.symbol == symbol)
@@ -67,24 +75,9 @@ class TradeRepository:
         if end_date:
             conditions.append(Trade.trade_date <= end_date)
 
-        # 查询总数
-        count_query = select(Trade).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Trade)
-            .where(and_(*conditions))
-            .order_by(Trade.trade_date.desc(), Trade.created_at.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        trades = result.scalars().all()
-
-        return list(trades), total
+        # 分页查询（count(*)统计总数）
+        query = select(Trade).where(and_(*conditions)).order_by(Trade.trade_date.desc(), Trade.created_at.desc())
+        return await paginate(db, query, page, page_size)
 
     async def query_by_user(
         self,
@@ -92,49 +85,92 @@ class TradeRepository:
         user_id: int,
         account_id: Optional[int] = None,
         symbol: Optional[str] = None,
+        trade_type: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
         page: int = 1,
         page_size: int = 20,
     ) -> tuple[List[Trade], int]:
         """
-        查询用户所有交易记录（跨账户）
+        查询用户所有交易记录（跨账户，页码分页）
 
         Args:
             db: 数据库会话
             user_id: 用户ID
             account_id: 账户ID（可选）
             symbol: 股票代码（可选）
+            trade_type: 交易类型（可选）
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
             page: 页码
             page_size: 每页数量
 
         Returns:
             (交易记录列表, 总数)
         """
-        # 构建查询条件
-        conditions = [Trade.user_id == user_id, Trade.is_deleted is False]
+        query = self._build_user_query(user_id, account_id, symbol, trade_type, start_date, end_date)
+
+        # 分页查询（count(*)统计总数，排序与游标模式一致）
+        query = query.order_by(*(key.desc() for key in self.SORT_KEYS))
+        return await paginate(db, query, page, page_size)
+
+    async def query_by_user_after(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        after: Optional[list] = None,
+        account_id: Optional[int] = None,
+        symbol: Optional[str] = None,
+        trade_type: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        page_size: int = 20,
+    ) -> tuple[List[Trade], Optional[list]]:
+        """
+        查询用户所有交易记录（跨账户，游标分页）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            after: 上一页最后一条记录的排序键值 [trade_date, created_at, trade_id]（首页为None）
+            account_id: 账户ID（可选）
+            symbol: 股票代码（可选）
+            trade_type: 交易类型（可选）
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+            page_size: 每页数量
+
+        Returns:
+            (交易记录列表, 下一页排序键值；没有下一页时为None)
+        """
+        query = self._build_user_query(user_id, account_id, symbol, trade_type, start_date, end_date)
+        return await paginate_keyset(db, query, self.SORT_KEYS, page_size, after=after)
+
+    @classmethod
+    def _build_user_query(
+        cls,
+        user_id: int,
+        account_id: Optional[int],
+        symbol: Optional[str],
+        trade_type: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ):
+        """构建用户交易查询（含筛选条件，不含排序）"""
+        conditions = [Trade.user_id == user_id, cls.not_deleted()]
 
         if account_id:
             conditions.append(Trade.account_id == account_id)
         if symbol:
             conditions.append(Trade.symbol == symbol)
+        if trade_type:
+            conditions.append(Trade.trade_type == trade_type)
+        if start_date:
+            conditions.append(Trade.trade_date >= start_date)
+        if end_date:
+            conditions.append(Trade.trade_date <= end_date)
 
-        # 查询总数
-        count_query = select(Trade).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Trade)
-            .where(and_(*conditions))
-            .order_by(Trade.trade_date.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        trades = result.scalars().all()
-
-        return list(trades), total
+        return select(Trade).where(and_(*conditions))
 
     async def create(self, db: AsyncSession, data: dict) -> Trade:
         """
@@ -149,8 +185,7 @@ class TradeRepository:
         """
         trade = Trade(**data)
         db.add(trade)
-        await db.commit()
-        await db.refresh(trade)
+        await db.flush()
         return trade
 
     async def update(self, db: AsyncSession, trade_id: int, data: dict) -> Optional[Trade]:
@@ -173,8 +208,7 @@ class TradeRepository:
             if hasattr(trade, key):
                 setattr(trade, key, value)
 
-        await db.commit()
-        await db.refresh(trade)
+        await db.flush()
         return trade
 
     async def soft_delete(self, db: AsyncSession, trade_id: int) -> bool:
@@ -195,9 +229,54 @@ class TradeRepository:
         trade.is_deleted = True
         trade.deleted_at = datetime.utcnow()
 
-        await db.commit()
+        await db.flush()
         return True
 
+    def stream_by_account(
+        self, db: AsyncSession, account_id: int, symbol: Optional[str] = None
+    ) -> AsyncIterator[Trade]:
+        """
+        按成交时间正序流式读取账户全部交易（服务端游标，分批获取，不一次性加载）
+
+        Args:
+            db: 数据库会话
+            account_id: 账户ID
+            symbol: 股票代码（可选，只读取该股票的交易）
+
+        Returns:
+            Trade对象异步迭代器
+        """
+        conditions = [Trade.account_id == account_id, self.not_deleted()]
+        if symbol:
+            conditions.append(Trade.symbol == symbol)
+
+        query = select(Trade).where(*conditions).order_by(*(key.asc() for key in self.SORT_KEYS))
+        return stream_scalars(db, query)
+
+    def stream_by_user(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        account_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> AsyncIterator[Trade]:
+        """
+        按成交时间正序流式读取用户交易（用于导出等全量扫描）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            account_id: 账户ID（可选）
+            start_date: 开始日期（可选）
+            end_date: 结束日期（可选）
+
+        Returns:
+            Trade对象异步迭代器
+        """
+        query = self._build_user_query(user_id, account_id, None, None, start_date, end_date)
+        return stream_scalars(db, query.order_by(*(key.asc() for key in self.SORT_KEYS)))
+
     async def query_by_symbol(
         self, db: AsyncSession, user_id: int, symbol: str, page: int = 1, page_size: int = 20
     ) -> tuple[List[Trade], int]:
@@ -214,23 +293,8 @@ class TradeRepository:
         Returns:
             (交易记录列表, 总数)
         """
-        conditions = [Trade.user_id == user_id, Trade.symbol == symbol, Trade.is_deleted is False]
-
-        # 查询总数
-        count_query = select(Trade).where(and_(*conditions))
-        count_result = await db.execute(count_query)
-        total = len(count_result.scalars().all())
-
-        # 查询列表
-        query = (
-            select(Trade)
-            .where(and_(*conditions))
-            .order_by(Trade.trade_date.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        )
-
-        result = await db.execute(query)
-        trades = result.scalars().all()
+        conditions = [Trade.user_id == user_id, Trade.symbol == symbol, self.not_deleted()]
 
-        return list(trades), total
+        # 分页查询（count(*)统计总数）
+        query = select(Trade).where(and_(*conditions)).order_by(Trade.trade_date.desc())
+        return await paginate(db, query, page, page_size)
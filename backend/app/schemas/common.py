@@ -68,53 +68,108 @@ class Response(BaseModel, Generic[T]):
 
 
 class PaginationParams(BaseModel):
-    """分页参数"""
+    """
+    分页参数
+
+    - 页码模式: 传 page / page_size，返回总数和总页数
+    - 游标模式: 传上一页响应中的 next_cursor（忽略 page），深翻页耗时不随页码增长，不返回总数
+    """
 
     page: int = 1
     page_size: int = 20
+    cursor: Optional[str] = None
 
     class Config:
-        json_schema_extra = {"example": {"page": 1, "page_size": 20}}
+        json_schema_extra = {"example": {"page": 1, "page_size": 20, "cursor": None}}
 
 
 class PaginationResponse(BaseModel, Generic[T]):
     """
     分页响应数据结构
 
+    页码模式:
     {
         "items": [...],
         "total": 100,
         "page": 1,
         "page_size": 20,
-        "total_pages": 5
+        "total_pages": 5,
+        "next_cursor": "WyIyMDI1...",   // 可切换为游标模式继续翻页
+        "has_more": true
+    }
+
+    游标模式（total/page/total_pages 为 null）:
+    {
+        "items": [...],
+        "page_size": 20,
+        "next_cursor": "WyIyMDI1...",   // 最后一页为 null
+        "has_more": true
     }
     """
 
     items: list[T]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
     @classmethod
-    def create(cls, items: list[T], total: int, page: int, page_size: int) -> "PaginationResponse[T]":
+    def create(
+        cls, items: list[T], total: int, page: int, page_size: int, next_cursor: Optional[str] = None
+    ) -> "PaginationResponse[T]":
         """
-        创建分页响应
+        创建分页响应（页码模式）
 
         Args:
             items: 数据列表
             total: 总数
             page: 当前页码
             page_size: 每页数量
+            next_cursor: 下一页游标（可选）
 
         Returns:
             PaginationResponse对象
         """
         total_pages = (total + page_size - 1) // page_size if page_size > 0 else 0
-        return cls(items=items, total=total, page=page, page_size=page_size, total_pages=total_pages)
+        return cls(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=total_pages,
+            next_cursor=next_cursor,
+            has_more=page < total_pages,
+        )
+
+    @classmethod
+    def create_cursor(cls, items: list[T], page_size: int, next_cursor: Optional[str]) -> "PaginationResponse[T]":
+        """
+        创建分页响应（游标模式）
+
+        Args:
+            items: 数据列表
+            page_size: 每页数量
+            next_cursor: 下一页游标（没有下一页时为None）
+
+        Returns:
+            PaginationResponse对象
+        """
+        return cls(items=items, page_size=page_size, next_cursor=next_cursor, has_more=next_cursor is not None)
 
     class Config:
-        json_schema_extra = {"example": {"items": [], "total": 100, "page": 1, "page_size": 20, "total_pages": 5}}
+        json_schema_extra = {
+            "example": {
+                "items": [],
+                "total": 100,
+                "page": 1,
+                "page_size": 20,
+                "total_pages": 5,
+                "next_cursor": None,
+                "has_more": True,
+            }
+        }
 
 
 class ErrorDetail(BaseModel):
@@ -50,15 +50,12 @@ class AccountQueryService:
             db=db, user_id=user_id, market=market, status=status, page=page, page_size=page_size
         )
 
-        # 2. 查询每个账户的持仓统计（用于显示账户总市值等）
+        # 2. 一次分组查询本页所有账户的持仓统计（用于显示账户总市值等）
         account_ids = [acc.account_id for acc in accounts]
-        holdings_map = {}
-        for account_id in account_ids:
-            holdings = await self.holding_repo.query_by_account(db, account_id)
-            holdings_map[account_id] = holdings
+        stats_map = await self.holding_repo.query_stats_by_accounts(db, account_ids)
 
         # 3. 调用 Converter 转换数据
-        items = AccountQueryConverter.convert(accounts, holdings_map)
+        items = AccountQueryConverter.convert(accounts, stats_map)
 
         # 4. 调用 Builder 构建响应
         return AccountQueryBuilder.build_response(items, total, page, page_size)
@@ -72,28 +69,28 @@ class AccountQueryConverter:
     """
 
     @staticmethod
-    def convert(accounts, holdings_map) -> list:
+    def convert(accounts, stats_map) -> list:
         """
         将账户列表转换为业务数据
 
         Args:
             accounts: 账户对象列表
-            holdings_map: 账户ID到持仓列表的映射
+            stats_map: 账户ID到持仓统计的映射（market_value、total_cost、holding_count）
 
         Returns:
             转换后的数据列表
         """
         result = []
         for account in accounts:
-            holdings = holdings_map.get(account.account_id, [])
+            stats = stats_map.get(account.account_id)
 
             # 计算账户统计数据
-            total_value = AccountQueryConverter._calculate_total_value(holdings)
-            total_cost = AccountQueryConverter._calculate_total_cost(holdings)
+            total_value = float(stats.market_value) if stats else 0.0
+            total_cost = float(stats.total_cost) if stats else 0.0
             total_pnl = total_value - total_cost
             total_pnl_rate = (total_pnl / total_cost * 100) if total_cost > 0 else 0.0
 
-            # 构建单个账户数据
+            # 构建单个账户数据（资金字段映射与账户创建响应一致）
             result.append(
                 {
                     "account_id": account.account_id,
@@ -101,45 +98,19 @@ class AccountQueryConverter:
                     "market": account.market,
                     "status": account.status,
                     "broker": account.broker,
-                    "initial_capital": float(account.initial_capital) if account.initial_capital else 0.0,
-                    "current_capital": float(account.current_capital) if account.current_capital else 0.0,
+                    "initial_capital": float(account.available_cash) if account.available_cash else 0.0,
+                    "current_capital": float(account.available_cash) if account.available_cash else 0.0,
                     "total_value": total_value,
                     "total_cost": total_cost,
                     "total_pnl": total_pnl,
                     "total_pnl_rate": round(total_pnl_rate, 2),
-                    "holding_count": len(holdings),
+                    "holding_count": stats.holding_count if stats else 0,
                     "created_at": account.created_at.isoformat() if account.created_at else None,
                 }
             )
 
         return result
 
-    @staticmethod
-    def _calculate_total_value(holdings) -> float:
-        """
-        计算持仓总市值
-
-        Args:
-            holdings: 持仓列表
-
-        Returns:
-            总市值
-        """
-        return sum(float(h.quantity) * float(h.current_price) for h in holdings if h.quantity and h.current_price)
-
-    @staticmethod
-    def _calculate_total_cost(holdings) -> float:
-        """
-        计算持仓总成本
-
-        Args:
-            holdings: 持仓列表
-
-        Returns:
-            总成本
-        """
-        return sum(float(h.quantity) * float(h.cost_price) for h in holdings if h.quantity and h.cost_price)
-
 
 class AccountQueryBuilder:
     """
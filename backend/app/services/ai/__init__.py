@@ -8,10 +8,12 @@ from app.services.ai.daily_analysis_service import DailyAnalysisService
 from app.services.ai.single_analysis_service import SingleAnalysisService
 from app.services.ai.daily_review_service import DailyReviewService
 from app.services.ai.ai_chat_service import AIChatService
+from app.services.ai.ai_diagnostics_service import AIDiagnosticsService
 
 __all__ = [
     "DailyAnalysisService",
     "SingleAnalysisService",
     "DailyReviewService",
     "AIChatService",
+    "AIDiagnosticsService",
 ]
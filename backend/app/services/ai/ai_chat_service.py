@@ -2,16 +2,28 @@
 AI Chat Service
 
 AI对话业务服务 - Service + Converter + Builder
-注意：会话数据存储在一条记录中，messages是JSON数组
+注意：会话存储在ai_conversations表，消息逐条追加到ai_messages表，读取历史只取最近N条
+Prompt按Token预算（AI_CHAT_CONTEXT_TOKENS）放入历史消息，放不下的旧消息折叠进会话的滚动摘要
 """
 
 import uuid
-from typing import Optional, List, Dict
+from typing import Any, AsyncIterator, Optional, List, Dict, Tuple
 from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.exceptions import ConversationAccessDenied
 from app.repositories.ai_conversation_repo import AIConversationRepository
+from app.repositories.ai_message_repo import AIMessageRepository
 from app.repositories.stock_repo import StockRepository
 from app.utils.ai_client import ai_client, AIPromptBuilder
+from app.utils.chat_context import estimate_messages_tokens, estimate_tokens, split_history, truncate_to_tokens
+
+# AI回复的Token上限
+REPLY_MAX_TOKENS = 1000
+
+# session.info 中缓存本次请求已解析的会话 {(user_id, session_id): AIConversation}
+_CONVERSATION_CACHE_KEY = "ai_conversations"
 
 
 class AIChatService:
@@ -23,6 +35,7 @@ class AIChatService:
 
     def __init__(self):
         self.conversation_repo = AIConversationRepository()
+        self.message_repo = AIMessageRepository()
         self.stock_repo = StockRepository()
 
     async def create_session(
@@ -44,10 +57,9 @@ class AIChatService:
         session_id = str(uuid.uuid4())
 
         # 创建会话记录
-        await self.conversation_repo.create_or_get(
-            db=db, user_id=user_id, session_id=session_id, context_symbol=context_symbol, context_type=context_type
+        await self._resolve_conversation(
+            db, user_id, session_id, create=True, context_symbol=context_symbol, context_type=context_type
         )
-        await db.commit()
 
         # 使用Builder构建响应
         return AIChatBuilder.build_session_response(
@@ -68,33 +80,146 @@ class AIChatService:
             AI回复
         """
         # 1. 创建或获取会话（如果不存在则创建）
-        conv = await self.conversation_repo.create_or_get(db=db, user_id=user_id, session_id=session_id)
+        conv = await self._resolve_conversation(db, user_id, session_id, create=True)
+
+        # 2. 按Token预算构建Prompt（历史不含本次用户消息，本次消息由Prompt单独追加）
+        prompt_messages, prompt_tokens = await self._prepare_prompt(db, conv, message)
+
+        # 3. 添加用户消息
+        await self.message_repo.append(
+            db, conv.conversation_id, role="user", content=message, tokens=estimate_tokens(message)
+        )
+
+        # 4. 调用AI获取回复
+        ai_reply = await AIChatConverter.generate_ai_reply(prompt_messages)
+
+        # 5. 添加AI回复，累计本轮Token
+        reply_tokens = estimate_tokens(ai_reply)
+        reply = await self.message_repo.append(
+            db, conv.conversation_id, role="assistant", content=ai_reply, tokens=reply_tokens
+        )
+        await self.conversation_repo.add_tokens(db, conv.conversation_id, prompt_tokens + reply_tokens)
+
+        # 6. 使用Builder构建响应
+        return AIChatBuilder.build_message_response(AIChatConverter.to_message_dict(reply))
+
+    async def start_message_stream(
+        self, db: AsyncSession, user_id: int, session_id: str, message: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        发送消息并流式获取AI回复
+
+        在请求内完成会话准备（保存用户消息、构建Prompt），返回的事件流在响应阶段执行，
+        AI回复完整生成后使用独立的数据库会话保存（请求的数据库会话此时已关闭）。
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            session_id: 会话ID
+            message: 用户消息
+
+        Returns:
+            (事件名, 数据) 异步迭代器：meta → token... → done / error
+        """
+        # 1. 创建或获取会话（如果不存在则创建），按Token预算构建Prompt
+        conv = await self._resolve_conversation(db, user_id, session_id, create=True)
+        prompt_messages, prompt_tokens = await self._prepare_prompt(db, conv, message)
 
         # 2. 添加用户消息
-        await self.conversation_repo.append_message(db=db, session_id=session_id, role="user", content=message)
+        await self.message_repo.append(
+            db, conv.conversation_id, role="user", content=message, tokens=estimate_tokens(message)
+        )
+        # AI回复在独立会话中追加，返回事件流前先提交用户消息（及更新后的摘要）
+        await db.commit()
+
+        # 3. 返回事件流（响应阶段执行）
+        return self._stream_reply(session_id, conv.conversation_id, prompt_messages, prompt_tokens)
+
+    async def _stream_reply(
+        self, session_id: str, conversation_id: int, prompt_messages: List[Dict], prompt_tokens: int
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """流式生成AI回复，结束后保存完整回复并累计本轮Token"""
+        yield "meta", {"session_id": session_id}
+
+        # 1. 逐段转发AI回复
+        chunks = []
+        try:
+            async for chunk in ai_client.stream_chat_completion(
+                messages=prompt_messages, temperature=0.7, max_tokens=REPLY_MAX_TOKENS
+            ):
+                chunks.append(chunk)
+                yield "token", {"content": chunk}
+        except Exception as e:
+            print(f"AI流式回复失败: {e}")
+            yield "error", {"message": "AI回复生成失败"}
+            return
+
+        # 2. 使用独立会话保存完整回复
+        try:
+            async with AsyncSessionLocal() as db:
+                content = "".join(chunks)
+                reply_tokens = estimate_tokens(content)
+                reply = await self.message_repo.append(
+                    db, conversation_id, role="assistant", content=content, tokens=reply_tokens
+                )
+                await self.conversation_repo.add_tokens(db, conversation_id, prompt_tokens + reply_tokens)
+                await db.commit()
+        except Exception as e:
+            print(f"保存AI回复失败: {e}")
+            yield "error", {"message": "AI回复保存失败"}
+            return
+
+        # 3. 返回最终消息
+        yield "done", AIChatBuilder.build_message_response(AIChatConverter.to_message_dict(reply))
+
+    async def _prepare_prompt(self, db: AsyncSession, conv: Any, message: str) -> Tuple[List[Dict[str, str]], int]:
+        """
+        按Token预算构建对话Prompt
+
+        历史消息从新到旧放入预算（AI_CHAT_CONTEXT_TOKENS 扣除系统提示、本次消息和摘要预留），
+        放不下的旧消息折叠进会话的滚动摘要，之后只读取摘要之后的消息。
 
-        # 3. 获取上下文数据
+        Args:
+            db: 数据库会话
+            conv: AIConversation对象
+            message: 本次用户消息
+
+        Returns:
+            (Prompt消息列表, 本轮Prompt消耗的Token数（含生成摘要的调用）)
+        """
+        # 1. 读取摘要之后的最近消息和上下文数据
+        recent = await self.message_repo.get_recent(
+            db, conv.conversation_id, settings.AI_CHAT_HISTORY_MAX_MESSAGES, after_seq=conv.summary_seq or 0
+        )
+        history = AIChatConverter.to_prompt_history(recent)
         context_data = await AIChatConverter.get_context_data(
             db=db, stock_repo=self.stock_repo, context_symbol=conv.context_symbol
         )
 
-        # 4. 调用AI获取回复
-        ai_reply = await AIChatConverter.generate_ai_reply(
+        # 2. 计算历史消息可用的预算（不含历史的Prompt + 摘要预留）
+        base_prompt = AIPromptBuilder.build_chat_prompt(
+            user_message=message, history=[], context_symbol=conv.context_symbol, context_data=context_data
+        )
+        budget = (
+            settings.AI_CHAT_CONTEXT_TOKENS - estimate_messages_tokens(base_prompt) - settings.AI_CHAT_SUMMARY_TOKENS
+        )
+        overflow, kept = split_history(history, max(budget, 0), settings.AI_CHAT_HISTORY_MAX_MESSAGES)
+
+        # 3. 放不下的旧消息折叠进滚动摘要
+        summary_tokens = 0
+        if overflow:
+            summary, summary_tokens = await AIChatConverter.summarize_history(conv.summary, overflow)
+            await self.conversation_repo.update_summary(db, conv, summary, overflow[-1]["seq"])
+
+        # 4. 构建Prompt
+        prompt_messages = AIPromptBuilder.build_chat_prompt(
             user_message=message,
-            history=conv.messages if conv.messages else [],
+            history=[{"role": item["role"], "content": item["content"]} for item in kept],
             context_symbol=conv.context_symbol,
             context_data=context_data,
+            summary=conv.summary,
         )
-
-        # 5. 添加AI回复
-        conv = await self.conversation_repo.append_message(
-            db=db, session_id=session_id, role="assistant", content=ai_reply
-        )
-        await db.commit()
-
-        # 6. 使用Builder构建响应（返回最后一条消息）
-        last_message = conv.messages[-1] if conv.messages else {}
-        return AIChatBuilder.build_message_response(last_message)
+        return prompt_messages, estimate_messages_tokens(prompt_messages) + summary_tokens
 
     async def get_history(self, db: AsyncSession, user_id: int, session_id: str, limit: int = 50) -> dict:
         """
@@ -110,12 +235,13 @@ class AIChatService:
             历史消息列表
         """
         # 1. 查询会话
-        conv = await self.conversation_repo.get_by_session(db, session_id)
+        conv = await self._resolve_conversation(db, user_id, session_id)
         if not conv:
             return AIChatBuilder.build_history_response(session_id, [])
 
-        # 2. 获取消息列表（限制数量）
-        messages = conv.messages[-limit:] if conv.messages else []
+        # 2. 获取最近的消息（限制数量）
+        recent = await self.message_repo.get_recent(db, conv.conversation_id, limit)
+        messages = [AIChatConverter.to_message_dict(item) for item in recent]
 
         # 3. 使用Builder构建响应
         return AIChatBuilder.build_history_response(session_id, messages)
@@ -132,11 +258,64 @@ class AIChatService:
         Returns:
             删除结果
         """
-        # 软删除会话
-        success = await self.conversation_repo.delete_session(db, session_id)
-        await db.commit()
+        # 1. 查询会话（只能删除自己的会话）
+        conv = await self._resolve_conversation(db, user_id, session_id)
+        if not conv:
+            return AIChatBuilder.build_delete_response(0)
+
+        # 2. 软删除会话
+        await self.conversation_repo.delete_session(db, conv)
+        db.info[_CONVERSATION_CACHE_KEY].pop((user_id, session_id), None)
+
+        return AIChatBuilder.build_delete_response(1)
+
+    async def _resolve_conversation(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        session_id: str,
+        create: bool = False,
+        context_symbol: Optional[str] = None,
+        context_type: Optional[str] = None,
+    ) -> Optional[Any]:
+        """
+        解析会话（同一请求内只查询一次）
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            session_id: 会话ID
+            create: 不存在时是否创建
+            context_symbol: 上下文股票代码（创建时使用）
+            context_type: 上下文类型（创建时使用）
+
+        Returns:
+            AIConversation对象，不存在且不创建时返回None
 
-        return AIChatBuilder.build_delete_response(1 if success else 0)
+        Raises:
+            ConversationAccessDenied: session_id 属于其他用户的会话
+        """
+        cache = db.info.setdefault(_CONVERSATION_CACHE_KEY, {})
+        key = (user_id, session_id)
+        if key in cache:
+            return cache[key]
+
+        if create:
+            conv = await self.conversation_repo.create_or_get(
+                db=db,
+                user_id=user_id,
+                session_id=session_id,
+                context_symbol=context_symbol,
+                context_type=context_type,
+            )
+            if conv is None:
+                raise ConversationAccessDenied(f"无权访问会话 {session_id}")
+        else:
+            conv = await self.conversation_repo.get_by_session(db, user_id, session_id)
+
+        if conv:
+            cache[key] = conv
+        return conv
 
 
 class AIChatConverter:
@@ -146,6 +325,41 @@ class AIChatConverter:
     职责：业务逻辑计算
     """
 
+    @staticmethod
+    def to_message_dict(message) -> dict:
+        """
+        消息记录转为响应字典
+
+        Args:
+            message: AIMessage对象
+
+        Returns:
+            {message_id, seq, role, content, timestamp}
+        """
+        return {
+            "message_id": message.message_id,
+            "seq": message.seq,
+            "role": message.role,
+            "content": message.content,
+            "timestamp": message.created_at.isoformat() if message.created_at else None,
+        }
+
+    @staticmethod
+    def to_prompt_history(messages: list) -> List[Dict[str, Any]]:
+        """
+        消息记录转为Prompt历史（seq和tokens用于预算切分与摘要，放入Prompt时只保留role和content）
+
+        Args:
+            messages: AIMessage列表（从旧到新）
+
+        Returns:
+            [{seq, role, content, tokens}]
+        """
+        return [
+            {"seq": message.seq, "role": message.role, "content": message.content, "tokens": message.tokens}
+            for message in messages
+        ]
+
     @staticmethod
     async def get_context_data(
         db: AsyncSession, stock_repo: StockRepository, context_symbol: Optional[str]
@@ -177,33 +391,50 @@ class AIChatConverter:
         }
 
     @staticmethod
-    async def generate_ai_reply(
-        user_message: str,
-        history: List[Dict],
-        context_symbol: Optional[str] = None,
-        context_data: Optional[Dict] = None,
-    ) -> str:
+    async def generate_ai_reply(prompt_messages: List[Dict[str, str]]) -> str:
         """
         生成AI回复
 
         Args:
-            user_message: 用户消息
-            history: 对话历史
-            context_symbol: 上下文股票代码
-            context_data: 上下文数据
+            prompt_messages: 对话Prompt（见 AIChatService._prepare_prompt）
 
         Returns:
             AI回复内容
         """
-        # 1. 构建Prompt
-        messages = AIPromptBuilder.build_chat_prompt(
-            user_message=user_message, history=history, context_symbol=context_symbol, context_data=context_data
+        return await ai_client.chat_completion(messages=prompt_messages, temperature=0.7, max_tokens=REPLY_MAX_TOKENS)
+
+    @staticmethod
+    async def summarize_history(previous_summary: Optional[str], messages: List[Dict]) -> Tuple[str, int]:
+        """
+        把较早的对话折叠进滚动摘要
+
+        Args:
+            previous_summary: 已有摘要（可选）
+            messages: 需要折叠的消息（从旧到新）
+
+        Returns:
+            (新摘要, 生成摘要消耗的Token数)
+        """
+        max_tokens = settings.AI_CHAT_SUMMARY_TOKENS
+
+        # 1. 调用AI合并摘要
+        prompt = AIPromptBuilder.build_chat_summary_prompt(
+            previous_summary, [{"role": item["role"], "content": item["content"]} for item in messages], max_tokens
         )
+        try:
+            summary = await ai_client.chat_completion(messages=prompt, temperature=0.3, max_tokens=max_tokens)
+        except Exception as e:
+            print(f"生成对话摘要失败: {e}")
+            summary = None
 
-        # 2. 调用AI
-        ai_reply = await ai_client.chat_completion(messages=messages, temperature=0.7, max_tokens=1000)
+        # 2. 失败时退回摘录：保留已有摘要，追加每条消息的开头
+        if not summary:
+            lines = [previous_summary] if previous_summary else []
+            lines.extend(f"{item['role']}: {truncate_to_tokens(item['content'], 40)}" for item in messages)
+            return truncate_to_tokens("\n".join(lines), max_tokens), 0
 
-        return ai_reply
+        summary = truncate_to_tokens(summary.strip(), max_tokens)
+        return summary, estimate_messages_tokens(prompt) + estimate_tokens(summary)
 
 
 class AIChatBuilder:
@@ -230,7 +461,7 @@ class AIChatBuilder:
     def build_message_response(message: dict) -> dict:
         """构建消息响应"""
         return {
-            "message_id": message.get("timestamp", ""),  # 使用timestamp作为消息ID
+            "message_id": message.get("message_id"),
             "role": message.get("role", "assistant"),
             "content": message.get("content", ""),
             "timestamp": message.get("timestamp", datetime.now().isoformat()),
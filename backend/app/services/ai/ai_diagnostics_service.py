@@ -0,0 +1,50 @@
+"""
+AI Diagnostics Service
+
+AI后端诊断业务服务 - Service + Builder
+"""
+
+from datetime import datetime
+from app.utils.ai_client import ai_client
+
+
+class AIDiagnosticsService:
+    """
+    AI后端诊断业务类
+
+    职责：汇总AI后端熔断状态与响应缓存指标，供运维查看当前服务流量的后端
+    """
+
+    async def get_backend_status(self) -> dict:
+        """
+        查询AI后端状态
+
+        Returns:
+            各后端熔断状态、选择顺序与响应缓存指标
+        """
+        # 1. 读取AI客户端的熔断器与响应缓存快照
+        diagnostics = ai_client.get_diagnostics()
+
+        # 2. 构建响应
+        return AIDiagnosticsBuilder.build_backend_response(diagnostics)
+
+
+class AIDiagnosticsBuilder:
+    """
+    AI后端诊断构建器（静态类）
+
+    职责：构建响应数据结构
+    """
+
+    @staticmethod
+    def build_backend_response(diagnostics: dict) -> dict:
+        """构建后端状态响应"""
+        return {
+            "serving_backend": diagnostics["selection_order"][0],
+            "selection_order": diagnostics["selection_order"],
+            "last_backend": diagnostics["last_backend"],
+            "http2_enabled": diagnostics["http2_enabled"],
+            "backends": diagnostics["backends"],
+            "response_cache": diagnostics["response_cache"],
+            "checked_at": datetime.now().isoformat(),
+        }
@@ -4,16 +4,42 @@ AI Daily Analysis Service
 AI每日批量分析业务服务 - Service + Converter + Builder
 """
 
+import asyncio
 import uuid
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.exceptions import ResourceNotFound
+from app.repositories.ai_analysis_task_repo import AIAnalysisTaskRepository
 from app.repositories.ai_decision_repo import AIDecisionRepository
 from app.repositories.stock_repo import StockRepository
+from app.repositories.symbol_analysis_snapshot_repo import SymbolAnalysisSnapshotRepository
+from app.services.ai.symbol_snapshot_service import SymbolSnapshotConverter
 from app.utils.ai_client import ai_client, AIPromptBuilder
+from app.utils.ai_response_cache import STOCK_ANALYSIS, cache_ttl_for
+from app.tasks import enqueue_daily_analysis
 from app.utils.tushare_client import tushare_client
 
+# 个股分析的AI生成参数（参与分析输入哈希）
+ANALYSIS_TEMPERATURE = 0.7
+ANALYSIS_MAX_TOKENS = 1500
+
+# 批量分析的全局并发上限（所有批量任务共享，按事件循环创建）
+_semaphores: Dict[str, tuple] = {}
+
+
+def _get_semaphore(name: str, limit: int) -> asyncio.Semaphore:
+    """获取当前事件循环的全局并发信号量（同一进程中可能先后运行多个事件循环，信号量不能跨循环使用）"""
+    loop = asyncio.get_running_loop()
+    semaphore, owner = _semaphores.get(name, (None, None))
+    if semaphore is None or owner is not loop:
+        semaphore = asyncio.Semaphore(limit)
+        _semaphores[name] = (semaphore, loop)
+    return semaphore
+
 
 class DailyAnalysisService:
     """
@@ -24,11 +50,13 @@ class DailyAnalysisService:
 
     def __init__(self):
         self.ai_decision_repo = AIDecisionRepository()
+        self.ai_task_repo = AIAnalysisTaskRepository()
         self.stock_repo = StockRepository()
+        self.snapshot_repo = SymbolAnalysisSnapshotRepository()
 
     async def create_task(self, db: AsyncSession, user_id: int, stock_symbols: List[str]) -> dict:
         """
-        创建并执行批量分析任务（简化版，同步执行）
+        创建批量分析任务并投递到后台执行（立即返回）
 
         Args:
             db: 数据库会话
@@ -36,61 +64,184 @@ class DailyAnalysisService:
             stock_symbols: 股票代码列表
 
         Returns:
-            任务信息
-        """
-        # 1. 生成任务ID
-        task_id = str(uuid.uuid4())
+            任务信息（status=pending，通过results接口轮询进度）
 
-        # 2. 验证和限制
+        Raises:
+            ValueError: 股票列表为空或超出单次分析上限
+        """
+        # 1. 验证和限制（去重并保持顺序）
+        stock_symbols = list(dict.fromkeys(stock_symbols))
         if not stock_symbols:
             raise ValueError("股票列表不能为空")
-        if len(stock_symbols) > 20:
-            raise ValueError("单次最多分析20只股票")
+        if len(stock_symbols) > settings.AI_BATCH_MAX_SYMBOLS:
+            raise ValueError(f"单次最多分析{settings.AI_BATCH_MAX_SYMBOLS}只股票")
+
+        # 2. 持久化任务（先提交，worker才能读取到）
+        task = await self.ai_task_repo.create(
+            db,
+            {
+                "task_id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "analysis_type": "daily",
+                "status": "pending",
+                "stock_symbols": stock_symbols,
+                "total_stocks": len(stock_symbols),
+                "processed_stocks": 0,
+                "failed_stocks": 0,
+                "results": [],
+            },
+        )
+        # 后台任务在独立会话中读取任务，投递前先提交
+        await db.commit()
 
-        # 3. 批量分析股票（简化版：顺序执行）
-        results = []
-        for symbol in stock_symbols:
-            try:
-                # 查询股票信息
-                stock = await self.stock_repo.get_by_symbol(db, symbol)
-                stock_name = stock.name if stock else symbol
-
-                # 调用AI分析
-                analysis_result = await DailyAnalysisConverter.analyze_stock(symbol=symbol, stock_name=stock_name)
-
-                # 保存结果
-                decision_data = {
-                    "user_id": user_id,
-                    "symbol": symbol,
-                    "stock_name": stock_name,
-                    "analysis_type": "daily",
-                    "ai_score": analysis_result.get("ai_score", {}),
-                    "ai_suggestion": analysis_result.get("ai_suggestion", ""),
-                    "ai_strategy": analysis_result.get("ai_strategy", {}),
-                    "ai_reasons": analysis_result.get("ai_reasons", []),
-                    "confidence_level": Decimal(str(analysis_result.get("confidence_level", 50.0))),
-                }
-
-                decision = await self.ai_decision_repo.create(db, decision_data)
-                results.append(decision)
+        # 3. 投递到后台任务队列
+        await enqueue_daily_analysis(task.task_id)
+
+        # 4. 构建响应
+        return DailyAnalysisBuilder.build_task_response(task)
+
+    async def run_task(self, task_id: str) -> None:
+        """
+        执行批量分析任务（后台worker入口，使用独立的数据库会话）
+
+        每只股票的分析流水线（行情补查 → AI分析）并发执行，受任务内并发数限制；
+        行情补查与AI调用另有全局并发上限。每完成一只股票即保存决策并更新任务进度。
+        分析输入相同且未过期的个股分析快照直接复用，多个用户持有相同股票时每只股票只调用一次AI。
+        任务可重入：消息重新投递时跳过已有结果的股票。
+
+        Args:
+            task_id: 任务ID
+        """
+        async with AsyncSessionLocal() as db:
+            # 1. 读取任务（已结束的任务不再执行）
+            task = await self.ai_task_repo.get_by_id(db, task_id)
+            if task is None or task.status not in ("pending", "processing"):
+                return
+
+            await self.ai_task_repo.update(db, task, {"status": "processing", "started_at": datetime.now()})
+            await db.commit()
 
+            try:
+                await self._execute_task(db, task)
             except Exception as e:
-                print(f"分析{symbol}失败: {e}")
-                # 继续处理下一只股票
+                print(f"批量分析任务{task_id}执行失败: {e}")
+                await db.rollback()
+                await self.ai_task_repo.update(
+                    db, task, {"status": "failed", "error_message": str(e), "completed_at": datetime.now()}
+                )
+                await db.commit()
+
+    async def interrupt_tasks(self, task_ids: List[str]) -> None:
+        """
+        将被中断的任务标记为失败（本地任务队列关闭时调用，使用独立的数据库会话）
 
-        await db.commit()
+        已有结果的股票保留在任务结果中，用户可重新发起分析。
 
-        # 4. 构建响应
-        return DailyAnalysisBuilder.build_task_response(
-            task_id=task_id,
-            total_stocks=len(stock_symbols),
-            processed_stocks=len(results),
-            results=[DailyAnalysisConverter.convert_single_decision(d) for d in results],
+        Args:
+            task_ids: 任务ID列表
+        """
+        async with AsyncSessionLocal() as db:
+            for task_id in task_ids:
+                task = await self.ai_task_repo.get_by_id(db, task_id)
+                if task is None or task.status not in ("pending", "processing"):
+                    continue
+                await self.ai_task_repo.update(
+                    db,
+                    task,
+                    {"status": "failed", "error_message": "服务关闭，任务已中断", "completed_at": datetime.now()},
+                )
+            await db.commit()
+
+    async def _execute_task(self, db: AsyncSession, task) -> None:
+        """并发分析任务中尚未完成的股票，逐只保存结果和进度"""
+        # 1. 跳过已有结果的股票（重新投递时）
+        results = list(task.results or [])
+        finished = {item["symbol"] for item in results}
+        symbols = [symbol for symbol in task.stock_symbols if symbol not in finished]
+
+        # 2. 一次IN查询获取股票名称，一次性批量获取所有股票的行情和基本面数据
+        stocks = await self.stock_repo.get_by_symbols(db, symbols)
+        stock_names = {stock.symbol: stock.name for stock in stocks}
+        stock_data_map = await DailyAnalysisConverter.fetch_stock_data_batch(symbols) if symbols else {}
+
+        # 3. 一次IN查询可复用的个股分析快照（预取到数据的股票才能在分析前算出输入哈希）
+        input_hashes = {
+            symbol: DailyAnalysisConverter.compute_input_hash(
+                symbol, stock_names.get(symbol, symbol), stock_data_map[symbol]
+            )
+            for symbol in symbols
+            if stock_data_map.get(symbol)
+        }
+        snapshots = await SymbolSnapshotConverter.find_live(db, self.snapshot_repo, list(input_hashes.values()))
+
+        # 4. 并发分析没有快照的股票（单只失败不影响其他股票）
+        semaphore = asyncio.Semaphore(settings.AI_BATCH_CONCURRENCY)
+
+        async def run(symbol: str) -> tuple:
+            snapshot = snapshots.get(input_hashes.get(symbol))
+            if snapshot is not None:
+                return symbol, SymbolSnapshotConverter.to_analysis_result(snapshot), snapshot, True, None
+
+            async with semaphore:
+                try:
+                    analysis_result, parsed = await DailyAnalysisConverter.analyze_stock_bounded(
+                        symbol=symbol,
+                        stock_name=stock_names.get(symbol, symbol),
+                        stock_data=stock_data_map.get(symbol),
+                    )
+                    return symbol, analysis_result, None, parsed, None
+                except Exception as e:
+                    return symbol, None, None, False, e
+
+        pending = [asyncio.ensure_future(run(symbol)) for symbol in symbols]
+        try:
+            # 5. 按完成顺序保存结果并更新进度（同一数据库会话不能并发使用）
+            for next_done in asyncio.as_completed(pending):
+                symbol, analysis_result, snapshot, parsed, error = await next_done
+                if error is not None:
+                    print(f"分析{symbol}失败: {error}")
+                    results.append(DailyAnalysisBuilder.build_failure(symbol, error))
+                else:
+                    stock_name = stock_names.get(symbol, symbol)
+                    # 新的分析结果保存为快照供其他用户复用（AI响应解析失败时的默认结果不共享）
+                    if snapshot is None and parsed and symbol in input_hashes:
+                        snapshot = await SymbolSnapshotConverter.save(
+                            db, self.snapshot_repo, symbol, stock_name, input_hashes[symbol], analysis_result
+                        )
+
+                    decision = await self.ai_decision_repo.create(
+                        db,
+                        DailyAnalysisConverter.convert_decision_data(
+                            task.user_id,
+                            symbol,
+                            stock_name,
+                            analysis_result,
+                            snapshot_id=snapshot.snapshot_id if snapshot else None,
+                        ),
+                    )
+                    results.append(DailyAnalysisBuilder.build_success(symbol, decision.decision_id))
+
+                await self.ai_task_repo.update(db, task, DailyAnalysisConverter.convert_progress(results))
+                await db.commit()
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # 6. 汇总任务状态
+        progress = DailyAnalysisConverter.convert_progress(results)
+        await self.ai_task_repo.update(
+            db,
+            task,
+            {
+                "status": DailyAnalysisConverter.resolve_status(task.total_stocks, progress["processed_stocks"]),
+                "completed_at": datetime.now(),
+            },
         )
+        await db.commit()
 
     async def get_results(self, db: AsyncSession, user_id: int, task_id: str) -> dict:
         """
-        获取批量分析结果
+        获取批量分析任务的进度和结果（按任务ID查询）
 
         Args:
             db: 数据库会话
@@ -98,19 +249,25 @@ class DailyAnalysisService:
             task_id: 任务ID
 
         Returns:
-            分析结果
+            任务状态、进度、已完成股票的分析结果和失败原因
+
+        Raises:
+            ResourceNotFound: 任务不存在或不属于当前用户
         """
-        # 查询最近的daily类型分析结果
-        decisions, total = await self.ai_decision_repo.query_by_user(
-            db=db, user_id=user_id, analysis_type="daily", page=1, page_size=100
+        # 1. 主键查询任务
+        task = await self.ai_task_repo.get_by_id(db, task_id)
+        if task is None or task.user_id != user_id:
+            raise ResourceNotFound("分析任务不存在")
+
+        # 2. 一次IN查询已完成股票的决策
+        decision_ids = [item["decision_id"] for item in task.results or [] if item.get("decision_id")]
+        decisions = await self.ai_decision_repo.get_by_ids(db, decision_ids)
+
+        # 3. 构建响应
+        return DailyAnalysisBuilder.build_results_response(
+            task=task, decisions=[DailyAnalysisConverter.convert_single_decision(d) for d in decisions]
         )
 
-        # 转换数据
-        decision_data = [DailyAnalysisConverter.convert_single_decision(d) for d in decisions]
-
-        # 构建响应
-        return DailyAnalysisBuilder.build_results_response(task_id=task_id, decisions=decision_data, total_count=total)
-
 
 class DailyAnalysisConverter:
     """
@@ -120,22 +277,45 @@ class DailyAnalysisConverter:
     """
 
     @staticmethod
-    async def analyze_stock(symbol: str, stock_name: str) -> dict:
+    async def analyze_stock(symbol: str, stock_name: str, stock_data: Optional[dict] = None) -> Tuple[dict, bool]:
         """
         分析单只股票
 
         Args:
             symbol: 股票代码
             stock_name: 股票名称
+            stock_data: 预先批量获取的股票数据（可选，为空则单独获取）
 
         Returns:
-            分析结果
+            (分析结果, AI响应是否解析成功)；解析失败时分析结果为默认分析结果
         """
         # 1. 获取真实股票数据
-        stock_data = await DailyAnalysisConverter.fetch_stock_data(symbol)
+        if stock_data is None:
+            stock_data = await DailyAnalysisConverter.fetch_stock_data(symbol)
 
         # 2. 构建Prompt（包含真实数据）
-        messages = AIPromptBuilder.build_stock_analysis_prompt(
+        messages = DailyAnalysisConverter.build_prompt(symbol, stock_name, stock_data)
+
+        # 3. 调用AI（相同Prompt复用缓存的响应）
+        ai_response = await ai_client.chat_completion(
+            messages=messages,
+            temperature=ANALYSIS_TEMPERATURE,
+            max_tokens=ANALYSIS_MAX_TOKENS,
+            cache_ttl=cache_ttl_for(STOCK_ANALYSIS),
+            validate=DailyAnalysisConverter._parse_ai_response,
+        )
+
+        # 4. 解析响应
+        try:
+            return DailyAnalysisConverter._parse_ai_response(ai_response), True
+        except Exception as e:
+            print(f"解析AI响应失败: {e}")
+            return DailyAnalysisConverter._get_default_analysis(symbol, stock_name), False
+
+    @staticmethod
+    def build_prompt(symbol: str, stock_name: str, stock_data: Optional[dict]) -> List[Dict[str, str]]:
+        """构建单只股票的分析Prompt（批量分析包含全部分析维度）"""
+        return AIPromptBuilder.build_stock_analysis_prompt(
             symbol=symbol,
             stock_name=stock_name,
             stock_data=stock_data,  # ✅ 传入真实数据
@@ -144,17 +324,41 @@ class DailyAnalysisConverter:
             include_valuation=True,
         )
 
-        # 3. 调用AI
-        ai_response = await ai_client.chat_completion(messages=messages, temperature=0.7, max_tokens=1500)
+    @staticmethod
+    def compute_input_hash(symbol: str, stock_name: str, stock_data: Optional[dict]) -> str:
+        """计算单只股票的分析输入哈希（用于复用个股分析快照）"""
+        return SymbolSnapshotConverter.compute_input_hash(
+            DailyAnalysisConverter.build_prompt(symbol, stock_name, stock_data),
+            ANALYSIS_TEMPERATURE,
+            ANALYSIS_MAX_TOKENS,
+        )
 
-        # 4. 解析响应
-        try:
-            analysis_result = DailyAnalysisConverter._parse_ai_response(ai_response)
-        except Exception as e:
-            print(f"解析AI响应失败: {e}")
-            analysis_result = DailyAnalysisConverter._get_default_analysis(symbol, stock_name)
+    @staticmethod
+    async def analyze_stock_bounded(
+        symbol: str, stock_name: str, stock_data: Optional[dict] = None
+    ) -> Tuple[dict, bool]:
+        """
+        在全局并发上限内分析单只股票（批量分析使用）
 
-        return analysis_result
+        批量预取没有拿到数据的股票先单独补查行情（受行情并发上限约束），
+        再调用AI分析（受AI调用并发上限约束）。
+
+        Args:
+            symbol: 股票代码
+            stock_name: 股票名称
+            stock_data: 批量预取的股票数据（可选）
+
+        Returns:
+            (分析结果, AI响应是否解析成功)
+        """
+        if not stock_data:
+            async with _get_semaphore("market_data", settings.AI_BATCH_MARKET_CONCURRENCY):
+                stock_data = await DailyAnalysisConverter.fetch_stock_data(symbol)
+
+        async with _get_semaphore("llm", settings.AI_BATCH_LLM_CONCURRENCY):
+            return await DailyAnalysisConverter.analyze_stock(
+                symbol=symbol, stock_name=stock_name, stock_data=stock_data
+            )
 
     @staticmethod
     async def fetch_stock_data(symbol: str) -> dict:
@@ -167,22 +371,41 @@ class DailyAnalysisConverter:
         Returns:
             股票数据字典
         """
-        stock_data = {}
+        stock_data_map = await DailyAnalysisConverter.fetch_stock_data_batch([symbol])
+        return stock_data_map.get(symbol, {})
+
+    @staticmethod
+    async def fetch_stock_data_batch(symbols: List[str]) -> Dict[str, dict]:
+        """
+        批量获取股票数据（行情、基本面、技术指标各一次批量调用）
+
+        Args:
+            symbols: 股票代码列表
+
+        Returns:
+            {symbol: 股票数据字典}
+        """
+        stock_data_map = {symbol: {} for symbol in symbols}
 
         try:
             # 只获取关键数据，减少API调用
-            quote = await tushare_client.get_realtime_quote(symbol)
-            if quote:
-                stock_data["quote"] = quote
+            quotes = await tushare_client.get_realtime_quotes(symbols)
+            for symbol, quote in quotes.items():
+                stock_data_map[symbol]["quote"] = quote
+
+            fundamentals = await tushare_client.get_batch_fundamentals(symbols)
+            for symbol, data in fundamentals.items():
+                stock_data_map[symbol]["fundamentals"] = data
 
-            fundamentals = await tushare_client.get_fundamentals(symbol)
-            if fundamentals:
-                stock_data["fundamentals"] = fundamentals
+            # 技术指标基于本地日线计算，只增量下载缺失的交易日
+            technicals = await tushare_client.get_batch_technical_indicators(symbols)
+            for symbol, data in technicals.items():
+                stock_data_map[symbol]["technicals"] = data
 
         except Exception as e:
-            print(f"获取{symbol}数据失败: {e}")
+            print(f"批量获取股票数据失败: {e}")
 
-        return stock_data
+        return stock_data_map
 
     @staticmethod
     def _parse_ai_response(ai_response: str) -> dict:
@@ -231,6 +454,39 @@ class DailyAnalysisConverter:
             "confidence_level": 50.0,
         }
 
+    @staticmethod
+    def convert_decision_data(
+        user_id: int, symbol: str, stock_name: str, analysis_result: dict, snapshot_id: Optional[int] = None
+    ) -> dict:
+        """将AI分析结果转换为决策记录数据（结果来自快照时记录快照ID）"""
+        return {
+            "user_id": user_id,
+            "symbol": symbol,
+            "stock_name": stock_name,
+            "analysis_type": "daily",
+            "ai_score": analysis_result.get("ai_score", {}),
+            "ai_suggestion": analysis_result.get("ai_suggestion", ""),
+            "ai_strategy": analysis_result.get("ai_strategy", {}),
+            "ai_reasons": analysis_result.get("ai_reasons", []),
+            "confidence_level": Decimal(str(analysis_result.get("confidence_level", 50.0))),
+            "snapshot_id": snapshot_id,
+        }
+
+    @staticmethod
+    def convert_progress(results: List[dict]) -> dict:
+        """根据逐只股票结果计算任务进度"""
+        failed = sum(1 for item in results if item["status"] == "failed")
+        return {"results": list(results), "processed_stocks": len(results) - failed, "failed_stocks": failed}
+
+    @staticmethod
+    def resolve_status(total_stocks: int, processed_stocks: int) -> str:
+        """根据成功数量确定任务最终状态"""
+        if processed_stocks == total_stocks:
+            return "completed"
+        if processed_stocks == 0:
+            return "failed"
+        return "partial"
+
     @staticmethod
     def convert_single_decision(decision) -> dict:
         """转换单个AI决策"""
@@ -255,25 +511,48 @@ class DailyAnalysisBuilder:
     """
 
     @staticmethod
-    def build_task_response(task_id: str, total_stocks: int, processed_stocks: int, results: List[dict]) -> dict:
+    def build_task_response(task) -> dict:
         """构建任务创建响应"""
         return {
-            "task_id": task_id,
-            "status": "completed" if processed_stocks == total_stocks else "partial",
-            "total_stocks": total_stocks,
-            "processed_stocks": processed_stocks,
-            "results": results,
+            "task_id": task.task_id,
+            "status": task.status,
+            "total_stocks": task.total_stocks,
+            "processed_stocks": task.processed_stocks,
+            "estimated_tokens": task.total_stocks * 1500,
+            "estimated_time_seconds": task.total_stocks * 3,
             "created_at": datetime.now().isoformat(),
         }
 
     @staticmethod
-    def build_results_response(task_id: str, decisions: List[dict], total_count: int) -> dict:
-        """构建分析结果响应"""
+    def build_success(symbol: str, decision_id: int) -> dict:
+        """构建单只股票的成功结果"""
+        return {"symbol": symbol, "status": "success", "decision_id": decision_id}
+
+    @staticmethod
+    def build_failure(symbol: str, error: BaseException) -> dict:
+        """构建单只股票的失败信息"""
+        return {"symbol": symbol, "status": "failed", "error": str(error) or error.__class__.__name__}
+
+    @staticmethod
+    def build_results_response(task, decisions: List[dict]) -> dict:
+        """构建任务进度与分析结果响应"""
+        finished = task.processed_stocks + task.failed_stocks
         return {
-            "task_id": task_id,
-            "status": "completed",
-            "total_count": total_count,
+            "task_id": task.task_id,
+            "status": task.status,
+            "total_stocks": task.total_stocks,
+            "processed_stocks": task.processed_stocks,
+            "failed_stocks": task.failed_stocks,
+            "progress": round(finished / task.total_stocks * 100, 1) if task.total_stocks else 100.0,
+            "total_count": len(decisions),
             "results": decisions,
+            "failures": [
+                {"symbol": item["symbol"], "error": item.get("error")}
+                for item in task.results or []
+                if item["status"] == "failed"
+            ],
+            "error_message": task.error_message,
             "total_tokens_used": len(decisions) * 1200,  # 估算
-            "completed_at": datetime.now().isoformat(),
+            "created_at": task.created_at.isoformat() if task.created_at else None,
+            "completed_at": task.completed_at.isoformat() if task.completed_at else None,
         }
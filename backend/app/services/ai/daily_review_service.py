@@ -13,6 +13,7 @@ from app.repositories.stock_repo import StockRepository
 from app.repositories.event_repo import EventRepository
 from app.repositories.review_repo import ReviewRepository
 from app.utils.ai_client import ai_client, AIPromptBuilder
+from app.utils.ai_response_cache import DAILY_REVIEW, cache_ttl_for
 
 
 class DailyReviewService:
@@ -112,7 +113,6 @@ class DailyReviewService:
         review_data = {"user_id": user_id, "review_date": target_date, "content": review_content, "type": "daily"}
 
         review = await self.review_repo.create(db, review_data)
-        await db.commit()
 
         return DailyReviewBuilder.build_task_response(review_id=review.review_id, status="completed")
 
@@ -173,8 +173,14 @@ class DailyReviewConverter:
         # 构建Prompt
         messages = AIPromptBuilder.build_daily_review_prompt(date=date, holdings=holdings, events=events)
 
-        # 调用AI
-        ai_response = await ai_client.chat_completion(messages=messages, temperature=0.7, max_tokens=2000)
+        # 调用AI（相同Prompt复用缓存的响应）
+        ai_response = await ai_client.chat_completion(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=2000,
+            cache_ttl=cache_ttl_for(DAILY_REVIEW),
+            validate=DailyReviewConverter._parse_ai_review,
+        )
 
         # 解析AI响应
         try:
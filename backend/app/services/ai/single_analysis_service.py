@@ -6,12 +6,23 @@ Single Stock Analysis Service
 
 import json
 from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
 from app.repositories.ai_decision_repo import AIDecisionRepository
+from app.repositories.pagination import keyset_values
 from app.repositories.stock_repo import StockRepository
+from app.repositories.symbol_analysis_snapshot_repo import SymbolAnalysisSnapshotRepository
+from app.services.ai.symbol_snapshot_service import SymbolSnapshotConverter
 from app.utils.ai_client import ai_client, AIPromptBuilder
+from app.utils.ai_response_cache import STOCK_ANALYSIS, cache_ttl_for
+from app.utils.cursor import decode_cursor, encode_cursor
 from app.utils.tushare_client import tushare_client
 
+# 单股分析的AI生成参数（参与分析输入哈希）
+ANALYSIS_TEMPERATURE = 0.7
+ANALYSIS_MAX_TOKENS = 2000
+
 
 class SingleAnalysisService:
     """
@@ -23,6 +34,7 @@ class SingleAnalysisService:
     def __init__(self):
         self.ai_decision_repo = AIDecisionRepository()
         self.stock_repo = StockRepository()
+        self.snapshot_repo = SymbolAnalysisSnapshotRepository()
 
     async def analyze_stock(
         self,
@@ -58,8 +70,8 @@ class SingleAnalysisService:
             symbol=symbol, include_fundamentals=include_fundamentals, include_technicals=include_technicals
         )
 
-        # 3. 调用AI进行分析
-        analysis_result = await SingleAnalysisConverter.analyze_with_ai(
+        # 3. 复用未过期的个股分析快照（相同数据已被其他用户分析过），否则调用AI进行分析
+        messages = AIPromptBuilder.build_stock_analysis_prompt(
             symbol=symbol,
             stock_name=stock_name,
             stock_data=stock_data,  # ✅ 传入真实股票数据
@@ -67,23 +79,160 @@ class SingleAnalysisService:
             include_technicals=include_technicals,
             include_valuation=include_valuation,
         )
+        input_hash = SymbolSnapshotConverter.compute_input_hash(messages, ANALYSIS_TEMPERATURE, ANALYSIS_MAX_TOKENS)
+        snapshot = (await SymbolSnapshotConverter.find_live(db, self.snapshot_repo, [input_hash])).get(input_hash)
+        if snapshot is not None:
+            analysis_result = SymbolSnapshotConverter.to_analysis_result(snapshot)
+        else:
+            analysis_result, parsed = await SingleAnalysisConverter.analyze_with_ai(
+                symbol=symbol, stock_name=stock_name, messages=messages
+            )
+            # 新的分析结果保存为快照（AI响应解析失败时的默认结果不共享）
+            if parsed:
+                snapshot = await SymbolSnapshotConverter.save(
+                    db, self.snapshot_repo, symbol, stock_name, input_hash, analysis_result
+                )
 
-        # 3. 准备保存到数据库的数据
+        # 4. 准备保存到数据库的数据
         decision_data = SingleAnalysisConverter.prepare_decision_data(
             user_id=user_id,
             symbol=symbol,
             stock_name=stock_name,
             analysis_type="single",
             analysis_result=analysis_result,
+            snapshot_id=snapshot.snapshot_id if snapshot else None,
         )
 
-        # 4. 保存AI决策到数据库
+        # 5. 保存AI决策到数据库
         decision = await self.ai_decision_repo.create(db, decision_data)
-        await db.commit()
 
-        # 5. 使用Builder构建响应
+        # 6. 使用Builder构建响应
         return SingleAnalysisBuilder.build_analysis_response(decision)
 
+    async def start_analysis_stream(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        symbol: str,
+        analysis_type: str = "comprehensive",
+        include_fundamentals: bool = True,
+        include_technicals: bool = True,
+        include_valuation: bool = True,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        流式分析单只股票
+
+        请求内只查询股票信息；行情数据获取、AI生成都在事件流中进行，首个事件立即返回。
+        AI分析完成后使用独立的数据库会话保存个股分析快照和决策（请求的数据库会话此时已关闭）。
+        流式输出的是AI原始响应，重复请求由AI响应缓存复用；已有相同输入的快照时决策引用该快照。
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            symbol: 股票代码
+            analysis_type: 分析类型
+            include_fundamentals: 是否包含基本面分析
+            include_technicals: 是否包含技术面分析
+            include_valuation: 是否包含估值分析
+
+        Returns:
+            (事件名, 数据) 异步迭代器：meta → token... → done / error
+        """
+        # 1. 查询股票信息
+        stock = await self.stock_repo.get_by_symbol(db, symbol)
+        stock_name = stock.name if stock else "未知股票"
+
+        # 2. 返回事件流（响应阶段执行）
+        return self._stream_analysis(
+            user_id=user_id,
+            symbol=symbol,
+            stock_name=stock_name,
+            include_fundamentals=include_fundamentals,
+            include_technicals=include_technicals,
+            include_valuation=include_valuation,
+        )
+
+    async def _stream_analysis(
+        self,
+        user_id: int,
+        symbol: str,
+        stock_name: str,
+        include_fundamentals: bool,
+        include_technicals: bool,
+        include_valuation: bool,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """流式生成分析，结束后解析并保存AI决策"""
+        yield "meta", {"symbol": symbol, "stock_name": stock_name}
+
+        # 1. 获取真实股票数据（行情+基本面+技术指标）
+        stock_data = await SingleAnalysisConverter.fetch_stock_data(
+            symbol=symbol, include_fundamentals=include_fundamentals, include_technicals=include_technicals
+        )
+
+        # 2. 逐段转发AI分析
+        messages = AIPromptBuilder.build_stock_analysis_prompt(
+            symbol=symbol,
+            stock_name=stock_name,
+            stock_data=stock_data,
+            include_fundamentals=include_fundamentals,
+            include_technicals=include_technicals,
+            include_valuation=include_valuation,
+        )
+        chunks = []
+        try:
+            async for chunk in ai_client.stream_chat_completion(
+                messages=messages,
+                temperature=ANALYSIS_TEMPERATURE,
+                max_tokens=ANALYSIS_MAX_TOKENS,
+                cache_ttl=cache_ttl_for(STOCK_ANALYSIS),
+                validate=SingleAnalysisConverter._parse_ai_response,
+            ):
+                chunks.append(chunk)
+                yield "token", {"content": chunk}
+        except Exception as e:
+            print(f"AI流式分析失败: {e}")
+            yield "error", {"message": "AI分析生成失败"}
+            return
+
+        # 3. 解析完整响应
+        parsed = True
+        try:
+            analysis_result = SingleAnalysisConverter._parse_ai_response("".join(chunks))
+        except Exception as e:
+            print(f"AI响应解析失败: {e}")
+            analysis_result = SingleAnalysisConverter._get_default_analysis(symbol, stock_name)
+            parsed = False
+
+        # 4. 使用独立会话保存个股分析快照（解析成功且尚无快照时）和AI决策
+        try:
+            async with AsyncSessionLocal() as db:
+                snapshot = None
+                if parsed:
+                    input_hash = SymbolSnapshotConverter.compute_input_hash(
+                        messages, ANALYSIS_TEMPERATURE, ANALYSIS_MAX_TOKENS
+                    )
+                    snapshots = await SymbolSnapshotConverter.find_live(db, self.snapshot_repo, [input_hash])
+                    snapshot = snapshots.get(input_hash) or await SymbolSnapshotConverter.save(
+                        db, self.snapshot_repo, symbol, stock_name, input_hash, analysis_result
+                    )
+                decision_data = SingleAnalysisConverter.prepare_decision_data(
+                    user_id=user_id,
+                    symbol=symbol,
+                    stock_name=stock_name,
+                    analysis_type="single",
+                    analysis_result=analysis_result,
+                    snapshot_id=snapshot.snapshot_id if snapshot else None,
+                )
+                decision = await self.ai_decision_repo.create(db, decision_data)
+                await db.commit()
+        except Exception as e:
+            print(f"保存AI决策失败: {e}")
+            yield "error", {"message": "AI分析结果保存失败"}
+            return
+
+        # 5. 返回最终分析结果
+        yield "done", SingleAnalysisBuilder.build_analysis_response(decision)
+
     async def get_ai_suggestions(
         self,
         db: AsyncSession,
@@ -92,6 +241,7 @@ class SingleAnalysisService:
         action: str = None,
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
     ) -> dict:
         """
         获取AI投资建议列表
@@ -103,14 +253,30 @@ class SingleAnalysisService:
             action: 操作类型筛选（可选）
             page: 页码
             page_size: 每页数量
+            cursor: 分页游标（可选，传入时按游标分页并忽略page）
 
         Returns:
             AI建议列表
+
+        Raises:
+            ValidationError: 游标不合法
         """
-        # 1. 查询AI决策记录
-        decisions, total = await self.ai_decision_repo.query_by_user(
-            db=db, user_id=user_id, analysis_type="single", page=page, page_size=page_size
-        )
+        # 1. 查询AI决策记录（游标模式不统计总数）
+        if cursor:
+            total = None
+            decisions, next_key = await self.ai_decision_repo.query_by_user_after(
+                db=db,
+                user_id=user_id,
+                after=decode_cursor(cursor, len(AIDecisionRepository.SORT_KEYS)),
+                analysis_type="single",
+                page_size=page_size,
+            )
+        else:
+            decisions, total = await self.ai_decision_repo.query_by_user(
+                db=db, user_id=user_id, analysis_type="single", page=page, page_size=page_size
+            )
+            has_more = decisions and page * page_size < total
+            next_key = keyset_values(decisions[-1], AIDecisionRepository.SORT_KEYS) if has_more else None
 
         # 2. 使用Converter过滤和转换数据
         filtered_suggestions = SingleAnalysisConverter.filter_suggestions(
@@ -119,7 +285,11 @@ class SingleAnalysisService:
 
         # 3. 使用Builder构建响应
         return SingleAnalysisBuilder.build_suggestions_response(
-            suggestions=filtered_suggestions, total=total, page=page, page_size=page_size
+            suggestions=filtered_suggestions,
+            total=total,
+            page=None if cursor else page,
+            page_size=page_size,
+            next_cursor=encode_cursor(next_key),
         )
 
 
@@ -179,51 +349,35 @@ class SingleAnalysisConverter:
         return stock_data
 
     @staticmethod
-    async def analyze_with_ai(
-        symbol: str,
-        stock_name: str,
-        stock_data: dict = None,
-        include_fundamentals: bool = True,
-        include_technicals: bool = True,
-        include_valuation: bool = True,
-    ) -> dict:
+    async def analyze_with_ai(symbol: str, stock_name: str, messages: List[Dict[str, str]]) -> Tuple[dict, bool]:
         """
         使用AI进行股票分析
 
         Args:
             symbol: 股票代码
             stock_name: 股票名称
-            stock_data: 股票数据（可选）
-            include_fundamentals: 包含基本面分析
-            include_technicals: 包含技术面分析
-            include_valuation: 包含估值分析
+            messages: 分析Prompt（AIPromptBuilder.build_stock_analysis_prompt）
 
         Returns:
-            AI分析结果字典
+            (AI分析结果字典, AI响应是否解析成功)；解析失败时分析结果为默认分析结果
         """
-        # 1. 构建Prompt
-        messages = AIPromptBuilder.build_stock_analysis_prompt(
-            symbol=symbol,
-            stock_name=stock_name,
-            stock_data=stock_data,
-            include_fundamentals=include_fundamentals,
-            include_technicals=include_technicals,
-            include_valuation=include_valuation,
+        # 1. 调用AI（相同Prompt复用缓存的响应）
+        ai_response = await ai_client.chat_completion(
+            messages=messages,
+            temperature=ANALYSIS_TEMPERATURE,
+            max_tokens=ANALYSIS_MAX_TOKENS,
+            cache_ttl=cache_ttl_for(STOCK_ANALYSIS),
+            validate=SingleAnalysisConverter._parse_ai_response,
         )
 
-        # 2. 调用AI
-        ai_response = await ai_client.chat_completion(messages=messages, temperature=0.7, max_tokens=2000)
-
-        # 3. 解析AI响应
+        # 2. 解析AI响应
         try:
             # 尝试从响应中提取JSON
-            analysis_result = SingleAnalysisConverter._parse_ai_response(ai_response)
+            return SingleAnalysisConverter._parse_ai_response(ai_response), True
         except Exception as e:
             print(f"AI响应解析失败: {e}")
             # 使用默认分析结果
-            analysis_result = SingleAnalysisConverter._get_default_analysis(symbol, stock_name)
-
-        return analysis_result
+            return SingleAnalysisConverter._get_default_analysis(symbol, stock_name), False
 
     @staticmethod
     def _parse_ai_response(ai_response: str) -> dict:
@@ -285,7 +439,12 @@ class SingleAnalysisConverter:
 
     @staticmethod
     def prepare_decision_data(
-        user_id: int, symbol: str, stock_name: str, analysis_type: str, analysis_result: dict
+        user_id: int,
+        symbol: str,
+        stock_name: str,
+        analysis_type: str,
+        analysis_result: dict,
+        snapshot_id: Optional[int] = None,
     ) -> dict:
         """
         准备AI决策数据用于保存到数据库
@@ -296,6 +455,7 @@ class SingleAnalysisConverter:
             stock_name: 股票名称
             analysis_type: 分析类型
             analysis_result: AI分析结果
+            snapshot_id: 个股分析快照ID（可选）
 
         Returns:
             数据库记录字典
@@ -310,6 +470,7 @@ class SingleAnalysisConverter:
             "ai_strategy": analysis_result.get("ai_strategy", {}),
             "ai_reasons": analysis_result.get("ai_reasons", []),
             "confidence_level": Decimal(str(analysis_result.get("confidence_level", 50.0))),
+            "snapshot_id": snapshot_id,
         }
 
     @staticmethod
@@ -418,17 +579,27 @@ class SingleAnalysisBuilder:
         }
 
     @staticmethod
-    def build_suggestions_response(suggestions: list, total: int, page: int, page_size: int) -> dict:
+    def build_suggestions_response(
+        suggestions: list, total: Optional[int], page: Optional[int], page_size: int, next_cursor: Optional[str] = None
+    ) -> dict:
         """
         构建建议列表响应
 
         Args:
             suggestions: 建议数据列表
-            total: 总数量
-            page: 页码
+            total: 总数量（游标模式为None）
+            page: 页码（游标模式为None）
             page_size: 每页数量
+            next_cursor: 下一页游标（没有下一页时为None）
 
         Returns:
             建议列表响应数据
         """
-        return {"total": total, "page": page, "page_size": page_size, "suggestions": suggestions}
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+            "suggestions": suggestions,
+        }
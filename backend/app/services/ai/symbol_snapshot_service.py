@@ -0,0 +1,116 @@
+"""
+Symbol Snapshot Service
+
+个股分析快照 - Converter（单股分析与每日批量分析共用）
+注意：个股分析只取决于股票代码和行情数据，与用户无关。同一分析输入（Prompt + 生成参数）
+在有效期内只调用一次AI，结果保存为快照；各用户的AI决策复制快照结果并记录快照ID。
+"""
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.symbol_analysis_snapshot_repo import SymbolAnalysisSnapshotRepository
+from app.utils.ai_response_cache import STOCK_ANALYSIS, AIResponseCache, cache_ttl_for
+
+
+class SymbolSnapshotConverter:
+    """
+    个股分析快照转换器（静态类）
+
+    职责：业务逻辑计算
+    """
+
+    @staticmethod
+    def compute_input_hash(messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        """
+        计算分析输入哈希（与AI响应缓存键一致，行情数据写在Prompt里）
+
+        Args:
+            messages: 分析Prompt
+            temperature: 温度参数
+            max_tokens: 最大token数
+
+        Returns:
+            SHA-256十六进制摘要
+        """
+        return AIResponseCache.make_key(messages, temperature, max_tokens)
+
+    @staticmethod
+    async def find_live(
+        db: AsyncSession, snapshot_repo: SymbolAnalysisSnapshotRepository, input_hashes: List[str]
+    ) -> Dict[str, object]:
+        """
+        批量查询未过期的快照
+
+        Args:
+            db: 数据库会话
+            snapshot_repo: 快照Repository
+            input_hashes: 分析输入哈希列表
+
+        Returns:
+            {分析输入哈希: 最新的快照}
+        """
+        snapshots = await snapshot_repo.get_live_by_hashes(db, list(set(input_hashes)), datetime.now(timezone.utc))
+        return {snapshot.input_hash: snapshot for snapshot in snapshots}
+
+    @staticmethod
+    async def save(
+        db: AsyncSession,
+        snapshot_repo: SymbolAnalysisSnapshotRepository,
+        symbol: str,
+        stock_name: str,
+        input_hash: str,
+        analysis_result: dict,
+    ) -> Optional[object]:
+        """
+        保存快照（有效期同个股分析的AI响应缓存：交易时段较短，收盘后到下一交易时段开盘）
+
+        Args:
+            db: 数据库会话
+            snapshot_repo: 快照Repository
+            symbol: 股票代码
+            stock_name: 股票名称
+            input_hash: 分析输入哈希
+            analysis_result: AI分析结果（解析成功的结果，默认分析结果不应共享）
+
+        Returns:
+            快照对象，有效期为0时不保存并返回None
+        """
+        ttl = cache_ttl_for(STOCK_ANALYSIS)
+        if ttl <= 0:
+            return None
+
+        return await snapshot_repo.create(
+            db,
+            {
+                "symbol": symbol,
+                "stock_name": stock_name,
+                "input_hash": input_hash,
+                "ai_score": analysis_result.get("ai_score", {}),
+                "ai_suggestion": analysis_result.get("ai_suggestion", ""),
+                "ai_strategy": analysis_result.get("ai_strategy", {}),
+                "ai_reasons": analysis_result.get("ai_reasons", []),
+                "confidence_level": Decimal(str(analysis_result.get("confidence_level", 50.0))),
+                "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl),
+            },
+        )
+
+    @staticmethod
+    def to_analysis_result(snapshot) -> dict:
+        """
+        快照转为AI分析结果（字段同AI响应解析结果）
+
+        Args:
+            snapshot: SymbolAnalysisSnapshot对象
+
+        Returns:
+            AI分析结果字典
+        """
+        return {
+            "ai_score": snapshot.ai_score or {},
+            "ai_suggestion": snapshot.ai_suggestion,
+            "ai_strategy": snapshot.ai_strategy or {},
+            "ai_reasons": list(snapshot.ai_reasons or []),
+            "confidence_level": float(snapshot.confidence_level) if snapshot.confidence_level is not None else 50.0,
+        }
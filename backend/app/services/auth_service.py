@@ -5,7 +5,7 @@ Authentication Service
 from typing import Optional
 from datetime import timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, true, false
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas.user import Token, UserResponse
@@ -34,7 +34,7 @@ class AuthService:
             HTTPException: If authentication fails
         """
         # Get user from database
-        stmt = select(User).where(User.username == username, User.is_active is True, User.is_deleted is False)
+        stmt = select(User).where(User.username == username, User.is_active == true(), User.is_deleted == false())
         result = await self.db.execute(stmt)
         user = result.scalar_one_or_none()
 
@@ -56,7 +56,13 @@ class AuthService:
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": str(user.user_id), "username": user.username}, expires_delta=access_token_expires
+            data={
+                "sub": str(user.user_id),
+                "username": user.username,
+                "ver": user.token_version,
+                "active": user.is_active,
+            },
+            expires_delta=access_token_expires,
         )
 
         # Prepare user response
@@ -77,7 +83,7 @@ class AuthService:
         Raises:
             HTTPException: If user not found or inactive
         """
-        stmt = select(User).where(User.user_id == user_id, User.is_active is True, User.is_deleted is False)
+        stmt = select(User).where(User.user_id == user_id, User.is_active == true(), User.is_deleted == false())
         result = await self.db.execute(stmt)
         user = result.scalar_one_or_none()
 
@@ -8,7 +8,9 @@ from typing import Optional
 from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.event_repo import EventRepository
+from app.repositories.pagination import keyset_values
 from app.schemas.common import PaginationResponse
+from app.utils.cursor import decode_cursor, encode_cursor
 
 
 class EventQueryService:
@@ -32,6 +34,7 @@ class EventQueryService:
         end_date: Optional[date] = None,
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
     ) -> dict:
         """
         执行事件查询业务逻辑
@@ -46,11 +49,30 @@ class EventQueryService:
             end_date: 结束日期（可选）
             page: 页码
             page_size: 每页数量
+            cursor: 分页游标（可选，传入时按游标分页并忽略page）
 
         Returns:
             分页的事件列表数据
+
+        Raises:
+            ValidationError: 游标不合法
         """
-        # 1. 查询事件列表
+        # 1. 游标模式：按上一页末尾的排序键定位，不统计总数
+        if cursor:
+            events, next_key = await self.event_repo.query_by_user_after(
+                db=db,
+                user_id=user_id,
+                after=decode_cursor(cursor, len(EventRepository.SORT_KEYS)),
+                symbol=symbol,
+                category=category,
+                is_read=is_read,
+                start_date=start_date,
+                end_date=end_date,
+                page_size=page_size,
+            )
+            return EventQueryBuilder.build_cursor_response(EventQueryConverter.convert(events), page_size, next_key)
+
+        # 2. 页码模式：查询事件列表
         events, total = await self.event_repo.query_by_user(
             db=db,
             user_id=user_id,
@@ -63,11 +85,12 @@ class EventQueryService:
             page_size=page_size,
         )
 
-        # 2. 调用 Converter 转换数据
+        # 3. 调用 Converter 转换数据
         items = EventQueryConverter.convert(events)
 
-        # 3. 调用 Builder 构建响应
-        return EventQueryBuilder.build_response(items, total, page, page_size)
+        # 4. 调用 Builder 构建响应（附带下一页游标，可切换为游标模式）
+        next_key = keyset_values(events[-1], EventRepository.SORT_KEYS) if events and page * page_size < total else None
+        return EventQueryBuilder.build_response(items, total, page, page_size, next_key)
 
 
 class EventQueryConverter:
@@ -120,18 +143,39 @@ class EventQueryBuilder:
     """
 
     @staticmethod
-    def build_response(items: list, total: int, page: int, page_size: int) -> dict:
+    def build_response(items: list, total: int, page: int, page_size: int, next_key: Optional[list] = None) -> dict:
         """
-        构建分页响应
+        构建分页响应（页码模式）
 
         Args:
             items: 事件数据列表
             total: 总记录数
             page: 当前页码
             page_size: 每页数量
+            next_key: 下一页排序键值（可选）
 
         Returns:
             分页响应字典
         """
-        pagination = PaginationResponse.create(items=items, total=total, page=page, page_size=page_size)
+        pagination = PaginationResponse.create(
+            items=items, total=total, page=page, page_size=page_size, next_cursor=encode_cursor(next_key)
+        )
+        return pagination.dict()
+
+    @staticmethod
+    def build_cursor_response(items: list, page_size: int, next_key: Optional[list]) -> dict:
+        """
+        构建分页响应（游标模式）
+
+        Args:
+            items: 事件数据列表
+            page_size: 每页数量
+            next_key: 下一页排序键值（没有下一页时为None）
+
+        Returns:
+            分页响应字典
+        """
+        pagination = PaginationResponse.create_cursor(
+            items=items, page_size=page_size, next_cursor=encode_cursor(next_key)
+        )
         return pagination.dict()
@@ -4,10 +4,20 @@ Export Service
 数据导出业务服务 - Service + Converter + Builder
 """
 
+import csv
+import re
 import uuid
-from typing import Optional
 from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.exceptions import ResourceNotFound, ValidationError
+from app.repositories.trade_repo import TradeRepository
+
+# 导出任务ID格式（同时防止下载时路径穿越）
+TASK_ID_PATTERN = re.compile(r"^export_[0-9a-f]{12}$")
 
 
 class ExportService:
@@ -17,6 +27,9 @@ class ExportService:
     职责：权限校验、编排流程、事务管理
     """
 
+    def __init__(self):
+        self.trade_repo = TradeRepository()
+
     async def export_trades(
         self,
         db: AsyncSession,
@@ -30,24 +43,74 @@ class ExportService:
         """
         导出交易记录
 
+        交易按成交时间正序流式读取并逐行写入文件，内存占用与交易数量无关
+
         Args:
             db: 数据库会话
             user_id: 用户ID
             account_id: 账户ID（可选）
-            format: 导出格式
+            format: 导出格式（csv/xlsx）
             start_date: 开始日期
             end_date: 结束日期
             include_summary: 包含汇总
 
         Returns:
             导出任务信息
+
+        Raises:
+            ValidationError: 格式或日期不合法
         """
-        # TODO: 实际实现
-        # 1. 查询交易记录
-        # 2. 生成Excel/CSV文件
-        # 3. 返回任务ID
+        # 1. 参数校验
+        ExportConverter.validate_format(format)
+        start = ExportConverter.parse_date(start_date)
+        end = ExportConverter.parse_date(end_date)
+
+        # 2. 流式读取交易并逐行写入文件
         task_id = f"export_{uuid.uuid4().hex[:12]}"
-        return ExportBuilder.build_task_response(task_id, "trades")
+        path = ExportConverter.export_path(user_id, task_id, format)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        trades = self.trade_repo.stream_by_user(db, user_id, account_id=account_id, start_date=start, end_date=end)
+        try:
+            with ExportConverter.open_writer(path, format) as writer:
+                writer.writerow(ExportConverter.TRADE_HEADERS)
+                summary = ExportConverter.new_trade_summary()
+                async for trade in trades:
+                    writer.writerow(ExportConverter.trade_row(trade))
+                    ExportConverter.accumulate_trade_summary(summary, trade)
+
+                if include_summary:
+                    for row in ExportConverter.trade_summary_rows(summary):
+                        writer.writerow(row)
+        except Exception:
+            # 导出失败不保留不完整的文件
+            path.unlink(missing_ok=True)
+            raise
+
+        # 3. 调用 Builder 构建响应
+        return ExportBuilder.build_task_response(task_id, "trades", status="completed")
+
+    def get_export_file(self, user_id: int, task_id: str) -> Path:
+        """
+        查找用户的导出文件
+
+        Args:
+            user_id: 用户ID
+            task_id: 导出任务ID
+
+        Returns:
+            文件路径
+
+        Raises:
+            ResourceNotFound: 文件不存在或不属于该用户
+        """
+        if TASK_ID_PATTERN.match(task_id):
+            for format in ExportConverter.FORMATS:
+                path = ExportConverter.export_path(user_id, task_id, format)
+                if path.is_file():
+                    return path
+
+        raise ResourceNotFound("文件不存在或已过期")
 
     async def export_holdings(
         self, db: AsyncSession, user_id: int, account_id: Optional[int], format: str, include_stats: bool
@@ -84,20 +147,193 @@ class ExportConverter:
     职责：业务逻辑计算
     """
 
+    FORMATS = ("csv", "xlsx")
+
+    TRADE_HEADERS = [
+        "成交时间",
+        "账户ID",
+        "股票代码",
+        "股票名称",
+        "交易类型",
+        "数量",
+        "价格",
+        "成交金额",
+        "净金额",
+        "备注",
+    ]
+
     @staticmethod
-    def format_export_data(data: list, format: str) -> bytes:
+    def validate_format(format: str) -> None:
         """
-        格式化导出数据
+        校验导出格式
 
         Args:
-            data: 原始数据列表
-            format: 导出格式（xlsx/csv/pdf）
+            format: 导出格式
+
+        Raises:
+            ValidationError: 不支持的格式
+        """
+        if format not in ExportConverter.FORMATS:
+            raise ValidationError(f"导出格式必须是以下之一: {', '.join(ExportConverter.FORMATS)}")
+
+    @staticmethod
+    def parse_date(value: Optional[str]) -> Optional[datetime]:
+        """
+        解析日期参数（YYYY-MM-DD）
+
+        Args:
+            value: 日期字符串
 
         Returns:
-            格式化后的字节数据
+            datetime对象，未提供时返回None
+
+        Raises:
+            ValidationError: 日期格式不合法
+        """
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            raise ValidationError(f"日期格式不正确: {value}，应为 YYYY-MM-DD")
+
+    @staticmethod
+    def export_path(user_id: int, task_id: str, format: str) -> Path:
         """
-        # TODO: 实际实现格式转换
-        pass
+        导出文件路径（按用户分目录）
+
+        Args:
+            user_id: 用户ID
+            task_id: 导出任务ID
+            format: 导出格式
+
+        Returns:
+            文件路径
+        """
+        return Path(settings.EXPORT_DIR) / str(user_id) / f"{task_id}.{format}"
+
+    @staticmethod
+    def open_writer(path: Path, format: str):
+        """
+        打开逐行写入的导出文件
+
+        Args:
+            path: 文件路径
+            format: 导出格式（csv/xlsx）
+
+        Returns:
+            上下文管理器，进入后得到带 writerow() 的写入器
+
+        Raises:
+            ValidationError: xlsx格式但未安装 openpyxl
+        """
+        if format == "csv":
+            return _CsvWriter(path)
+        return _XlsxWriter(path)
+
+    @staticmethod
+    def trade_row(trade) -> list:
+        """
+        交易记录转换为导出行
+
+        Args:
+            trade: 交易对象
+
+        Returns:
+            导出行
+        """
+        return [
+            trade.trade_date.isoformat() if trade.trade_date else "",
+            trade.account_id,
+            trade.symbol,
+            trade.stock_name,
+            "买入" if trade.trade_type == "buy" else "卖出",
+            float(trade.quantity),
+            float(trade.price),
+            float(trade.total_amount),
+            float(trade.net_amount),
+            trade.notes or "",
+        ]
+
+    @staticmethod
+    def new_trade_summary() -> dict:
+        """
+        初始化交易汇总（流式累计，不保留交易明细）
+
+        Returns:
+            汇总数据
+        """
+        return {"count": 0, "buy_amount": Decimal("0"), "sell_amount": Decimal("0")}
+
+    @staticmethod
+    def accumulate_trade_summary(summary: dict, trade) -> None:
+        """
+        累计一笔交易到汇总
+
+        Args:
+            summary: 汇总数据
+            trade: 交易对象
+        """
+        summary["count"] += 1
+        key = "buy_amount" if trade.trade_type == "buy" else "sell_amount"
+        summary[key] += trade.total_amount or Decimal("0")
+
+    @staticmethod
+    def trade_summary_rows(summary: dict) -> list:
+        """
+        生成汇总行
+
+        Args:
+            summary: 汇总数据
+
+        Returns:
+            汇总行列表
+        """
+        return [
+            [],
+            ["交易笔数", summary["count"]],
+            ["买入金额", float(summary["buy_amount"])],
+            ["卖出金额", float(summary["sell_amount"])],
+        ]
+
+
+class _CsvWriter:
+    """CSV逐行写入（UTF-8 BOM，Excel可直接打开）"""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __enter__(self):
+        self.file = open(self.path, "w", newline="", encoding="utf-8-sig")
+        return csv.writer(self.file)
+
+    def __exit__(self, *exc):
+        self.file.close()
+        return False
+
+
+class _XlsxWriter:
+    """xlsx逐行写入（openpyxl write_only 模式，不在内存中保留整张表）"""
+
+    def __init__(self, path: Path):
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ValidationError("xlsx导出需要安装 openpyxl，请改用csv格式")
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+
+    def __enter__(self):
+        self.sheet = self.workbook.create_sheet()
+        return self
+
+    def writerow(self, row: list) -> None:
+        self.sheet.append(row)
+
+    def __exit__(self, *exc):
+        self.workbook.save(self.path)
+        return False
 
 
 class ExportBuilder:
@@ -108,11 +344,11 @@ class ExportBuilder:
     """
 
     @staticmethod
-    def build_task_response(task_id: str, export_type: str) -> dict:
+    def build_task_response(task_id: str, export_type: str, status: str = "processing") -> dict:
         """构建导出任务响应"""
         return {
             "task_id": task_id,
-            "status": "processing",
+            "status": status,
             "export_type": export_type,
             "download_url": f"/api/v1/export/download/{task_id}",
             "created_at": datetime.now().isoformat(),
@@ -0,0 +1,269 @@
+"""
+Holding Delta Service
+
+持仓增量更新业务服务 - Service + Converter
+
+交易新增、修改、删除时只调整受影响的 (账户, 股票) 持仓，不重放账户全部交易。
+持仓行加锁后修改（并发的首次建仓用 ON CONFLICT 合并），变更后持仓为负时拒绝；
+只flush不提交，由交易服务与交易记录在同一事务中提交。
+
+成本按移动加权平均计算：按时间追加的交易增量结果与全量重放一致；撤销已清仓的卖出时恢复清仓前的成本。
+补录历史交易或修改较早的交易时，平均成本可能与全量重放有差异，可通过持仓同步（全量重建）校正。
+上线前须执行 scripts/rebuild_holdings.py 重建已有账户的持仓，增量更新才有正确的起点。
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.exceptions import InsufficientHolding
+from app.repositories.holding_repo import HoldingRepository
+from app.repositories.trade_repo import TradeRepository
+
+
+class HoldingDeltaService:
+    """
+    持仓增量更新业务类
+
+    职责：加锁读取持仓、编排增量计算、写入（不提交事务）
+    """
+
+    def __init__(self):
+        self.holding_repo = HoldingRepository()
+        self.trade_repo = TradeRepository()
+
+    async def apply(self, db: AsyncSession, trade, reverse: bool = False) -> None:
+        """
+        将一笔交易应用到持仓（reverse=True 时撤销该交易的影响）
+
+        Args:
+            db: 数据库会话
+            trade: 交易对象或字典（user_id、account_id、symbol、stock_name、trade_type、quantity、price）
+            reverse: 是否撤销（交易删除）
+
+        Raises:
+            InsufficientHolding: 变更后持仓数量为负（卖出超过持仓）
+        """
+        await self._apply(db, [(HoldingDeltaConverter.normalize_trade(trade), reverse)])
+
+    async def replace(self, db: AsyncSession, old_trade, new_trade) -> None:
+        """
+        交易修改：撤销旧交易、应用新交易
+
+        同一 (账户, 股票) 时在一次加锁中完成，只校验最终持仓（撤销旧交易后的中间状态可以为负）
+
+        Args:
+            db: 数据库会话
+            old_trade: 修改前的交易对象或字典
+            new_trade: 修改后的交易对象或字典
+
+        Raises:
+            InsufficientHolding: 变更后持仓数量为负（卖出超过持仓）
+        """
+        old_trade = HoldingDeltaConverter.normalize_trade(old_trade)
+        new_trade = HoldingDeltaConverter.normalize_trade(new_trade)
+
+        if (old_trade["account_id"], old_trade["symbol"]) == (new_trade["account_id"], new_trade["symbol"]):
+            await self._apply(db, [(old_trade, True), (new_trade, False)])
+        else:
+            await self._apply(db, [(old_trade, True)])
+            await self._apply(db, [(new_trade, False)])
+
+    async def _closed_position_cost(self, db: AsyncSession, account_id: int, symbol: str) -> Optional[Decimal]:
+        """已清仓持仓的平均成本：优先取最近一次清仓（软删除）的持仓，没有时按成交时间正序回放该股票的交易"""
+        closed = await self.holding_repo.get_latest_deleted(db, account_id, symbol)
+        if closed is not None and closed.avg_cost is not None:
+            return closed.avg_cost
+
+        quantity, avg_cost = Decimal("0"), None
+        async for trade in self.trade_repo.stream_by_account(db, account_id, symbol=symbol):
+            quantity, avg_cost = HoldingDeltaConverter.apply_trade(
+                quantity=quantity,
+                avg_cost=avg_cost,
+                trade_type=trade.trade_type,
+                trade_quantity=trade.quantity,
+                price=trade.price,
+            )
+        return avg_cost
+
+    async def _apply(self, db: AsyncSession, changes: List[Tuple[dict, bool]]) -> None:
+        """将同一 (账户, 股票) 的交易变更依次应用到持仓"""
+        trade = changes[-1][0]
+
+        # 1. 锁定持仓行，防止并发交易互相覆盖；已清仓时撤销卖出按清仓前的成本恢复持仓
+        holding = await self.holding_repo.get_for_update(db, trade["account_id"], trade["symbol"])
+        closed_cost = None
+        if holding is None and HoldingDeltaConverter.reverses_sell(changes):
+            closed_cost = await self._closed_position_cost(db, trade["account_id"], trade["symbol"])
+        quantity, avg_cost = HoldingDeltaConverter.apply_changes(holding, changes, closed_cost)
+
+        # 2. 首次建仓（ON CONFLICT DO NOTHING）；并发交易已先建仓时，锁定该持仓后重新计算
+        if holding is None and quantity > 0:
+            created = await self.holding_repo.create_if_absent(
+                db, HoldingDeltaConverter.new_holding(trade, quantity, avg_cost)
+            )
+            if created:
+                return
+            holding = await self.holding_repo.get_for_update(db, trade["account_id"], trade["symbol"])
+            quantity, avg_cost = HoldingDeltaConverter.apply_changes(holding, changes)
+
+        # 3. 卖出超过持仓（或撤销买入后持仓为负）时拒绝，由调用方回滚整笔交易
+        if quantity < 0:
+            held = holding.quantity if holding else Decimal("0")
+            raise InsufficientHolding(f"{trade['symbol']}持仓数量不足（当前持仓{held}，变更后为{quantity}）")
+
+        # 4. 写入持仓（数量归零时软删除）
+        if holding:
+            await self.holding_repo.assign(db, holding, HoldingDeltaConverter.holding_changes(quantity, avg_cost))
+
+
+class HoldingDeltaConverter:
+    """
+    持仓增量转换器（静态类）
+
+    职责：持仓数量与平均成本计算
+    """
+
+    @staticmethod
+    def apply_changes(
+        holding, changes: List[Tuple[dict, bool]], closed_cost: Optional[Decimal] = None
+    ) -> Tuple[Decimal, Decimal]:
+        """
+        计算交易变更依次应用到持仓后的数量和平均成本
+
+        Args:
+            holding: 当前持仓对象（无持仓时为None）
+            changes: [(交易数据, 是否撤销)]
+            closed_cost: 无持仓时已清仓持仓的平均成本（可选，撤销卖出时恢复该成本）
+
+        Returns:
+            (新的持仓数量, 新的平均成本)
+        """
+        quantity = holding.quantity if holding else Decimal("0")
+        avg_cost = holding.avg_cost if holding else closed_cost
+        for trade, reverse in changes:
+            quantity, avg_cost = HoldingDeltaConverter.apply_trade(
+                quantity=quantity,
+                avg_cost=avg_cost,
+                trade_type=trade["trade_type"],
+                trade_quantity=trade["quantity"],
+                price=trade["price"],
+                reverse=reverse,
+            )
+        return quantity, avg_cost
+
+    @staticmethod
+    def apply_trade(
+        quantity: Decimal,
+        avg_cost: Optional[Decimal],
+        trade_type: str,
+        trade_quantity: Decimal,
+        price: Decimal,
+        reverse: bool = False,
+    ) -> Tuple[Decimal, Decimal]:
+        """
+        计算一笔交易后的持仓数量和平均成本
+
+        Args:
+            quantity: 当前持仓数量
+            avg_cost: 当前平均成本（无持仓且成本未知时为None；已清仓时为清仓前的平均成本）
+            trade_type: 交易类型（buy/sell）
+            trade_quantity: 交易数量
+            price: 交易价格
+            reverse: 是否撤销该交易
+
+        Returns:
+            (新的持仓数量, 新的平均成本)
+        """
+        known_cost = avg_cost
+        avg_cost = avg_cost if avg_cost is not None else Decimal("0")
+
+        if trade_type == "buy" and not reverse:
+            # 买入：增加数量，按加权平均更新成本
+            new_quantity = quantity + trade_quantity
+            if new_quantity <= 0:
+                return new_quantity, avg_cost
+            return new_quantity, (quantity * avg_cost + trade_quantity * price) / new_quantity
+
+        if trade_type == "buy":
+            # 撤销买入：扣回数量和该笔成本
+            new_quantity = quantity - trade_quantity
+            remaining_cost = quantity * avg_cost - trade_quantity * price
+            if new_quantity <= 0 or remaining_cost <= 0:
+                return new_quantity, avg_cost
+            return new_quantity, remaining_cost / new_quantity
+
+        if not reverse:
+            # 卖出：减少数量，平均成本不变
+            return quantity - trade_quantity, avg_cost
+
+        # 撤销卖出：加回数量，恢复原平均成本（已清仓时为清仓前的成本）；成本未知时以卖出价作为成本
+        if quantity > 0 or known_cost is not None:
+            return quantity + trade_quantity, avg_cost
+        return quantity + trade_quantity, price
+
+    @staticmethod
+    def reverses_sell(changes: List[Tuple[dict, bool]]) -> bool:
+        """交易变更中是否包含撤销卖出（已清仓时需要恢复清仓前的成本）"""
+        return any(trade["trade_type"] == "sell" and reverse for trade, reverse in changes)
+
+    @staticmethod
+    def normalize_trade(trade) -> dict:
+        """
+        统一交易数据格式（ORM对象或字典）
+
+        Args:
+            trade: 交易对象或字典
+
+        Returns:
+            交易数据字典
+        """
+        fields = ("user_id", "account_id", "symbol", "stock_name", "trade_type", "quantity", "price")
+        if isinstance(trade, dict):
+            return {field: trade.get(field) for field in fields}
+        return {field: getattr(trade, field) for field in fields}
+
+    @staticmethod
+    def holding_changes(quantity: Decimal, avg_cost: Decimal) -> dict:
+        """
+        构建持仓修改数据（数量归零时软删除）
+
+        Args:
+            quantity: 新的持仓数量
+            avg_cost: 新的平均成本
+
+        Returns:
+            持仓修改数据字典
+        """
+        if quantity <= 0:
+            return {
+                "quantity": Decimal("0"),
+                "available_quantity": Decimal("0"),
+                "is_deleted": True,
+                "deleted_at": datetime.utcnow(),
+            }
+
+        return {"quantity": quantity, "available_quantity": quantity, "avg_cost": avg_cost}
+
+    @staticmethod
+    def new_holding(trade: dict, quantity: Decimal, avg_cost: Decimal) -> dict:
+        """
+        构建新建持仓数据
+
+        Args:
+            trade: 交易数据
+            quantity: 持仓数量
+            avg_cost: 平均成本
+
+        Returns:
+            持仓数据字典
+        """
+        return {
+            "user_id": trade["user_id"],
+            "account_id": trade["account_id"],
+            "symbol": trade["symbol"],
+            "stock_name": trade["stock_name"],
+            "quantity": quantity,
+            "available_quantity": quantity,
+            "avg_cost": avg_cost,
+        }
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.holding_repo import HoldingRepository
 from app.repositories.account_repo import AccountRepository
 from app.exceptions import ResourceNotFound, PermissionDenied
+from app.utils.tushare_client import tushare_client
 
 
 class HoldingQueryService:
@@ -53,10 +54,13 @@ class HoldingQueryService:
             # 2. 查询用户所有账户的持仓列表
             holdings = await self.holding_repo.query_by_user(db, user_id)
 
-        # 3. 调用 Converter 转换数据和计算统计
-        items, summary = HoldingQueryConverter.convert(holdings)
+        # 3. 一次批量获取所有持仓股票的最新行情
+        quotes = await tushare_client.get_realtime_quotes([h.symbol for h in holdings])
 
-        # 4. 调用 Builder 构建响应
+        # 4. 调用 Converter 转换数据和计算统计
+        items, summary = HoldingQueryConverter.convert(holdings, quotes)
+
+        # 5. 调用 Builder 构建响应
         return HoldingQueryBuilder.build_response(items, summary)
 
 
@@ -68,12 +72,13 @@ class HoldingQueryConverter:
     """
 
     @staticmethod
-    def convert(holdings: list) -> tuple[list, dict]:
+    def convert(holdings: list, quotes: Optional[dict] = None) -> tuple[list, dict]:
         """
         将持仓列表转换为业务数据并计算汇总统计
 
         Args:
             holdings: 持仓对象列表
+            quotes: 最新行情 {symbol: quote}（可选，缺失时使用持仓中保存的价格）
 
         Returns:
             (持仓数据列表, 汇总统计)
@@ -85,7 +90,7 @@ class HoldingQueryConverter:
 
         for holding in holdings:
             # 计算单个持仓数据
-            item = HoldingQueryConverter._convert_single(holding)
+            item = HoldingQueryConverter._convert_single(holding, (quotes or {}).get(holding.symbol))
             items.append(item)
 
             # 累计汇总数据
@@ -105,12 +110,13 @@ class HoldingQueryConverter:
         return items, summary
 
     @staticmethod
-    def _convert_single(holding) -> dict:
+    def _convert_single(holding, quote: Optional[dict] = None) -> dict:
         """
         转换单个持仓对象
 
         Args:
             holding: 持仓对象
+            quote: 该股票的最新行情（可选）
 
         Returns:
             持仓数据字典
@@ -119,6 +125,10 @@ class HoldingQueryConverter:
         avg_cost = float(holding.average_cost) if holding.average_cost else 0.0
         current_price = float(holding.current_price) if holding.current_price else 0.0
 
+        # 有真实行情时使用最新价估值（Mock数据不参与估值）
+        if quote and quote.get("data_source") != "mock" and quote.get("current_price"):
+            current_price = float(quote["current_price"])
+
         # 计算成本
         cost_basis = quantity * avg_cost
 
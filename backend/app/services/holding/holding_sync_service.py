@@ -3,12 +3,13 @@ Holding Sync Service
 
 持仓同步业务服务 - Service + Converter + Builder
 
-根据交易记录同步更新持仓数据
+根据账户全部交易记录重建持仓数据（显式重建；日常交易增删改由 HoldingDeltaService 增量维护）
 """
 
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.holding_repo import HoldingRepository
+from app.services.holding.holding_delta_service import HoldingDeltaConverter
 from app.repositories.trade_repo import TradeRepository
 from app.repositories.account_repo import AccountRepository
 from app.exceptions import ResourceNotFound, PermissionDenied
@@ -52,22 +53,20 @@ class HoldingSyncService:
         if account.user_id != user_id:
             raise PermissionDenied(f"无权访问账户ID {account_id}")
 
-        # 2. 查询该账户的所有交易
-        trades, _ = await self.trade_repo.query_by_account(
-            db=db, account_id=account_id, page=1, page_size=10000  # 获取所有交易
-        )
+        # 2. 按成交时间正序流式读取全部交易，逐笔调用 Converter 累计持仓
+        holdings_state = {}
+        async for trade in self.trade_repo.stream_by_account(db, account_id):
+            HoldingSyncConverter.accumulate(holdings_state, user_id, account_id, trade)
 
-        # 3. 调用 Converter 计算持仓
-        holdings_data = HoldingSyncConverter.calculate_holdings(user_id=user_id, account_id=account_id, trades=trades)
+        # 3. 调用 Converter 生成持仓数据
+        holdings_data = HoldingSyncConverter.build_holdings_data(holdings_state)
 
-        # 4. 更新数据库中的持仓
-        updated_count = 0
-        for symbol, holding_data in holdings_data.items():
-            await self.holding_repo.upsert(db, holding_data)
-            updated_count += 1
+        # 4. 单事务批量写入持仓，并软删除已清仓的持仓
+        holdings = list(holdings_data.values())
+        closed_count = await self.holding_repo.sync_account_holdings(db, account_id, holdings)
 
         # 5. 调用 Builder 构建响应
-        return HoldingSyncBuilder.build_response(updated_count, len(holdings_data))
+        return HoldingSyncBuilder.build_response(len(holdings), closed_count)
 
 
 class HoldingSyncConverter:
@@ -78,105 +77,54 @@ class HoldingSyncConverter:
     """
 
     @staticmethod
-    def calculate_holdings(user_id: int, account_id: int, trades: list) -> dict:
+    def accumulate(holdings_state: dict, user_id: int, account_id: int, trade) -> None:
         """
-        根据交易列表计算持仓
+        累计一笔交易到持仓状态（交易须按成交时间正序传入）
 
         Args:
+            holdings_state: 持仓状态 {symbol: state}
             user_id: 用户ID
             account_id: 账户ID
-            trades: 交易列表
-
-        Returns:
-            持仓数据字典 {symbol: holding_data}
-        """
-        # 按股票代码分组计算持仓
-        holdings = {}
-
-        for trade in trades:
-            symbol = trade.symbol
-
-            # 初始化持仓
-            if symbol not in holdings:
-                holdings[symbol] = {
-                    "user_id": user_id,
-                    "account_id": account_id,
-                    "symbol": symbol,
-                    "stock_name": trade.stock_name,
-                    "quantity": Decimal("0"),
-                    "average_cost": Decimal("0"),
-                    "total_cost": Decimal("0"),
-                }
-
-            holding = holdings[symbol]
-
-            # 根据交易类型更新持仓
-            if trade.trade_type == "buy":
-                # 买入：增加数量，更新平均成本
-                HoldingSyncConverter._process_buy(holding, trade)
-            elif trade.trade_type == "sell":
-                # 卖出：减少数量
-                HoldingSyncConverter._process_sell(holding, trade)
-
-        # 过滤掉数量为0的持仓
-        holdings = {symbol: data for symbol, data in holdings.items() if data["quantity"] > 0}
-
-        return holdings
-
-    @staticmethod
-    def _process_buy(holding: dict, trade) -> None:
-        """
-        处理买入交易
-
-        Args:
-            holding: 持仓数据
             trade: 交易对象
         """
-        old_quantity = holding["quantity"]
-        old_total_cost = holding["total_cost"]
-
-        # 买入数量和成本
-        buy_quantity = trade.quantity
-        buy_cost = trade.price * buy_quantity
-
-        # 新的总数量和总成本
-        new_quantity = old_quantity + buy_quantity
-        new_total_cost = old_total_cost + buy_cost
-
-        # 新的平均成本
-        new_average_cost = new_total_cost / new_quantity if new_quantity > 0 else Decimal("0")
+        state = holdings_state.setdefault(
+            trade.symbol,
+            {
+                "user_id": user_id,
+                "account_id": account_id,
+                "symbol": trade.symbol,
+                "stock_name": trade.stock_name,
+                "quantity": Decimal("0"),
+                "avg_cost": None,
+            },
+        )
 
-        # 更新持仓
-        holding["quantity"] = new_quantity
-        holding["total_cost"] = new_total_cost
-        holding["average_cost"] = new_average_cost
-        holding["stock_name"] = trade.stock_name  # 更新股票名称
+        # 买入：增加数量，更新平均成本；卖出：减少数量，平均成本不变
+        state["quantity"], state["avg_cost"] = HoldingDeltaConverter.apply_trade(
+            quantity=state["quantity"],
+            avg_cost=state["avg_cost"],
+            trade_type=trade.trade_type,
+            trade_quantity=trade.quantity,
+            price=trade.price,
+        )
+        state["stock_name"] = trade.stock_name  # 更新股票名称
 
     @staticmethod
-    def _process_sell(holding: dict, trade) -> None:
+    def build_holdings_data(holdings_state: dict) -> dict:
         """
-        处理卖出交易
+        过滤掉数量为0的持仓，并映射为持仓表字段
 
         Args:
-            holding: 持仓数据
-            trade: 交易对象
-        """
-        old_quantity = holding["quantity"]
-        avg_cost = holding["average_cost"]
-
-        # 卖出数量
-        sell_quantity = trade.quantity
-
-        # 新的数量
-        new_quantity = old_quantity - sell_quantity
+            holdings_state: 持仓状态 {symbol: state}
 
-        # 新的总成本（按比例减少）
-        new_total_cost = avg_cost * new_quantity if new_quantity > 0 else Decimal("0")
-
-        # 更新持仓
-        holding["quantity"] = new_quantity
-        holding["total_cost"] = new_total_cost
-        # 平均成本保持不变
+        Returns:
+            持仓数据字典 {symbol: holding_data}
+        """
+        return {
+            symbol: {**state, "available_quantity": state["quantity"]}
+            for symbol, state in holdings_state.items()
+            if state["quantity"] > 0
+        }
 
 
 class HoldingSyncBuilder:
@@ -187,20 +135,21 @@ class HoldingSyncBuilder:
     """
 
     @staticmethod
-    def build_response(updated_count: int, total_holdings: int) -> dict:
+    def build_response(total_holdings: int, closed_count: int = 0) -> dict:
         """
         构建持仓同步响应
 
         Args:
-            updated_count: 更新的持仓数量
-            total_holdings: 总持仓数量
+            total_holdings: 同步后的持仓数量（写入的持仓记录数）
+            closed_count: 已清仓（软删除）的持仓数量
 
         Returns:
-            同步结果字典
+            同步结果字典（updated_count 为写入与软删除的持仓记录总数）
         """
         return {
             "success": True,
-            "updated_count": updated_count,
+            "updated_count": total_holdings + closed_count,
             "total_holdings": total_holdings,
-            "message": f"成功同步 {updated_count} 个持仓",
+            "closed_count": closed_count,
+            "message": f"成功同步 {total_holdings} 个持仓",
         }
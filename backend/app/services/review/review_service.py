@@ -66,8 +66,6 @@ class ReviewService:
             create_data = ReviewBuilder.build_create_data(user_id, symbol, review_data)
             review = await self.review_repo.create(db, create_data)
 
-        await db.commit()
-
         # 3. 使用Converter转换响应
         return ReviewConverter.convert(review)
 
@@ -0,0 +1,5 @@
+"""System Services Module"""
+
+from app.services.system.system_diagnostics_service import SystemDiagnosticsService
+
+__all__ = ["SystemDiagnosticsService"]
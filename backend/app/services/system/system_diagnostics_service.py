@@ -0,0 +1,76 @@
+"""
+System Diagnostics Service
+
+系统诊断业务服务 - Service + Builder
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import engine
+
+
+class SystemDiagnosticsService:
+    """
+    系统诊断业务类
+
+    职责：汇总数据库连接池状态，供运维按 Postgres max_connections 规划进程数
+    """
+
+    async def get_database_status(self, db: AsyncSession) -> dict:
+        """
+        查询数据库连接池状态
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            连接池配置、当前状态、累计指标与服务端连接数
+        """
+        # 1. 读取本进程连接池快照
+        pool = engine.sync_engine.pool
+        pool_status = pool.status_snapshot() if hasattr(pool, "status_snapshot") else {"status": pool.status()}
+
+        # 2. 查询服务端连接上限与当前连接数（非 Postgres 时为空）
+        server = await self._get_server_connections(db)
+
+        # 3. 构建响应
+        return SystemDiagnosticsBuilder.build_database_response(pool_status, server)
+
+    async def _get_server_connections(self, db: AsyncSession) -> Optional[dict]:
+        """查询 Postgres max_connections 与当前连接数"""
+        if engine.dialect.name != "postgresql":
+            return None
+
+        max_connections = (await db.execute(text("SHOW max_connections"))).scalar()
+        current = (await db.execute(text("SELECT count(*) FROM pg_stat_activity"))).scalar()
+        return {"max_connections": int(max_connections), "connections": current}
+
+
+class SystemDiagnosticsBuilder:
+    """
+    系统诊断构建器（静态类）
+
+    职责：构建响应数据结构
+    """
+
+    @staticmethod
+    def build_database_response(pool_status: dict, server: Optional[dict]) -> dict:
+        """构建连接池状态响应"""
+        return {
+            "pool": pool_status,
+            "config": {
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "max_connections_per_process": settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT,
+                "pool_recycle": settings.DB_POOL_RECYCLE,
+                "pool_pre_ping": settings.DB_POOL_PRE_PING,
+                "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            },
+            "server": server,
+            "checked_at": datetime.now().isoformat(),
+        }
@@ -10,6 +10,7 @@ from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.trade_repo import TradeRepository
 from app.repositories.account_repo import AccountRepository
+from app.services.holding.holding_delta_service import HoldingDeltaService
 from app.exceptions import ValidationError, PermissionDenied, ResourceNotFound
 
 
@@ -23,6 +24,7 @@ class TradeCreateService:
     def __init__(self):
         self.trade_repo = TradeRepository()
         self.account_repo = AccountRepository()
+        self.holding_delta = HoldingDeltaService()
 
     async def execute(
         self,
@@ -65,6 +67,7 @@ class TradeCreateService:
             ValidationError: 数据验证失败
             PermissionDenied: 无权访问账户
             ResourceNotFound: 账户不存在
+            InsufficientHolding: 卖出超过持仓
         """
         # 1. 权限校验 - 检查账户归属
         account = await self.account_repo.get_by_id(db, account_id)
@@ -101,10 +104,13 @@ class TradeCreateService:
             notes=notes,
         )
 
-        # 4. 创建交易
+        # 4. 增量更新持仓（与交易记录在同一事务中提交）
+        await self.holding_delta.apply(db, data)
+
+        # 5. 创建交易
         trade = await self.trade_repo.create(db, data)
 
-        # 5. 调用 Builder 构建响应
+        # 6. 调用 Builder 构建响应
         return TradeCreateBuilder.build_response(trade)
 
 
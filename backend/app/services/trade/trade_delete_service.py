@@ -6,6 +6,7 @@ Trade Delete Service
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.trade_repo import TradeRepository
+from app.services.holding.holding_delta_service import HoldingDeltaService
 from app.exceptions import ResourceNotFound, PermissionDenied
 
 
@@ -18,6 +19,7 @@ class TradeDeleteService:
 
     def __init__(self):
         self.trade_repo = TradeRepository()
+        self.holding_delta = HoldingDeltaService()
 
     async def execute(self, db: AsyncSession, trade_id: int, user_id: int) -> dict:
         """
@@ -34,6 +36,7 @@ class TradeDeleteService:
         Raises:
             ResourceNotFound: 交易不存在
             PermissionDenied: 无权访问
+            InsufficientHolding: 撤销买入后持仓为负（该买入已被卖出）
         """
         # 1. 权限校验 - 查询交易
         trade = await self.trade_repo.get_by_id(db, trade_id)
@@ -43,10 +46,13 @@ class TradeDeleteService:
         if trade.user_id != user_id:
             raise PermissionDenied(f"无权访问交易ID {trade_id}")
 
-        # 2. 软删除交易
+        # 2. 撤销该交易对持仓的影响（与交易删除在同一事务中提交）
+        await self.holding_delta.apply(db, trade, reverse=True)
+
+        # 3. 软删除交易
         success = await self.trade_repo.soft_delete(db, trade_id)
 
-        # 3. 调用 Builder 构建响应
+        # 4. 调用 Builder 构建响应
         return TradeDeleteBuilder.build_response(success, trade_id)
 
 
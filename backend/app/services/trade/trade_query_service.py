@@ -7,8 +7,10 @@ Trade Query Service
 from typing import Optional
 from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.repositories.pagination import keyset_values
 from app.repositories.trade_repo import TradeRepository
 from app.schemas.common import PaginationResponse
+from app.utils.cursor import decode_cursor, encode_cursor
 
 
 class TradeQueryService:
@@ -32,6 +34,7 @@ class TradeQueryService:
         end_date: Optional[date] = None,
         page: int = 1,
         page_size: int = 20,
+        cursor: Optional[str] = None,
     ) -> dict:
         """
         执行交易查询业务逻辑
@@ -46,11 +49,30 @@ class TradeQueryService:
             end_date: 结束日期（可选）
             page: 页码
             page_size: 每页数量
+            cursor: 分页游标（可选，传入时按游标分页并忽略page）
 
         Returns:
             分页的交易列表数据
+
+        Raises:
+            ValidationError: 游标不合法
         """
-        # 1. 查询交易列表（Repository已包含user_id权限控制）
+        # 1. 游标模式：按上一页末尾的排序键定位，不统计总数
+        if cursor:
+            trades, next_key = await self.trade_repo.query_by_user_after(
+                db=db,
+                user_id=user_id,
+                after=decode_cursor(cursor, len(TradeRepository.SORT_KEYS)),
+                account_id=account_id,
+                symbol=symbol,
+                trade_type=trade_type,
+                start_date=start_date,
+                end_date=end_date,
+                page_size=page_size,
+            )
+            return TradeQueryBuilder.build_cursor_response(TradeQueryConverter.convert(trades), page_size, next_key)
+
+        # 2. 页码模式：查询交易列表（Repository已包含user_id权限控制）
         trades, total = await self.trade_repo.query_by_user(
             db=db,
             user_id=user_id,
@@ -63,11 +85,12 @@ class TradeQueryService:
             page_size=page_size,
         )
 
-        # 2. 调用 Converter 转换数据
+        # 3. 调用 Converter 转换数据
         items = TradeQueryConverter.convert(trades)
 
-        # 3. 调用 Builder 构建响应
-        return TradeQueryBuilder.build_response(items, total, page, page_size)
+        # 4. 调用 Builder 构建响应（附带下一页游标，可切换为游标模式）
+        next_key = keyset_values(trades[-1], TradeRepository.SORT_KEYS) if trades and page * page_size < total else None
+        return TradeQueryBuilder.build_response(items, total, page, page_size, next_key)
 
 
 class TradeQueryConverter:
@@ -158,18 +181,39 @@ class TradeQueryBuilder:
     """
 
     @staticmethod
-    def build_response(items: list, total: int, page: int, page_size: int) -> dict:
+    def build_response(items: list, total: int, page: int, page_size: int, next_key: Optional[list] = None) -> dict:
         """
-        构建分页响应
+        构建分页响应（页码模式）
 
         Args:
             items: 交易数据列表
             total: 总记录数
             page: 当前页码
             page_size: 每页数量
+            next_key: 下一页排序键值（可选）
 
         Returns:
             分页响应字典
         """
-        pagination = PaginationResponse.create(items=items, total=total, page=page, page_size=page_size)
+        pagination = PaginationResponse.create(
+            items=items, total=total, page=page, page_size=page_size, next_cursor=encode_cursor(next_key)
+        )
+        return pagination.dict()
+
+    @staticmethod
+    def build_cursor_response(items: list, page_size: int, next_key: Optional[list]) -> dict:
+        """
+        构建分页响应（游标模式）
+
+        Args:
+            items: 交易数据列表
+            page_size: 每页数量
+            next_key: 下一页排序键值（没有下一页时为None）
+
+        Returns:
+            分页响应字典
+        """
+        pagination = PaginationResponse.create_cursor(
+            items=items, page_size=page_size, next_cursor=encode_cursor(next_key)
+        )
         return pagination.dict()
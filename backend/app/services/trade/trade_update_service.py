@@ -9,6 +9,7 @@ from decimal import Decimal
 from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.trade_repo import TradeRepository
+from app.services.holding.holding_delta_service import HoldingDeltaConverter, HoldingDeltaService
 from app.exceptions import ResourceNotFound, PermissionDenied, ValidationError
 
 
@@ -21,6 +22,7 @@ class TradeUpdateService:
 
     def __init__(self):
         self.trade_repo = TradeRepository()
+        self.holding_delta = HoldingDeltaService()
 
     async def execute(
         self,
@@ -63,6 +65,7 @@ class TradeUpdateService:
             ResourceNotFound: 交易不存在
             PermissionDenied: 无权访问
             ValidationError: 数据验证失败
+            InsufficientHolding: 卖出超过持仓
         """
         # 1. 权限校验 - 查询交易
         trade = await self.trade_repo.get_by_id(db, trade_id)
@@ -86,10 +89,16 @@ class TradeUpdateService:
             notes=notes,
         )
 
-        # 3. 更新交易
+        # 3. 影响持仓时：撤销旧交易、应用新交易（与交易更新在同一事务中提交）
+        old_trade = HoldingDeltaConverter.normalize_trade(trade)
+        new_trade = {**old_trade, **update_data}
+        if TradeUpdateConverter.affects_holding(old_trade, new_trade):
+            await self.holding_delta.replace(db, old_trade, new_trade)
+
+        # 4. 更新交易
         updated_trade = await self.trade_repo.update(db, trade_id, update_data)
 
-        # 4. 调用 Builder 构建响应
+        # 5. 调用 Builder 构建响应
         return TradeUpdateBuilder.build_response(updated_trade)
 
 
@@ -193,6 +202,20 @@ class TradeUpdateConverter:
 
         return update_data
 
+    @staticmethod
+    def affects_holding(old_trade: dict, new_trade: dict) -> bool:
+        """
+        判断交易修改是否影响持仓（股票代码、交易类型、数量、价格有变化）
+
+        Args:
+            old_trade: 修改前的交易数据
+            new_trade: 修改后的交易数据
+
+        Returns:
+            是否需要调整持仓
+        """
+        return any(old_trade[field] != new_trade[field] for field in ("symbol", "trade_type", "quantity", "price"))
+
 
 class TradeUpdateBuilder:
     """
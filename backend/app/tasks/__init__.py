@@ -0,0 +1,12 @@
+"""
+Background Tasks Package
+
+后台任务 - 按 TASK_QUEUE_BACKEND 分发到 Celery worker 或当前进程的事件循环
+"""
+
+from app.tasks.task_queue import enqueue_daily_analysis, shutdown_local_tasks
+
+__all__ = [
+    "enqueue_daily_analysis",
+    "shutdown_local_tasks",
+]
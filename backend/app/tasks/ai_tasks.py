@@ -0,0 +1,27 @@
+"""
+AI 后台任务（Celery）
+"""
+
+import asyncio
+
+from app.core.database import engine
+from app.services.ai.daily_analysis_service import DailyAnalysisService
+from app.tasks.celery_app import celery_app
+from app.utils.ai_client import ai_client
+from app.utils.ai_response_cache import ai_response_cache
+
+
+@celery_app.task(name="ai.run_daily_analysis")
+def run_daily_analysis(task_id: str) -> None:
+    """执行批量分析任务（每个 Celery 任务运行在新的事件循环中）"""
+    asyncio.run(_run_daily_analysis(task_id))
+
+
+async def _run_daily_analysis(task_id: str) -> None:
+    try:
+        await DailyAnalysisService().run_task(task_id)
+    finally:
+        # 数据库连接、AI连接池和AI响应缓存的Redis连接绑定在当前事件循环上，任务结束时释放
+        await ai_client.shutdown()
+        await ai_response_cache.aclose()
+        await engine.dispose()
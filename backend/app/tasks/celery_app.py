@@ -0,0 +1,29 @@
+"""
+Celery 应用
+
+启动 worker:
+    celery -A app.tasks.celery_app worker --loglevel=info --concurrency=2
+"""
+
+from celery import Celery
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "ai_investment",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.tasks.ai_tasks"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="Asia/Shanghai",
+    # 任务执行完才确认，worker 异常退出时消息会重新投递（任务入口可重入）
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    # 任务状态与结果已持久化在数据库中，不需要 Celery 保存返回值
+    task_ignore_result=True,
+)
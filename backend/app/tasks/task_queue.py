@@ -0,0 +1,61 @@
+"""
+任务分发
+
+- celery: 投递到 Redis broker，由独立的 Celery worker 执行（生产环境）
+- local:  在当前进程的事件循环中后台执行（开发/测试环境，无需 Redis 和 worker）
+
+两种模式执行的是同一个任务入口，任务状态与结果都持久化在 ai_analysis_tasks 表中。
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# 本地模式下正在执行的后台任务 {Task: 任务ID}（保持强引用，避免被垃圾回收）
+_local_tasks: Dict[asyncio.Task, str] = {}
+
+
+async def enqueue_daily_analysis(task_id: str) -> Optional[asyncio.Task]:
+    """
+    投递批量分析任务
+
+    调用前任务记录必须已提交，worker 才能读取到。
+
+    Args:
+        task_id: 任务ID
+
+    Returns:
+        本地模式返回后台 asyncio.Task，Celery 模式返回None
+    """
+    if settings.TASK_QUEUE_BACKEND == "celery":
+        from app.tasks.ai_tasks import run_daily_analysis
+
+        # 投递消息是同步网络调用，放到线程中执行，不阻塞事件循环
+        await asyncio.to_thread(run_daily_analysis.delay, task_id)
+        return None
+
+    from app.services.ai.daily_analysis_service import DailyAnalysisService
+
+    task = asyncio.get_running_loop().create_task(DailyAnalysisService().run_task(task_id))
+    _local_tasks[task] = task_id
+    task.add_done_callback(lambda done: _local_tasks.pop(done, None))
+    return task
+
+
+async def shutdown_local_tasks() -> None:
+    """
+    取消本地模式下尚未完成的后台任务（应用关闭时调用）
+
+    本地模式没有消息重投，被取消的任务重启后不会继续执行，标记为失败，避免一直显示为执行中
+    """
+    tasks = dict(_local_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    interrupted = [task_id for task, task_id in tasks.items() if task.cancelled()]
+    if interrupted:
+        from app.services.ai.daily_analysis_service import DailyAnalysisService
+
+        await DailyAnalysisService().interrupt_tasks(interrupted)
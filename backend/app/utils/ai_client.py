@@ -7,9 +7,177 @@ AI Client - 统一AI调用接口
 """
 
 import json
+import time
 import httpx
-from typing import List, Dict, Optional
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, List, Dict, Optional, Tuple
 from app.core.config import settings
+from app.utils.ai_response_cache import AIResponseCache, ai_response_cache
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # 未安装 h2 时退回 HTTP/1.1
+    HTTP2_AVAILABLE = False
+
+
+class CircuitBreaker:
+    """
+    AI后端熔断器（进程内缓存的健康状态，替代每次请求前的健康探测）
+
+    状态:
+    - closed: 正常调用，统计滑动窗口内的错误率和EWMA延迟
+    - open: 熔断，冷却期内直接跳过该后端（连续熔断时冷却时间翻倍，有上限）
+    - half_open: 冷却结束后只放行一个探测请求，成功则恢复closed，失败则重新open
+
+    触发熔断:
+    - 连接失败（后端不可达）立即熔断
+    - 窗口内请求数达到 AI_BREAKER_MIN_REQUESTS 且错误率 ≥ AI_BREAKER_ERROR_RATE
+    """
+
+    LATENCY_ALPHA = 0.2  # EWMA平滑系数
+
+    def __init__(
+        self,
+        name: str,
+        cooldown: float,
+        max_cooldown: Optional[float] = None,
+        window: float = 60.0,
+        min_requests: int = 5,
+        error_rate_threshold: float = 0.5,
+    ):
+        self.name = name
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown if max_cooldown is not None else cooldown
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate_threshold = error_rate_threshold
+
+        self.state = "closed"
+        self.cooldown = cooldown
+        self.opened_at: Optional[float] = None
+        self.latency_ewma: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.total_requests = 0
+        self.total_failures = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()  # (时间, 是否成功)
+        self._probe_in_flight = False
+
+    def is_available(self) -> bool:
+        """当前是否可以调用该后端（只读，不占用探测名额）"""
+        if self.state == "closed":
+            return True
+        return not self._probe_in_flight and self._cooldown_elapsed()
+
+    def needs_probe(self) -> bool:
+        """是否处于等待探测的状态（open且冷却结束）"""
+        return self.state != "closed" and self.is_available()
+
+    def try_acquire(self) -> bool:
+        """
+        申请调用该后端
+
+        open状态冷却结束时转为half_open并占用唯一的探测名额
+        """
+        if self.state == "closed":
+            return True
+        if not self.is_available():
+            return False
+
+        self.state = "half_open"
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self, latency: float) -> None:
+        """记录成功调用及延迟（秒）"""
+        self._record(True)
+        self.latency_ewma = (
+            latency
+            if self.latency_ewma is None
+            else self.LATENCY_ALPHA * latency + (1 - self.LATENCY_ALPHA) * self.latency_ewma
+        )
+
+        if self.state != "closed":
+            # 探测成功，恢复正常并重置统计窗口
+            self.state = "closed"
+            self.cooldown = self.base_cooldown
+            self.opened_at = None
+            self._outcomes.clear()
+        self._probe_in_flight = False
+
+    def record_failure(self, error: str, unreachable: bool = False) -> None:
+        """
+        记录失败调用
+
+        Args:
+            error: 错误信息
+            unreachable: 是否为连接失败（后端不可达时立即熔断）
+        """
+        self._record(False)
+        self.total_failures += 1
+        self.last_error = error
+
+        if self.state == "half_open":
+            # 探测失败，冷却时间翻倍
+            self._open(min(self.cooldown * 2, self.max_cooldown))
+        elif unreachable or self._error_rate_exceeded():
+            self._open(self.base_cooldown)
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """释放探测名额（探测请求被取消、未记录结果时回到open，下一个请求重新探测）"""
+        if self.state == "half_open":
+            self.state = "open"
+        self._probe_in_flight = False
+
+    def error_rate(self) -> float:
+        """滑动窗口内的错误率"""
+        self._evict()
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """熔断器状态快照（用于诊断）"""
+        remaining = None
+        if self.state == "open":
+            remaining = round(max(0.0, self.cooldown - (time.monotonic() - self.opened_at)), 1)
+
+        return {
+            "name": self.name,
+            "state": self.state,
+            "available": self.is_available(),
+            "error_rate": round(self.error_rate(), 3),
+            "window_requests": len(self._outcomes),
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 1) if self.latency_ewma is not None else None,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "cooldown_seconds": self.cooldown,
+            "cooldown_remaining_seconds": remaining,
+            "last_error": self.last_error,
+        }
+
+    def _open(self, cooldown: float) -> None:
+        self.state = "open"
+        self.cooldown = cooldown
+        self.opened_at = time.monotonic()
+
+    def _cooldown_elapsed(self) -> bool:
+        return self.opened_at is None or time.monotonic() - self.opened_at >= self.cooldown
+
+    def _record(self, success: bool) -> None:
+        self.total_requests += 1
+        self._outcomes.append((time.monotonic(), success))
+        self._evict()
+
+    def _evict(self) -> None:
+        cutoff = time.monotonic() - self.window
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _error_rate_exceeded(self) -> bool:
+        return len(self._outcomes) >= self.min_requests and self.error_rate() >= self.error_rate_threshold
 
 
 class AIClient:
@@ -17,15 +185,116 @@ class AIClient:
     AI客户端统一接口
 
     自动选择可用的AI后端：
-    1. 优先本地Ollama（如果运行中）
-    2. 备选DeepSeek API（如果配置了API Key）
+    - 本地Ollama、DeepSeek API（配置了API Key时）各有一个熔断器
+    - 选择顺序：等待探测的后端 → 健康后端按EWMA延迟从快到慢 → Mock
+    - 延迟相同（尚无统计）时Ollama优先
+
+    连接管理：
+    - 每个后端持有一个长连接池（keep-alive，DeepSeek在安装h2时启用HTTP/2）
+    - 连接池在应用启动时创建（startup），关闭时释放（shutdown）
+    - 后端可用性由熔断状态判断，不再逐次探测
     """
 
     def __init__(self):
         self.local_url = "http://localhost:11434"  # Ollama默认端口
         self.deepseek_url = settings.DEEPSEEK_API_URL
         self.deepseek_key = settings.DEEPSEEK_API_KEY
-        self.timeout = 120.0  # AI调用超时时间
+        self.timeout = settings.AI_HTTP_TIMEOUT  # AI调用超时时间
+
+        self._local_client: Optional[httpx.AsyncClient] = None
+        self._deepseek_client: Optional[httpx.AsyncClient] = None
+
+        self.breakers = {name: self._build_breaker(name) for name in ("ollama", "deepseek")}
+        self.last_backend: Optional[str] = None  # 最近一次成功响应的后端
+
+    async def startup(self) -> None:
+        """创建后端连接池（应用启动时调用）"""
+        self._get_local_client()
+        if self.deepseek_key:
+            self._get_deepseek_client()
+
+    async def shutdown(self) -> None:
+        """关闭后端连接池（应用关闭时调用）"""
+        for client in (self._local_client, self._deepseek_client):
+            if client is not None:
+                await client.aclose()
+        self._local_client = None
+        self._deepseek_client = None
+
+    @staticmethod
+    def _build_breaker(name: str) -> CircuitBreaker:
+        return CircuitBreaker(
+            name,
+            cooldown=settings.AI_BACKEND_COOLDOWN,
+            max_cooldown=settings.AI_BREAKER_MAX_COOLDOWN,
+            window=settings.AI_BREAKER_WINDOW,
+            min_requests=settings.AI_BREAKER_MIN_REQUESTS,
+            error_rate_threshold=settings.AI_BREAKER_ERROR_RATE,
+        )
+
+    def select_backends(self) -> List[str]:
+        """
+        按选择策略排序当前可调用的后端
+
+        Returns:
+            后端名称列表（不含Mock）
+        """
+        candidates = ["ollama"] + (["deepseek"] if self.deepseek_key else [])
+
+        # 1. 冷却结束等待探测的后端优先（只放行一个请求，用于尽快恢复）
+        probing = [name for name in candidates if self.breakers[name].needs_probe()]
+
+        # 2. 健康后端按EWMA延迟从快到慢（无统计视为0，保持默认优先级）
+        healthy = [name for name in candidates if self.breakers[name].state == "closed"]
+        healthy.sort(key=lambda name: self.breakers[name].latency_ewma or 0.0)
+
+        return probing + healthy
+
+    def get_diagnostics(self) -> Dict[str, Any]:
+        """
+        AI后端诊断信息
+
+        Returns:
+            各后端熔断状态、当前选择顺序、最近服务的后端、响应缓存指标
+        """
+        candidates = ["ollama"] + (["deepseek"] if self.deepseek_key else [])
+        return {
+            "backends": [self.breakers[name].snapshot() for name in candidates],
+            "selection_order": self.select_backends() + ["mock"],
+            "last_backend": self.last_backend,
+            "http2_enabled": HTTP2_AVAILABLE,
+            "response_cache": ai_response_cache.snapshot(),
+        }
+
+    def _get_local_client(self) -> httpx.AsyncClient:
+        """获取Ollama连接池（未启动时按需创建）"""
+        if self._local_client is None or self._local_client.is_closed:
+            self._local_client = self._build_client(self.local_url, http2=False)
+        return self._local_client
+
+    def _get_deepseek_client(self) -> httpx.AsyncClient:
+        """获取DeepSeek连接池（未启动时按需创建）"""
+        if self._deepseek_client is None or self._deepseek_client.is_closed:
+            self._deepseek_client = self._build_client(
+                self.deepseek_url,
+                http2=HTTP2_AVAILABLE,
+                headers={"Authorization": f"Bearer {self.deepseek_key}", "Content-Type": "application/json"},
+            )
+        return self._deepseek_client
+
+    def _build_client(self, base_url: str, http2: bool, headers: Optional[Dict[str, str]] = None) -> httpx.AsyncClient:
+        """创建带连接池配置的 httpx.AsyncClient"""
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            http2=http2,
+            timeout=httpx.Timeout(self.timeout, connect=settings.AI_HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
 
     async def chat_completion(
         self,
@@ -33,6 +302,8 @@ class AIClient:
         temperature: float = 0.7,
         max_tokens: int = 4000,
         model: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        validate: Optional[Callable[[str], Any]] = None,
     ) -> str:
         """
         聊天补全接口
@@ -42,6 +313,8 @@ class AIClient:
             temperature: 温度参数（0-1）
             max_tokens: 最大token数
             model: 指定模型（可选）
+            cache_ttl: 响应缓存TTL（秒，可选，见 ai_response_cache.cache_ttl_for；不传则不缓存）
+            validate: 缓存前校验响应的函数（可选，如调用方的响应解析函数），抛出异常时不缓存
 
         Returns:
             AI回复内容
@@ -49,26 +322,147 @@ class AIClient:
         Raises:
             Exception: AI调用失败
         """
-        # 1. 尝试本地Ollama
-        try:
-            response = await self._call_ollama(messages, temperature, max_tokens, model)
-            if response:
-                return response
-        except Exception as e:
-            print(f"Ollama调用失败: {e}")
+        if cache_ttl is None or not ai_response_cache.enabled:
+            response, _ = await self._complete(messages, temperature, max_tokens, model)
+            return response
 
-        # 2. 尝试DeepSeek API
-        if self.deepseek_key:
+        key = AIResponseCache.make_key(messages, temperature, max_tokens, model)
+        return await ai_response_cache.get_or_compute(
+            key, cache_ttl, lambda: self._complete(messages, temperature, max_tokens, model), validate
+        )
+
+    async def _complete(
+        self, messages: List[Dict[str, str]], temperature: float, max_tokens: int, model: Optional[str]
+    ) -> Tuple[str, str]:
+        """
+        按后端选择策略调用AI（不经过缓存）
+
+        Returns:
+            (AI回复内容, 服务的后端名称)
+        """
+        backend_calls = {"ollama": self._call_ollama, "deepseek": self._call_deepseek}
+        deepseek_error: Optional[Exception] = None
+
+        # 1. 按选择策略依次尝试后端（熔断中的后端被跳过）
+        for name in self.select_backends():
+            breaker = self.breakers[name]
+            if not breaker.try_acquire():
+                continue
+
+            started = time.monotonic()
             try:
-                response = await self._call_deepseek(messages, temperature, max_tokens, model)
-                if response:
-                    return response
+                response = await backend_calls[name](messages, temperature, max_tokens, model)
             except Exception as e:
-                print(f"DeepSeek调用失败: {e}")
-                raise Exception(f"DeepSeek API调用失败: {e}")
+                print(f"{name}调用失败: {e}")
+                breaker.record_failure(str(e), unreachable=isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)))
+                if name == "deepseek":
+                    deepseek_error = e
+                continue
+            except BaseException:
+                # 请求被取消（如客户端断开），释放探测名额
+                breaker.release_probe()
+                raise
+
+            if response:
+                breaker.record_success(time.monotonic() - started)
+                self.last_backend = name
+                return response, name
+            breaker.record_failure("无有效响应")
+
+        # 2. DeepSeek已配置但调用出错时向上抛出
+        if deepseek_error is not None:
+            raise Exception(f"DeepSeek API调用失败: {deepseek_error}")
 
         # 3. 如果都不可用，返回Mock数据（开发阶段）
-        return self._generate_mock_response(messages)
+        self.last_backend = "mock"
+        return self._generate_mock_response(messages), "mock"
+
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 4000,
+        model: Optional[str] = None,
+        cache_ttl: Optional[float] = None,
+        validate: Optional[Callable[[str], Any]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        流式聊天补全接口（逐段返回生成内容）
+
+        后端选择与熔断逻辑同 chat_completion；只有在尚未输出任何内容时才会切换到下一个后端，
+        已输出部分内容后后端出错则直接抛出异常。
+        传入 cache_ttl 时与 chat_completion 共用响应缓存：命中时一次返回完整内容，
+        完整生成后写入缓存（流式调用不合并并发请求）。
+
+        Args:
+            messages: 消息列表
+            temperature: 温度参数（0-1）
+            max_tokens: 最大token数
+            model: 指定模型（可选）
+            cache_ttl: 响应缓存TTL（秒，可选；不传则不缓存）
+            validate: 缓存前校验完整响应的函数（可选），抛出异常时不缓存
+
+        Yields:
+            AI回复的内容片段
+
+        Raises:
+            Exception: AI调用失败
+        """
+        key = None
+        if cache_ttl is not None and ai_response_cache.enabled:
+            key = AIResponseCache.make_key(messages, temperature, max_tokens, model)
+            cached = await ai_response_cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        backend_streams = {"ollama": self._stream_ollama, "deepseek": self._stream_deepseek}
+        deepseek_error: Optional[Exception] = None
+
+        # 1. 按选择策略依次尝试后端（熔断中的后端被跳过）
+        for name in self.select_backends():
+            breaker = self.breakers[name]
+            if not breaker.try_acquire():
+                continue
+
+            started = time.monotonic()
+            chunks: List[str] = []
+            try:
+                async for chunk in backend_streams[name](messages, temperature, max_tokens, model):
+                    if chunk:
+                        chunks.append(chunk)
+                        yield chunk
+            except Exception as e:
+                print(f"{name}流式调用失败: {e}")
+                breaker.record_failure(str(e), unreachable=isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)))
+                if chunks:
+                    raise
+                if name == "deepseek":
+                    deepseek_error = e
+                continue
+            except BaseException:
+                # 请求被取消/客户端断开，释放探测名额
+                breaker.release_probe()
+                raise
+
+            if chunks:
+                breaker.record_success(time.monotonic() - started)
+                self.last_backend = name
+                response = "".join(chunks)
+                if key is not None and AIResponseCache.is_cacheable(response, validate):
+                    ai_response_cache.set(key, response, cache_ttl)
+                return
+            breaker.record_failure("无有效响应")
+
+        # 2. DeepSeek已配置但调用出错时向上抛出
+        if deepseek_error is not None:
+            raise Exception(f"DeepSeek API调用失败: {deepseek_error}")
+
+        # 3. 如果都不可用，分段返回Mock数据（开发阶段）
+        self.last_backend = "mock"
+        mock_response = self._generate_mock_response(messages)
+        for start in range(0, len(mock_response), 20):
+            yield mock_response[start : start + 20]
 
     async def _call_ollama(
         self, messages: List[Dict[str, str]], temperature: float, max_tokens: int, model: Optional[str] = None
@@ -83,33 +477,24 @@ class AIClient:
         if not model:
             model = "qwen2:latest"  # 默认使用Qwen2（系统已安装）
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            # 检查Ollama是否运行
-            try:
-                health_check = await client.get(f"{self.local_url}/api/tags")
-                if health_check.status_code != 200:
-                    return None
-            except Exception:
-                return None
-
-            # 转换消息格式为Ollama格式
-            prompt = self._messages_to_prompt(messages)
+        # 转换消息格式为Ollama格式
+        prompt = self._messages_to_prompt(messages)
 
-            # 调用Ollama API
-            payload = {
-                "model": model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": temperature, "num_predict": max_tokens},
-            }
+        # 调用Ollama API
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"temperature": temperature, "num_predict": max_tokens},
+        }
 
-            response = await client.post(f"{self.local_url}/api/generate", json=payload)
+        response = await self._get_local_client().post("/api/generate", json=payload)
 
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "")
+        if response.status_code == 200:
+            result = response.json()
+            return result.get("response", "")
 
-            return None
+        return None
 
     async def _call_deepseek(
         self, messages: List[Dict[str, str]], temperature: float, max_tokens: int, model: Optional[str] = None
@@ -126,19 +511,74 @@ class AIClient:
         if not model:
             model = settings.DEEPSEEK_MODEL
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            headers = {"Authorization": f"Bearer {self.deepseek_key}", "Content-Type": "application/json"}
+        payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
 
-            payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        response = await self._get_deepseek_client().post("/chat/completions", json=payload)
 
-            response = await client.post(f"{self.deepseek_url}/chat/completions", headers=headers, json=payload)
+        if response.status_code == 200:
+            result = response.json()
+            return result["choices"][0]["message"]["content"]
+        else:
+            error_msg = response.text
+            raise Exception(f"DeepSeek API错误 (状态码: {response.status_code}): {error_msg}")
 
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-            else:
-                error_msg = response.text
-                raise Exception(f"DeepSeek API错误 (状态码: {response.status_code}): {error_msg}")
+    async def _stream_ollama(
+        self, messages: List[Dict[str, str]], temperature: float, max_tokens: int, model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """流式调用本地Ollama（NDJSON，每行一个片段）"""
+        payload = {
+            "model": model or "qwen2:latest",
+            "prompt": self._messages_to_prompt(messages),
+            "stream": True,
+            "options": {"temperature": temperature, "num_predict": max_tokens},
+        }
+
+        async with self._get_local_client().stream("POST", "/api/generate", json=payload) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise Exception(f"Ollama错误 (状态码: {response.status_code}): {response.text}")
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise Exception(f"Ollama错误: {data['error']}")
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    break
+
+    async def _stream_deepseek(
+        self, messages: List[Dict[str, str]], temperature: float, max_tokens: int, model: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """流式调用DeepSeek API（SSE，data: {...} / data: [DONE]）"""
+        if not self.deepseek_key:
+            return
+
+        payload = {
+            "model": model or settings.DEEPSEEK_MODEL,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+        }
+
+        async with self._get_deepseek_client().stream("POST", "/chat/completions", json=payload) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise Exception(f"DeepSeek API错误 (状态码: {response.status_code}): {response.text}")
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or [{}]
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield content
 
     def _messages_to_prompt(self, messages: List[Dict[str, str]]) -> str:
         """
@@ -272,6 +712,8 @@ class AIPromptBuilder:
             # 1. 实时行情数据
             if "quote" in stock_data:
                 quote = stock_data["quote"]
+                amount_val = quote.get("amount")
+                amount_str = f"{amount_val / 100000000:.2f}" if amount_val else "N/A"
                 user_prompt += f"""**实时行情**:
 - 最新价: {quote.get('current_price', 'N/A')} 元
 - 涨跌幅: {quote.get('change_percent', 'N/A')}%
@@ -281,7 +723,7 @@ class AIPromptBuilder:
 - 最低: {quote.get('low_price', 'N/A')} 元
 - 昨收: {quote.get('close_price', 'N/A')} 元
 - 成交量: {quote.get('volume', 'N/A')} 股
-- 成交额: {quote.get('amount', 'N/A') / 100000000:.2f if quote.get('amount') else 'N/A'} 亿元
+- 成交额: {amount_str} 亿元
 - 数据来源: {quote.get('data_source', 'unknown')}
 
 """
@@ -307,12 +749,18 @@ class AIPromptBuilder:
 
             # 3. 技术指标
             if "technicals" in stock_data:
-                technicals = stock_data["technicals"]
+                technicals = {k: ("N/A" if v is None else v) for k, v in stock_data["technicals"].items()}
                 user_prompt += f"""**技术指标**:
 - MA5: {technicals.get('ma5', 'N/A')} 元
 - MA10: {technicals.get('ma10', 'N/A')} 元
 - MA20: {technicals.get('ma20', 'N/A')} 元
 - MA60: {technicals.get('ma60', 'N/A')} 元
+- EMA12 / EMA26: {technicals.get('ema12', 'N/A')} / {technicals.get('ema26', 'N/A')} 元
+- MACD: DIF {technicals.get('macd_dif', 'N/A')}, DEA {technicals.get('macd_dea', 'N/A')}, \
+MACD柱 {technicals.get('macd', 'N/A')}
+- KDJ(9,3,3): K {technicals.get('kdj_k', 'N/A')}, D {technicals.get('kdj_d', 'N/A')}, \
+J {technicals.get('kdj_j', 'N/A')}
+- RSI(14): {technicals.get('rsi', 'N/A')}
 
 """
 
@@ -338,15 +786,19 @@ class AIPromptBuilder:
         history: List[Dict[str, str]] = None,
         context_symbol: Optional[str] = None,
         context_data: Optional[Dict] = None,
+        summary: Optional[str] = None,
     ) -> List[Dict[str, str]]:
         """
         构建对话Prompt
 
+        历史消息按调用方给出的全部放入（由调用方按Token预算裁剪，见 app.utils.chat_context）。
+
         Args:
             user_message: 用户消息
             history: 对话历史
             context_symbol: 上下文股票代码
             context_data: 上下文数据
+            summary: 早期对话摘要（可选）
 
         Returns:
             消息列表
@@ -367,20 +819,61 @@ class AIPromptBuilder:
             system_prompt += f"""
 
 当前讨论股票：{context_data.get('stock_name', '')}（{context_symbol}）
-相关数据：{json.dumps(context_data, ensure_ascii=False, indent=2)}
+相关数据：{json.dumps(context_data, ensure_ascii=False, separators=(',', ':'))}
+"""
+
+        # 添加早期对话摘要
+        if summary:
+            system_prompt += f"""
+
+早期对话摘要：
+{summary}
 """
 
         messages = [{"role": "system", "content": system_prompt}]
 
         # 添加历史对话
         if history:
-            messages.extend(history[-10:])  # 最多保留最近10轮对话
+            messages.extend(history)
 
         # 添加当前用户消息
         messages.append({"role": "user", "content": user_message})
 
         return messages
 
+    @staticmethod
+    def build_chat_summary_prompt(
+        previous_summary: Optional[str], messages: List[Dict[str, str]], max_tokens: int
+    ) -> List[Dict[str, str]]:
+        """
+        构建对话摘要Prompt（把较早的对话折叠进滚动摘要）
+
+        Args:
+            previous_summary: 已有摘要（可选）
+            messages: 需要折叠的消息 [{role, content}]
+            max_tokens: 摘要长度上限（Token）
+
+        Returns:
+            消息列表
+        """
+        system_prompt = f"""你负责压缩投资顾问与用户的对话记录。
+请在已有摘要的基础上合并新的对话内容，输出一份新的摘要：
+1. 保留用户的投资目标、持仓、关注的股票、风险偏好和已经给出的关键结论
+2. 省略寒暄和重复内容
+3. 不超过{max_tokens}个Token，直接输出摘要正文
+"""
+
+        role_names = {"user": "用户", "assistant": "助手", "system": "系统"}
+        dialogue = "\n".join(f"{role_names.get(m['role'], m['role'])}: {m['content']}" for m in messages)
+        user_prompt = f"""已有摘要：
+{previous_summary or "（无）"}
+
+新的对话：
+{dialogue}
+"""
+
+        return [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+
     @staticmethod
     def build_daily_review_prompt(date: str, holdings: List[Dict], events: List[Dict]) -> List[Dict[str, str]]:
         """
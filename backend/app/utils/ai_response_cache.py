@@ -0,0 +1,331 @@
+"""
+AI Response Cache
+
+AI响应缓存：Prompt完全相同的分析请求复用同一次AI调用
+
+- 按 (model, messages, temperature, max_tokens) 的SHA-256哈希缓存（内容寻址），
+  行情数据写在Prompt里，数据变化后自然换成新的缓存键
+- 进程内 LRU + TTL；AI_RESPONSE_CACHE_BACKEND=redis 时以 Redis 作为二级缓存，多个进程共享
+- TTL按分析类型决定（见 cache_ttl_for）：个股分析在交易时段使用短TTL，
+  收盘后缓存到下一交易时段开盘（行情不再变化）
+- 相同请求并发时只调用一次AI（single-flight），其余请求等待同一结果
+- Mock响应、调用失败和未通过调用方校验（如无法解析）的响应不缓存
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.utils.market_calendar import is_trading_hours, seconds_until_next_session
+
+# 分析类型
+STOCK_ANALYSIS = "stock_analysis"
+DAILY_REVIEW = "daily_review"
+
+# 不缓存的后端
+_UNCACHED_BACKENDS = ("mock",)
+
+
+def cache_ttl_for(analysis_type: str, now: Optional[datetime] = None) -> float:
+    """
+    按分析类型计算缓存TTL
+
+    Args:
+        analysis_type: 分析类型（STOCK_ANALYSIS / DAILY_REVIEW）
+        now: 指定时间（可选，默认当前时间）
+
+    Returns:
+        TTL（秒）
+    """
+    if analysis_type == DAILY_REVIEW:
+        return settings.AI_RESPONSE_CACHE_TTL_REVIEW
+
+    # 个股分析：交易时段行情持续变化，收盘后缓存到下一交易时段开盘
+    if is_trading_hours(now):
+        return settings.AI_RESPONSE_CACHE_TTL_TRADING
+    return min(seconds_until_next_session(now), settings.AI_RESPONSE_CACHE_TTL_CLOSED)
+
+
+class AIResponseCache:
+    """
+    AI响应缓存
+    """
+
+    def __init__(self, backend: str, max_size: int, redis_url: str):
+        self.backend = backend
+        self.max_size = max_size
+        self.redis_url = redis_url
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        # 进行中的AI调用 {key: Task}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # 写入 Redis 的后台任务（保持强引用，避免被垃圾回收）
+        self._pending_tasks: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """是否启用缓存"""
+        return self.backend in ("memory", "redis")
+
+    @staticmethod
+    def make_key(
+        messages: List[Dict[str, str]], temperature: float, max_tokens: int, model: Optional[str] = None
+    ) -> str:
+        """
+        计算缓存键
+
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大token数
+            model: 指定模型（可选）
+
+        Returns:
+            SHA-256十六进制摘要
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存的响应（进程内 → Redis）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            命中时返回响应内容，否则返回None
+        """
+        if not self.enabled:
+            return None
+
+        # 1. 进程内缓存
+        response = self._get_local(key)
+        if response is not None:
+            self.hits += 1
+            return response
+
+        # 2. Redis 二级缓存，命中后回填进程内缓存（剩余TTL未知，按Redis剩余有效期回填）
+        if self.backend == "redis":
+            response, ttl = await self._get_redis(key)
+            if response is not None:
+                self.redis_hits += 1
+                self._set_local(key, response, ttl)
+                return response
+        return None
+
+    def set(self, key: str, response: str, ttl: float) -> None:
+        """
+        缓存响应
+
+        Args:
+            key: 缓存键
+            response: 响应内容
+            ttl: 有效期（秒）
+        """
+        if not self.enabled or ttl <= 0:
+            return
+
+        self.stores += 1
+        self._set_local(key, response, ttl)
+        if self.backend == "redis":
+            task = asyncio.get_running_loop().create_task(self._set_redis(key, response, ttl))
+            self._pending_tasks.add(task)
+            task.add_done_callback(self._pending_tasks.discard)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        ttl: float,
+        compute: Callable[[], Awaitable[Tuple[str, str]]],
+        validate: Optional[Callable[[str], Any]] = None,
+    ) -> str:
+        """
+        读取缓存，未命中时调用AI并缓存结果（相同键并发时只调用一次）
+
+        Args:
+            key: 缓存键
+            ttl: 有效期（秒）
+            compute: 调用AI的协程函数，返回 (响应内容, 后端名称)
+            validate: 缓存前校验响应的函数（可选，如响应解析函数），抛出异常时不缓存
+
+        Returns:
+            响应内容
+
+        Raises:
+            Exception: AI调用失败（等待同一调用的请求收到相同异常）
+        """
+        # 1. 读取缓存
+        response = await self.get(key)
+        if response is not None:
+            return response
+
+        # 2. 加入进行中的相同调用
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = loop.create_task(self._compute(key, ttl, compute, validate))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._discard_inflight(key, done))
+
+        # shield: 单个请求被取消不影响其他等待同一调用的请求
+        return await asyncio.shield(task)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """缓存指标快照"""
+        lookups = self.hits + self.redis_hits + self.misses + self.coalesced
+        return {
+            "backend": self.backend,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        """等待写入 Redis 的后台任务完成并关闭 Redis 客户端（事件循环结束前调用）"""
+        loop = asyncio.get_running_loop()
+        pending = [task for task in self._pending_tasks if task.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        client, self._redis, self._redis_loop = self._redis, None, None
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception as e:
+                print(f"关闭AI响应缓存Redis连接失败: {e}")
+
+    def clear(self) -> None:
+        """清空进程内缓存与指标"""
+        self._entries.clear()
+        self.hits = self.redis_hits = self.misses = self.coalesced = self.stores = self.evictions = 0
+
+    @staticmethod
+    def is_cacheable(response: str, validate: Optional[Callable[[str], Any]] = None) -> bool:
+        """
+        响应是否可以缓存（非空且通过校验）
+
+        Args:
+            response: 响应内容
+            validate: 校验函数（可选），抛出异常视为不可缓存
+
+        Returns:
+            是否可以缓存
+        """
+        if not response:
+            return False
+        if validate is not None:
+            try:
+                validate(response)
+            except Exception as e:
+                print(f"AI响应未通过校验，不缓存: {e}")
+                return False
+        return True
+
+    async def _compute(
+        self,
+        key: str,
+        ttl: float,
+        compute: Callable[[], Awaitable[Tuple[str, str]]],
+        validate: Optional[Callable[[str], Any]],
+    ) -> str:
+        """执行一次AI调用并缓存（Mock响应和未通过校验的响应不缓存）"""
+        response, backend = await compute()
+        if backend not in _UNCACHED_BACKENDS and self.is_cacheable(response, validate):
+            self.set(key, response, ttl)
+        return response
+
+    def _discard_inflight(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def _get_local(self, key: str) -> Optional[str]:
+        """读取进程内缓存（过期条目删除）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, response = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return response
+
+    def _set_local(self, key: str, response: str, ttl: float) -> None:
+        """写入进程内缓存（超出容量时淘汰最久未使用的条目）"""
+        self._entries[key] = (time.monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _client(self):
+        """获取当前事件循环的 Redis 客户端（同一进程中可能先后运行多个事件循环，连接不能跨循环使用）"""
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._redis_loop is not loop:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(self.redis_url)
+            self._redis_loop = loop
+        return self._redis
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"ai_response:{key}"
+
+    async def _get_redis(self, key: str) -> Tuple[Optional[str], float]:
+        try:
+            pipe = self._client().pipeline()
+            pipe.get(self._redis_key(key))
+            pipe.pttl(self._redis_key(key))
+            raw, pttl = await pipe.execute()
+        except Exception as e:
+            print(f"读取AI响应缓存失败: {e}")
+            return None, 0.0
+        if raw is None or pttl <= 0:
+            return None, 0.0
+        return raw.decode("utf-8") if isinstance(raw, bytes) else raw, pttl / 1000
+
+    async def _set_redis(self, key: str, response: str, ttl: float) -> None:
+        try:
+            await self._client().set(self._redis_key(key), response, px=max(int(ttl * 1000), 1))
+        except Exception as e:
+            print(f"写入AI响应缓存失败: {e}")
+
+
+# Global AI response cache instance
+ai_response_cache = AIResponseCache(
+    backend=settings.AI_RESPONSE_CACHE_BACKEND,
+    max_size=settings.AI_RESPONSE_CACHE_MAX_SIZE,
+    redis_url=settings.REDIS_URL,
+)
@@ -0,0 +1,120 @@
+"""
+Chat Context Window - 对话上下文Token预算
+
+- 本地估算Token数（不依赖分词器）：中日韩字符与全角标点按1个Token，其余字符按4个字符1个Token
+- 按预算从新到旧保留历史消息，放不下的旧消息交给调用方折叠进滚动摘要
+- 发生折叠时只保留预算（和条数上限）的一部分（FOLD_KEEP_RATIO），留出余量，避免之后每轮都触发摘要
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+# 中日韩统一表意文字、CJK标点、假名、全角字符
+_CJK_PATTERN = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+# 每条消息的格式开销（角色标记、分隔符）
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# 回复起始标记的开销
+REPLY_PRIMING_TOKENS = 2
+
+# 折叠旧消息后，历史消息最多占用的预算比例
+FOLD_KEEP_RATIO = 0.5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本Token数
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的Token数
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    估算消息列表（Prompt）Token数
+
+    Args:
+        messages: [{role, content}]
+
+    Returns:
+        估算的Token数
+    """
+    return sum(estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages) + (
+        REPLY_PRIMING_TOKENS
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    截断文本到Token上限以内（保留开头）
+
+    Args:
+        text: 文本
+        max_tokens: Token上限
+
+    Returns:
+        截断后的文本
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def split_history(
+    history: List[Dict], budget: int, max_messages: Optional[int] = None
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    按Token预算切分历史消息
+
+    全部放得下时不折叠；超出预算或达到 max_messages 条时，从新到旧保留不超过
+    budget * FOLD_KEEP_RATIO（且不超过 max_messages * FOLD_KEEP_RATIO 条）的消息，其余折叠。
+    调用方每轮最多读取 max_messages 条未折叠消息，达到上限即折叠，保证较早的消息先进入摘要再离开读取窗口。
+
+    Args:
+        history: 历史消息（从旧到新），每条包含 content，可带 tokens（已统计的Token数）
+        budget: 历史消息可用的Token预算
+        max_messages: 历史消息条数上限（可选）
+
+    Returns:
+        (需要折叠进摘要的旧消息, 放入Prompt的消息)，均为从旧到新
+    """
+    costs = [_message_tokens(message) for message in history]
+    if sum(costs) <= budget and (max_messages is None or len(history) < max_messages):
+        return [], list(history)
+
+    limit = budget * FOLD_KEEP_RATIO
+    max_kept = len(history) if max_messages is None else int(max_messages * FOLD_KEEP_RATIO)
+    used = 0
+    split_at = len(history)
+    for index in range(len(history) - 1, -1, -1):
+        if used + costs[index] > limit or len(history) - index > max_kept:
+            break
+        used += costs[index]
+        split_at = index
+    return list(history[:split_at]), list(history[split_at:])
+
+
+def _message_tokens(message: Dict) -> int:
+    """单条历史消息的Token数（优先使用已统计的值）"""
+    tokens = message.get("tokens")
+    if tokens is None:
+        tokens = estimate_tokens(message["content"])
+    return tokens + MESSAGE_OVERHEAD_TOKENS
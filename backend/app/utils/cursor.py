@@ -0,0 +1,79 @@
+"""
+分页游标编解码
+
+游标是上一页最后一条记录的排序键值（如 [trade_date, created_at, trade_id]），
+编码为 URL 安全的 base64 字符串，对前端不透明。日期时间按 ISO 格式保存并带类型标记，
+解码后可直接用于 SQL 比较。
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+
+from app.exceptions import ValidationError
+
+
+def encode_cursor(values: Optional[Sequence[Any]]) -> Optional[str]:
+    """
+    编码游标
+
+    Args:
+        values: 排序键值列表（None 表示没有下一页）
+
+    Returns:
+        游标字符串，values 为 None 时返回 None
+    """
+    if values is None:
+        return None
+
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key_count: int) -> List[Any]:
+    """
+    解码游标
+
+    Args:
+        cursor: 游标字符串
+        key_count: 排序键数量（用于校验游标是否属于当前列表）
+
+    Returns:
+        排序键值列表
+
+    Raises:
+        ValidationError: 游标格式不合法
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != key_count:
+            raise ValueError("cursor length mismatch")
+        return [_decode_value(value) for value in values]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise ValidationError("无效的分页游标")
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "n" in value:
+            return Decimal(value["n"])
+        raise ValueError("unknown cursor value")
+    return value
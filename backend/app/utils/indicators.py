@@ -0,0 +1,277 @@
+"""
+技术指标计算引擎
+
+基于NumPy二维价格矩阵（股票数 × 交易日）批量计算技术指标:
+- MA: 累积和差分实现的滑动均值
+- EMA / MACD: 沿时间轴递推，股票维度整体向量化
+- KDJ: 错位取极值（N次逐元素max/min）计算N日最高/最低价
+- RSI: Wilder平滑（SMA(X, N, 1)）
+
+约定:
+- 价格矩阵每行一只股票，按交易日升序排列
+- 缺失值为NaN（上市较晚/数据较短的股票在左侧补NaN，见 align_series）
+- 数据不足以计算的位置结果为NaN
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 指标参数
+MA_WINDOWS = (5, 10, 20, 60)
+EMA_SHORT = 12
+EMA_LONG = 26
+MACD_SIGNAL = 9
+KDJ_WINDOW = 9
+RSI_WINDOW = 14
+
+# 计算指标所需的最少历史交易日（MA60 + EMA收敛余量）
+INDICATOR_LOOKBACK_DAYS = 120
+
+
+def align_series(series_list: Sequence[Sequence[float]], length: Optional[int] = None) -> np.ndarray:
+    """
+    将多只股票长度不一的价格序列右对齐为二维矩阵（左侧补NaN）
+
+    Args:
+        series_list: 每只股票按日期升序的价格序列
+        length: 矩阵列数（可选，默认取最长序列长度）
+
+    Returns:
+        shape 为 (股票数, length) 的float64矩阵
+    """
+    if length is None:
+        length = max((len(s) for s in series_list), default=0)
+
+    panel = np.full((len(series_list), length), np.nan)
+    for i, series in enumerate(series_list):
+        values = np.asarray(series, dtype=np.float64)[-length:] if length else np.empty(0)
+        if len(values):
+            panel[i, length - len(values) :] = values
+    return panel
+
+
+def moving_averages(values: np.ndarray, windows: Sequence[int]) -> Dict[int, np.ndarray]:
+    """
+    多个窗口的简单移动平均（共享一次累积和，O(股票数 × 交易日)）
+
+    窗口内存在缺失值时结果为NaN
+
+    Returns:
+        {窗口: 与输入同形状的矩阵}
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rows, days = values.shape
+    valid = ~np.isnan(values)
+
+    # 1. 前补一列0的累积和，窗口和 = sums[t+1] - sums[t+1-window]
+    sums = np.zeros((rows, days + 1))
+    np.cumsum(np.where(valid, values, 0.0), axis=1, out=sums[:, 1:])
+    counts = np.zeros((rows, days + 1), dtype=np.int64)
+    np.cumsum(valid, axis=1, out=counts[:, 1:])
+
+    result = {}
+    for window in windows:
+        averages = np.full(values.shape, np.nan)
+        if days >= window:
+            # 2. 只保留窗口内数据完整的位置
+            complete = (counts[:, window:] - counts[:, :-window]) == window
+            window_sums = sums[:, window:] - sums[:, :-window]
+            np.divide(window_sums, window, out=averages[:, window - 1 :], where=complete)
+        result[window] = averages
+    return result
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """简单移动平均 MA(X, N)"""
+    return moving_averages(values, (window,))[window]
+
+
+def recursive_smooth(values: np.ndarray, alpha: float, initial: Optional[float] = None) -> np.ndarray:
+    """
+    递推平滑 Y[t] = alpha * X[t] + (1 - alpha) * Y[t-1]
+
+    只在时间轴上循环，股票维度向量化；遇到缺失值沿用前值。
+
+    Args:
+        values: 二维矩阵（股票数 × 交易日）
+        alpha: 平滑系数
+        initial: 初始值（可选，默认取每只股票第一个有效值）
+
+    Returns:
+        与输入同形状的矩阵，首个有效值之前为NaN
+    """
+    # 转置为 (交易日 × 股票数) 的连续内存，逐日读取一整行
+    columns = np.ascontiguousarray(np.asarray(values, dtype=np.float64).T)
+    result = np.empty_like(columns)
+    prev = np.full(columns.shape[1], np.nan if initial is None else float(initial))
+    started = np.zeros(columns.shape[1], dtype=bool)
+
+    for t in range(columns.shape[0]):
+        x = columns[t]
+        valid = ~np.isnan(x)
+        smoothed = alpha * x + (1 - alpha) * prev
+        if initial is None:
+            smoothed = np.where(np.isnan(prev), x, smoothed)
+        np.copyto(prev, smoothed, where=valid)
+        started |= valid
+        result[t] = np.where(started, prev, np.nan)
+
+    return result.T
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """指数移动平均 EMA(X, N)，alpha = 2 / (N + 1)"""
+    return recursive_smooth(values, 2.0 / (span + 1))
+
+
+def macd(
+    close: np.ndarray, short: int = EMA_SHORT, long: int = EMA_LONG, signal: int = MACD_SIGNAL
+) -> Dict[str, np.ndarray]:
+    """
+    MACD指标
+
+    DIF = EMA(C, 12) - EMA(C, 26)，DEA = EMA(DIF, 9)，MACD柱 = 2 × (DIF - DEA)
+
+    Returns:
+        {"ema_short", "ema_long", "dif", "dea", "macd"}
+    """
+    ema_short = ema(close, short)
+    ema_long = ema(close, long)
+    dif = ema_short - ema_long
+    dea = ema(dif, signal)
+    return {"ema_short": ema_short, "ema_long": ema_long, "dif": dif, "dea": dea, "macd": 2 * (dif - dea)}
+
+
+def rolling_extreme(values: np.ndarray, window: int, func: np.ufunc) -> np.ndarray:
+    """
+    N日最高/最低（窗口内各偏移量错位后逐元素取极值），窗口内存在缺失值时为NaN
+
+    Args:
+        values: 二维矩阵（股票数 × 交易日）
+        window: 窗口大小
+        func: np.maximum / np.minimum
+    """
+    values = np.asarray(values, dtype=np.float64)
+    days = values.shape[1]
+    result = np.full(values.shape, np.nan)
+    if days < window:
+        return result
+
+    extreme = result[:, window - 1 :]
+    extreme[:] = values[:, window - 1 :]
+    for offset in range(1, window):
+        func(extreme, values[:, window - 1 - offset : days - offset], out=extreme)
+    return result
+
+
+def kdj(
+    close: np.ndarray, high: Optional[np.ndarray] = None, low: Optional[np.ndarray] = None, window: int = KDJ_WINDOW
+) -> Dict[str, np.ndarray]:
+    """
+    KDJ指标（9, 3, 3）
+
+    RSV = (C - LLV(L, 9)) / (HHV(H, 9) - LLV(L, 9)) × 100
+    K = SMA(RSV, 3, 1)，D = SMA(K, 3, 1)（初始值50），J = 3K - 2D
+
+    Returns:
+        {"k", "d", "j"}
+    """
+    close = np.asarray(close, dtype=np.float64)
+    highest = rolling_extreme(close if high is None else high, window, np.maximum)
+    lowest = rolling_extreme(close if low is None else low, window, np.minimum)
+
+    spread = highest - lowest
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsv = np.where(spread > 0, (close - lowest) / spread * 100, 50.0)
+    rsv = np.where(np.isnan(spread) | np.isnan(close), np.nan, rsv)
+
+    k = recursive_smooth(rsv, 1.0 / 3, initial=50.0)
+    d = recursive_smooth(k, 1.0 / 3, initial=50.0)
+    return {"k": k, "d": d, "j": 3 * k - 2 * d}
+
+
+def rsi(close: np.ndarray, window: int = RSI_WINDOW) -> np.ndarray:
+    """
+    相对强弱指标RSI（Wilder平滑）
+
+    RSI = SMA(MAX(ΔC, 0), N, 1) / SMA(|ΔC|, N, 1) × 100
+    """
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.full(close.shape, np.nan)
+    delta[:, 1:] = np.diff(close, axis=1)
+
+    avg_gain = recursive_smooth(np.where(np.isnan(delta), np.nan, np.maximum(delta, 0.0)), 1.0 / window)
+    avg_loss = recursive_smooth(np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0.0)), 1.0 / window)
+
+    total = avg_gain + avg_loss
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, avg_gain / total * 100, np.where(np.isnan(total), np.nan, 50.0))
+
+
+def compute_indicators(
+    close: np.ndarray, high: Optional[np.ndarray] = None, low: Optional[np.ndarray] = None
+) -> Dict[str, np.ndarray]:
+    """
+    批量计算全部技术指标（完整时间序列）
+
+    Args:
+        close: 收盘价矩阵（股票数 × 交易日）
+        high: 最高价矩阵（可选，缺省使用收盘价）
+        low: 最低价矩阵（可选，缺省使用收盘价）
+
+    Returns:
+        {指标名: 与close同形状的矩阵}，指标名同 latest_indicators
+    """
+    close = np.atleast_2d(np.asarray(close, dtype=np.float64))
+    if high is not None:
+        high = np.atleast_2d(np.asarray(high, dtype=np.float64))
+    if low is not None:
+        low = np.atleast_2d(np.asarray(low, dtype=np.float64))
+
+    result = {f"ma{window}": values for window, values in moving_averages(close, MA_WINDOWS).items()}
+
+    macd_result = macd(close)
+    result["ema12"] = macd_result["ema_short"]
+    result["ema26"] = macd_result["ema_long"]
+    result["macd_dif"] = macd_result["dif"]
+    result["macd_dea"] = macd_result["dea"]
+    result["macd"] = macd_result["macd"]
+
+    kdj_result = kdj(close, high, low)
+    result["kdj_k"] = kdj_result["k"]
+    result["kdj_d"] = kdj_result["d"]
+    result["kdj_j"] = kdj_result["j"]
+
+    result["rsi"] = rsi(close)
+    return result
+
+
+def latest_indicators(
+    close: np.ndarray,
+    high: Optional[np.ndarray] = None,
+    low: Optional[np.ndarray] = None,
+    decimals: int = 2,
+) -> List[Dict[str, Optional[float]]]:
+    """
+    批量计算每只股票最新交易日的技术指标
+
+    Args:
+        close: 收盘价矩阵（股票数 × 交易日）
+        high: 最高价矩阵（可选）
+        low: 最低价矩阵（可选）
+        decimals: 保留小数位数（MACD类指标多保留1位）
+
+    Returns:
+        与close行顺序一致的指标字典列表，无法计算的指标为None
+    """
+    indicators = compute_indicators(close, high, low)
+
+    # 逐列取最新值并四舍五入，NaN转换为None
+    columns = {}
+    for name, values in indicators.items():
+        digits = decimals + 1 if name.startswith("macd") else decimals
+        latest = np.round(values[:, -1], digits).tolist()
+        columns[name] = [None if value != value else value for value in latest]
+
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
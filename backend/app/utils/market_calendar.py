@@ -0,0 +1,52 @@
+"""
+A股交易日历
+
+交易时段判断（北京时间，不含节假日判断），供行情快照缓存、AI响应缓存等按交易时段决定有效期
+"""
+
+from datetime import datetime, timedelta, time as dt_time
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+# A股交易时段（北京时间）
+MARKET_TZ = ZoneInfo("Asia/Shanghai")
+TRADING_SESSIONS = ((dt_time(9, 15), dt_time(11, 30)), (dt_time(13, 0), dt_time(15, 0)))
+
+
+def is_trading_hours(now: Optional[datetime] = None) -> bool:
+    """
+    判断当前是否处于A股交易时段（不含节假日判断）
+
+    Args:
+        now: 指定时间（可选，默认当前时间）
+
+    Returns:
+        是否在交易时段内
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    if now.weekday() >= 5:
+        return False
+    current = now.time()
+    return any(start <= current <= end for start, end in TRADING_SESSIONS)
+
+
+def seconds_until_next_session(now: Optional[datetime] = None) -> float:
+    """
+    距下一个A股交易时段开始的秒数（不含节假日判断）
+
+    Args:
+        now: 指定时间（可选，默认当前时间）
+
+    Returns:
+        秒数
+    """
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    for days in range(8):
+        day = now.date() + timedelta(days=days)
+        if day.weekday() >= 5:
+            continue
+        for start, _ in TRADING_SESSIONS:
+            opens_at = datetime.combine(day, start, tzinfo=MARKET_TZ)
+            if opens_at > now:
+                return (opens_at - now).total_seconds()
+    return 0.0
@@ -0,0 +1,178 @@
+"""
+本地日线行情存储（OHLCV）
+
+每只股票一个只追加的二进制文件（定长结构化记录，按交易日升序），
+读取时通过 np.memmap 映射，只拷贝需要的尾部窗口，技术指标计算无需联网。
+
+目录结构:
+    {root}/{source}/{symbol}.bin      source: tushare / akshare
+
+说明:
+- 存储不复权日线（前复权历史会随除权除息整体变化，无法只追加）
+- 成交量单位为股，成交额单位为元
+- 写入时只追加比已有最后交易日更新的记录，重复/乱序数据会被忽略
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.indicators import align_series
+
+# 日线记录结构（date 为 YYYYMMDD 整数）
+BAR_DTYPE = np.dtype(
+    [
+        ("date", "<i4"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+        ("amount", "<f8"),
+    ]
+)
+
+# 支持的数据源
+SOURCES = ("tushare", "akshare")
+
+# 股票代码只允许字母、数字和点（如 600519 / 600519.SH），防止路径穿越
+_SYMBOL_PATTERN = re.compile(r"^[0-9A-Za-z.]+$")
+
+
+class OHLCVStore:
+    """
+    本地日线行情存储
+
+    - read / last_date: 只读映射文件，零网络调用
+    - append: 追加缺失交易日的日线（线程安全）
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def read(self, source: str, symbol: str, days: Optional[int] = None) -> np.ndarray:
+        """
+        读取股票日线
+
+        Args:
+            source: 数据源（tushare / akshare）
+            symbol: 股票代码
+            days: 只读取最近N个交易日（可选，默认全部）
+
+        Returns:
+            BAR_DTYPE 结构化数组（按交易日升序），无数据返回空数组
+        """
+        bars = self._map(source, symbol)
+        if days is not None:
+            bars = bars[-days:]
+        return np.array(bars)
+
+    def last_date(self, source: str, symbol: str) -> Optional[int]:
+        """
+        查询已存储的最后交易日
+
+        Returns:
+            YYYYMMDD 整数，无数据返回None
+        """
+        bars = self._map(source, symbol)
+        return int(bars["date"][-1]) if len(bars) else None
+
+    def append(self, source: str, symbol: str, bars: np.ndarray) -> int:
+        """
+        追加日线（只保留比已有最后交易日更新的记录）
+
+        Args:
+            source: 数据源
+            symbol: 股票代码
+            bars: BAR_DTYPE 结构化数组（顺序任意）
+
+        Returns:
+            实际追加的记录数
+        """
+        bars = np.asarray(bars, dtype=BAR_DTYPE)
+        if not len(bars):
+            return 0
+
+        # 1. 排序去重
+        bars = np.sort(bars, order="date")
+        bars = bars[np.concatenate(([True], np.diff(bars["date"]) > 0))]
+
+        with self._lock:
+            # 2. 过滤已存在的交易日
+            last = self.last_date(source, symbol)
+            if last is not None:
+                bars = bars[bars["date"] > last]
+            if not len(bars):
+                return 0
+
+            # 3. 截掉未写完整的尾部记录后追加写入
+            path = self._path(source, symbol)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) % BAR_DTYPE.itemsize:
+                os.truncate(path, os.path.getsize(path) // BAR_DTYPE.itemsize * BAR_DTYPE.itemsize)
+            with open(path, "ab") as f:
+                f.write(bars.tobytes())
+
+        return len(bars)
+
+    def panel(
+        self, source: str, symbols: Sequence[str], days: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[int]]:
+        """
+        读取多只股票最近N个交易日，右对齐为二维价格矩阵（股票数 × days）
+
+        每行按各自的交易日序列排列（停牌日不补齐），适用于逐行计算的技术指标。
+
+        Returns:
+            (收盘价矩阵, 最高价矩阵, 最低价矩阵, 每只股票的有效交易日数)
+        """
+        bars_list = [self.read(source, symbol, days) for symbol in symbols]
+        close = align_series([bars["close"] for bars in bars_list], days)
+        high = align_series([bars["high"] for bars in bars_list], days)
+        low = align_series([bars["low"] for bars in bars_list], days)
+        return close, high, low, [len(bars) for bars in bars_list]
+
+    def _map(self, source: str, symbol: str) -> np.ndarray:
+        """只读映射股票文件（忽略未写完整的尾部记录）"""
+        path = self._path(source, symbol)
+        try:
+            count = os.path.getsize(path) // BAR_DTYPE.itemsize
+        except OSError:
+            count = 0
+
+        if count == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+
+    def _path(self, source: str, symbol: str) -> str:
+        """
+        股票文件路径
+
+        Raises:
+            ValueError: 数据源不支持或股票代码非法
+        """
+        if source not in SOURCES:
+            raise ValueError(f"不支持的数据源: {source}")
+        if not _SYMBOL_PATTERN.match(symbol) or symbol.strip(".") == "":
+            raise ValueError(f"非法股票代码: {symbol}")
+        return os.path.join(self.root, source, f"{symbol}.bin")
+
+
+def build_bars(columns: Dict[str, Sequence[float]]) -> np.ndarray:
+    """
+    将按列组织的日线数据转换为 BAR_DTYPE 结构化数组
+
+    Args:
+        columns: {"date": [...], "open": [...], "high": [...], "low": [...], "close": [...],
+                  "volume": [...], "amount": [...]}，缺失的列填0，NaN按0处理
+    """
+    length = len(columns["date"])
+    bars = np.zeros(length, dtype=BAR_DTYPE)
+    for name in BAR_DTYPE.names:
+        if name in columns:
+            bars[name] = np.nan_to_num(np.asarray(columns[name], dtype=np.float64))
+    return bars
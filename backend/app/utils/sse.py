@@ -0,0 +1,46 @@
+"""
+Server-Sent Events 工具
+
+将 (事件名, 数据) 异步序列转换为 text/event-stream 响应
+"""
+
+import json
+from typing import Any, AsyncIterator, Optional, Tuple
+from fastapi.responses import StreamingResponse
+
+# 禁止代理缓冲/缓存，保证片段实时到达客户端
+SSE_HEADERS = {"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"}
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """
+    格式化单条SSE消息
+
+    Args:
+        data: 消息数据（JSON序列化）
+        event: 事件名（可选）
+
+    Returns:
+        SSE消息文本（以空行结尾）
+    """
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    构建SSE流式响应
+
+    Args:
+        events: (事件名, 数据) 异步迭代器
+
+    Returns:
+        StreamingResponse（text/event-stream）
+    """
+
+    async def body():
+        async for event, data in events:
+            yield format_sse(data, event)
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=SSE_HEADERS)
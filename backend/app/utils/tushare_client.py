@@ -6,11 +6,102 @@ Tushare数据源客户端
 依赖:
 - tushare (需要 API Token)
 - akshare (备选方案，免费)
+
+注意: tushare/akshare SDK均为同步阻塞调用，所有SDK调用统一通过 `_run_sync`
+提交到有界线程池执行，避免阻塞事件循环（并发上限、单次超时可配置）。
 """
 
 import os
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
+import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Tuple
+from datetime import datetime, timedelta, time as dt_time
+from app.core.config import settings
+from app.utils.indicators import INDICATOR_LOOKBACK_DAYS, latest_indicators
+from app.utils.market_calendar import MARKET_TZ, is_trading_hours
+from app.utils.ohlcv_store import OHLCVStore, build_bars
+
+# Tushare多代码查询：每批股票数、当天无数据时的回溯天数
+# （daily/daily_basic单次最多返回6000行，400只 × 15个自然日不会超限）
+TUSHARE_BATCH_SIZE = 400
+TUSHARE_LOOKBACK_DAYS = 15
+
+# 本地日线存储读写线程数
+OHLCV_IO_WORKERS = 2
+
+# 当日日线视为已收盘可入库的时间（北京时间）
+DAILY_BAR_READY_TIME = dt_time(15, 30)
+
+
+def _safe_float(value: Any, default: float = 0.0) -> float:
+    """转换为float，None/NaN/非法值返回默认值"""
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return default
+    return default if result != result else result
+
+
+class SpotSnapshotCache:
+    """
+    全市场实时行情快照缓存
+
+    - 快照按刷新时间失效：交易时段使用较短TTL，收盘后使用较长TTL
+    - 快照按股票代码建立索引，单只股票查询为O(1)字典查找
+    - 并发请求共享同一次刷新（single-flight），不会重复下载全市场数据
+    """
+
+    def __init__(self, trading_ttl: float, closed_ttl: float):
+        self.trading_ttl = trading_ttl
+        self.closed_ttl = closed_ttl
+        self.refreshed_at: Optional[datetime] = None
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._expires_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def current_ttl(self) -> float:
+        """当前时段对应的TTL（秒）"""
+        return self.trading_ttl if is_trading_hours() else self.closed_ttl
+
+    def is_fresh(self) -> bool:
+        """快照是否仍在有效期内"""
+        return bool(self._rows) and time.monotonic() < self._expires_at
+
+    async def get_rows(self, fetch: Callable[[], Awaitable[Dict[str, Dict[str, Any]]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        获取按股票代码索引的快照，过期时刷新
+
+        Args:
+            fetch: 下载并返回 {symbol: row} 的协程函数
+
+        Returns:
+            {symbol: row} 字典
+        """
+        if self.is_fresh():
+            return self._rows
+
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._refresh(fetch))
+            self._refresh_task = task
+
+        # shield: 单个请求被取消不影响其他等待同一次刷新的请求
+        return await asyncio.shield(task)
+
+    async def _refresh(self, fetch: Callable[[], Awaitable[Dict[str, Dict[str, Any]]]]) -> Dict[str, Dict[str, Any]]:
+        """执行一次刷新"""
+        rows = await fetch()
+        self._rows = rows
+        self.refreshed_at = datetime.now(MARKET_TZ)
+        self._expires_at = time.monotonic() + self.current_ttl()
+        return rows
+
+    def invalidate(self) -> None:
+        """使快照失效"""
+        self._expires_at = 0.0
 
 
 class TushareClient:
@@ -21,6 +112,15 @@ class TushareClient:
     1. Tushare API (需要Token) - 专业数据源
     2. AkShare (免费) - 备选方案
     3. Mock数据 (降级) - 无数据源时
+
+    执行层:
+    - SDK调用在独立线程池中执行（MARKET_DATA_MAX_WORKERS）
+    - 同时进行的上游调用数受信号量限制（MARKET_DATA_CONCURRENCY）
+    - 单次调用超时（MARKET_DATA_TIMEOUT），超时/请求取消时放弃等待
+
+    技术指标:
+    - 日线保存在本地OHLCV存储（OHLCV_STORE_DIR），每次只增量下载缺失的交易日
+    - 指标基于本地日线批量计算，已是最新的股票无需联网
     """
 
     def __init__(self):
@@ -28,6 +128,26 @@ class TushareClient:
         self.use_tushare = False
         self.use_akshare = False
 
+        # 执行层配置
+        self.call_timeout = settings.MARKET_DATA_TIMEOUT
+        self.max_concurrency = settings.MARKET_DATA_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.MARKET_DATA_MAX_WORKERS, thread_name_prefix="market-data"
+        )
+        # 本地日线存储读写使用独立线程池，不与可能卡住的SDK调用争抢线程
+        self._io_executor = ThreadPoolExecutor(max_workers=OHLCV_IO_WORKERS, thread_name_prefix="ohlcv-store")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # AkShare全市场行情快照（所有请求共享）
+        self.spot_cache = SpotSnapshotCache(
+            trading_ttl=settings.MARKET_SPOT_TTL_TRADING, closed_ttl=settings.MARKET_SPOT_TTL_CLOSED
+        )
+
+        # 本地日线存储（记录每只股票最近一次增量检查: (目标交易日, 检查时间)）
+        self.ohlcv_store = OHLCVStore(settings.OHLCV_STORE_DIR)
+        self._bars_checked: Dict[str, Tuple[str, float]] = {}
+
         # 尝试初始化Tushare
         if self.tushare_token:
             try:
@@ -82,6 +202,30 @@ class TushareClient:
         else:
             return self._get_quote_mock(symbol)
 
+    async def get_realtime_quotes(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取实时行情数据
+
+        Tushare使用多代码ts_code查询（每批一次上游调用），AkShare使用一次全市场快照，
+        数百只股票只需一到数次上游调用。
+
+        Args:
+            symbols: 股票代码列表（如 ["600519", "000858"]）
+
+        Returns:
+            {symbol: 行情数据}，字段同 get_realtime_quote；获取失败的股票不在结果中
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        if self.use_tushare:
+            return await self._get_quotes_tushare(symbols)
+        elif self.use_akshare:
+            return await self._get_quotes_akshare(symbols)
+        else:
+            return {symbol: self._get_quote_mock(symbol) for symbol in symbols}
+
     async def get_fundamentals(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         获取基本面数据
@@ -107,6 +251,29 @@ class TushareClient:
         else:
             return self._get_fundamentals_mock(symbol)
 
+    async def get_batch_fundamentals(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取基本面数据
+
+        Tushare使用多代码daily_basic查询，AkShare复用全市场行情快照中的估值字段。
+
+        Args:
+            symbols: 股票代码列表
+
+        Returns:
+            {symbol: 基本面数据}，字段同 get_fundamentals；获取失败的股票不在结果中
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        if self.use_tushare:
+            return await self._get_batch_fundamentals_tushare(symbols)
+        elif self.use_akshare:
+            return await self._get_batch_fundamentals_akshare(symbols)
+        else:
+            return {symbol: self._get_fundamentals_mock(symbol) for symbol in symbols}
+
     async def get_technical_indicators(self, symbol: str, period: int = 30) -> Optional[Dict[str, Any]]:
         """
         获取技术指标
@@ -123,18 +290,118 @@ class TushareClient:
             - ma60: 60日均线
             - ema12: 12日指数移动平均
             - ema26: 26日指数移动平均
-            - macd: MACD指标
+            - macd_dif: MACD快线（DIF）
+            - macd_dea: MACD慢线（DEA）
+            - macd: MACD柱（2 × (DIF - DEA)）
             - kdj_k: KDJ-K值
             - kdj_d: KDJ-D值
-            - rsi: RSI相对强弱指标
+            - kdj_j: KDJ-J值
+            - rsi: RSI相对强弱指标（14日）
+
+            数据不足以计算的指标为None
         """
-        if self.use_tushare:
-            return await self._get_technical_tushare(symbol, period)
-        elif self.use_akshare:
-            return await self._get_technical_akshare(symbol, period)
-        else:
+        if not self.use_tushare and not self.use_akshare:
             return self._get_technical_mock(symbol)
 
+        result = await self.get_batch_technical_indicators([symbol], period)
+        return result.get(symbol)
+
+    async def get_batch_technical_indicators(self, symbols: List[str], period: int = 30) -> Dict[str, Dict[str, Any]]:
+        """
+        批量获取技术指标
+
+        先增量更新本地日线（已是最新的股票零网络调用），再对 股票数 × 交易日 的价格矩阵一次性计算。
+
+        Args:
+            symbols: 股票代码列表
+            period: 计算周期（天数，不足指标所需历史时按 INDICATOR_LOOKBACK_DAYS 读取）
+
+        Returns:
+            {symbol: 技术指标数据}，字段同 get_technical_indicators；日线不足5天的股票不在结果中
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        if not self.use_tushare and not self.use_akshare:
+            return {symbol: self._get_technical_mock(symbol) for symbol in symbols}
+
+        source = self._bars_source()
+
+        # 1. 增量更新本地日线
+        await self.refresh_daily_bars(symbols)
+
+        # 2. 读取本地日线并批量计算指标
+        try:
+            rows, lengths = await self._run_local(
+                self._compute_technicals_from_store, source, symbols, max(period, INDICATOR_LOOKBACK_DAYS)
+            )
+        except Exception as e:
+            print(f"计算技术指标失败: {e}")
+            return {}
+
+        return {
+            symbol: {**row, "data_source": source} for symbol, row, length in zip(symbols, rows, lengths) if length >= 5
+        }
+
+    async def refresh_daily_bars(self, symbols: List[str], history_days: Optional[int] = None) -> Dict[str, int]:
+        """
+        增量更新本地日线：只下载已存储的最后交易日之后的数据
+
+        Args:
+            symbols: 股票代码列表
+            history_days: 本地无数据时下载的历史交易日数（可选，默认 INDICATOR_LOOKBACK_DAYS）
+
+        Returns:
+            {symbol: 新增的日线条数}
+        """
+        if not self.use_tushare and not self.use_akshare:
+            return {}
+
+        source = self._bars_source()
+        end_date = self._last_closed_trade_date()
+        appended = await asyncio.gather(
+            *[self._refresh_symbol_bars(source, symbol, end_date, history_days) for symbol in symbols]
+        )
+        return dict(zip(symbols, appended))
+
+    async def _refresh_symbol_bars(self, source: str, symbol: str, end_date: str, history_days: Optional[int]) -> int:
+        """增量更新单只股票的本地日线"""
+        # 1. 最近已检查过（同一目标交易日、未超过复查间隔）则跳过
+        checked = self._bars_checked.get(symbol)
+        if checked and checked[0] == end_date and time.monotonic() - checked[1] < settings.OHLCV_RECHECK_INTERVAL:
+            return 0
+
+        # 2. 本地已是最新，无需联网
+        last_date = await self._run_local(self.ohlcv_store.last_date, source, symbol)
+        if last_date is not None and str(last_date) >= end_date:
+            self._bars_checked[symbol] = (end_date, time.monotonic())
+            return 0
+
+        # 3. 只下载缺失的交易日
+        if last_date is not None:
+            start_date = (datetime.strptime(str(last_date), "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d")
+        else:
+            start_date = self._history_start_date(history_days or INDICATOR_LOOKBACK_DAYS)
+
+        try:
+            if source == "tushare":
+                bars = await self._fetch_daily_bars_tushare(symbol, start_date, end_date)
+            else:
+                bars = await self._fetch_daily_bars_akshare(symbol, start_date, end_date)
+        except Exception as e:
+            print(f"更新{symbol}日线失败: {e}")
+            return 0
+
+        appended = await self._run_local(self.ohlcv_store.append, source, symbol, bars)
+        self._bars_checked[symbol] = (end_date, time.monotonic())
+        return appended
+
+    def _compute_technicals_from_store(self, source: str, symbols: List[str], days: int):
+        """读取本地日线价格矩阵并计算最新技术指标（在线程池中执行）"""
+        close, high, low, lengths = self.ohlcv_store.panel(source, symbols, days)
+        return latest_indicators(close, high, low), lengths
+
     async def get_stock_info(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         获取股票基本信息
@@ -167,98 +434,163 @@ class TushareClient:
             ts_code = self._convert_symbol_to_tushare(symbol)
 
             # 获取实时行情
-            df = self.pro.daily(ts_code=ts_code, trade_date=datetime.now().strftime("%Y%m%d"))
+            df = await self._run_sync(self.pro.daily, ts_code=ts_code, trade_date=datetime.now().strftime("%Y%m%d"))
 
             if df.empty:
                 # 如果当天没数据，获取最近一个交易日
-                df = self.pro.daily(ts_code=ts_code, limit=1)
+                df = await self._run_sync(self.pro.daily, ts_code=ts_code, limit=1)
 
             if df.empty:
                 return None
 
-            row = df.iloc[0]
-
-            # 计算涨跌幅和涨跌额
-            pre_close = float(row.get("pre_close", row.get("close", 0)))
-            current = float(row.get("close", 0))
-            change_amount = current - pre_close
-            change_percent = (change_amount / pre_close * 100) if pre_close > 0 else 0
-
-            return {
-                "current_price": float(row.get("close", 0)),
-                "open_price": float(row.get("open", 0)),
-                "high_price": float(row.get("high", 0)),
-                "low_price": float(row.get("low", 0)),
-                "close_price": pre_close,
-                "volume": int(row.get("vol", 0)) * 100,  # Tushare单位是手（100股）
-                "amount": float(row.get("amount", 0)) * 1000,  # Tushare单位是千元
-                "change_percent": round(change_percent, 2),
-                "change_amount": round(change_amount, 2),
-                "trade_date": row.get("trade_date", ""),
-                "data_source": "tushare",
-            }
+            return self._convert_daily_row_tushare(df.iloc[0].to_dict())
         except Exception as e:
             print(f"Tushare获取行情失败: {e}")
             return None
 
+    async def _get_quotes_tushare(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """使用Tushare批量获取行情（多代码查询）"""
+        quotes = {}
+        for start in range(0, len(symbols), TUSHARE_BATCH_SIZE):
+            chunk = symbols[start : start + TUSHARE_BATCH_SIZE]
+            try:
+                rows = await self._fetch_latest_rows_tushare(self.pro.daily, chunk)
+            except Exception as e:
+                print(f"Tushare批量获取行情失败: {e}")
+                continue
+
+            for symbol, row in rows.items():
+                quotes[symbol] = self._convert_daily_row_tushare(row)
+
+        return quotes
+
+    @staticmethod
+    def _convert_daily_row_tushare(row: Dict[str, Any]) -> Dict[str, Any]:
+        """将Tushare日线数据转换为统一行情格式"""
+        # 计算涨跌幅和涨跌额
+        current = _safe_float(row.get("close"))
+        pre_close = _safe_float(row.get("pre_close"), current)
+        change_amount = current - pre_close
+        change_percent = (change_amount / pre_close * 100) if pre_close > 0 else 0
+
+        return {
+            "current_price": current,
+            "open_price": _safe_float(row.get("open")),
+            "high_price": _safe_float(row.get("high")),
+            "low_price": _safe_float(row.get("low")),
+            "close_price": pre_close,
+            "volume": int(_safe_float(row.get("vol"))) * 100,  # Tushare单位是手（100股）
+            "amount": _safe_float(row.get("amount")) * 1000,  # Tushare单位是千元
+            "change_percent": round(change_percent, 2),
+            "change_amount": round(change_amount, 2),
+            "trade_date": row.get("trade_date", ""),
+            "data_source": "tushare",
+        }
+
     async def _get_fundamentals_tushare(self, symbol: str) -> Dict[str, Any]:
         """使用Tushare获取基本面数据"""
         try:
             ts_code = self._convert_symbol_to_tushare(symbol)
 
             # 获取日线基本指标
-            df = self.pro.daily_basic(ts_code=ts_code, limit=1)
+            df = await self._run_sync(self.pro.daily_basic, ts_code=ts_code, limit=1)
 
             if df.empty:
                 return None
 
-            row = df.iloc[0]
-
-            return {
-                "pe_ratio": float(row.get("pe", 0)),
-                "pb_ratio": float(row.get("pb", 0)),
-                "ps_ratio": float(row.get("ps", 0)),
-                "total_market_cap": float(row.get("total_mv", 0)),  # 总市值（万元）
-                "circulating_market_cap": float(row.get("circ_mv", 0)),  # 流通市值（万元）
-                "data_source": "tushare",
-            }
+            return self._convert_daily_basic_row_tushare(df.iloc[0].to_dict())
         except Exception as e:
             print(f"Tushare获取基本面失败: {e}")
             return None
 
-    async def _get_technical_tushare(self, symbol: str, period: int) -> Dict[str, Any]:
-        """使用Tushare获取技术指标（简化版）"""
-        try:
-            ts_code = self._convert_symbol_to_tushare(symbol)
+    async def _get_batch_fundamentals_tushare(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """使用Tushare批量获取基本面数据（多代码查询）"""
+        fundamentals = {}
+        for start in range(0, len(symbols), TUSHARE_BATCH_SIZE):
+            chunk = symbols[start : start + TUSHARE_BATCH_SIZE]
+            try:
+                rows = await self._fetch_latest_rows_tushare(self.pro.daily_basic, chunk)
+            except Exception as e:
+                print(f"Tushare批量获取基本面失败: {e}")
+                continue
 
-            # 获取最近N天的行情数据
-            end_date = datetime.now().strftime("%Y%m%d")
-            start_date = (datetime.now() - timedelta(days=period + 30)).strftime("%Y%m%d")
+            for symbol, row in rows.items():
+                fundamentals[symbol] = self._convert_daily_basic_row_tushare(row)
 
-            df = self.pro.daily(ts_code=ts_code, start_date=start_date, end_date=end_date)
+        return fundamentals
 
-            if df.empty or len(df) < 5:
-                return None
+    @staticmethod
+    def _convert_daily_basic_row_tushare(row: Dict[str, Any]) -> Dict[str, Any]:
+        """将Tushare每日指标数据转换为统一基本面格式"""
+        return {
+            "pe_ratio": _safe_float(row.get("pe")),
+            "pb_ratio": _safe_float(row.get("pb")),
+            "ps_ratio": _safe_float(row.get("ps")),
+            "total_market_cap": _safe_float(row.get("total_mv")),  # 总市值（万元）
+            "circulating_market_cap": _safe_float(row.get("circ_mv")),  # 流通市值（万元）
+            "data_source": "tushare",
+        }
 
-            # 计算均线（简单移动平均）
-            df = df.sort_values("trade_date")
-            closes = df["close"].values
+    async def _fetch_latest_rows_tushare(self, api: Callable, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        使用多代码ts_code查询Tushare日线类接口，返回每只股票最近一个交易日的数据
 
-            ma5 = float(closes[-5:].mean()) if len(closes) >= 5 else 0
-            ma10 = float(closes[-10:].mean()) if len(closes) >= 10 else 0
-            ma20 = float(closes[-20:].mean()) if len(closes) >= 20 else 0
-            ma60 = float(closes[-60:].mean()) if len(closes) >= 60 else 0
+        Args:
+            api: Tushare接口（如 self.pro.daily / self.pro.daily_basic）
+            symbols: 股票代码列表（单批不超过 TUSHARE_BATCH_SIZE）
 
-            return {
-                "ma5": round(ma5, 2),
-                "ma10": round(ma10, 2),
-                "ma20": round(ma20, 2),
-                "ma60": round(ma60, 2),
-                "data_source": "tushare",
+        Returns:
+            {symbol: 数据行}
+        """
+        # 1. 转换代码格式并建立反向映射
+        code_map = {self._convert_symbol_to_tushare(symbol): symbol for symbol in symbols}
+        today = datetime.now()
+
+        # 2. 一次查询当天所有股票
+        df = await self._run_sync(api, ts_code=",".join(code_map), trade_date=today.strftime("%Y%m%d"))
+        rows = self._latest_rows_by_code(df)
+
+        # 3. 当天无数据的股票（未收盘/停牌/非交易日）回溯最近一段时间，取最新一条
+        missing = [code for code in code_map if code not in rows]
+        if missing:
+            df = await self._run_sync(
+                api,
+                ts_code=",".join(missing),
+                start_date=(today - timedelta(days=TUSHARE_LOOKBACK_DAYS)).strftime("%Y%m%d"),
+                end_date=today.strftime("%Y%m%d"),
+            )
+            rows.update(self._latest_rows_by_code(df))
+
+        return {code_map[code]: row for code, row in rows.items() if code in code_map}
+
+    @staticmethod
+    def _latest_rows_by_code(df) -> Dict[str, Dict[str, Any]]:
+        """按ts_code分组，保留每只股票最新交易日的一行"""
+        if df is None or df.empty:
+            return {}
+
+        df = df.sort_values("trade_date").drop_duplicates(subset="ts_code", keep="last")
+        return df.set_index("ts_code", drop=False).to_dict("index")
+
+    async def _fetch_daily_bars_tushare(self, symbol: str, start_date: str, end_date: str):
+        """使用Tushare下载日线（不复权），转换为本地存储格式"""
+        ts_code = self._convert_symbol_to_tushare(symbol)
+        df = await self._run_sync(self.pro.daily, ts_code=ts_code, start_date=start_date, end_date=end_date)
+
+        if df is None or df.empty:
+            return build_bars({"date": []})
+
+        return build_bars(
+            {
+                "date": df["trade_date"].astype(int),
+                "open": df["open"],
+                "high": df["high"],
+                "low": df["low"],
+                "close": df["close"],
+                "volume": df["vol"] * 100,  # 手 → 股
+                "amount": df["amount"] * 1000,  # 千元 → 元
             }
-        except Exception as e:
-            print(f"Tushare获取技术指标失败: {e}")
-            return None
+        )
 
     async def _get_stock_info_tushare(self, symbol: str) -> Dict[str, Any]:
         """使用Tushare获取股票基本信息"""
@@ -266,7 +598,9 @@ class TushareClient:
             ts_code = self._convert_symbol_to_tushare(symbol)
 
             # 获取股票基本信息
-            df = self.pro.stock_basic(ts_code=ts_code, fields="ts_code,name,industry,market,list_date")
+            df = await self._run_sync(
+                self.pro.stock_basic, ts_code=ts_code, fields="ts_code,name,industry,market,list_date"
+            )
 
             if df.empty:
                 return None
@@ -287,40 +621,60 @@ class TushareClient:
     # ============= AkShare实现 =============
 
     async def _get_quote_akshare(self, symbol: str) -> Dict[str, Any]:
-        """使用AkShare获取实时行情"""
+        """使用AkShare获取实时行情（从共享的全市场快照中查找）"""
         try:
-            # AkShare获取实时行情
-            df = self.akshare.stock_zh_a_spot_em()
+            rows = await self.spot_cache.get_rows(self._fetch_spot_snapshot_akshare)
 
-            # 查找对应股票
-            stock_data = df[df["代码"] == symbol]
-
-            if stock_data.empty:
+            row = rows.get(symbol)
+            if row is None:
                 return None
 
-            row = stock_data.iloc[0]
-
-            return {
-                "current_price": float(row.get("最新价", 0)),
-                "open_price": float(row.get("今开", 0)),
-                "high_price": float(row.get("最高", 0)),
-                "low_price": float(row.get("最低", 0)),
-                "close_price": float(row.get("昨收", 0)),
-                "volume": int(row.get("成交量", 0)),
-                "amount": float(row.get("成交额", 0)),
-                "change_percent": float(row.get("涨跌幅", 0)),
-                "change_amount": float(row.get("涨跌额", 0)),
-                "data_source": "akshare",
-            }
+            return self._convert_spot_row_akshare(row, self.spot_cache.refreshed_at)
         except Exception as e:
             print(f"AkShare获取行情失败: {e}")
             return None
 
+    async def _get_quotes_akshare(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """使用AkShare批量获取行情（一次全市场快照）"""
+        try:
+            rows = await self.spot_cache.get_rows(self._fetch_spot_snapshot_akshare)
+        except Exception as e:
+            print(f"AkShare批量获取行情失败: {e}")
+            return {}
+
+        snapshot_time = self.spot_cache.refreshed_at
+        return {
+            symbol: self._convert_spot_row_akshare(rows[symbol], snapshot_time) for symbol in symbols if symbol in rows
+        }
+
+    async def _fetch_spot_snapshot_akshare(self) -> Dict[str, Dict[str, Any]]:
+        """下载A股全市场实时行情，并按股票代码建立索引"""
+        df = await self._run_sync(self.akshare.stock_zh_a_spot_em, timeout=settings.MARKET_SPOT_TIMEOUT)
+        df = df.drop_duplicates(subset="代码").set_index("代码")
+        return df.to_dict("index")
+
+    @staticmethod
+    def _convert_spot_row_akshare(row: Dict[str, Any], snapshot_time: Optional[datetime]) -> Dict[str, Any]:
+        """将AkShare快照中的一行转换为统一行情格式"""
+        return {
+            "current_price": _safe_float(row.get("最新价")),
+            "open_price": _safe_float(row.get("今开")),
+            "high_price": _safe_float(row.get("最高")),
+            "low_price": _safe_float(row.get("最低")),
+            "close_price": _safe_float(row.get("昨收")),
+            "volume": int(_safe_float(row.get("成交量"))),
+            "amount": _safe_float(row.get("成交额")),
+            "change_percent": _safe_float(row.get("涨跌幅")),
+            "change_amount": _safe_float(row.get("涨跌额")),
+            "snapshot_time": snapshot_time.isoformat() if snapshot_time else None,
+            "data_source": "akshare",
+        }
+
     async def _get_fundamentals_akshare(self, symbol: str) -> Dict[str, Any]:
         """使用AkShare获取基本面数据"""
         try:
             # AkShare获取个股信息
-            df = self.akshare.stock_individual_info_em(symbol=symbol)
+            df = await self._run_sync(self.akshare.stock_individual_info_em, symbol=symbol)
 
             if df.empty:
                 return None
@@ -339,38 +693,56 @@ class TushareClient:
             print(f"AkShare获取基本面失败: {e}")
             return None
 
-    async def _get_technical_akshare(self, symbol: str, period: int) -> Dict[str, Any]:
-        """使用AkShare获取技术指标（简化版）"""
+    async def _get_batch_fundamentals_akshare(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """使用AkShare批量获取基本面数据（复用全市场快照中的估值字段）"""
         try:
-            # AkShare获取历史行情
-            df = self.akshare.stock_zh_a_hist(symbol=symbol, period="daily", adjust="qfq")
-
-            if df.empty or len(df) < 5:
-                return None
-
-            # 计算均线
-            closes = df["收盘"].values
-
-            ma5 = float(closes[-5:].mean()) if len(closes) >= 5 else 0
-            ma10 = float(closes[-10:].mean()) if len(closes) >= 10 else 0
-            ma20 = float(closes[-20:].mean()) if len(closes) >= 20 else 0
-            ma60 = float(closes[-60:].mean()) if len(closes) >= 60 else 0
+            rows = await self.spot_cache.get_rows(self._fetch_spot_snapshot_akshare)
+        except Exception as e:
+            print(f"AkShare批量获取基本面失败: {e}")
+            return {}
 
-            return {
-                "ma5": round(ma5, 2),
-                "ma10": round(ma10, 2),
-                "ma20": round(ma20, 2),
-                "ma60": round(ma60, 2),
+        return {
+            symbol: {
+                "pe_ratio": _safe_float(rows[symbol].get("市盈率-动态")),
+                "pb_ratio": _safe_float(rows[symbol].get("市净率")),
+                "total_market_cap": _safe_float(rows[symbol].get("总市值")),
+                "circulating_market_cap": _safe_float(rows[symbol].get("流通市值")),
                 "data_source": "akshare",
             }
-        except Exception as e:
-            print(f"AkShare获取技术指标失败: {e}")
-            return None
+            for symbol in symbols
+            if symbol in rows
+        }
+
+    async def _fetch_daily_bars_akshare(self, symbol: str, start_date: str, end_date: str):
+        """使用AkShare下载日线（不复权），转换为本地存储格式"""
+        df = await self._run_sync(
+            self.akshare.stock_zh_a_hist,
+            symbol=symbol,
+            period="daily",
+            start_date=start_date,
+            end_date=end_date,
+            adjust="",
+        )
+
+        if df is None or df.empty:
+            return build_bars({"date": []})
+
+        return build_bars(
+            {
+                "date": df["日期"].astype(str).str.replace("-", "").astype(int),
+                "open": df["开盘"],
+                "high": df["最高"],
+                "low": df["最低"],
+                "close": df["收盘"],
+                "volume": df["成交量"] * 100,  # 手 → 股
+                "amount": df["成交额"],
+            }
+        )
 
     async def _get_stock_info_akshare(self, symbol: str) -> Dict[str, Any]:
         """使用AkShare获取股票基本信息"""
         try:
-            df = self.akshare.stock_individual_info_em(symbol=symbol)
+            df = await self._run_sync(self.akshare.stock_individual_info_em, symbol=symbol)
 
             if df.empty:
                 return None
@@ -430,9 +802,12 @@ class TushareClient:
             "ma60": 1595.30,
             "ema12": 1645.00,
             "ema26": 1625.00,
+            "macd_dif": 20.0,
+            "macd_dea": 12.25,
             "macd": 15.5,
             "kdj_k": 72.3,
             "kdj_d": 68.5,
+            "kdj_j": 79.9,
             "rsi": 58.2,
             "data_source": "mock",
             "warning": "使用Mock数据，请配置Tushare或安装AkShare",
@@ -451,8 +826,87 @@ class TushareClient:
             "warning": "使用Mock数据，请配置Tushare或安装AkShare",
         }
 
+    # ============= 执行层 =============
+
+    async def _run_sync(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        在有界线程池中执行同步SDK调用
+
+        Args:
+            func: 同步函数（如 self.pro.daily）
+            *args: 位置参数
+            timeout: 超时时间（秒），默认 MARKET_DATA_TIMEOUT
+            **kwargs: 关键字参数
+
+        Returns:
+            函数返回值
+
+        Raises:
+            TimeoutError: 调用超时
+            asyncio.CancelledError: 请求被取消
+        """
+        timeout = timeout if timeout is not None else self.call_timeout
+        loop = asyncio.get_running_loop()
+
+        async with self._get_semaphore():
+            future = loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+            try:
+                return await asyncio.wait_for(future, timeout=timeout)
+            except asyncio.TimeoutError:
+                # 线程中的SDK调用无法被中断，这里只放弃等待并释放并发名额
+                raise TimeoutError(f"{getattr(func, '__name__', 'sdk call')} 调用超时（{timeout}s）")
+            finally:
+                # 请求取消/超时时，尚未开始执行的任务直接从线程池队列中撤销
+                future.cancel()
+
+    async def _run_local(self, func: Callable, *args) -> Any:
+        """
+        在本地I/O线程池中执行文件读写（如日线存储），避免阻塞事件循环
+
+        与SDK调用的线程池分开（超时的SDK调用仍占用线程），不占用SDK并发名额、不设超时（本地I/O不依赖网络）
+
+        Args:
+            func: 同步函数（如 self.ohlcv_store.append）
+            *args: 位置参数
+
+        Returns:
+            函数返回值
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._io_executor, functools.partial(func, *args))
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环的并发信号量（同一进程中可能先后运行多个事件循环，信号量不能跨循环使用）"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def shutdown(self) -> None:
+        """关闭线程池（应用关闭时调用）"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._io_executor.shutdown(wait=False, cancel_futures=True)
+
     # ============= 工具方法 =============
 
+    def _bars_source(self) -> str:
+        """当前日线数据源（本地存储按数据源分目录）"""
+        return "tushare" if self.use_tushare else "akshare"
+
+    @staticmethod
+    def _last_closed_trade_date(now: Optional[datetime] = None) -> str:
+        """最近一个已收盘的日期（收盘数据就绪前取前一天，YYYYMMDD）"""
+        now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+        if now.time() < DAILY_BAR_READY_TIME:
+            now -= timedelta(days=1)
+        return now.strftime("%Y%m%d")
+
+    @staticmethod
+    def _history_start_date(period: int) -> str:
+        """计算技术指标所需历史行情的起始日期（交易日换算为自然日，预留节假日余量）"""
+        trading_days = max(period, INDICATOR_LOOKBACK_DAYS)
+        return (datetime.now() - timedelta(days=trading_days * 7 // 5 + 20)).strftime("%Y%m%d")
+
     def _convert_symbol_to_tushare(self, symbol: str) -> str:
         """
         转换股票代码为Tushare格式
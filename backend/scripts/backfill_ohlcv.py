@@ -0,0 +1,80 @@
+"""
+本地日线存储回填脚本
+
+为指定股票（默认：stocks表中所有未退市的A股）下载日线到本地OHLCV存储。
+已有数据的股票只追加最后交易日之后的缺失数据，可重复执行（适合每日收盘后定时运行）。
+
+用法:
+    python scripts/backfill_ohlcv.py [--symbols 600519 000858] [--days 750] [--batch 200]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import false, select  # noqa: E402
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.models.stock import Stock  # noqa: E402
+from app.utils.tushare_client import tushare_client  # noqa: E402
+
+
+async def load_symbols_from_db() -> list:
+    """查询stocks表中所有未退市的A股代码"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Stock.symbol).where(Stock.market == "A股", Stock.is_delisted == false(), Stock.is_deleted == false())
+        )
+        return [row[0] for row in result.all()]
+
+
+async def backfill(symbols: list, days: int, batch: int):
+    """分批回填日线"""
+    if not tushare_client.use_tushare and not tushare_client.use_akshare:
+        print("❌ 未配置数据源（Tushare/AkShare），无法回填日线")
+        return
+
+    print("=" * 60)
+    print(f"开始回填日线: {len(symbols)} 只股票，无本地数据时下载最近 {days} 个交易日")
+    print(f"存储目录: {tushare_client.ohlcv_store.root}")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    total_appended = 0
+    updated = 0
+
+    for start in range(0, len(symbols), batch):
+        chunk = symbols[start : start + batch]
+        appended = await tushare_client.refresh_daily_bars(chunk, history_days=days)
+        total_appended += sum(appended.values())
+        updated += sum(1 for count in appended.values() if count > 0)
+        print(f"  进度: {min(start + batch, len(symbols))}/{len(symbols)}，累计新增 {total_appended} 条日线")
+
+    print("=" * 60)
+    print(f"✅ 回填完成: {updated} 只股票有新增数据，共 {total_appended} 条，耗时 {time.perf_counter() - started:.1f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="本地日线存储回填")
+    parser.add_argument("--symbols", nargs="*", help="股票代码列表（默认读取stocks表）")
+    parser.add_argument("--days", type=int, default=750, help="无本地数据时下载的历史交易日数")
+    parser.add_argument("--batch", type=int, default=200, help="每批处理的股票数")
+    args = parser.parse_args()
+
+    symbols = args.symbols or await load_symbols_from_db()
+    if not symbols:
+        print("⚠️  没有需要回填的股票")
+        return
+
+    try:
+        await backfill(symbols, args.days, args.batch)
+    finally:
+        tushare_client.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
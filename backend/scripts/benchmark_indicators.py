@@ -0,0 +1,63 @@
+"""
+技术指标引擎性能测试脚本
+
+生成随机游走价格矩阵（默认 5000只股票 × 250个交易日），
+测量 compute_indicators / latest_indicators 的耗时与吞吐量。
+
+用法:
+    python scripts/benchmark_indicators.py [--symbols 5000] [--days 250] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.indicators import compute_indicators, latest_indicators  # noqa: E402
+
+
+def build_panel(symbols: int, days: int, seed: int = 42):
+    """生成随机游走OHLC价格矩阵"""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.02, size=(symbols, days))
+    close = 10 * np.exp(np.cumsum(returns, axis=1))
+    spread = np.abs(rng.normal(0, 0.01, size=(symbols, days))) * close
+    return close, close + spread, close - spread
+
+
+def run_benchmark(symbols: int, days: int, repeat: int):
+    """执行性能测试"""
+    close, high, low = build_panel(symbols, days)
+
+    print("=" * 60)
+    print(f"技术指标引擎性能测试: {symbols} 只股票 × {days} 个交易日")
+    print("=" * 60)
+
+    # 预热一次，排除首次调用开销
+    compute_indicators(close[:10], high[:10], low[:10])
+
+    for name, func in (("compute_indicators", compute_indicators), ("latest_indicators", latest_indicators)):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(close, high, low)
+            timings.append(time.perf_counter() - started)
+
+        best = min(timings)
+        print(f"{name}:")
+        print(f"  最快: {best * 1000:.1f} ms, 平均: {sum(timings) / len(timings) * 1000:.1f} ms")
+        print(f"  吞吐量: {symbols / best:,.0f} 只股票/秒, {symbols * days / best / 1e6:.1f} M 数据点/秒")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="技术指标引擎性能测试")
+    parser.add_argument("--symbols", type=int, default=5000, help="股票数量")
+    parser.add_argument("--days", type=int, default=250, help="交易日数量")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    run_benchmark(args.symbols, args.days, args.repeat)
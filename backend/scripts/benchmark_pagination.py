@@ -0,0 +1,131 @@
+"""
+分页查询性能测试脚本
+
+为一个测试用户批量生成交易记录（数据库端 generate_series，默认逐级增长到 100 万条），
+在每个数据量级上测量以下方式获取一页数据的耗时:
+
+- legacy:        旧实现（加载全部匹配行后 len() 计算总数 + OFFSET 分页）
+- count+offset:  paginate()（count(*) 统计总数 + OFFSET 分页）
+- keyset:        paginate_keyset()（按上一页末尾的排序键定位，不统计总数）
+
+legacy 耗时随数据量线性增长；keyset 在首页和深页都保持平稳。
+测试数据使用独立的 user_id，结束后自动删除（--keep 保留）。
+
+用法:
+    python scripts/benchmark_pagination.py [--sizes 10000 100000 1000000] [--page-size 20] [--repeat 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, false, select, text  # noqa: E402
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.models.trade import Trade  # noqa: E402
+from app.repositories.pagination import paginate, paginate_keyset  # noqa: E402
+
+BENCH_USER_ID = 900000001
+BENCH_ACCOUNT_ID = 900000001
+
+SEED_SQL = text(
+    """
+    INSERT INTO trades (user_id, account_id, symbol, stock_name, trade_type, quantity, price, total_amount,
+                        commission, stamp_duty, transfer_fee, net_amount, trade_date, is_deleted)
+    SELECT :user_id, :account_id, lpad((g % 5000)::text, 6, '6'), '测试股票',
+           CASE WHEN g % 2 = 0 THEN 'buy' ELSE 'sell' END,
+           100, 10, 1000, 0, 0, 0, 1000, now() - make_interval(mins => g), false
+    FROM generate_series(:start, :stop) AS g
+    """
+)
+
+
+async def seed(current: int, target: int):
+    """追加测试交易记录到目标数量"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            SEED_SQL, {"user_id": BENCH_USER_ID, "account_id": BENCH_ACCOUNT_ID, "start": current + 1, "stop": target}
+        )
+        await db.commit()
+        await db.execute(text("ANALYZE trades"))
+
+
+async def measure(func, repeat: int) -> float:
+    """重复执行取中位数（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await func(db)
+            timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def run_benchmark(sizes: list, page_size: int, repeat: int, keep: bool):
+    """执行性能测试"""
+    query = (
+        select(Trade)
+        .where(Trade.user_id == BENCH_USER_ID, Trade.is_deleted == false())
+        .order_by(Trade.trade_date.desc(), Trade.trade_id.desc())
+    )
+    keys = [Trade.trade_date, Trade.trade_id]
+
+    async def legacy(db, page):
+        result = await db.execute(query)
+        total = len(result.scalars().all())
+        result = await db.execute(query.offset((page - 1) * page_size).limit(page_size))
+        return list(result.scalars().all()), total
+
+    print("=" * 72)
+    print(f"分页查询性能测试: 每页 {page_size} 条，每项取 {repeat} 次中位数（毫秒）")
+    print("=" * 72)
+    print(f"{'数据量':>10} {'legacy首页':>12} {'count首页':>12} {'count深页':>12} {'keyset首页':>12} {'keyset深页':>12}")
+
+    current = 0
+    try:
+        for size in sorted(sizes):
+            await seed(current, size)
+            current = size
+
+            deep_page = size // page_size // 2
+
+            # 深页游标：取中间位置记录的排序键
+            async with AsyncSessionLocal() as db:
+                middle = (await db.execute(query.offset(deep_page * page_size - 1).limit(1))).scalar_one()
+                cursor = [middle.trade_date, middle.trade_id]
+
+            legacy_ms = await measure(lambda db: legacy(db, 1), repeat) if size <= 200000 else float("nan")
+            count_first = await measure(lambda db: paginate(db, query, 1, page_size), repeat)
+            count_deep = await measure(lambda db: paginate(db, query, deep_page, page_size), repeat)
+            keyset_first = await measure(lambda db: paginate_keyset(db, query, keys, page_size), repeat)
+            keyset_deep = await measure(lambda db: paginate_keyset(db, query, keys, page_size, after=cursor), repeat)
+
+            print(
+                f"{size:>10,} {legacy_ms:>12.1f} {count_first:>12.1f} {count_deep:>12.1f} "
+                f"{keyset_first:>12.1f} {keyset_deep:>12.1f}"
+            )
+    finally:
+        if not keep:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(Trade).where(Trade.user_id == BENCH_USER_ID))
+                await db.commit()
+        await engine.dispose()
+
+    print("=" * 72)
+    print("legacy 在数据量超过 20 万后跳过（NaN）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="分页查询性能测试")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10000, 100000, 1000000], help="交易记录数量级")
+    parser.add_argument("--page-size", type=int, default=20, help="每页数量")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    parser.add_argument("--keep", action="store_true", help="保留测试数据")
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.sizes, args.page_size, args.repeat, args.keep))
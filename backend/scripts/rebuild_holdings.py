@@ -0,0 +1,84 @@
+"""
+持仓全量重建脚本
+
+按全部交易记录重建每个账户的持仓（同 POST /holding/sync），每个账户单独提交。
+
+交易增删改会增量更新持仓，并在卖出超过持仓时拒绝交易；此前持仓只在手动同步时生成，
+从未同步或同步后又有交易的账户持仓不准确。上线增量更新前须先执行本脚本，之后可随时重复执行校正。
+
+用法:
+    python scripts/rebuild_holdings.py [--accounts 1 2 3]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import false, select  # noqa: E402
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.models.account import Account  # noqa: E402
+from app.services.holding.holding_sync_service import HoldingSyncService  # noqa: E402
+
+
+async def load_accounts(account_ids: list) -> list:
+    """查询需要重建持仓的账户 (account_id, user_id)（默认所有未删除的账户）"""
+    query = select(Account.account_id, Account.user_id).where(Account.is_deleted == false())
+    if account_ids:
+        query = query.where(Account.account_id.in_(account_ids))
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(query.order_by(Account.account_id))
+        return [(row.account_id, row.user_id) for row in result.all()]
+
+
+async def rebuild(accounts: list):
+    """逐个账户重建持仓（单个账户失败不影响其他账户）"""
+    print("=" * 60)
+    print(f"开始重建持仓: {len(accounts)} 个账户")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    service = HoldingSyncService()
+    failed = []
+
+    for account_id, user_id in accounts:
+        async with AsyncSessionLocal() as db:
+            try:
+                result = await service.execute(db, user_id, account_id)
+                await db.commit()
+                print(f"  账户 {account_id}: {result['total_holdings']} 个持仓，清仓 {result['closed_count']} 个")
+            except Exception as e:
+                await db.rollback()
+                failed.append(account_id)
+                print(f"  ❌ 账户 {account_id} 重建失败: {e}")
+
+    print("=" * 60)
+    print(
+        f"✅ 重建完成: {len(accounts) - len(failed)}/{len(accounts)} 个账户，耗时 {time.perf_counter() - started:.1f}s"
+    )
+    if failed:
+        print(f"⚠️  失败的账户: {failed}（可用 --accounts 重新执行）")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="持仓全量重建")
+    parser.add_argument("--accounts", nargs="*", type=int, help="账户ID列表（默认所有账户）")
+    args = parser.parse_args()
+
+    try:
+        accounts = await load_accounts(args.accounts)
+        if not accounts:
+            print("⚠️  没有需要重建持仓的账户")
+            return
+        await rebuild(accounts)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -20,7 +20,7 @@ Repository Template - {Module}数据访问层
 ✅ 不允许在Repository中进行数据计算
 ✅ 不允许在Repository中调用其他Repository
 ✅ 使用软删除（is_deleted字段）
-✅ 查询时默认过滤已删除记录
+✅ 查询时默认过滤已删除记录（继承 SoftDeleteQueryMixin，使用 self.not_deleted()）
 
 参考文档: backend/ARCHITECTURE.md
 """
@@ -29,12 +29,13 @@ from typing import List, Optional
 from sqlalchemy import select, update, and_, or_, desc, asc
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
+from app.repositories.soft_delete import SoftDeleteQueryMixin
 
 # TODO: 导入Model
 # from backend.app.models.{module} import {Module}
 
 
-class {Module}Repository:
+class {Module}Repository(SoftDeleteQueryMixin):
     """
     {Module}数据访问仓库
 
@@ -48,6 +49,9 @@ class {Module}Repository:
     - 不允许直接访问HTTP请求或用户信息
     """
 
+    # TODO: 指定Model（软删除条件 self.not_deleted() 依赖此属性）
+    # model = {Module}
+
     def __init__(self, db: AsyncSession):
         """
         初始化Repository
@@ -75,7 +79,7 @@ class {Module}Repository:
         # stmt = select({Module}).where(
         #     and_(
         #         {Module}.id == id,
-        #         {Module}.is_deleted == False
+        #         self.not_deleted()
         #     )
         # )
         # result = await self.db.execute(stmt)
@@ -97,7 +101,7 @@ class {Module}Repository:
         # stmt = select({Module}).where(
         #     and_(
         #         {Module}.user_id == user_id,
-        #         {Module}.is_deleted == False
+        #         self.not_deleted()
         #     )
         # ).order_by(desc({Module}.created_at))
         # result = await self.db.execute(stmt)
@@ -129,7 +133,7 @@ class {Module}Repository:
         # TODO: 构建查询条件
         # conditions = [
         #     {Module}.user_id == user_id,
-        #     {Module}.is_deleted == False
+        #     self.not_deleted()
         # ]
         #
         # # 添加筛选条件
@@ -203,7 +207,7 @@ class {Module}Repository:
         #     .where(
         #         and_(
         #             {Module}.id == id,
-        #             {Module}.is_deleted == False
+        #             self.not_deleted()
         #         )
         #     )
         #     .values(**data)
@@ -231,7 +235,7 @@ class {Module}Repository:
         #     .where(
         #         and_(
         #             {Module}.id == id,
-        #             {Module}.is_deleted == False
+        #             self.not_deleted()
         #         )
         #     )
         #     .values(
@@ -264,7 +268,7 @@ class {Module}Repository:
         # stmt = select({Module}).where(
         #     and_(
         #         {Module}.name == name,
-        #         {Module}.is_deleted == False
+        #         self.not_deleted()
         #     )
         # )
         # result = await self.db.execute(stmt)
@@ -287,7 +291,7 @@ class {Module}Repository:
         # stmt = select({Module}.id).where(
         #     and_(
         #         {Module}.name == conditions.get("name"),
-        #         {Module}.is_deleted == False
+        #         self.not_deleted()
         #     )
         # ).limit(1)
         # result = await self.db.execute(stmt)
@@ -309,7 +313,7 @@ class {Module}Repository:
         # TODO: 实现计数逻辑
         # conditions = [
         #     {Module}.user_id == user_id,
-        #     {Module}.is_deleted == False
+        #     self.not_deleted()
         # ]
         #
         # if "status" in filters:
@@ -338,7 +342,7 @@ class {Module}Repository:
         # stmt = select({Module}).where(
         #     and_(
         #         {Module}.id.in_(ids),
-        #         {Module}.is_deleted == False
+        #         self.not_deleted()
         #     )
         # )
         # result = await self.db.execute(stmt)
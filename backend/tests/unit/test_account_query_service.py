@@ -0,0 +1,76 @@
+"""
+账户列表查询服务单元测试（SQLite内存库）
+"""
+
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models.account import Account
+from app.models.holding import Holding
+from app.services.account.account_query_service import AccountQueryService
+
+
+@pytest_asyncio.fixture
+async def db():
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Account.__table__.create(sync_conn))
+        await conn.run_sync(lambda sync_conn: Holding.__table__.create(sync_conn))
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add_all(
+            [
+                Account(account_id=i, user_id=1, account_name=f"账户{i}", market="A股", available_cash=Decimal("1000"))
+                for i in range(1, 21)
+            ]
+        )
+        for account_id in (1, 2):
+            session.add_all(
+                [
+                    Holding(
+                        holding_id=account_id * 10 + i,
+                        user_id=1,
+                        account_id=account_id,
+                        symbol=f"60000{i}",
+                        stock_name="测试",
+                        quantity=Decimal("100"),
+                        avg_cost=Decimal("10"),
+                        current_price=Decimal("12"),
+                        is_deleted=(i == 3),
+                    )
+                    for i in range(1, 4)
+                ]
+            )
+        await session.commit()
+
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        session.info["statements"] = statements
+        yield session
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_account_list_loads_holding_stats_in_one_query(db):
+    """20个账户的持仓统计由一条分组查询得到，已删除持仓不计入"""
+    result = await AccountQueryService().execute(db, user_id=1, page=1, page_size=20)
+
+    holding_queries = [sql for sql in db.info["statements"] if "FROM holdings" in sql]
+    assert len(holding_queries) == 1
+    assert "GROUP BY holdings.account_id" in holding_queries[0]
+
+    items = {item["account_id"]: item for item in result["items"]}
+    assert len(items) == 20
+    assert items[1]["holding_count"] == 2
+    assert items[1]["total_value"] == 2400.0
+    assert items[1]["total_cost"] == 2000.0
+    assert items[1]["total_pnl_rate"] == 20.0
+    assert items[3]["holding_count"] == 0 and items[3]["total_value"] == 0.0
+    assert items[3]["current_capital"] == 1000.0
@@ -0,0 +1,160 @@
+"""
+AI对话服务单元测试（SQLite内存库，消息逐条追加到 ai_messages）
+"""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Integer, MetaData, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.exceptions import ConversationAccessDenied
+from app.models.ai_decision import AIConversation, AIMessage
+from app.models.stock import Stock
+from app.services.ai import ai_chat_service as module
+from app.services.ai.ai_chat_service import AIChatService
+
+
+@pytest_asyncio.fixture
+async def db():
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    # SQLite 只有 INTEGER 主键自增，这里复制表结构并替换主键类型
+    metadata = MetaData()
+    for model, key in ((AIConversation, "conversation_id"), (AIMessage, "message_id"), (Stock, "stock_id")):
+        table = model.__table__.to_metadata(metadata)
+        table.c[key].type = Integer()
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        session.info["statements"] = statements
+        yield session
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_send_message_appends_rows_and_reads_recent_history(db, monkeypatch):
+    """每轮追加两条消息行并累计Token；预算内的历史全部放入Prompt且不重复本次用户消息"""
+    prompts = []
+
+    async def fake_chat_completion(messages, **kwargs):
+        prompts.append(messages)
+        return f"回复{len(prompts)}"
+
+    monkeypatch.setattr(module.ai_client, "chat_completion", fake_chat_completion)
+    service = AIChatService()
+
+    for turn in range(1, 8):
+        # 每轮模拟一个新请求（请求内会话缓存随数据库会话创建）
+        db.info["statements"].clear()
+        db.info.pop(module._CONVERSATION_CACHE_KEY, None)
+        reply = await service.send_message(db, user_id=1, session_id="s1", message=f"问题{turn}")
+
+    # 1. 最后一轮：system + 前6轮历史 + 本次用户消息（未超出预算，不生成摘要）
+    prompt = prompts[-1]
+    assert len(prompt) == 14
+    assert prompt[1] == {"role": "user", "content": "问题1"}
+    assert prompt[-2] == {"role": "assistant", "content": "回复6"}
+    assert prompt[-1] == {"role": "user", "content": "问题7"}
+    assert reply["role"] == "assistant" and reply["content"] == "回复7" and reply["message_id"]
+
+    # 2. 会话只按 session_id 查询一次；写入为两条 INSERT ... SELECT 和一条原子累加Token的 UPDATE
+    conversation_queries = [sql for sql in db.info["statements"] if "FROM ai_conversations" in sql]
+    assert len(conversation_queries) == 1
+    assert "ai_conversations.session_id = ?" in conversation_queries[0]
+    assert "ai_conversations.user_id = ?" in conversation_queries[0]
+    writes = [sql for sql in db.info["statements"] if not sql.startswith("SELECT")]
+    assert len(writes) == 3
+    assert all(sql.startswith("INSERT INTO ai_messages") and "SELECT" in sql for sql in writes[:2])
+    assert writes[2].startswith("UPDATE ai_conversations SET total_tokens=")
+
+    # 3. 历史按 seq 取最近N条
+    history = await service.get_history(db, user_id=1, session_id="s1", limit=3)
+    assert [(item["seq"], item["content"]) for item in history["messages"]] == [
+        (12, "回复6"),
+        (13, "问题7"),
+        (14, "回复7"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_old_turns_fold_into_running_summary(db, monkeypatch):
+    """超出Token预算的旧消息折叠进滚动摘要，之后只读取摘要之后的消息；每轮Token计入 total_tokens"""
+    monkeypatch.setattr(settings, "AI_CHAT_CONTEXT_TOKENS", 400)
+    monkeypatch.setattr(settings, "AI_CHAT_SUMMARY_TOKENS", 50)
+    prompts, summaries = [], []
+
+    async def fake_chat_completion(messages, **kwargs):
+        if messages[0]["content"].startswith("你负责压缩"):
+            summaries.append(messages[1]["content"])
+            return f"摘要{len(summaries)}"
+        prompts.append(messages)
+        return "回复" + "很长" * 40
+
+    monkeypatch.setattr(module.ai_client, "chat_completion", fake_chat_completion)
+    service = AIChatService()
+
+    for turn in range(1, 7):
+        db.info.pop(module._CONVERSATION_CACHE_KEY, None)
+        await service.send_message(db, user_id=1, session_id="s1", message=f"问题{turn}")
+
+    conv = await service.conversation_repo.get_by_session(db, 1, "s1")
+    await db.refresh(conv)
+
+    # 1. 发生过折叠：摘要在系统提示中，已折叠的消息不再出现在Prompt里
+    assert len(summaries) == 2 and conv.summary == "摘要2"
+    assert "早期对话摘要" in prompts[-1][0]["content"] and conv.summary in prompts[-1][0]["content"]
+    assert {"role": "user", "content": "问题1"} not in prompts[-1]
+    assert prompts[-1][-1] == {"role": "user", "content": "问题6"}
+
+    # 2. 第二次摘要在上一次摘要的基础上合并（增量更新），只带新折叠的消息
+    assert "摘要1" in summaries[1] and "问题1" not in summaries[1]
+
+    # 3. 每轮Prompt都在预算内；Token累计到会话
+    assert all(module.estimate_messages_tokens(prompt) <= settings.AI_CHAT_CONTEXT_TOKENS for prompt in prompts)
+    assert conv.total_tokens >= sum(module.estimate_messages_tokens(prompt) for prompt in prompts)
+    assert conv.summary_seq > 0
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_scoped_to_their_owner(db):
+    """会话按 session_id + user_id 查询：上下文股票代码不再被会话ID覆盖，其他用户不能读取或占用"""
+    service = AIChatService()
+    session = await service.create_session(db, user_id=1, context_symbol="600519", context_type="stock")
+
+    conv = await service.conversation_repo.get_by_session(db, 1, session["session_id"])
+    assert conv.context_symbol == "600519"
+
+    # 其他用户：查不到历史，删除无效，发送消息被拒绝
+    assert (await service.get_history(db, user_id=2, session_id=session["session_id"]))["total"] == 0
+    assert (await service.delete_session(db, user_id=2, session_id=session["session_id"]))["deleted_count"] == 0
+    with pytest.raises(ConversationAccessDenied):
+        await service.send_message(db, user_id=2, session_id=session["session_id"], message="你好")
+
+    # 保存点回滚后，原会话不受影响
+    assert (await service.delete_session(db, user_id=1, session_id=session["session_id"]))["deleted_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_message_reuses_winning_session(db):
+    """同一用户并发创建同一会话时，插入冲突的请求返回先创建的会话，而不是拒绝访问"""
+    repo = AIChatService().conversation_repo
+    winner = await repo.create_or_get(db, user_id=1, session_id="s-race")
+
+    # 模拟本请求查询时对方尚未插入：首次查询返回None，插入与对方的记录冲突
+    get_by_session = repo.get_by_session
+    lookups = []
+
+    async def racing_get_by_session(db, user_id, session_id):
+        lookups.append(session_id)
+        return None if len(lookups) == 1 else await get_by_session(db, user_id, session_id)
+
+    repo.get_by_session = racing_get_by_session
+    assert await repo.create_or_get(db, user_id=1, session_id="s-race") is winner
+    assert await repo.create_or_get(db, user_id=2, session_id="s-race") is None
@@ -0,0 +1,177 @@
+"""
+AIClient 单元测试
+
+使用 httpx.MockTransport 模拟AI后端，覆盖连接池复用、熔断器、后端选择与流式响应。
+"""
+import json
+
+import httpx
+import pytest
+
+from app.utils.ai_client import AIClient, CircuitBreaker
+from app.utils.sse import format_sse
+
+MESSAGES = [{"role": "user", "content": "你好"}]
+
+
+def _mock_client(base_url: str, handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url=base_url, transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_ollama_reuses_pooled_client_without_health_probe():
+    """多次调用复用同一连接池，且不再请求 /api/tags"""
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        return httpx.Response(200, json={"response": "ok"})
+
+    client = AIClient()
+    client._local_client = _mock_client(client.local_url, handler)
+    pooled = client._get_local_client()
+
+    for _ in range(3):
+        assert await client.chat_completion(MESSAGES) == "ok"
+
+    assert paths == ["/api/generate"] * 3
+    assert client._get_local_client() is pooled
+
+    await client.shutdown()
+    assert client._local_client is None
+
+
+@pytest.mark.asyncio
+async def test_failed_backend_is_skipped_until_cooldown():
+    """后端失败后熔断，冷却期内直接跳过，冷却结束后重新尝试"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = AIClient()
+    client.deepseek_key = ""
+    client._local_client = _mock_client(client.local_url, handler)
+
+    first = await client.chat_completion(MESSAGES)
+    second = await client.chat_completion(MESSAGES)
+
+    assert "Mock AI响应" in first and "Mock AI响应" in second
+    assert len(calls) == 1
+    assert client.breakers["ollama"].state == "open"
+
+    client.breakers["ollama"].cooldown = 0
+    await client.chat_completion(MESSAGES)
+    assert len(calls) == 2
+
+    await client.shutdown()
+
+
+def test_breaker_opens_on_error_rate_and_probes_once():
+    """错误率超过阈值熔断；冷却后只放行一个探测请求，探测失败冷却翻倍"""
+    breaker = CircuitBreaker("test", cooldown=0, max_cooldown=10, min_requests=4, error_rate_threshold=0.5)
+
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure("boom")
+    assert breaker.state == "closed"
+    breaker.record_failure("boom")
+    assert breaker.state == "open"
+
+    assert breaker.try_acquire()
+    assert breaker.state == "half_open"
+    assert not breaker.try_acquire()
+
+    breaker.base_cooldown = breaker.cooldown = 1
+    breaker.record_failure("still down")
+    assert breaker.state == "open"
+    assert breaker.cooldown == 2
+    assert not breaker.is_available()
+
+
+def test_breaker_recovers_after_successful_probe():
+    """探测成功后恢复closed并重置统计窗口"""
+    breaker = CircuitBreaker("test", cooldown=0)
+    breaker.record_failure("refused", unreachable=True)
+    assert breaker.state == "open"
+
+    assert breaker.try_acquire()
+    breaker.record_success(0.2)
+
+    snapshot = breaker.snapshot()
+    assert snapshot["state"] == "closed"
+    assert snapshot["window_requests"] == 0
+    assert snapshot["latency_ewma_ms"] == 200.0
+
+
+def test_select_backends_fastest_healthy_first():
+    """健康后端按EWMA延迟排序，熔断中的后端不参与选择"""
+    client = AIClient()
+    client.deepseek_key = "sk-test"
+
+    assert client.select_backends() == ["ollama", "deepseek"]
+
+    client.breakers["ollama"].record_success(2.0)
+    client.breakers["deepseek"].record_success(0.5)
+    assert client.select_backends() == ["deepseek", "ollama"]
+
+    client.breakers["deepseek"].record_failure("refused", unreachable=True)
+    assert client.select_backends() == ["ollama"]
+    assert client.get_diagnostics()["selection_order"] == ["ollama", "mock"]
+
+
+@pytest.mark.asyncio
+async def test_stream_ollama_ndjson():
+    """Ollama流式响应按NDJSON逐段返回"""
+    body = "\n".join(
+        [
+            json.dumps({"response": "价值", "done": False}),
+            json.dumps({"response": "投资", "done": False}),
+            json.dumps({"response": "", "done": True}),
+        ]
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content=body.encode())
+
+    client = AIClient()
+    client._local_client = _mock_client(client.local_url, handler)
+
+    chunks = [chunk async for chunk in client.stream_chat_completion(MESSAGES)]
+
+    assert chunks == ["价值", "投资"]
+    assert client.last_backend == "ollama"
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stream_falls_back_to_deepseek_sse():
+    """Ollama不可达时切换到DeepSeek，按SSE解析增量内容"""
+    events = [
+        {"choices": [{"delta": {"role": "assistant"}}]},
+        {"choices": [{"delta": {"content": "你"}}]},
+        {"choices": [{"delta": {"content": "好"}}]},
+    ]
+    body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+
+    def refuse(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = AIClient()
+    client.deepseek_key = "sk-test"
+    client._local_client = _mock_client(client.local_url, refuse)
+    client._deepseek_client = _mock_client(client.deepseek_url, lambda request: httpx.Response(200, content=body))
+
+    chunks = [chunk async for chunk in client.stream_chat_completion(MESSAGES)]
+
+    assert chunks == ["你", "好"]
+    assert client.breakers["ollama"].state == "open"
+    assert client.last_backend == "deepseek"
+    await client.shutdown()
+
+
+def test_format_sse():
+    """SSE消息格式：event行 + JSON data行 + 空行"""
+    assert format_sse({"content": "你好"}, "token") == 'event: token\ndata: {"content": "你好"}\n\n'
@@ -0,0 +1,142 @@
+"""
+AI响应缓存单元测试
+
+使用 httpx.MockTransport 模拟AI后端，覆盖内容寻址缓存、并发合并、Mock及无法解析的响应不缓存与按分析类型的TTL。
+"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.utils import ai_client as ai_client_module
+from app.utils.ai_client import AIClient
+from app.utils.ai_response_cache import DAILY_REVIEW, STOCK_ANALYSIS, AIResponseCache, cache_ttl_for
+from app.utils.market_calendar import MARKET_TZ
+
+MESSAGES = [
+    {"role": "system", "content": "你是投资分析师"},
+    {"role": "user", "content": "请分析股票：贵州茅台（600519）"},
+]
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = AIResponseCache(backend="memory", max_size=2, redis_url="")
+    monkeypatch.setattr(ai_client_module, "ai_response_cache", cache)
+    return cache
+
+
+def _client(handler) -> AIClient:
+    client = AIClient()
+    client.deepseek_key = ""
+    client._local_client = httpx.AsyncClient(base_url=client.local_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_call(cache):
+    """相同请求并发时只调用一次AI，之后命中缓存；参数不同则换成新的缓存键"""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"response": f"分析{len(calls)}"})
+
+    client = _client(handler)
+
+    replies = await asyncio.gather(*[client.chat_completion(MESSAGES, max_tokens=2000, cache_ttl=60) for _ in range(5)])
+    assert replies == ["分析1"] * 5
+    assert await client.chat_completion(MESSAGES, max_tokens=2000, cache_ttl=60) == "分析1"
+    assert len(calls) == 1
+
+    # 不传 cache_ttl 不经过缓存；max_tokens 不同是不同的缓存键
+    assert await client.chat_completion(MESSAGES, max_tokens=2000) == "分析2"
+    assert await client.chat_completion(MESSAGES, max_tokens=1500, cache_ttl=60) == "分析3"
+
+    # 流式调用命中同一缓存
+    assert [chunk async for chunk in client.stream_chat_completion(MESSAGES, max_tokens=2000, cache_ttl=60)] == [
+        "分析1"
+    ]
+
+    metrics = cache.snapshot()
+    assert (metrics["misses"], metrics["coalesced"], metrics["hits"]) == (2, 4, 2)
+    assert metrics["size"] == 2 and metrics["inflight"] == 0
+    await client.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_mock_and_failed_responses_are_not_cached(cache):
+    """所有后端不可用时的Mock响应、未通过校验的响应不缓存；缓存条目过期后重新调用"""
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = _client(unreachable)
+    assert "Mock AI响应" in await client.chat_completion(MESSAGES, cache_ttl=60)
+    assert cache.snapshot()["stores"] == 0
+    await client.shutdown()
+
+    # 未通过调用方校验（无法解析）的响应不缓存，下次重新调用
+    replies = iter(["不是JSON", '{"ai_score": 80}'])
+    client = _client(lambda request: httpx.Response(200, json={"response": next(replies)}))
+    for _ in range(2):
+        await client.chat_completion(MESSAGES, cache_ttl=60, validate=json.loads)
+    assert await client.chat_completion(MESSAGES, cache_ttl=60, validate=json.loads) == '{"ai_score": 80}'
+    assert cache.snapshot()["stores"] == 1
+    await client.shutdown()
+
+    cache.set("key", "旧分析", ttl=0.01)
+    await asyncio.sleep(0.02)
+    assert await cache.get("key") is None
+
+
+def test_cache_ttl_follows_market_sessions(monkeypatch):
+    """交易时段使用短TTL；午休与收盘后缓存到下一交易时段开盘（有上限）；复盘使用固定TTL"""
+    monkeypatch.setattr(settings, "AI_RESPONSE_CACHE_TTL_TRADING", 60.0)
+    monkeypatch.setattr(settings, "AI_RESPONSE_CACHE_TTL_CLOSED", 43200.0)
+
+    def at(*args):
+        return datetime(*args, tzinfo=MARKET_TZ)
+
+    assert cache_ttl_for(STOCK_ANALYSIS, at(2025, 11, 18, 10, 0)) == 60.0  # 周二上午
+    assert cache_ttl_for(STOCK_ANALYSIS, at(2025, 11, 18, 12, 0)) == 3600.0  # 午休，13:00开盘
+    assert cache_ttl_for(STOCK_ANALYSIS, at(2025, 11, 18, 23, 0)) == 10 * 3600 + 15 * 60  # 次日9:15开盘
+    assert cache_ttl_for(STOCK_ANALYSIS, at(2025, 11, 22, 10, 0)) == 43200.0  # 周六，上限
+    assert cache_ttl_for(DAILY_REVIEW, at(2025, 11, 18, 10, 0)) == settings.AI_RESPONSE_CACHE_TTL_REVIEW
+
+
+def test_redis_client_is_bound_to_event_loop(monkeypatch):
+    """每个事件循环使用各自的Redis客户端；aclose 等待后台写入并关闭客户端"""
+    import redis.asyncio as aioredis
+
+    class FakeRedis:
+        def __init__(self):
+            self.values, self.closed = {}, False
+
+        async def set(self, key, value, px):
+            await asyncio.sleep(0.01)
+            self.values[key] = value
+
+        async def aclose(self):
+            self.closed = True
+
+    clients = []
+    monkeypatch.setattr(aioredis, "from_url", lambda url: clients.append(FakeRedis()) or clients[-1])
+    cache = AIResponseCache(backend="redis", max_size=2, redis_url="redis://test")
+
+    async def task(key):
+        cache.set(key, "分析", ttl=60)
+        await cache.aclose()
+
+    # 模拟两个任务各自运行在新的事件循环中（asyncio.run）
+    asyncio.run(task("a"))
+    asyncio.run(task("b"))
+
+    assert len(clients) == 2
+    assert [list(client.values) for client in clients] == [["ai_response:a"], ["ai_response:b"]]
+    assert all(client.closed for client in clients)
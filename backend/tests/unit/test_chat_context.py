@@ -0,0 +1,32 @@
+"""
+对话上下文Token预算单元测试
+"""
+
+from app.utils.chat_context import estimate_tokens, split_history, truncate_to_tokens
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+    """中文按字计数，其余字符按4个字符1个Token"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("贵州茅台") == 4
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("买入600519") == 2 + 2
+
+    text = "今天大盘怎么样" * 10
+    assert estimate_tokens(truncate_to_tokens(text, 15)) == 15
+    assert truncate_to_tokens(text, 1000) == text
+
+
+def test_split_history_folds_oldest_with_headroom():
+    """放得下时不折叠；超出预算或条数上限时只保留一半预算内的最新消息"""
+    history = [{"seq": seq, "role": "user", "content": "x", "tokens": 6} for seq in range(1, 9)]  # 每条10 Token
+
+    assert split_history(history, 80) == ([], history)
+
+    overflow, kept = split_history(history, 60)
+    assert [item["seq"] for item in overflow] == [1, 2, 3, 4, 5]
+    assert [item["seq"] for item in kept] == [6, 7, 8]
+
+    overflow, kept = split_history(history, 1000, max_messages=8)
+    assert [item["seq"] for item in kept] == [5, 6, 7, 8]
+    assert len(overflow) == 4
@@ -0,0 +1,281 @@
+"""
+AI每日批量分析服务单元测试（本地任务队列，内存仓储）
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.exceptions import ResourceNotFound
+from app.services.ai import daily_analysis_service as module
+from app.services.ai import symbol_snapshot_service as snapshot_module
+from app.services.ai.daily_analysis_service import DailyAnalysisConverter, DailyAnalysisService
+from app.tasks import task_queue
+
+
+class FakeDB:
+    def __init__(self):
+        self.commits = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeStockRepo:
+    def __init__(self):
+        self.calls = []
+
+    async def get_by_symbols(self, db, symbols):
+        self.calls.append(list(symbols))
+        return [SimpleNamespace(symbol=symbol, name=f"股票{symbol}") for symbol in symbols]
+
+
+class FakeDecisionRepo:
+    def __init__(self):
+        self.rows = {}
+
+    async def create(self, db, decision_data):
+        decision = SimpleNamespace(decision_id=len(self.rows) + 1, created_at=None, **decision_data)
+        self.rows[decision.decision_id] = decision
+        return decision
+
+    async def get_by_ids(self, db, decision_ids):
+        return [self.rows[decision_id] for decision_id in sorted(decision_ids)]
+
+
+class FakeSnapshotRepo:
+    def __init__(self):
+        self.rows = []
+        self.lookups = []
+
+    async def get_live_by_hashes(self, db, input_hashes, now):
+        self.lookups.append(sorted(input_hashes))
+        return [row for row in self.rows if row.input_hash in input_hashes and row.expires_at > now]
+
+    async def create(self, db, snapshot_data):
+        snapshot = SimpleNamespace(snapshot_id=len(self.rows) + 1, **snapshot_data)
+        self.rows.append(snapshot)
+        return snapshot
+
+
+class FakeTaskRepo:
+    def __init__(self):
+        self.rows = {}
+
+    async def get_by_id(self, db, task_id):
+        return self.rows.get(task_id)
+
+    async def create(self, db, task_data):
+        task = SimpleNamespace(error_message=None, created_at=None, completed_at=None, **task_data)
+        self.rows[task.task_id] = task
+        return task
+
+    async def update(self, db, task, update_data):
+        for key, value in update_data.items():
+            setattr(task, key, value)
+        return task
+
+
+@pytest.fixture
+def service(monkeypatch):
+    decision_repo = FakeDecisionRepo()
+    task_repo = FakeTaskRepo()
+    stock_repo = FakeStockRepo()
+    snapshot_repo = FakeSnapshotRepo()
+
+    def build():
+        instance = DailyAnalysisService.__new__(DailyAnalysisService)
+        instance.ai_decision_repo = decision_repo
+        instance.ai_task_repo = task_repo
+        instance.stock_repo = stock_repo
+        instance.snapshot_repo = snapshot_repo
+        return instance
+
+    async def fetch_batch(symbols):
+        return {symbol: {"quote": {"price": 10.0}} for symbol in symbols}
+
+    # 后台任务（本地队列）中新建的Service与测试共用同一组内存仓储
+    monkeypatch.setattr(module, "DailyAnalysisService", build)
+    monkeypatch.setattr(module, "AsyncSessionLocal", FakeDB)
+    monkeypatch.setattr(module.settings, "TASK_QUEUE_BACKEND", "local")
+    monkeypatch.setattr(DailyAnalysisConverter, "fetch_stock_data_batch", staticmethod(fetch_batch))
+    monkeypatch.setattr(task_queue, "_local_tasks", {})
+    return build()
+
+
+async def _wait_for_background_tasks():
+    await asyncio.gather(*list(task_queue._local_tasks))
+
+
+@pytest.mark.asyncio
+async def test_create_returns_immediately_and_results_track_progress(service, monkeypatch):
+    """创建接口立即返回pending任务，后台并发分析，结果按任务ID查询"""
+    monkeypatch.setattr(module.settings, "AI_BATCH_LLM_CONCURRENCY", 3)
+    monkeypatch.setattr(module, "_semaphores", {})
+    release = asyncio.Event()
+    active = 0
+    peak = 0
+
+    async def analyze(symbol, stock_name, stock_data=None):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await release.wait()
+        await asyncio.sleep(0.01)
+        active -= 1
+        return DailyAnalysisConverter._get_default_analysis(symbol, stock_name), False
+
+    monkeypatch.setattr(DailyAnalysisConverter, "analyze_stock", staticmethod(analyze))
+
+    symbols = [f"6000{i:02d}" for i in range(10)]
+    db = FakeDB()
+    created = await service.create_task(db, user_id=1, stock_symbols=symbols + symbols[:2])
+
+    assert created["status"] == "pending"
+    assert created["total_stocks"] == 10
+
+    # 后台任务已开始，但尚无结果
+    await asyncio.sleep(0.01)
+    pending = await service.get_results(db, user_id=1, task_id=created["task_id"])
+    assert pending["status"] == "processing"
+    assert pending["progress"] == 0.0
+
+    release.set()
+    await _wait_for_background_tasks()
+
+    result = await service.get_results(db, user_id=1, task_id=created["task_id"])
+    assert peak == 3
+    assert service.stock_repo.calls == [symbols]
+    assert result["status"] == "completed"
+    assert result["progress"] == 100.0
+    assert sorted(item["symbol"] for item in result["results"]) == symbols
+    assert result["results"][0]["stock_name"].startswith("股票")
+
+
+@pytest.mark.asyncio
+async def test_failures_are_reported_per_symbol(service, monkeypatch):
+    """单只股票失败不影响其他股票，失败原因逐只返回"""
+
+    async def analyze(symbol, stock_name, stock_data=None):
+        if symbol == "000858":
+            raise RuntimeError("上游超时")
+        return DailyAnalysisConverter._get_default_analysis(symbol, stock_name), False
+
+    monkeypatch.setattr(DailyAnalysisConverter, "analyze_stock", staticmethod(analyze))
+
+    created = await service.create_task(FakeDB(), user_id=1, stock_symbols=["600519", "000858"])
+    await _wait_for_background_tasks()
+    result = await service.get_results(FakeDB(), user_id=1, task_id=created["task_id"])
+
+    assert result["status"] == "partial"
+    assert result["processed_stocks"] == 1
+    assert result["failures"] == [{"symbol": "000858", "error": "上游超时"}]
+
+    # 其他用户无法查询
+    with pytest.raises(ResourceNotFound):
+        await service.get_results(FakeDB(), user_id=2, task_id=created["task_id"])
+
+
+@pytest.mark.asyncio
+async def test_redelivered_task_skips_finished_symbols(service, monkeypatch):
+    """任务重新投递时只分析尚无结果的股票"""
+    analyzed = []
+
+    async def analyze(symbol, stock_name, stock_data=None):
+        analyzed.append(symbol)
+        return DailyAnalysisConverter._get_default_analysis(symbol, stock_name), False
+
+    monkeypatch.setattr(DailyAnalysisConverter, "analyze_stock", staticmethod(analyze))
+
+    task = await service.ai_task_repo.create(
+        None,
+        {
+            "task_id": "t-1",
+            "user_id": 1,
+            "status": "processing",
+            "stock_symbols": ["600519", "000858"],
+            "total_stocks": 2,
+            "processed_stocks": 1,
+            "failed_stocks": 0,
+            "results": [{"symbol": "600519", "status": "success", "decision_id": 99}],
+        },
+    )
+    await service.run_task("t-1")
+
+    assert analyzed == ["000858"]
+    assert task.status == "completed"
+    assert [item["symbol"] for item in task.results] == ["600519", "000858"]
+
+
+@pytest.mark.asyncio
+async def test_symbol_limit_is_configurable(service, monkeypatch):
+    """单次分析数量上限由配置决定"""
+    monkeypatch.setattr(module.settings, "AI_BATCH_MAX_SYMBOLS", 2)
+
+    with pytest.raises(ValueError):
+        await service.create_task(FakeDB(), user_id=1, stock_symbols=["600519", "000858", "300750"])
+
+
+@pytest.mark.asyncio
+async def test_overlapping_holdings_reuse_symbol_snapshots(service, monkeypatch):
+    """不同用户的任务分析相同股票时复用个股分析快照，每只股票只调用一次AI；默认分析结果不共享"""
+    analyzed = []
+
+    async def analyze(symbol, stock_name, stock_data=None):
+        analyzed.append(symbol)
+        if symbol == "300750":
+            return DailyAnalysisConverter._get_default_analysis(symbol, stock_name), False
+        return {"ai_score": {"overall_score": 80}, "ai_suggestion": f"看好{symbol}", "confidence_level": 70.0}, True
+
+    monkeypatch.setattr(DailyAnalysisConverter, "analyze_stock", staticmethod(analyze))
+    monkeypatch.setattr(snapshot_module, "cache_ttl_for", lambda analysis_type: 60.0)
+
+    first = await service.create_task(FakeDB(), user_id=1, stock_symbols=["600519", "000858", "300750"])
+    await _wait_for_background_tasks()
+    second = await service.create_task(FakeDB(), user_id=2, stock_symbols=["000858", "600519", "300750", "601318"])
+    await _wait_for_background_tasks()
+
+    # 1. 第二个任务只分析新股票和没有快照的股票
+    assert sorted(analyzed) == sorted(["600519", "000858", "300750", "300750", "601318"])
+    assert sorted(row.symbol for row in service.snapshot_repo.rows) == ["000858", "600519", "601318"]
+    assert len(service.snapshot_repo.lookups) == 2
+
+    # 2. 两个用户的决策引用同一快照，结果字段一致
+    first_result = await service.get_results(FakeDB(), user_id=1, task_id=first["task_id"])
+    second_result = await service.get_results(FakeDB(), user_id=2, task_id=second["task_id"])
+    assert second_result["status"] == "completed"
+    decisions = {(row.user_id, row.symbol): row for row in service.ai_decision_repo.rows.values()}
+    assert decisions[(1, "600519")].snapshot_id == decisions[(2, "600519")].snapshot_id is not None
+    assert decisions[(2, "600519")].ai_suggestion == "看好600519"
+    assert decisions[(2, "300750")].snapshot_id is None
+    assert len(first_result["results"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_shutdown_marks_interrupted_local_tasks_failed(service, monkeypatch):
+    """应用关闭时取消本地后台任务，被中断的任务标记为失败而不是一直显示为执行中"""
+    started = asyncio.Event()
+
+    async def analyze(symbol, stock_name, stock_data=None):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(DailyAnalysisConverter, "analyze_stock", staticmethod(analyze))
+
+    created = await service.create_task(FakeDB(), user_id=1, stock_symbols=["600519"])
+    await started.wait()
+    await task_queue.shutdown_local_tasks()
+
+    result = await service.get_results(FakeDB(), user_id=1, task_id=created["task_id"])
+    assert result["status"] == "failed"
+    assert task_queue._local_tasks == {}
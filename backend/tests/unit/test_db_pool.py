@@ -0,0 +1,58 @@
+"""
+数据库连接池配置与指标单元测试（SQLite文件库）
+"""
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.db_pool import InstrumentedAsyncPool, build_engine_options
+
+
+def test_engine_options_from_settings(monkeypatch):
+    """连接池参数来自配置；asyncpg 连接附带语句缓存参数，关闭复用时语句名唯一"""
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+    monkeypatch.setattr(settings, "DB_PREPARED_STATEMENT_CACHE_SIZE", 0)
+
+    options = build_engine_options("postgresql+asyncpg://u:p@localhost/db")
+
+    assert options["poolclass"] is InstrumentedAsyncPool
+    assert options["pool_pre_ping"] is False
+    assert options["pool_size"] == settings.DB_POOL_SIZE
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    name_func = options["connect_args"]["prepared_statement_name_func"]
+    assert name_func() != name_func()
+    assert "connect_args" not in build_engine_options("sqlite+aiosqlite://")
+
+
+@pytest.mark.asyncio
+async def test_pool_records_overflow_and_timeouts(tmp_path):
+    """连接池满后新建溢出连接、再满则超时，均计入指标"""
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedAsyncPool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    pool = engine.sync_engine.pool
+
+    first = await engine.connect()
+    second = await engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        await engine.connect()
+
+    status = pool.status_snapshot()
+    assert (status["checked_out"], status["overflow"]) == (2, 1)
+    assert status["checkouts"] == 2
+    assert status["overflow_events"] == 1
+    assert status["max_checked_out"] == 2
+    assert status["timeouts"] == 1
+    assert status["max_wait_ms"] >= 50
+
+    await first.close()
+    await second.close()
+    assert pool.status_snapshot()["checked_out"] == 0
+    await engine.dispose()
@@ -0,0 +1,90 @@
+"""
+交易导出单元测试（SQLite内存库，流式读取）
+"""
+
+import csv
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.exceptions import ResourceNotFound, ValidationError
+from app.models.trade import Trade
+from app.services.export.export_service import ExportService
+
+
+@pytest_asyncio.fixture
+async def db():
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Trade.__table__.create(sync_conn))
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        # 插入顺序与成交时间相反，另有一条已删除、一条其他用户的交易
+        session.add_all(
+            [
+                Trade(
+                    trade_id=i,
+                    user_id=2 if i == 9 else 1,
+                    account_id=1,
+                    symbol="600519",
+                    stock_name="贵州茅台",
+                    trade_type="buy" if i % 2 else "sell",
+                    quantity=Decimal("100"),
+                    price=Decimal("10"),
+                    total_amount=Decimal("1000"),
+                    net_amount=Decimal("1000"),
+                    trade_date=datetime(2025, 1, 31) - timedelta(days=i),
+                    is_deleted=(i == 8),
+                )
+                for i in range(1, 10)
+            ]
+        )
+        await session.commit()
+        yield session
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_export_trades_streams_in_time_order(db, tmp_path, monkeypatch):
+    """交易按成交时间正序分批读取并逐行写入，末尾附汇总"""
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "DB_STREAM_BATCH_SIZE", 2)
+    service = ExportService()
+
+    task = await service.export_trades(db, 1, None, "csv", None, None, include_summary=True)
+    assert task["status"] == "completed"
+
+    path = service.get_export_file(1, task["task_id"])
+    with open(path, encoding="utf-8-sig") as file:
+        rows = list(csv.reader(file))
+
+    trade_rows = rows[1:8]
+    assert rows[0][0] == "成交时间"
+    assert [row[0][:10] for row in trade_rows] == [f"2025-01-{day:02d}" for day in range(24, 31)]
+    assert rows[-3:] == [["交易笔数", "7"], ["买入金额", "4000.0"], ["卖出金额", "3000.0"]]
+
+    # 其他用户、非法任务ID都找不到文件
+    with pytest.raises(ResourceNotFound):
+        service.get_export_file(2, task["task_id"])
+    with pytest.raises(ResourceNotFound):
+        service.get_export_file(1, "../1/" + task["task_id"])
+
+
+@pytest.mark.asyncio
+async def test_export_rejects_bad_parameters(db, tmp_path, monkeypatch):
+    """不支持的格式和不合法的日期直接报错，不生成文件"""
+    monkeypatch.setattr(settings, "EXPORT_DIR", str(tmp_path))
+
+    with pytest.raises(ValidationError):
+        await ExportService().export_trades(db, 1, None, "pdf", None, None, include_summary=False)
+    with pytest.raises(ValidationError):
+        await ExportService().export_trades(db, 1, None, "csv", "2025/01/01", None, include_summary=False)
+
+    assert list(tmp_path.iterdir()) == []
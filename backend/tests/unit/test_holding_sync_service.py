@@ -0,0 +1,266 @@
+"""
+持仓同步单元测试（全量重建、批量写入语句、交易变更时的增量更新）
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.exceptions import InsufficientHolding
+from app.repositories.holding_repo import HoldingRepository
+from app.services.holding.holding_delta_service import HoldingDeltaService
+from app.services.holding.holding_sync_service import HoldingSyncConverter, HoldingSyncService
+
+
+class FakeDB:
+    def __init__(self):
+        self.statements = []
+        self.flushes = 0
+        self.commits = 0
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(rowcount=1, scalar_one_or_none=lambda: None)
+
+    async def flush(self):
+        self.flushes += 1
+
+    async def commit(self):
+        self.commits += 1
+
+
+def _trade(trade_id, symbol, trade_type, quantity, price):
+    return SimpleNamespace(
+        trade_id=trade_id,
+        symbol=symbol,
+        stock_name=f"股票{symbol}",
+        trade_type=trade_type,
+        quantity=Decimal(quantity),
+        price=Decimal(price),
+        trade_date=datetime(2025, 1, 1) + timedelta(days=trade_id),
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+def _replay(trades, user_id=1, account_id=7):
+    holdings_state = {}
+    for trade in trades:
+        HoldingSyncConverter.accumulate(holdings_state, user_id, account_id, trade)
+    return HoldingSyncConverter.build_holdings_data(holdings_state)
+
+
+def test_holdings_accumulate_trades_and_skip_closed_positions():
+    """逐笔累计交易（按成交时间正序），清仓的股票不生成持仓"""
+    trades = [
+        _trade(1, "600519", "buy", "100", "10"),
+        _trade(2, "600519", "buy", "100", "20"),
+        _trade(3, "600519", "sell", "50", "30"),
+        _trade(4, "000858", "buy", "100", "10"),
+        _trade(5, "000858", "sell", "100", "12"),
+    ]
+
+    holdings = _replay(trades)
+
+    assert list(holdings) == ["600519"]
+    assert holdings["600519"] == {
+        "user_id": 1,
+        "account_id": 7,
+        "symbol": "600519",
+        "stock_name": "股票600519",
+        "quantity": Decimal("150"),
+        "available_quantity": Decimal("150"),
+        "avg_cost": Decimal("15"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_sync_writes_all_holdings_in_one_transaction():
+    """全部持仓一条 ON CONFLICT 语句写入，已清仓持仓软删除，只flush不提交（由请求事务统一提交）"""
+    holdings = _replay([_trade(i, f"600{i:03d}", "buy", "100", "10") for i in range(1, 301)])
+    db = FakeDB()
+
+    closed = await HoldingRepository().sync_account_holdings(db, 7, list(holdings.values()))
+
+    upsert, soft_delete = db.statements
+    assert upsert.count("INSERT INTO holdings") == 1
+    assert "ON CONFLICT (account_id, symbol) WHERE is_deleted = false DO UPDATE" in upsert
+    assert "avg_cost = excluded.avg_cost" in upsert
+    assert soft_delete.startswith("UPDATE holdings SET")
+    assert "holdings.symbol NOT IN" in soft_delete
+    assert (db.flushes, db.commits) == (1, 0)
+    assert closed == 1
+
+
+@pytest.mark.asyncio
+async def test_sync_response_counts_written_and_closed_holdings():
+    """同步响应：total_holdings 为同步后的持仓数，updated_count 含软删除的已清仓持仓"""
+    trades = [
+        _trade(1, "600519", "buy", "100", "10"),
+        _trade(2, "000858", "buy", "100", "10"),
+        _trade(3, "000858", "sell", "100", "12"),
+    ]
+
+    async def stream_by_account(db, account_id):
+        for trade in trades:
+            yield trade
+
+    async def sync_account_holdings(db, account_id, holdings):
+        assert [holding["symbol"] for holding in holdings] == ["600519"]
+        return 2
+
+    async def get_by_id(db, account_id):
+        return SimpleNamespace(account_id=account_id, user_id=1)
+
+    service = HoldingSyncService.__new__(HoldingSyncService)
+    service.account_repo = SimpleNamespace(get_by_id=get_by_id)
+    service.trade_repo = SimpleNamespace(stream_by_account=stream_by_account)
+    service.holding_repo = SimpleNamespace(sync_account_holdings=sync_account_holdings)
+
+    result = await service.execute(None, user_id=1, account_id=7)
+
+    assert (result["total_holdings"], result["closed_count"], result["updated_count"]) == (1, 2, 3)
+
+
+class FakeHoldingRepo:
+    def __init__(self):
+        self.rows = []
+        # 模拟并发事务在本次读取之后抢先建仓
+        self.concurrent_rows = []
+
+    async def get_for_update(self, db, account_id, symbol):
+        live = [h for h in self.rows if h.account_id == account_id and h.symbol == symbol and not h.is_deleted]
+        return live[0] if live else None
+
+    async def create_if_absent(self, db, data):
+        self.rows.extend(self.concurrent_rows)
+        self.concurrent_rows = []
+        if await self.get_for_update(db, data["account_id"], data["symbol"]):
+            return None
+        holding = SimpleNamespace(is_deleted=False, **data)
+        self.rows.append(holding)
+        return holding
+
+    async def get_latest_deleted(self, db, account_id, symbol):
+        closed = [h for h in self.rows if h.account_id == account_id and h.symbol == symbol and h.is_deleted]
+        return closed[-1] if closed else None
+
+    async def assign(self, db, holding, data):
+        for key, value in data.items():
+            setattr(holding, key, value)
+        return holding
+
+
+@pytest.mark.asyncio
+async def test_incremental_delta_matches_full_replay():
+    """逐笔增量更新与全量重放结果一致；撤销交易恢复原持仓，清仓时软删除"""
+    service = HoldingDeltaService.__new__(HoldingDeltaService)
+    service.holding_repo = FakeHoldingRepo()
+    trades = [
+        _trade(1, "600519", "buy", "100", "10"),
+        _trade(2, "600519", "buy", "100", "20"),
+        _trade(3, "600519", "sell", "50", "30"),
+    ]
+    for trade in trades:
+        trade.user_id, trade.account_id = 1, 7
+        await service.apply(None, trade)
+
+    (holding,) = service.holding_repo.rows
+    replayed = _replay(trades)["600519"]
+    assert (holding.quantity, holding.avg_cost) == (replayed["quantity"], replayed["avg_cost"])
+
+    # 依次撤销卖出和第二笔买入
+    await service.apply(None, trades[2], reverse=True)
+    await service.apply(None, trades[1], reverse=True)
+    assert (holding.quantity, holding.avg_cost) == (Decimal("100"), Decimal("10"))
+
+    # 撤销第一笔买入后清仓
+    await service.apply(None, trades[0], reverse=True)
+    assert holding.is_deleted and holding.quantity == 0
+
+
+@pytest.mark.asyncio
+async def test_delta_rejects_oversell_and_merges_concurrent_first_buy():
+    """卖出超过持仓时拒绝；并发首笔买入冲突时在已建的持仓上累加；修改交易只校验最终持仓"""
+    service = HoldingDeltaService.__new__(HoldingDeltaService)
+    service.holding_repo = FakeHoldingRepo()
+
+    def trade(trade_id, trade_type, quantity, price):
+        t = _trade(trade_id, "600519", trade_type, quantity, price)
+        t.user_id, t.account_id = 1, 7
+        return t
+
+    with pytest.raises(InsufficientHolding):
+        await service.apply(None, trade(1, "sell", "10", "10"))
+    assert service.holding_repo.rows == []
+
+    # 并发事务已建仓 100@10：本次买入 100@20 合并为 200@15
+    service.holding_repo.concurrent_rows = [
+        SimpleNamespace(
+            account_id=7, symbol="600519", quantity=Decimal("100"), avg_cost=Decimal("10"), is_deleted=False
+        )
+    ]
+    await service.apply(None, trade(2, "buy", "100", "20"))
+    (holding,) = service.holding_repo.rows
+    assert (holding.quantity, holding.avg_cost) == (Decimal("200"), Decimal("15"))
+
+    with pytest.raises(InsufficientHolding):
+        await service.apply(None, trade(3, "sell", "201", "30"))
+    await service.apply(None, trade(4, "sell", "150", "30"))
+
+    # 撤销买入后持仓为负：拒绝删除；修改价格时中间状态为负但最终持仓有效
+    with pytest.raises(InsufficientHolding):
+        await service.apply(None, trade(2, "buy", "100", "20"), reverse=True)
+    await service.replace(None, trade(2, "buy", "100", "20"), trade(2, "buy", "100", "22"))
+    assert holding.quantity == Decimal("50") and not holding.is_deleted
+
+
+@pytest.mark.asyncio
+async def test_create_if_absent_uses_partial_unique_index():
+    """首次建仓的冲突目标与批量同步一致（未删除记录上的唯一部分索引）"""
+    db = FakeDB()
+
+    created = await HoldingRepository().create_if_absent(
+        db, {"user_id": 1, "account_id": 7, "symbol": "600519", "quantity": Decimal("100")}
+    )
+
+    (statement,) = db.statements
+    assert "ON CONFLICT (account_id, symbol) WHERE is_deleted = false DO NOTHING RETURNING" in statement
+    assert created is None
+
+
+@pytest.mark.asyncio
+async def test_undoing_close_out_sell_restores_original_cost():
+    """撤销清仓的卖出时按清仓前的成本恢复持仓；没有已清仓持仓记录时回放该股票的交易"""
+    service = HoldingDeltaService.__new__(HoldingDeltaService)
+    service.holding_repo = FakeHoldingRepo()
+
+    buy = _trade(1, "600519", "buy", "100", "10")
+    sell = _trade(2, "600519", "sell", "100", "15")
+    for trade in (buy, sell):
+        trade.user_id, trade.account_id = 1, 7
+
+    # 1. 建仓 → 清仓 → 删除卖出：成本为买入价而不是卖出价
+    await service.apply(None, buy)
+    await service.apply(None, sell)
+    assert service.holding_repo.rows[0].is_deleted
+    await service.apply(None, sell, reverse=True)
+    restored = await service.holding_repo.get_for_update(None, 7, "600519")
+    assert (restored.quantity, restored.avg_cost) == (Decimal("100"), Decimal("10"))
+
+    # 2. 没有已清仓的持仓记录（持仓从未同步）：按成交时间正序回放该股票的交易得到成本
+    streamed = []
+
+    async def stream_by_account(db, account_id, symbol=None):
+        streamed.append((account_id, symbol))
+        for trade in (buy, sell):
+            yield trade
+
+    service.holding_repo = FakeHoldingRepo()
+    service.trade_repo = SimpleNamespace(stream_by_account=stream_by_account)
+    await service.apply(None, sell, reverse=True)
+    (restored,) = service.holding_repo.rows
+    assert (restored.quantity, restored.avg_cost) == (Decimal("100"), Decimal("10"))
+    assert streamed == [(7, "600519")]
@@ -0,0 +1,90 @@
+"""
+技术指标引擎单元测试
+
+以逐行循环/pandas实现作为参考值，校验向量化实现的结果。
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.indicators import (
+    align_series,
+    compute_indicators,
+    kdj,
+    latest_indicators,
+    moving_average,
+    rsi,
+)
+
+
+@pytest.fixture
+def panel():
+    """3只股票 × 80个交易日的随机价格"""
+    rng = np.random.default_rng(0)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, size=(3, 80)), axis=1))
+    return close, close * 1.01, close * 0.99
+
+
+def test_moving_average_matches_pandas(panel):
+    """MA与pandas rolling结果一致"""
+    close, _, _ = panel
+    expected = pd.DataFrame(close.T).rolling(20).mean().to_numpy().T
+    np.testing.assert_allclose(moving_average(close, 20), expected, equal_nan=True)
+
+
+def test_ema_and_macd_match_pandas(panel):
+    """EMA/MACD与pandas ewm(adjust=False)结果一致"""
+    close, high, low = panel
+    result = compute_indicators(close, high, low)
+
+    frame = pd.DataFrame(close.T)
+    ema12 = frame.ewm(span=12, adjust=False).mean()
+    ema26 = frame.ewm(span=26, adjust=False).mean()
+    dif = ema12 - ema26
+    dea = dif.ewm(span=9, adjust=False).mean()
+
+    np.testing.assert_allclose(result["ema12"], ema12.to_numpy().T)
+    np.testing.assert_allclose(result["macd_dif"], dif.to_numpy().T)
+    np.testing.assert_allclose(result["macd"], 2 * (dif - dea).to_numpy().T)
+
+
+def test_kdj_and_rsi_match_loop_reference(panel):
+    """KDJ/RSI与逐日循环的参考实现一致"""
+    close, high, low = panel
+    k_values, d_values = kdj(close, high, low)["k"], kdj(close, high, low)["d"]
+    rsi_values = rsi(close)
+
+    row = 1
+    k = d = 50.0
+    gain = loss = None
+    for t in range(close.shape[1]):
+        if t >= 8:
+            highest, lowest = high[row, t - 8 : t + 1].max(), low[row, t - 8 : t + 1].min()
+            rsv = (close[row, t] - lowest) / (highest - lowest) * 100
+            k = (2 * k + rsv) / 3
+            d = (2 * d + k) / 3
+            assert k_values[row, t] == pytest.approx(k)
+            assert d_values[row, t] == pytest.approx(d)
+        else:
+            assert np.isnan(k_values[row, t])
+
+        if t >= 1:
+            delta = close[row, t] - close[row, t - 1]
+            up, down = max(delta, 0.0), max(-delta, 0.0)
+            gain = up if gain is None else (gain * 13 + up) / 14
+            loss = down if loss is None else (loss * 13 + down) / 14
+            assert rsi_values[row, t] == pytest.approx(gain / (gain + loss) * 100)
+
+
+def test_short_history_is_left_padded_with_nan():
+    """历史较短的股票左侧补NaN，不足以计算的指标返回None"""
+    panel = align_series([np.arange(1, 71, dtype=float), np.arange(1, 11, dtype=float)])
+    assert panel.shape == (2, 70)
+    assert np.isnan(panel[1, :60]).all()
+
+    rows = latest_indicators(panel)
+    assert rows[0]["ma60"] == pytest.approx(np.arange(11, 71).mean())
+    assert rows[1]["ma5"] == pytest.approx(8.0)
+    assert rows[1]["ma20"] is None
+    assert rows[1]["ma60"] is None
+    assert rows[1]["rsi"] == 100.0
@@ -0,0 +1,130 @@
+"""
+本地日线存储单元测试
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.ohlcv_store import BAR_DTYPE, OHLCVStore, build_bars
+from app.utils.tushare_client import TushareClient
+
+
+def _bars(dates, start_price=10.0):
+    prices = start_price + np.arange(len(dates), dtype=float)
+    return build_bars(
+        {"date": dates, "open": prices, "high": prices + 1, "low": prices - 1, "close": prices, "volume": prices * 100}
+    )
+
+
+def test_append_only_keeps_new_trading_days(tmp_path):
+    """追加时忽略已存在/重复的交易日，读取按交易日升序"""
+    store = OHLCVStore(str(tmp_path))
+
+    assert store.last_date("tushare", "600519") is None
+    assert len(store.read("tushare", "600519")) == 0
+
+    assert store.append("tushare", "600519", _bars([20250103, 20250102, 20250102])) == 2
+    assert store.append("tushare", "600519", _bars([20250103, 20250106])) == 1
+
+    bars = store.read("tushare", "600519")
+    assert bars.dtype == BAR_DTYPE
+    assert list(bars["date"]) == [20250102, 20250103, 20250106]
+    assert store.last_date("tushare", "600519") == 20250106
+    assert list(store.read("tushare", "600519", days=2)["date"]) == [20250103, 20250106]
+
+
+def test_truncated_tail_record_is_ignored(tmp_path):
+    """未写完整的尾部记录在读取时忽略，追加前被截掉"""
+    store = OHLCVStore(str(tmp_path))
+    store.append("akshare", "000858", _bars([20250102]))
+
+    with open(store._path("akshare", "000858"), "ab") as f:
+        f.write(b"\x00" * 7)
+
+    assert len(store.read("akshare", "000858")) == 1
+    store.append("akshare", "000858", _bars([20250103]))
+    assert list(store.read("akshare", "000858")["date"]) == [20250102, 20250103]
+
+
+def test_invalid_source_or_symbol_is_rejected(tmp_path):
+    """数据源不在白名单或股票代码含路径字符时拒绝读写"""
+    store = OHLCVStore(str(tmp_path))
+
+    for source, symbol in [("../tushare", "600519"), ("tushare", "../600519"), ("tushare", "..")]:
+        with pytest.raises(ValueError):
+            store.last_date(source, symbol)
+        with pytest.raises(ValueError):
+            store.append(source, symbol, _bars([20250102]))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_panel_right_aligns_histories(tmp_path):
+    """价格矩阵右对齐，历史不足的股票左侧为NaN"""
+    store = OHLCVStore(str(tmp_path))
+    store.append("tushare", "600519", _bars([20250102, 20250103, 20250106]))
+    store.append("tushare", "000858", _bars([20250106]))
+
+    close, high, low, lengths = store.panel("tushare", ["600519", "000858", "300750"], days=3)
+
+    assert close.shape == (3, 3)
+    assert lengths == [3, 1, 0]
+    assert np.isnan(close[1, :2]).all() and close[1, 2] == 10.0
+    assert np.isnan(close[2]).all()
+    assert high[0, -1] == 13.0
+
+
+@pytest.mark.asyncio
+async def test_client_refresh_downloads_only_missing_days(tmp_path):
+    """技术指标基于本地日线计算，重复调用不再联网，新交易日只下载增量"""
+    client = TushareClient()
+    client.ohlcv_store = OHLCVStore(str(tmp_path))
+    calls = []
+
+    class FakePro:
+        @staticmethod
+        def daily(ts_code, start_date, end_date):
+            calls.append((ts_code, start_date, end_date))
+            dates = pd.bdate_range(start_date, end_date)
+            return pd.DataFrame(
+                {
+                    "trade_date": dates.strftime("%Y%m%d"),
+                    "open": np.linspace(10, 20, len(dates)),
+                    "high": np.linspace(11, 21, len(dates)),
+                    "low": np.linspace(9, 19, len(dates)),
+                    "close": np.linspace(10, 20, len(dates)),
+                    "vol": np.full(len(dates), 1000.0),
+                    "amount": np.full(len(dates), 5000.0),
+                }
+            )
+
+    client.pro = FakePro()
+    client.use_tushare = True
+    first_day = datetime.now()
+    next_day = first_day + timedelta(days=3)
+    client._last_closed_trade_date = lambda: first_day.strftime("%Y%m%d")
+
+    try:
+        technicals = await client.get_technical_indicators("600519")
+        assert len(calls) == 1
+        assert technicals["data_source"] == "tushare"
+        assert technicals["ma60"] is not None
+        assert technicals["rsi"] == 100.0
+
+        # 同一交易日再次查询：零网络调用
+        await client.get_batch_technical_indicators(["600519"])
+        assert len(calls) == 1
+
+        # 新交易日：只下载最后交易日之后的数据
+        last_date = client.ohlcv_store.last_date("tushare", "600519")
+        client._last_closed_trade_date = lambda: next_day.strftime("%Y%m%d")
+        appended = await client.refresh_daily_bars(["600519"])
+
+        start_date = datetime.strptime(str(last_date), "%Y%m%d") + timedelta(days=1)
+        assert calls[-1] == ("600519.SH", start_date.strftime("%Y%m%d"), next_day.strftime("%Y%m%d"))
+        assert appended == {"600519": len(pd.bdate_range(start_date, next_day))}
+        assert client.ohlcv_store.read("tushare", "600519")["volume"][-1] == 100000.0
+    finally:
+        client.shutdown()
@@ -0,0 +1,106 @@
+"""
+分页查询工具单元测试（SQLite内存库）与分页游标编解码测试
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, Integer, String, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.exceptions import ValidationError
+from app.repositories.pagination import count_rows, paginate, paginate_keyset
+from app.schemas.common import PaginationResponse
+from app.utils.cursor import decode_cursor, encode_cursor
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    row_id = Column(Integer, primary_key=True)
+    group_key = Column(String(10), nullable=False)
+    sort_key = Column(Integer, nullable=False)
+
+
+@pytest_asyncio.fixture
+async def db():
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        # 排序键有重复，用主键保证顺序唯一
+        session.add_all(
+            [Row(row_id=i, group_key="a" if i <= 45 else "b", sort_key=i // 3) for i in range(1, 51)]
+        )
+        await session.commit()
+        yield session
+
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_paginate_counts_with_sql(db):
+    """总数由count(*)统计，与排序和分页无关"""
+    query = select(Row).where(Row.group_key == "a").order_by(Row.row_id)
+
+    assert await count_rows(db, query.limit(5)) == 45
+
+    items, total = await paginate(db, query, page=3, page_size=20)
+    assert total == 45
+    assert [row.row_id for row in items] == [41, 42, 43, 44, 45]
+
+    items, total = await paginate(db, query, page=4, page_size=20)
+    assert items == [] and total == 45
+
+
+@pytest.mark.asyncio
+async def test_keyset_walks_all_rows_once(db):
+    """游标分页逐页遍历，不重复、不遗漏，最后一页没有下一页游标"""
+    query = select(Row).where(Row.group_key == "a")
+    keys = [Row.sort_key, Row.row_id]
+
+    seen = []
+    after = None
+    while True:
+        items, after = await paginate_keyset(db, query, keys, page_size=7, after=after)
+        seen.extend(row.row_id for row in items)
+        if after is None:
+            break
+
+    assert seen == list(range(45, 0, -1))
+
+    items, after = await paginate_keyset(db, query, keys, page_size=7, descending=False)
+    assert [row.row_id for row in items] == [1, 2, 3, 4, 5, 6, 7]
+    assert after == [2, 7]
+
+
+def test_cursor_round_trip_is_opaque():
+    """游标对前端不透明，解码后恢复排序键的原始类型"""
+    values = [datetime(2025, 1, 15, 9, 30, tzinfo=timezone.utc), datetime(2025, 1, 15, 10, 0), 42]
+    cursor = encode_cursor(values)
+
+    assert "2025" not in cursor
+    assert decode_cursor(cursor, 3) == values
+    assert encode_cursor(None) is None
+
+    with pytest.raises(ValidationError):
+        decode_cursor(cursor, 2)
+    with pytest.raises(ValidationError):
+        decode_cursor("not-a-cursor", 3)
+
+
+def test_pagination_response_modes():
+    """页码模式返回总数，游标模式只返回下一页游标"""
+    page = PaginationResponse.create(items=[1, 2], total=5, page=1, page_size=2, next_cursor="abc")
+    assert page.total_pages == 3 and page.has_more and page.next_cursor == "abc"
+
+    cursor_page = PaginationResponse.create_cursor(items=[1], page_size=2, next_cursor=None)
+    assert cursor_page.total is None and cursor_page.page is None
+    assert not cursor_page.has_more
@@ -0,0 +1,103 @@
+"""
+软删除查询条件单元测试
+
+对比旧写法（`Model.is_deleted is False`）与 SoftDeleteQueryMixin 生成的SQL和执行计划：
+旧写法被编译成常量 false，查不到任何记录，也用不上部分索引。
+"""
+
+import pytest
+from sqlalchemy import and_, create_engine, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.models.holding import Holding
+from app.repositories.event_repo import EventRepository
+from app.repositories.holding_repo import HoldingRepository
+from app.repositories.strategy_repo import StrategyRepository
+from app.repositories.trade_repo import TradeRepository
+
+# (Repository, 部分索引名)
+PARTIAL_INDEXES = [
+    (HoldingRepository, "idx_holdings_account_symbol_live"),
+    (TradeRepository, "idx_trades_account_date_live"),
+    (EventRepository, "idx_events_user_date_live"),
+    (StrategyRepository, "idx_strategies_user_status_live"),
+]
+
+
+def _pg(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def _explain(conn, query) -> str:
+    sql = str(query.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    return " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+def test_legacy_filter_compiles_to_constant_false():
+    """旧写法是Python身份比较，整条WHERE被折叠成常量 false"""
+    legacy = select(Holding).where(and_(Holding.account_id == 1, Holding.is_deleted is False))
+    fixed = select(Holding).where(Holding.account_id == 1, HoldingRepository.not_deleted())
+
+    assert _pg(legacy).endswith("WHERE false")
+    assert "account_id" not in _pg(legacy).split("WHERE")[1]
+    assert _pg(fixed).endswith("holdings.is_deleted = false")
+
+
+@pytest.mark.parametrize("repo, index_name", PARTIAL_INDEXES)
+def test_predicate_matches_partial_index(repo, index_name):
+    """Repository 的查询条件与部分索引谓词一致，规划器才能选用部分索引"""
+    table = repo.model.__table__
+    index = next(index for index in table.indexes if index.name == index_name)
+
+    predicate = str(index.dialect_options["postgresql"]["where"])
+    assert predicate == "is_deleted = false"
+    assert _pg(repo.not_deleted()) == f"{table.name}.{predicate}"
+
+
+def test_explain_before_and_after():
+    """执行计划：旧写法全表扫描且无结果，新写法走部分索引且只返回未删除记录"""
+    engine = create_engine("sqlite://")
+    Holding.__table__.create(engine)
+
+    with engine.begin() as conn:
+        # SQLite 忽略 postgresql_where，这里按相同谓词重建部分索引，并去掉同列的完整索引
+        conn.execute(text("DROP INDEX idx_holdings_account_symbol"))
+        conn.execute(text("DROP INDEX idx_holdings_account_symbol_live"))
+        conn.execute(
+            text("CREATE INDEX idx_holdings_account_symbol_live ON holdings (account_id, symbol) WHERE is_deleted = 0")
+        )
+        conn.execute(
+            Holding.__table__.insert(),
+            [
+                {
+                    "holding_id": 1,
+                    "user_id": 1,
+                    "account_id": 1,
+                    "symbol": "600519",
+                    "stock_name": "贵州茅台",
+                    "avg_cost": 1500,
+                    "is_deleted": False,
+                },
+                {
+                    "holding_id": 2,
+                    "user_id": 1,
+                    "account_id": 1,
+                    "symbol": "600519",
+                    "stock_name": "贵州茅台",
+                    "avg_cost": 1400,
+                    "is_deleted": True,
+                },
+            ],
+        )
+
+        conditions = [Holding.account_id == 1, Holding.symbol == "600519"]
+        legacy = select(Holding.holding_id).where(and_(*conditions, Holding.is_deleted is False))
+        fixed = select(Holding.holding_id).where(*conditions, HoldingRepository.not_deleted())
+
+        assert conn.execute(legacy).all() == []
+        assert "idx_holdings_account_symbol_live" not in _explain(conn, legacy)
+
+        assert conn.execute(fixed).scalars().all() == [1]
+        assert "USING INDEX idx_holdings_account_symbol_live" in _explain(conn, fixed)
+
+    engine.dispose()
@@ -0,0 +1,191 @@
+"""
+TushareClient 单元测试
+
+覆盖执行层（线程池、并发上限、超时）、行情快照缓存等不依赖真实数据源的逻辑。
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.utils.market_calendar import MARKET_TZ, is_trading_hours
+from app.utils.tushare_client import SpotSnapshotCache, TushareClient
+
+
+@pytest.fixture
+def client():
+    """无数据源配置的客户端（Mock模式）"""
+    c = TushareClient()
+    yield c
+    c.shutdown()
+
+
+def _slow_call(seconds: float) -> str:
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_run_sync_does_not_block_event_loop(client):
+    """SDK调用在线程池中执行，事件循环可以继续处理其他协程"""
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    thread_name, _ = await asyncio.gather(client._run_sync(_slow_call, 0.1), ticker())
+
+    assert thread_name.startswith("market-data")
+    assert len(ticks) == 5
+
+
+@pytest.mark.asyncio
+async def test_run_sync_respects_concurrency_limit(client):
+    """同时进行的上游调用数不超过 max_concurrency"""
+    client.max_concurrency = 2
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def tracked():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+
+    await asyncio.gather(*[client._run_sync(tracked) for _ in range(6)])
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_run_sync_timeout(client):
+    """超时抛出 TimeoutError，且释放并发名额"""
+    client.max_concurrency = 1
+
+    with pytest.raises(TimeoutError):
+        await client._run_sync(_slow_call, 0.5, timeout=0.05)
+
+    # 名额已释放，后续调用可以立即执行
+    assert (await client._run_sync(_slow_call, 0, timeout=1)).startswith("market-data")
+
+
+@pytest.mark.parametrize(
+    "moment,expected",
+    [
+        (datetime(2025, 11, 18, 10, 0, tzinfo=MARKET_TZ), True),  # 周二上午
+        (datetime(2025, 11, 18, 12, 0, tzinfo=MARKET_TZ), False),  # 午间休市
+        (datetime(2025, 11, 18, 14, 59, tzinfo=MARKET_TZ), True),
+        (datetime(2025, 11, 18, 15, 30, tzinfo=MARKET_TZ), False),  # 收盘后
+        (datetime(2025, 11, 22, 10, 0, tzinfo=MARKET_TZ), False),  # 周六
+    ],
+)
+def test_is_trading_hours(moment, expected):
+    """交易时段判断"""
+    assert is_trading_hours(moment) is expected
+
+
+@pytest.mark.asyncio
+async def test_spot_snapshot_single_flight():
+    """并发请求共享同一次全市场快照下载，过期前不会重复下载"""
+    cache = SpotSnapshotCache(trading_ttl=60, closed_ttl=60)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"600519": {"最新价": 1650.5}, "000858": {"最新价": 150.2}}
+
+    results = await asyncio.gather(*[cache.get_rows(fetch) for _ in range(20)])
+    assert calls == 1
+    assert all(r["600519"]["最新价"] == 1650.5 for r in results)
+
+    await cache.get_rows(fetch)
+    assert calls == 1
+
+    cache.invalidate()
+    await cache.get_rows(fetch)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_akshare_quote_uses_shared_snapshot(client):
+    """多只股票的行情查询只下载一次全市场数据"""
+    import pandas as pd
+
+    downloads = 0
+
+    class FakeAkShare:
+        @staticmethod
+        def stock_zh_a_spot_em():
+            nonlocal downloads
+            downloads += 1
+            return pd.DataFrame(
+                [
+                    {"代码": "600519", "最新价": 1650.5, "成交量": 1000, "昨收": 1630.0},
+                    {"代码": "000858", "最新价": 150.2, "成交量": 2000, "昨收": 149.0},
+                ]
+            )
+
+    client.akshare = FakeAkShare()
+    client.use_akshare = True
+
+    quotes = await asyncio.gather(*[client.get_realtime_quote(s) for s in ["600519", "000858", "300750"]])
+
+    assert downloads == 1
+    assert quotes[0]["current_price"] == 1650.5
+    assert quotes[1]["volume"] == 2000
+    assert quotes[2] is None
+
+
+@pytest.mark.asyncio
+async def test_tushare_batch_quotes_use_multi_code_query(client):
+    """Tushare批量行情：多代码一次查询，当天缺失的股票回溯取最新一条"""
+    import pandas as pd
+
+    calls = []
+
+    class FakePro:
+        @staticmethod
+        def daily(ts_code, **kwargs):
+            calls.append((ts_code, kwargs))
+            if "trade_date" in kwargs:
+                return pd.DataFrame(
+                    [{"ts_code": "600519.SH", "trade_date": kwargs["trade_date"], "close": 1650.0, "pre_close": 1600.0}]
+                )
+            return pd.DataFrame(
+                [
+                    {"ts_code": "000858.SZ", "trade_date": "20250102", "close": 150.0, "pre_close": 148.0},
+                    {"ts_code": "000858.SZ", "trade_date": "20250103", "close": 152.0, "pre_close": 150.0},
+                ]
+            )
+
+    client.pro = FakePro()
+    client.use_tushare = True
+
+    quotes = await client.get_realtime_quotes(["600519", "000858", "600519", "300750"])
+
+    assert len(calls) == 2
+    assert calls[0][0] == "600519.SH,000858.SZ,300750.SZ"
+    assert calls[1][0] == "000858.SZ,300750.SZ"
+    assert set(quotes) == {"600519", "000858"}
+    assert quotes["600519"]["change_percent"] == 3.12
+    assert quotes["000858"]["trade_date"] == "20250103"
+    assert quotes["000858"]["current_price"] == 152.0
+
+
+@pytest.mark.asyncio
+async def test_mock_batch_quotes(client):
+    """无数据源时批量行情返回每只股票的Mock数据"""
+    quotes = await client.get_realtime_quotes(["600519", "000858"])
+    assert set(quotes) == {"600519", "000858"}
+    assert await client.get_realtime_quotes([]) == {}
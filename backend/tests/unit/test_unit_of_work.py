@@ -0,0 +1,78 @@
+"""
+请求级事务单元测试（SQLite内存库，统计每个接口的数据库往返）
+"""
+
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import Integer, MetaData, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core import database
+from app.core.dependencies import get_current_user
+from app.main import app
+from app.models.account import Account
+
+
+@pytest_asyncio.fixture
+async def client(monkeypatch):
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    # SQLite 只有 INTEGER 主键自增，这里复制表结构并替换主键类型
+    table = Account.__table__.to_metadata(MetaData())
+    table.c.account_id.type = Integer()
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: table.create(sync_conn))
+
+    round_trips = {"statements": [], "commits": 0, "rollbacks": 0}
+
+    def count(name):
+        def listener(conn):
+            round_trips[name] += 1
+
+        return listener
+
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: round_trips["statements"].append(args[2]))
+    event.listen(engine.sync_engine, "commit", count("commits"))
+    event.listen(engine.sync_engine, "rollback", count("rollbacks"))
+
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(user_id=1)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http_client:
+        http_client.round_trips = round_trips
+        yield http_client
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_create_commits_once_without_refresh(client):
+    """创建账户：查重 + INSERT ... RETURNING，整个请求只提交一次，不再 refresh"""
+    payload = {"account_name": "我的A股账户", "market": "A-share", "initial_capital": 1000}
+
+    response = await client.post("/api/v1/account/create", json=payload)
+    body = response.json()
+    statements = client.round_trips["statements"]
+
+    assert body["code"] == 0 and body["data"]["created_at"]
+    assert len(statements) == 2
+    assert statements[0].startswith("SELECT")
+    assert statements[1].startswith("INSERT INTO accounts") and "RETURNING" in statements[1]
+    assert client.round_trips["commits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_request_rolls_back(client):
+    """业务异常时请求事务回滚，不提交"""
+    payload = {"account_name": "我的A股账户", "market": "A-share"}
+    await client.post("/api/v1/account/create", json=payload)
+
+    response = await client.post("/api/v1/account/create", json=payload)
+
+    assert response.json()["code"] != 0
+    assert client.round_trips["commits"] == 1
+    assert client.round_trips["rollbacks"] >= 1
@@ -0,0 +1,114 @@
+"""
+认证用户缓存单元测试（SQLite内存库，统计用户查询次数）
+"""
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core import dependencies
+from app.core import user_cache as user_cache_module
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.core.user_cache import UserCache
+from app.models.user import User
+
+
+@pytest_asyncio.fixture
+async def db(monkeypatch):
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: User.__table__.create(sync_conn))
+
+    cache = UserCache(backend="memory", ttl=30, redis_ttl=300, max_size=16, redis_url="")
+    monkeypatch.setattr(user_cache_module, "user_cache", cache)
+    monkeypatch.setattr(dependencies, "user_cache", cache)
+
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        session.add(User(user_id=1, username="alice", password_hash="x", nickname="Alice"))
+        await session.commit()
+
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        session.info["user_queries"] = lambda: [sql for sql in statements if sql.startswith("SELECT")]
+        yield session
+
+    await engine.dispose()
+
+
+def _token(version=0, **claims):
+    return create_access_token({"sub": "1", "username": "alice", "ver": version, **claims})
+
+
+@pytest.mark.asyncio
+async def test_cached_user_skips_database(db):
+    """第二次认证命中缓存，不再查询 users 表；缓存对象不含密码哈希"""
+    first = await dependencies.get_current_user(token=_token(), db=db)
+    second = await dependencies.get_current_user(token=_token(), db=db)
+
+    assert len(db.info["user_queries"]()) == 1
+    assert first.nickname == second.nickname == "Alice"
+    assert second.password_hash is None
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_and_deactivation_revokes_tokens(db):
+    """修改资料后缓存失效；停用账户时令牌版本递增，旧令牌被拒绝"""
+    user = await dependencies.get_current_user(token=_token(), db=db)
+    row = await db.get(User, user.user_id)
+
+    # 1. 修改昵称：提交后缓存失效，令牌仍然有效
+    row.nickname = "Alice Wang"
+    await db.commit()
+    user = await dependencies.get_current_user(token=_token(), db=db)
+    assert user.nickname == "Alice Wang"
+    # 首次认证 + 失效后重新查询（db.get 命中会话的identity map，不查询）
+    assert len(db.info["user_queries"]()) == 2
+
+    # 2. 停用账户：令牌版本递增，旧令牌不再有效
+    row.is_active = False
+    await db.commit()
+    assert row.token_version == 1
+    with pytest.raises(HTTPException) as exc_info:
+        await dependencies.get_current_user(token=_token(), db=db)
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_read_only_endpoints_can_trust_claims(db, monkeypatch):
+    """开启 AUTH_TRUST_JWT_CLAIMS 后只读接口直接使用令牌中的用户信息；缺少 active 声明的旧令牌查询用户"""
+    monkeypatch.setattr(settings, "AUTH_TRUST_JWT_CLAIMS", True)
+
+    user = await dependencies.get_current_user_read_only(token=_token(active=True), db=db)
+
+    assert (user.user_id, user.username, user.is_active) == (1, "alice", True)
+    assert db.info["user_queries"]() == []
+    with pytest.raises(HTTPException):
+        await dependencies.get_current_user_read_only(token=_token(active=False), db=db)
+
+    legacy = await dependencies.get_current_user_read_only(token=_token(), db=db)
+    assert legacy.nickname == "Alice" and len(db.info["user_queries"]()) == 1
+    with pytest.raises(HTTPException):
+        await dependencies.get_current_user_read_only(token="not-a-jwt", db=db)
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl(monkeypatch):
+    """超出容量淘汰最久未使用的条目，过期条目视为未命中"""
+    cache = UserCache(backend="memory", ttl=30, redis_ttl=300, max_size=2, redis_url="")
+    for user_id in (1, 2):
+        await cache.set(User(user_id=user_id, username=f"u{user_id}", token_version=0))
+
+    assert await cache.get(1, 0)
+    await cache.set(User(user_id=3, username="u3", token_version=0))
+    assert await cache.get(2, 0) is None
+    assert await cache.get(1, 0) and await cache.get(3, 0)
+    assert await cache.get(1, 1) is None
+
+    now = user_cache_module.time.monotonic()
+    monkeypatch.setattr(user_cache_module.time, "monotonic", lambda: now + 31)
+    assert await cache.get(1, 0) is None